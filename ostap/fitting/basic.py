@@ -1272,8 +1272,7 @@ class PDF (object) :
         >>>  pdf.fitTo ( ... )
         >>>  print 'MEDIAN: %s ' % pdf.median()
         """
-        from ostap.stats.moments import median as _median
-        return self._gets_stat_ ( _median )
+        return self.summary().median()
 
     ## get the effective mean
     def get_mean ( self ) :
@@ -1313,8 +1312,7 @@ class PDF (object) :
         >>>  pdf.fitTo ( ... )
         >>>  print 'QUANTILE: %s ' % pdf.quantile ( 0.10 )
         """
-        from ostap.stats.moments import quantile as _quantile
-        return self._get_stat_ ( quantile , prob ) 
+        return self.summary().quantile ( prob ) 
 
 
     ## get the symmetric confidence interval 
@@ -1324,8 +1322,7 @@ class PDF (object) :
         >>>  pdf.fitTo ( ... )
         >>>  print 'CL :  ',  pdf.cl_symm ( 0.10 )
         """
-        from ostap.stats.moments import cl_symm as _cl
-        return self._get_sstat_ ( _cl , prob , x0 ) 
+        return self.summary().cl_symm ( prob , x0 ) 
 
     ## get the asymmetric confidence interval 
     def cl_asymm ( self , prob ) :
@@ -1334,8 +1331,29 @@ class PDF (object) :
         >>>  pdf.fitTo ( ... )
         >>>  print 'CL :  ',  pdf.cl_asymm ( 0.10 )
         """
-        from ostap.stats.moments import cl_asymm as _cl
-        return self._get_sstat_ ( _cl , prob )
+        return self.summary().cl_asymm ( prob )
+
+    ## get the ``distribution summary'' with tabulated CDF
+    #  @code
+    #  pdf = ...
+    #  pdf.fitTo ( ... )
+    #  s   = pdf.summary() 
+    #  print s.median() , s.quantile ( 0.1 ) , s.cl_symm ( 0.68 ) 
+    #  @endcode
+    #  - the summary is cached for the given values of parameters (if exposed via pars())
+    #  @see ostap.stats.moments.Summary 
+    #  @see ostap.math.integral.integral_memo
+    def summary ( self ) :
+        """Get the ``distribution summary'' with tabulated CDF:
+        CDF is tabulated once and then used for many queries 
+        >>>  pdf = ...
+        >>>  pdf.fitTo ( ... )
+        >>>  s   = pdf.summary() 
+        >>>  print s.median() , s.quantile ( 0.1 ) , s.cl_symm ( 0.68 )
+        - the summary is cached for the given values of parameters (if exposed via pars())
+        """
+        from ostap.stats.moments import summary as _summary
+        return self._get_stat_ ( _summary )
     
     ## get the integral between xmin and xmax 
     def integral ( self , xmin , xmax ) :
@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+## @file ostap/fitting/dscache.py
+#  Content-addressed on-disk cache of datasets, produced from TTree/TChain
+#  by <code>make_dataset</code> or <code>process(selector)</code>.
+#
+#  The cache key is built from
+#  - the identity of the input files: name, size, modification time and UUID
+#  - the name of the tree
+#  - the variables: names, descriptions, ranges and accessors
+#  - the selection string and additional cuts
+#  - the processed range of entries
+#
+#  The datasets are stored in ROOT-files (one file per key) using the columnar
+#  vector storage of RooFit. The total size of the cache is capped
+#  and the least recently used entries are evicted first.
+#
+#  @code
+#  from ostap.fitting.dscache import DataSetCache
+#  cache = DataSetCache ( maxsize = 10 * 1024**3 )
+#  chain = ...
+#  selector = SelectorWithVars ( ... )
+#  chain.process ( selector , cache = cache ) ## the first time: process and store
+#  chain.process ( selector , cache = cache ) ## the second time: just load
+#  @endcode
+#  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
+#  @date 2019-03-10
+# =============================================================================
+""" Content-addressed on-disk cache of datasets, produced from TTree/TChain
+by `make_dataset` or `process(selector)`.
+
+The cache key is built from
+- the identity of the input files: name, size, modification time and UUID
+- the name of the tree
+- the variables: names, descriptions, ranges and accessors
+- the selection string and additional cuts
+- the processed range of entries
+
+The datasets are stored in ROOT-files (one file per key) using the columnar
+vector storage of RooFit. The total size of the cache is capped
+and the least recently used entries are evicted first.
+
+>>> from ostap.fitting.dscache import DataSetCache
+>>> cache = DataSetCache ( maxsize = 10 * 1024**3 )
+>>> chain = ...
+>>> selector = SelectorWithVars ( ... )
+>>> chain.process ( selector , cache = cache ) ## the first time: process and store
+>>> chain.process ( selector , cache = cache ) ## the second time: just load
+"""
+# =============================================================================
+__version__ = "$Revision$"
+__author__  = "Vanya BELYAEV Ivan.Belyaev@itep.ru"
+__date__    = "2019-03-10"
+__all__     = (
+    'DataSetCache'  , ## content-addressed cache of datasets
+    'default_cache' , ## get the default cache instance
+    )
+# =============================================================================
+import ROOT, os, hashlib, types
+import ostap.io.root_file
+# =============================================================================
+# logging
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' ==  __name__ : logger = getLogger ( 'ostap.fitting.dscache' )
+else                       : logger = getLogger ( __name__                )
+# =============================================================================
+## the internals of the callable object, used for the cache key
+#  - the code (recursively for the nested code objects), the names,
+#    the default arguments and the values captured in the closure
+#  - for callable instances also their attributes
+#  The addresses of objects never enter the key, therefore it is the same
+#  in different processes 
+def _internals_ ( obj ) :
+    """The internals of the callable object, used for the cache key
+    - the code (recursively for the nested code objects), the names,
+    the default arguments and the values captured in the closure
+    - for callable instances also their attributes
+    The addresses of objects never enter the key, therefore it is the same
+    in different processes 
+    """
+    if   obj is None                   : return ''
+    elif isinstance ( obj , str      ) : return obj.strip()
+    elif isinstance ( obj , ROOT.TCut) : return str ( obj ).strip()
+    return repr ( _value_internals_ ( obj ) ) 
+
+## the address-free representation of the value (used for the cache key)
+def _value_internals_ ( value , depth = 0 ) :
+    """The address-free representation of the value (used for the cache key)"""
+    if 10 < depth : return type ( value ).__name__ ## protection against the cycles  
+    depth += 1 
+    if   value is None or isinstance ( value , ( bool , int , long , float , complex , str , unicode ) ) :
+        return value
+    elif isinstance ( value , ROOT.TCut ) : return str ( value ).strip()
+    elif isinstance ( value , types.CodeType ) :
+        return ( value.co_code , value.co_names ,
+                 tuple ( _value_internals_ ( c , depth ) for c in value.co_consts ) )
+    elif isinstance ( value , ( tuple , list , set , frozenset ) ) :
+        items = tuple ( _value_internals_ ( v , depth ) for v in value )
+        return type ( value ).__name__ , tuple ( sorted ( items ) ) if isinstance ( value , ( set , frozenset ) ) else items
+    elif isinstance ( value , dict ) :
+        return 'dict' , tuple ( sorted ( ( _value_internals_ ( k , depth ) , _value_internals_ ( v , depth ) )
+                                         for k , v in value.items () ) )
+    ## functions and methods 
+    func = getattr ( value , '__func__' , value )
+    code = getattr ( func  , '__code__' , None )
+    if code is not None :
+        cells = []
+        for cell in ( getattr ( func , '__closure__' , None ) or () ) :
+            try               : cells.append ( _value_internals_ ( cell.cell_contents , depth ) )
+            except ValueError : cells.append ( '<empty>' )
+        result = ( _value_internals_ ( code , depth ) ,
+                   _value_internals_ ( getattr ( func , '__defaults__' , None ) , depth ) ,
+                   tuple ( cells ) )
+        this = getattr ( value , '__self__' , None )
+        if this is not None : result += ( _value_internals_ ( this , depth ) , )
+        return result
+    ## callable instances: the code of __call__ and the attributes
+    call = getattr ( type ( value ) , '__call__' , None )
+    call = getattr ( call , '__func__' , call )
+    if getattr ( call , '__code__' , None ) is not None :
+        return ( type ( value ).__name__ , _value_internals_ ( call , depth ) ,
+                 _value_internals_ ( getattr ( value , '__dict__' , {} ) , depth ) )
+    ## other objects: the representation without the address
+    text = repr ( value )
+    return type ( value ).__name__ if ' at 0x' in text else text 
+
+# =============================================================================
+## get the identity of the file: name, size, modification time and UUID
+def _file_id_ ( fname ) :
+    """Get the identity of the file: name, size, modification time and UUID"""
+    size , mtime = -1 , -1
+    if os.path.exists ( fname ) :
+        st    = os.stat ( fname )
+        fname = os.path.abspath ( fname )
+        size , mtime = st.st_size , int ( st.st_mtime )
+    uuid = ''
+    rfile = ROOT.TFile.Open ( fname , 'READ' )
+    if rfile :
+        uuid = rfile.GetUUID().AsString()
+        rfile.Close()
+    return fname , size , mtime , uuid
+
+# =============================================================================
+## get the list of files for the tree/chain
+def _tree_files_ ( tree ) :
+    """Get the list of files for the tree/chain"""
+    if isinstance ( tree , ROOT.TChain ) :
+        return [ f.GetTitle() for f in tree.GetListOfFiles() ]
+    tdir  = tree.GetDirectory()
+    rfile = tdir.GetFile() if tdir else None
+    return [ rfile.GetName() ] if rfile else []
+
+# =============================================================================
+## @class DataSetCache
+#  Content-addressed on-disk cache of datasets with LRU eviction
+#  @code
+#  cache = DataSetCache ( maxsize = 10 * 1024**3 )
+#  key   = cache.key ( chain , selector.variables , selector.selection )
+#  if key in cache : ds , stat = cache [ key ]
+#  else            :
+#     ...
+#     cache [ key ] = ds , stat
+#  @endcode
+class DataSetCache(object) :
+    """Content-addressed on-disk cache of datasets with LRU eviction
+    >>> cache = DataSetCache ( maxsize = 10 * 1024**3 )
+    >>> key   = cache.key ( chain , selector.variables , selector.selection )
+    >>> if key in cache : ds , stat = cache [ key ]
+    >>> else            :
+    ...    ...
+    ...    cache [ key ] = ds , stat
+    """
+    def __init__ ( self , cachedir = None , maxsize = 2 * 1024**3 ) :
+
+        if not cachedir :
+            from ostap.core.workdir import workdir
+            cachedir = os.path.join ( workdir , 'cache' , 'datasets' )
+
+        cachedir = os.path.expandvars ( os.path.expanduser ( cachedir ) )
+        if not os.path.exists ( cachedir ) : os.makedirs ( cachedir )
+
+        assert os.path.isdir ( cachedir ) , \
+               "DataSetCache: invalid cache directory %s" % cachedir
+        assert isinstance ( maxsize , ( int , long ) ) and 0 < maxsize , \
+               "DataSetCache: invalid maximal size %s" % maxsize
+
+        self.__cachedir = cachedir
+        self.__maxsize  = maxsize
+
+    @property
+    def cachedir ( self ) :
+        """``cachedir'' : the directory for cached datasets"""
+        return self.__cachedir
+
+    @property
+    def maxsize ( self ) :
+        """``maxsize'' : the maximal total size of the cache (in bytes)"""
+        return self.__maxsize
+    @maxsize.setter
+    def maxsize ( self , value ) :
+        assert isinstance ( value , ( int , long ) ) and 0 < value , \
+               "DataSetCache: invalid maximal size %s" % value
+        self.__maxsize = value
+        self.evict()
+
+    # =========================================================================
+    ## build the cache key
+    #  @code
+    #  key = cache.key ( chain , variables , selection , cuts , first , nevents )
+    #  @endcode
+    #  Instead of tree/chain the list of files (and the name of the tree) can be specified
+    #  @code
+    #  key = cache.key ( files , variables , selection , cuts , treename = 'S' )
+    #  @endcode
+    def key ( self , tree , variables , selection = '' , cuts = None , first = 0 , nevents = -1 , treename = '' ) :
+        """Build the cache key
+        >>> key = cache.key ( chain , variables , selection , cuts , first , nevents )
+        - instead of tree/chain the list of files (and the name of the tree) can be specified
+        >>> key = cache.key ( files , variables , selection , cuts , treename = 'S' )
+        """
+        from ostap.fitting.selectors import Variable
+        if isinstance ( tree , ( list , tuple ) ) :
+            items  = [ treename ]
+            items += [ _file_id_ ( f ) for f in sorted ( tree ) ]
+        else :
+            items  = [ tree.GetName () ]
+            items += [ _file_id_ ( f ) for f in _tree_files_ ( tree ) ]
+        for v in variables :
+            if isinstance ( v , Variable ) :
+                acc = v.formula if v.formula else _internals_ ( v.accessor )
+                items.append ( ( v.name , v.description , v.minmax , acc ) )
+            else : items.append ( repr ( v ) )
+        items += [ _internals_ ( selection ) , _internals_ ( cuts ) , first , nevents ]
+        return hashlib.sha256 ( repr ( items ) ).hexdigest()
+
+    ## the file name for the given key
+    def __path ( self , key ) :
+        return os.path.join ( self.__cachedir , '%s.root' % key )
+
+    def __contains__ ( self , key ) :
+        return os.path.exists ( self.__path ( key ) )
+
+    # =========================================================================
+    ## get the dataset and statistics from the cache
+    #  @code
+    #  ds , stat = cache [ key ]
+    #  @endcode
+    def __getitem__ ( self , key ) :
+        """Get the dataset and statistics from the cache
+        >>> ds , stat = cache [ key ]
+        """
+        fname = self.__path ( key )
+        if not os.path.exists ( fname ) : raise KeyError ( key )
+        with ROOT.TFile.Open ( fname , 'READ' ) as rfile :
+            ds   = rfile [ 'data' ]
+            stat = tuple ( int ( s ) for s in rfile [ 'stat' ].GetString().Data().split() )
+        os.utime ( fname , None ) ## mark as recently used
+        return ds , stat
+
+    # =========================================================================
+    ## put the dataset and statistics into the cache
+    #  @code
+    #  cache [ key ] = ds , stat
+    #  @endcode
+    def __setitem__ ( self , key , value ) :
+        """Put the dataset and statistics into the cache
+        >>> cache [ key ] = ds , stat
+        """
+        ds , stat = value
+
+        ## use the columnar vector storage
+        store = ds.store()
+        if not isinstance ( store , ROOT.RooVectorDataStore ) :
+            from ostap.fitting.roofit import useStorage
+            from ostap.core.core      import dsID
+            with useStorage ( ROOT.RooAbsData.Vector ) : ds = ds.Clone ( dsID () )
+
+        fname = self.__path ( key )
+        tmpf  = '%s.%d.tmp' % ( fname , os.getpid() )
+        with ROOT.TFile.Open ( tmpf , 'RECREATE' ) as rfile :
+            rfile [ 'data' ] = ds
+            rfile [ 'stat' ] = ROOT.TObjString ( ' '.join ( '%d' % s for s in stat[:3] ) )
+        os.rename ( tmpf , fname ) ## atomic replace
+
+        self.evict ()
+
+    def __delitem__ ( self , key ) :
+        fname = self.__path ( key )
+        if not os.path.exists ( fname ) : raise KeyError ( key )
+        os.remove ( fname )
+
+    # =========================================================================
+    ## evict the least recently used entries to fit into the size cap
+    def evict ( self ) :
+        """Evict the least recently used entries to fit into the size cap"""
+        entries = []
+        for f in os.listdir ( self.__cachedir ) :
+            if not f.endswith ( '.root' ) : continue
+            f  = os.path.join ( self.__cachedir , f )
+            st = os.stat ( f )
+            entries.append ( ( st.st_mtime , st.st_size , f ) )
+        entries.sort()
+        total = sum ( e[1] for e in entries )
+        ## keep at least the most recent entry
+        while 1 < len ( entries ) and self.__maxsize < total :
+            mtime , size , f = entries.pop ( 0 )
+            try :
+                os.remove ( f )
+                total -= size
+                logger.debug ( 'DataSetCache: evict %s' % f )
+            except OSError :
+                pass
+
+    ## clear the cache
+    def clear ( self ) :
+        """Clear the cache"""
+        for f in os.listdir ( self.__cachedir ) :
+            if f.endswith ( '.root' ) : os.remove ( os.path.join ( self.__cachedir , f ) )
+
+    ## the total size of the cache (in bytes)
+    def size ( self ) :
+        """The total size of the cache (in bytes)"""
+        return sum ( os.path.getsize ( os.path.join ( self.__cachedir , f ) )
+                     for f in os.listdir ( self.__cachedir ) if f.endswith ( '.root' ) )
+
+    def __len__ ( self ) :
+        return len ( [ f for f in os.listdir ( self.__cachedir ) if f.endswith ( '.root' ) ] )
+
+    def __repr__ ( self ) :
+        return 'DataSetCache(%s,#%d,%.1fMB)' % ( self.__cachedir , len ( self ) , self.size() / 1024.0**2 )
+    __str__ = __repr__
+
+# =============================================================================
+_default_cache = None
+## get the default cache instance (in ostap working directory)
+def default_cache () :
+    """Get the default cache instance (in ostap working directory)"""
+    global _default_cache
+    if _default_cache is None : _default_cache = DataSetCache()
+    return _default_cache
+
+# =============================================================================
+if '__main__' == __name__ :
+
+    from ostap.utils.docme import docme
+    docme ( __name__ , logger = logger )
+
+# =============================================================================
+# The END
+# =============================================================================
@@ -911,17 +911,16 @@ class SelectorWithVars(SelectorWithCuts) :
 
 # =============================================================================
 import os
-from   ostap.core.workdir import workdir
-from   ostap.io.zipshelve import ZipShelf 
 # =============================================================================
 
 # ==============================================================================
 ## Generic selector which loads already loaded datasets from cache
-#
+#  @see ostap.fitting.dscache.DataSetCache 
 #  @date   2014-07-02
 #  @author Sasha Baranov a.baranov@cern.ch
 class SelectorWithVarsCached(SelectorWithVars) :
     """Create and fill the basic dataset for RooFit. Or just load it from cache.
+    - see ostap.fitting.dscache.DataSetCache 
     """
     ## constructor 
     def __init__ ( self                           ,
@@ -930,80 +929,79 @@ class SelectorWithVarsCached(SelectorWithVars) :
                    files                          ,  ## List of files
                    cuts         = None            ,
                    name         = ''              ,
-                   fullname     = ''              ) : 
+                   fullname     = ''              ,
+                   cache        = True            ,
+                   tree         = ''              ) :  ## the name of the tree in files 
 
         SelectorWithVars.__init__(self, variables, selection, cuts, name, fullname)
 
+        self._files = tuple ( files ) 
+        self._cache = _get_cache_ ( cache )
+        self._key   = None 
+        
         # Try load from cache
         self._loaded_from_cache = False
-        self._cachepath = self._compute_cache_name()
-
+        ## without the tree name the key is built in Init 
+        if tree : self._trycache ( tree ) 
+
+    def _trycache ( self , tree ) :
+        " Build the key for the tree name and try to load the dataset from cache"
+        if self._cache is None : return False 
+        self._key   = self._cache.key ( self._files     , self.variables ,
+                                        self.selection  , self.morecuts  ,
+                                        treename = tree )
         if self._loadcache():
             self.Process = lambda entry: 1
             self._loaded_from_cache = True
-
-    def _l_internals(self, lmbd):
-        " Returns str of lambda expression internals"
-        if not hasattr(lmbd, "__code__"):
-            return ""
-
-        code = lmbd.__code__
-        return str((code.co_code, code.co_consts))
-
-    def _get_files_str(self):
-        "Returns string with used files and their modification times"
-        ret = ""
-        for filename in sorted(self.__filelist):
-            ret += filename
-            ret += str(int(os.stat(filename).st_mtime))
-        return ret
-
-    def _compute_cache_name(self):
-        " Computes dataset cache path(SHA512) "
-        h =  self._get_files_str()
-        h += self._l_internals(self.morecuts)
-
-        for var , vdesc , vmin , vmax , vfun in self._variables:
-            h += var.GetName() + vdesc + str(vmin) + str(vmax)
-            h += self._l_internals(vfun)
-
-        h += str(self.selection)
-
-        import hashlib 
-        filename = hashlib.sha512(h).hexdigest() + ".shelve"
-        return os.path.join(workdir, "cache", filename)
-
+        return self._loaded_from_cache 
+        
     def _loadcache(self):
-        " Loads cache from ZipShelf. Returns `True` on success, `False` othervise"
-        if not os.path.exists(self._cachepath):
+        " Loads dataset from cache. Returns `True` on success, `False` othervise"
+        if self._key is None or not self._key in self._cache :
             return False
-
-        with ZipShelf(self._cachepath, 'r' ) as db : 
-            self.data = db['data']
-
+        self.data , self.stat = self._cache [ self._key ]
         return True
 
     def _savecache(self):
-        
-        " Saves cache to file. "
-        with ZipShelf(self._cachepath) as db : 
-            db['data'] = self.data
-
+        " Saves dataset to the cache. "
+        if self._key is None : return False 
+        self._cache [ self._key ] = self.data , self.stat 
         return True
+
+    def Init    ( self, chain ) :
+        #
+        if self._cache is not None and self._key is None :
+            self._trycache ( chain.GetName() ) 
+        return SelectorWithVars.Init ( self , chain ) 
     
     #
     def Terminate ( self  ) :
         if not self._loaded_from_cache:
             SelectorWithVars.Terminate(self)
 
-            if len(self.data):
+            if self.data and len(self.data):
                 self._savecache()
 
         else:
-            self._logger.info('Loaded from cache!')
+            logger.info('Loaded from cache!')
 
         return 1
 
+# =============================================================================
+## get the dataset cache from the ``cache'' argument 
+#  - <code>None/False</code> : no cache
+#  - <code>True</code>       : the default cache
+#  - <code>DataSetCache</code> : the cache itself  
+def _get_cache_ ( cache ) :
+    """Get the dataset cache from the ``cache'' argument
+    - None/False   : no cache
+    - True         : the default cache
+    - DataSetCache : the cache itself  
+    """
+    if cache is None or cache is False : return None
+    from ostap.fitting.dscache import DataSetCache, default_cache
+    if isinstance ( cache , DataSetCache ) : return cache
+    return default_cache () if cache else None 
 
 # =============================================================================
 ## Create the dataset from the tree
@@ -1011,16 +1009,25 @@ class SelectorWithVarsCached(SelectorWithVars) :
 #  tree = ...
 #  ds = tree.make_dataset ( [ 'px , 'py' , 'pz' ] ) 
 #  @endcode
-def _make_dataset_ ( tree , variables , selection = '' , name = '' , title = '' , silent = False ) :
+#  The result can be taken from/stored in the dataset cache:
+#  @code 
+#  ds = tree.make_dataset ( [ 'px , 'py' , 'pz' ] , cache = True ) 
+#  @endcode
+#  @see ostap.fitting.dscache.DataSetCache 
+def _make_dataset_ ( tree , variables , selection = '' , name = '' , title = '' , silent = False , cache = None ) :
     """Create the dataset from the tree
     >>> tree = ...
     >>> ds = tree.make_dataset ( [ 'px , 'py' , 'pz' ] ) 
+    The result can be taken from/stored in the dataset cache:
+    >>> ds = tree.make_dataset ( [ 'px , 'py' , 'pz' ] , cache = True ) 
+    - see ostap.fitting.dscache.DataSetCache 
     """
     import ostap.trees.cuts
     import ostap.fitting.roofit
 
     cuts   = ROOT.TCut ( selection )
     varset = ROOT.RooArgSet()
+    vlist  = [] 
     for v in variables :
 
         if   isinstance  ( v  , str              ) : v = Variable (   v )
@@ -1032,6 +1039,7 @@ def _make_dataset_ ( tree , variables , selection = '' , name = '' , title = ''
         assert hasattr     ( tree , v.name )  , "Tree/Chain has no branch ``%s''"  % v.name
 
         varset.add  ( v.var )
+        vlist.append ( v ) 
         mn , mx = v.minmax
         if _minv < mn : cuts &= "%.16g <= %s" % ( mn      , v.name   )
         if _maxv > mx : cuts &= "%s <= %.16g" % ( v.name  , mx       )
@@ -1041,10 +1049,27 @@ def _make_dataset_ ( tree , variables , selection = '' , name = '' , title = ''
         name = '%s_%s' % ( dsID() , tree.GetName() )
     if not title : title = '%s/%s' % ( name , tree.GetTitle() )
 
+    cache = _get_cache_ ( cache ) 
+    if cache is not None :
+        key = cache.key ( tree , vlist , selection ) 
+        if key in cache :
+            ds , stat = cache [ key ]
+            if not silent : logger.info ( 'make_dataset: loaded from cache %s' % ds )
+            return ds , stat 
 
     total     = len ( tree )
-    processed = tree.statVar ( '1' , selection    ).nEntries()
-    skipped   = tree.statVar ( '1' , str ( cuts ) ).nEntries() 
+    try :
+        ## count both in a single pass over the tree 
+        from ostap.stats.statplan import StatPlan
+        plan = StatPlan ()
+        plan.count ( selection    , name = 'processed' )
+        plan.count ( str ( cuts ) , name = 'skipped'   )
+        counts    = plan.run ( tree ) 
+        processed = counts [ 'processed' ].nEntries()
+        skipped   = counts [ 'skipped'   ].nEntries()
+    except ImportError : ## no numpy 
+        processed = tree.statVar ( '1' , selection    ).nEntries()
+        skipped   = tree.statVar ( '1' , str ( cuts ) ).nEntries() 
 
     stat = total, processed , processed - skipped
 
@@ -1063,6 +1088,8 @@ def _make_dataset_ ( tree , variables , selection = '' , name = '' , title = ''
             stat[1] ,
             skipped ,
             selection  , ds ) )            
+
+    if cache is not None and ds : cache [ key ] = ds , stat 
         
     return ds , stat 
 
@@ -1110,7 +1137,7 @@ ROOT.TTree.make_dataset = _make_dataset_
 # @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 # @date   2010-04-30
 #
-def _process_ ( self , selector , nevents = -1 , first = 0 , shortcut = True , silent = False  ) :
+def _process_ ( self , selector , nevents = -1 , first = 0 , shortcut = True , silent = False , cache = None ) :
     """ ``Process'' the tree/chain with proper TPySelector :
     
     >>> from ostap.fitting.selectors import Selector    
@@ -1119,11 +1146,29 @@ def _process_ ( self , selector , nevents = -1 , first = 0 , shortcut = True , s
     >>> selector = MySelector()    
     >>> chain = ...
     >>> chain.process ( selector )  ## NB: note lowercase ``process'' here !!!    
+
+    For SelectorWithVars the dataset can be taken from/stored in the dataset cache:
+    >>> chain.process ( selector , cache = True )
+    - see ostap.fitting.dscache.DataSetCache 
     """
 
     ## process all events? 
     all = 0 == first and ( 0 > nevents or len ( self ) <= nevents )
 
+    cache = _get_cache_ ( cache ) 
+    if cache is not None and isinstance ( self , ROOT.TTree ) and isinstance ( selector , SelectorWithVars ) :
+        key = cache.key ( self , selector.variables , selector.selection , selector.morecuts ,
+                          first , nevents if not all else -1 )
+        if key in cache :
+            ds , stat     = cache [ key ]
+            selector.data = ds
+            selector.stat = stat 
+            if not silent : logger.info ( 'process: dataset is loaded from cache %s' % ds )
+            return 1
+        result = _process_ ( self , selector , nevents , first , shortcut , silent )
+        if selector.data : cache [ key ] = selector.data , selector.stat 
+        return result 
+
     if all and shortcut and isinstance ( self , ROOT.TTree ) and isinstance ( selector , SelectorWithVars ) and selector.trivial :
         if not silent : logger.info ( "Make try to use the shortcut!" )
         ds , stat  = self.make_dataset( variables = selector.variables , selection = selector.selection , silent = silent )
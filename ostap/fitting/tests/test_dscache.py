@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Copyright (c) Ostap developpers.
+# =============================================================================
+# @file test_dscache.py
+# Test module for ostap/fitting/dscache.py
+# - It tests the dataset cache for make_dataset/process
+# =============================================================================
+"""# Test module for ostap/fitting/dscache.py
+# - It tests the dataset cache for make_dataset/process
+"""
+# =============================================================================
+__author__ = "Ostap developers"
+__all__    = () ## nothing to import
+# =============================================================================
+import ROOT, array, random, os
+import ostap.io.root_file
+import ostap.trees.trees
+from   ostap.fitting.selectors import SelectorWithVars, SelectorWithVarsCached, Variable
+from   ostap.fitting.dscache   import DataSetCache
+from   ostap.utils.utils       import CleanUp
+# =============================================================================
+# logging
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' == __name__  or '__builtin__' == __name__ :
+    logger = getLogger ( 'ostap/fitting/tests/test_dscache' )
+else :
+    logger = getLogger ( __name__ )
+# =============================================================================
+tmpdir = CleanUp.tempdir ( prefix = 'dscache_' )
+fname  = os.path.join ( tmpdir , 'dscache_data.root' )
+
+with ROOT.TFile.Open ( fname , 'RECREATE' ) as rfile :
+    tree = ROOT.TTree ( 'S' , 'data for dataset cache' )
+    x    = array.array ( 'd' , [ 0 ] )
+    y    = array.array ( 'd' , [ 0 ] )
+    tree.Branch ( 'x' , x , 'x/D' )
+    tree.Branch ( 'y' , y , 'y/D' )
+    for i in range ( 5000 ) :
+        x[0] = random.uniform ( 0 , 10 )
+        y[0] = random.gauss   ( 0 , 1  )
+        tree.Fill()
+    tree.Write()
+
+# =============================================================================
+def test_dscache () :
+
+    cache = DataSetCache ( os.path.join ( tmpdir , 'cache' ) )
+
+    chain = ROOT.TChain ( 'S' )
+    chain.Add ( fname )
+
+    variables = [ Variable ( 'x' , 'x' , 0  , 10 ) ,
+                  Variable ( 'y' , 'y' , -5 ,  5 ) ]
+
+    ## the first time: process and store
+    sel1 = SelectorWithVars ( variables , 'x<5' , silence = True )
+    chain.process ( sel1 , cache = cache , silent = True )
+    assert 1 == len ( cache ) , 'The dataset is not stored in cache'
+
+    ## the second time: just load
+    sel2 = SelectorWithVars ( variables , 'x<5' , silence = True )
+    chain.process ( sel2 , cache = cache , silent = True )
+    assert len ( sel1.data ) == len ( sel2.data ) , 'Invalid dataset from cache'
+    assert sel1.stat         == sel2.stat         , 'Invalid statistics from cache'
+
+    ## another selection: another key
+    sel3 = SelectorWithVars ( variables , 'x>5' , silence = True )
+    chain.process ( sel3 , cache = cache , silent = True )
+    assert 2 == len ( cache ) , 'The dataset is not stored in cache'
+
+    ## eviction of the least recently used entry
+    cache.maxsize = 1
+    assert 1 == len ( cache ) , 'LRU eviction does not work'
+
+    logger.info ( 'Dataset cache: %s' % cache )
+
+# =============================================================================
+def test_cached_selector () :
+
+    cache     = DataSetCache ( os.path.join ( tmpdir , 'cache2' ) )
+    variables = [ Variable ( 'x' , 'x' , 0  , 10 ) ]
+
+    ## the same files, different trees: different keys 
+    kS = cache.key ( [ fname ] , variables , 'x<5' , treename = 'S' )
+    kT = cache.key ( [ fname ] , variables , 'x<5' , treename = 'T' )
+    assert kS != kT , 'The tree name is not in the key'
+
+    chain = ROOT.TChain ( 'S' )
+    chain.Add ( fname )
+
+    ## the first time: process and store (the key is built from the chain name)
+    sel1 = SelectorWithVarsCached ( variables , 'x<5' , [ fname ] , cache = cache )
+    chain.process ( sel1 , shortcut = False , silent = True )
+    assert 1 == len ( cache ) , 'The dataset is not stored in cache'
+
+    ## the second time: just load 
+    sel2 = SelectorWithVarsCached ( variables , 'x<5' , [ fname ] , cache = cache , tree = 'S' )
+    assert sel2._loaded_from_cache , 'The dataset is not loaded from cache'
+    assert len ( sel1.data ) == len ( sel2.data ) , 'Invalid dataset from cache'
+
+    ## no cache at all 
+    sel3 = SelectorWithVarsCached ( variables , 'x<5' , [ fname ] , cache = False )
+    chain.process ( sel3 , silent = True )
+    assert len ( sel1.data ) == len ( sel3.data ) , 'Invalid dataset without cache'
+    
+# =============================================================================
+def test_dscache_closures () :
+
+    cache = DataSetCache ( os.path.join ( tmpdir , 'cache3' ) )
+
+    def make_cut ( value ) : return lambda s : s.x < value 
+    def make_acc ( scale ) : return lambda s : s.y * scale 
+
+    def key ( cut , scale ) :
+        return cache.key ( [ fname ] , [ Variable ( 'z' , 'z' , -5 , 5 , make_acc ( scale ) ) ] ,
+                           make_cut ( cut ) , treename = 'S' )
+
+    ## the closures differ only in the captured values: different keys 
+    assert key ( 5 , 1 ) != key ( 6 , 1 ) , 'The captured cut value is not in the key'
+    assert key ( 5 , 1 ) != key ( 5 , 2 ) , 'The captured variable is not in the key'
+    
+    ## the same closures: the same key (no addresses in the key)
+    assert key ( 5 , 1 ) == key ( 5 , 1 ) , 'The key is not reproducible'
+    
+# =============================================================================
+if '__main__' == __name__ :
+
+    test_dscache ()
+    test_cached_selector ()
+    test_dscache_closures ()
+
+# =============================================================================
+# The END
+# =============================================================================
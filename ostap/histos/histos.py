@@ -687,6 +687,14 @@ _interpolate_2D_ = Ostap.Math.HistoInterpolation.interpolate_2D
 #  @see Ostap::Math::HistoInterpolation::interpolate_3D
 _interpolate_3D_ = Ostap.Math.HistoInterpolation.interpolate_3D
 # =============================================================================
+## C++ functions for vectorised histogram interpolation
+#  @see Ostap::Math::HistoInterpolation::evaluate_1D
+#  @see Ostap::Math::HistoInterpolation::evaluate_2D
+#  @see Ostap::Math::HistoInterpolation::evaluate_3D
+_evaluate_1D_    = Ostap.Math.HistoInterpolation.evaluate_1D    
+_evaluate_2D_    = Ostap.Math.HistoInterpolation.evaluate_2D    
+_evaluate_3D_    = Ostap.Math.HistoInterpolation.evaluate_3D    
+# =============================================================================
 
 # =============================================================================
 ## histogram as function 
@@ -1073,7 +1081,7 @@ def _h3_call_ ( h3                         ,
     elif isinstance ( interpolate , (tuple,list) ) and 3 <= len ( interpolate ) :
         tx = int ( interpolate [ 0 ] ) 
         ty = int ( interpolate [ 1 ] ) 
-        tx = int ( interpolate [ 2 ] )
+        tz = int ( interpolate [ 2 ] )
 
         
     ## use C++ function for fast interpolation 
@@ -1085,6 +1093,153 @@ ROOT.TH3   . __call__     = _h3_call_
 ROOT.TH3F  . __getitem__  = _h3_get_item_
 ROOT.TH3D  . __getitem__  = _h3_get_item_
 
+# =============================================================================
+## Vectorised version of the histogram as function:
+#  evaluate the histogram for the arrays of points
+#  @code
+#  histo = ...
+#  xs    = numpy.random.uniform ( 0 , 1 , 1000000 )
+#  values , errors = histo.evaluate ( xs ) 
+#  values , errors = histo.evaluate ( xs , interpolate = 2 ) ## parabolic interpolation
+#  @endcode
+#  The interpolation orders, edge and extrapolation semantics
+#  are the same as for <code>histo(x)</code>
+#  @see Ostap::Math::HistoInterpolation::evaluate_1D
+#  @see _h1_call_ 
+def _h1_evaluate_ ( h1                    ,
+                    xs                    ,
+                    interpolate   = 1     ,
+                    edges         = True  ,
+                    extrapolate   = False ,
+                    density       = False ) :
+    """Vectorised version of the histogram as function:
+    evaluate the histogram for the arrays of points
+    >>> histo = ...
+    >>> xs    = numpy.random.uniform ( 0 , 1 , 1000000 )
+    >>> values , errors = histo.evaluate ( xs ) 
+    >>> values , errors = histo.evaluate ( xs , interpolate = 2 ) ## parabolic interpolation
+    The interpolation orders, edge and extrapolation semantics
+    are the same as for `histo(x)`
+    """
+    import numpy
+    xs = numpy.ascontiguousarray ( xs , dtype = numpy.float64 ).ravel()
+    #
+    tx  = 1 
+    if isinstance ( interpolate , int ) and 0 <= interpolate :
+        tx = interpolate
+    elif not interpolate :
+        tx  = 0
+    #
+    n      = len ( xs ) 
+    values = numpy.empty ( n , dtype = numpy.float64 )
+    errors = numpy.empty ( n , dtype = numpy.float64 )
+    if n : _evaluate_1D_ ( h1 , n , xs , values , errors , tx , edges , extrapolate , density )
+    return values , errors 
+
+# =============================================================================
+## Vectorised version of the 2D-histogram as function:
+#  evaluate the histogram for the arrays of points
+#  @code
+#  histo = ...
+#  values , errors = histo.evaluate ( xs , ys ) 
+#  values , errors = histo.evaluate ( xs , ys , interpolate = (3,3) ) ## bi-cubic interpolation
+#  @endcode
+#  The interpolation orders, edge and extrapolation semantics
+#  are the same as for <code>histo(x,y)</code>
+#  @see Ostap::Math::HistoInterpolation::evaluate_2D
+#  @see _h2_call_ 
+def _h2_evaluate_ ( h2                    ,
+                    xs                    ,
+                    ys                    ,
+                    interpolate   = True  ,
+                    edges         = True  ,
+                    extrapolate   = False ,
+                    density       = False ) :
+    """Vectorised version of the 2D-histogram as function:
+    evaluate the histogram for the arrays of points
+    >>> histo = ...
+    >>> values , errors = histo.evaluate ( xs , ys ) 
+    >>> values , errors = histo.evaluate ( xs , ys , interpolate = (3,3) ) ## bi-cubic interpolation
+    The interpolation orders, edge and extrapolation semantics
+    are the same as for `histo(x,y)`
+    """
+    import numpy
+    xs = numpy.ascontiguousarray ( xs , dtype = numpy.float64 ).ravel()
+    ys = numpy.ascontiguousarray ( ys , dtype = numpy.float64 ).ravel()
+    assert len ( xs ) == len ( ys ) , 'evaluate: mismatch in array lengths %d/%d' % ( len ( xs ) , len ( ys ) )
+    #
+    tx = 1
+    ty = 1 
+    if   not interpolate :
+        tx = 0
+        ty = 0
+    elif isinstance ( interpolate , (tuple,list) ) and 2<= len ( interpolate ) : 
+        tx = int ( interpolate[0] )
+        ty = int ( interpolate[1] )
+    #
+    n      = len ( xs ) 
+    values = numpy.empty ( n , dtype = numpy.float64 )
+    errors = numpy.empty ( n , dtype = numpy.float64 )
+    if n : _evaluate_2D_ ( h2 , n , xs , ys , values , errors , tx , ty , edges , extrapolate , density )
+    return values , errors 
+
+# =============================================================================
+## Vectorised version of the 3D-histogram as function:
+#  evaluate the histogram for the arrays of points
+#  @code
+#  histo = ...
+#  values , errors = histo.evaluate ( xs , ys , zs ) 
+#  @endcode
+#  The interpolation orders, edge and extrapolation semantics
+#  are the same as for <code>histo(x,y,z)</code>
+#  @see Ostap::Math::HistoInterpolation::evaluate_3D
+#  @see _h3_call_ 
+def _h3_evaluate_ ( h3                    ,
+                    xs                    ,
+                    ys                    ,
+                    zs                    , 
+                    interpolate   = True  ,
+                    edges         = True  ,
+                    extrapolate   = False ,
+                    density       = False ) :
+    """Vectorised version of the 3D-histogram as function:
+    evaluate the histogram for the arrays of points
+    >>> histo = ...
+    >>> values , errors = histo.evaluate ( xs , ys , zs ) 
+    The interpolation orders, edge and extrapolation semantics
+    are the same as for `histo(x,y,z)`
+    """
+    import numpy
+    xs = numpy.ascontiguousarray ( xs , dtype = numpy.float64 ).ravel()
+    ys = numpy.ascontiguousarray ( ys , dtype = numpy.float64 ).ravel()
+    zs = numpy.ascontiguousarray ( zs , dtype = numpy.float64 ).ravel()
+    assert len ( xs ) == len ( ys ) == len ( zs ) , \
+           'evaluate: mismatch in array lengths %d/%d/%d' % ( len ( xs ) , len ( ys ) , len ( zs ) )
+    #
+    tx = 1
+    ty = 1 
+    tz = 1 
+    if   not interpolate :
+        tx = 0
+        ty = 0
+        tz = 0
+    elif isinstance ( interpolate , (tuple,list) ) and 3 <= len ( interpolate ) :
+        tx = int ( interpolate [ 0 ] ) 
+        ty = int ( interpolate [ 1 ] ) 
+        tz = int ( interpolate [ 2 ] )
+    #
+    n      = len ( xs ) 
+    values = numpy.empty ( n , dtype = numpy.float64 )
+    errors = numpy.empty ( n , dtype = numpy.float64 )
+    if n : _evaluate_3D_ ( h3 , n , xs , ys , zs , values , errors ,
+                           tx , ty , tz , edges , extrapolate , density )
+    return values , errors 
+
+ROOT.TH1F  . evaluate     = _h1_evaluate_
+ROOT.TH1D  . evaluate     = _h1_evaluate_
+ROOT.TH2   . evaluate     = _h2_evaluate_
+ROOT.TH3   . evaluate     = _h3_evaluate_
+
 
 # =============================================================================
 # iterate over items
@@ -1992,11 +2147,169 @@ def objectAsFunctionObject ( obj ) :
     ## the original stuff    
     return FUNC_OTHER ( obj ) 
 
+# =============================================================================
+## Vectorised engine for the histogram arithmetic
+#  The bin contents and sumw2 are taken as numpy arrays, the operation
+#  with error propagation is performed for whole arrays,
+#  and the result is written back in one shot.
+#  It is used for numbers, VE and histograms with the same binning,
+#  otherwise (or if numpy is not available) the per-bin path is used.
+# =============================================================================
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+## vectorised operations: ( v1 , c1 , v2 , c2 ) -> ( v , c ),
+#  the same error propagation as for Ostap::Math::ValueWithError 
+def _v_add_  ( v1 , c1 , v2 , c2 ) :
+    return v1 + v2 , c1 + numpy.where ( 0 < c2 , c2 , 0 )
+def _v_sub_  ( v1 , c1 , v2 , c2 ) :
+    return v1 - v2 , c1 + numpy.where ( 0 < c2 , c2 , 0 )
+def _v_mul_  ( v1 , c1 , v2 , c2 ) :
+    return v1 * v2 , c1 * v2 * v2 + numpy.where ( 0 < c2 , c2 , 0 ) * v1 * v1
+def _v_div_  ( v1 , c1 , v2 , c2 ) :
+    b2 = v2 * v2 
+    return v1 / v2 , c1 / b2 + numpy.where ( 0 < c2 , c2 , 0 ) * v1 * v1 / ( b2 * b2 )
+def _v_frac_ ( v1 , c1 , v2 , c2 ) :
+    s  = v1 + v2
+    s4 = s ** 4 
+    return v1 / s , ( abs ( c1 ) * v2 * v2 + abs ( c2 ) * v1 * v1 ) / s4
+def _v_asym_ ( v1 , c1 , v2 , c2 ) :
+    s  = v1 + v2
+    s4 = s ** 4 
+    return ( v1 - v2 ) / s , 4 * ( abs ( c1 ) * v2 * v2 + abs ( c2 ) * v1 * v1 ) / s4
+def _v_diff_ ( v1 , c1 , v2 , c2 ) :
+    v , c = _v_asym_ ( v1 , c1 , v2 , c2 )
+    return 2 * v , 4 * c 
+def _v_chi2_ ( v1 , c1 , v2 , c2 ) :
+    sc2 = c1 + c2
+    d   = v1 - v2
+    v   = numpy.where ( 0 < sc2 , d * d / numpy.where ( 0 < sc2 , sc2 , 1 ) , -1.0 )
+    v   = numpy.where ( numpy.isclose ( v1 , v2 , rtol = 1.e-14 , atol = 0 ) , 0.0 , v )
+    return v , numpy.zeros_like ( v ) 
+def _v_mean_ ( v1 , c1 , v2 , c2 ) :
+    v1 , c1 , v2 , c2 = numpy.broadcast_arrays ( v1 , c1 , v2 , c2 )
+    p1 = 0 < c1
+    p2 = 0 < c2 
+    cc = 1.0 / ( 1.0 / numpy.where ( p1 , c1 , 1 ) + 1.0 / numpy.where ( p2 , c2 , 1 ) )
+    vv = cc * ( v1 / numpy.where ( p1 , c1 , 1 ) + v2 / numpy.where ( p2 , c2 , 1 ) ) 
+    v  = numpy.where ( p1 & p2 , vv , numpy.where ( p1 , v2 , numpy.where ( p2 , v1 , 0.5 * ( v1 + v2 ) ) ) )
+    c  = numpy.where ( p1 & p2 , cc , numpy.where ( p1 , c2 , numpy.where ( p2 , c1 , 0.0 ) ) )
+    return v , c
+
+## reversed operations: y (oper) x 
+def _v_rev_ ( voper ) : return lambda v1 , c1 , v2 , c2 : voper ( v2 , c2 , v1 , c1 )
+_v_radd_ = _v_rev_ ( _v_add_ )
+_v_rsub_ = _v_rev_ ( _v_sub_ )
+_v_rmul_ = _v_rev_ ( _v_mul_ )
+_v_rdiv_ = _v_rev_ ( _v_div_ )
+
+# =============================================================================
+## the bin contents of the histogram as numpy array (including under/overflows)
+def _h_np_contents_ ( histo ) :
+    """The bin contents of the histogram as numpy array (including under/overflows)"""
+    n     = histo.GetSize()
+    dtype = numpy.float32 if isinstance ( histo , ROOT.TArrayF ) else numpy.float64
+    return numpy.array ( numpy.frombuffer ( histo.GetArray() , dtype = dtype , count = n ) ,
+                         dtype = numpy.float64 , copy = True ) 
+
+## the sumw2 of the histogram as numpy array (including under/overflows)
+def _h_np_sumw2_ ( histo ) :
+    """The sumw2 of the histogram as numpy array (including under/overflows)"""
+    n = histo.GetSize()
+    if 0 == histo.GetSumw2N() : histo.Sumw2()
+    return numpy.array ( numpy.frombuffer ( histo.GetSumw2().GetArray() , count = n ) , copy = True ) 
+
+## the mask for the inner (not under/overflow) bins 
+def _h_np_inner_ ( histo ) :
+    """The mask for the inner (not under/overflow) bins"""
+    nx    = histo.GetNbinsX ()
+    ny    = histo.GetNbinsY ()
+    nz    = histo.GetNbinsZ ()
+    dim   = histo.GetDimension() 
+    shape = ( nz + 2 if 3 <= dim else 1 , ny + 2 if 2 <= dim else 1 , nx + 2 )
+    inner = numpy.zeros ( shape , dtype = bool )
+    inner [ 1:-1 if 3 <= dim else None , 1:-1 if 2 <= dim else None , 1:-1 ] = True
+    return inner.ravel() 
+
+## are the axes the same?
+def _h_np_same_axis_ ( a1 , a2 ) :
+    """Are the axes the same?"""
+    n = a1.GetNbins()
+    if n != a2.GetNbins() : return False
+    e1 = numpy.array ( [ a1.GetBinLowEdge ( i ) for i in range ( 1 , n + 2 ) ] )
+    e2 = numpy.array ( [ a2.GetBinLowEdge ( i ) for i in range ( 1 , n + 2 ) ] )
+    return numpy.allclose ( e1 , e2 , rtol = 1.e-12 , atol = 1.e-12 )
+
+## can the histogram be used in the vectorised operations?
+#  @attention profiles (subclasses of TH1D/TH2D/TH3D) are excluded:
+#  their arrays keep the sums, not the bin means 
+def _h_np_ok_ ( histo ) :
+    """Can the histogram be used in the vectorised operations?
+    - profiles (subclasses of TH1D/TH2D/TH3D) are excluded:
+    their arrays keep the sums, not the bin means 
+    """
+    if isinstance ( histo , ( ROOT.TProfile , ROOT.TProfile2D , ROOT.TProfile3D ) ) : return False 
+    return isinstance ( histo , ( ROOT.TH1F , ROOT.TH1D ,
+                                  ROOT.TH2F , ROOT.TH2D ,
+                                  ROOT.TH3F , ROOT.TH3D ) )  
+    
+# =============================================================================
+## Vectorised operation with histograms:
+#  @param h1     the first operand, the histogram 
+#  @param h2     the second operand: number, VE or histogram with the same binning
+#  @param voper  the vectorised operation ( v1 , c1 , v2 , c2 ) -> ( v , c )
+#  @param result the histogram to store the result (can be <code>h1</code>)
+#  @param keep   keep the bin content for the ``invalid'' results?
+#  @return true if the operation is performed, false otherwise 
+def _h_voper_ ( h1 , h2 , voper , result , keep = False ) :
+    """Vectorised operation with histograms
+    - h1     : the first operand, the histogram 
+    - h2     : the second operand: number, VE or histogram with the same binning
+    - voper  : the vectorised operation ( v1 , c1 , v2 , c2 ) -> ( v , c )
+    - result : the histogram to store the result (can be h1)
+    - keep   : keep the bin content for the ``invalid'' results?
+    Return true if the operation is performed, false otherwise 
+    """
+    if numpy is None or voper is None           : return False
+    if not _h_np_ok_ ( h1 ) or not _h_np_ok_ ( result ) : return False 
+    ##
+    if   isinstance ( h2 , ( int , long , float ) ) : v2 , c2 = float ( h2 ) , 0.0
+    elif isinstance ( h2 , VE ) : v2 , c2 = h2.value() , h2.cov2() 
+    elif _h_np_ok_  ( h2 ) and h1.GetDimension() == h2.GetDimension() :
+        if not _h_np_same_axis_ ( h1.GetXaxis() , h2.GetXaxis() ) : return False
+        if not _h_np_same_axis_ ( h1.GetYaxis() , h2.GetYaxis() ) : return False
+        if not _h_np_same_axis_ ( h1.GetZaxis() , h2.GetZaxis() ) : return False
+        v2 , c2 = _h_np_contents_ ( h2 ) , _h_np_sumw2_ ( h2 )
+    else : return False 
+    ##
+    v1 , c1 = _h_np_contents_ ( h1 ) , _h_np_sumw2_ ( h1 )
+    with numpy.errstate ( all = 'ignore' ) : 
+        v , c = voper ( v1 , c1 , v2 , c2 )
+        v , c = numpy.broadcast_arrays ( v , abs ( c ) )
+        good  = numpy.isfinite ( v ) & numpy.isfinite ( c )
+    ##
+    inner = _h_np_inner_ ( h1 )
+    vr    = _h_np_contents_ ( result )
+    cr    = _h_np_sumw2_    ( result )
+    ok    = inner & good
+    vr [ ok ] = v [ ok ]
+    cr [ ok ] = c [ ok ]
+    if not keep :
+        bad = inner & ~good
+        vr [ bad ] = 0
+        cr [ bad ] = 0
+    ##
+    result.SetContent ( vr )
+    result.GetSumw2().Set ( len ( cr ) , cr ) 
+    return True 
+
 # =============================================================================
 ## operation with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2011-06-07
-def _h1_oper_ ( h1 , h2 , oper ) :
+def _h1_oper_ ( h1 , h2 , oper , voper = None ) :
     """Operation with the histogram
     >>> h1     = ...
     >>> h2     = ...
@@ -2004,7 +2317,7 @@ def _h1_oper_ ( h1 , h2 , oper ) :
     """
     if isinstance ( h1 , ROOT.TProfile ) :
         hh = h1.asH1()
-        return _h1_oper_ ( hh , h2 , oper ) 
+        return _h1_oper_ ( hh , h2 , oper , voper ) 
     #
     if                                 not h1.GetSumw2() : h1.Sumw2()
     if hasattr ( h2 , 'GetSumw2' ) and not h2.GetSumw2() : h2.Sumw2()
@@ -2012,6 +2325,9 @@ def _h1_oper_ ( h1 , h2 , oper ) :
     result = h1.Clone( hID() )
     if not result.GetSumw2() : result.Sumw2()
 
+    ## try the vectorised engine 
+    if _h_voper_ ( h1 , h2 , voper , result ) : return result 
+    
     ## 
     f2 = objectAsFunction ( h2 )
     
@@ -2037,7 +2353,7 @@ def _h1_oper_ ( h1 , h2 , oper ) :
 ## operation with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2011-06-07
-def _h1_ioper_ ( h1 , h2 , oper ) :
+def _h1_ioper_ ( h1 , h2 , oper , voper = None ) :
     """Operation with the histogram
     >>> obj= ...
     >>> h2     = ...
@@ -2047,6 +2363,9 @@ def _h1_ioper_ ( h1 , h2 , oper ) :
     if                                 not h1.GetSumw2() : h1.Sumw2()
     if hasattr ( h2 , 'GetSumw2' ) and not h2.GetSumw2() : h2.Sumw2()
     #
+    ## try the vectorised engine 
+    if _h_voper_ ( h1 , h2 , voper , h1 , keep = True ) : return h1 
+    #
     f2 = objectAsFunction ( h2 ) 
     ##
     for i1,x1,y1 in h1.iteritems() :
@@ -2075,7 +2394,7 @@ def _h1_div_ ( h1 , h2 ) :
     >>> result = h1 / h2  
     """
     #
-    return _h1_oper_ ( h1 , h2 , lambda x,y : x/y ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : x/y , _v_div_ )
 # =============================================================================
 ##  Division with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2086,7 +2405,7 @@ def _h1_mul_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 * h2  
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : x*y ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : x*y , _v_mul_ )
 # =============================================================================
 ##  Addition with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2097,7 +2416,7 @@ def _h1_add_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 + h2  
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : x+y ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : x+y , _v_add_ )
 # =============================================================================
 ##  Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2108,7 +2427,7 @@ def _h1_sub_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 - h2  
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : x-y ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : x-y , _v_sub_ )
 # =============================================================================
 ##  Fraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2119,7 +2438,7 @@ def _h1_frac_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1.frac  ( h2 ) 
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : x.frac(y) ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : x.frac(y) , _v_frac_ )
 # =============================================================================
 ##  ``Asymmetry'' of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2130,7 +2449,7 @@ def _h1_asym_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1.asym ( h2 )     
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : x.asym(y) ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : x.asym(y) , _v_asym_ )
 # =============================================================================
 ## ``Difference'' of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2141,7 +2460,7 @@ def _h1_diff_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1.diff ( h2 )     
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : 2*x.asym(y) )
+    return _h1_oper_ ( h1 , h2 , lambda x,y : 2*x.asym(y) , _v_diff_ )
 
 # =============================================================================
 ##  ``Chi2-tension'' of the histograms 
@@ -2153,7 +2472,7 @@ def _h1_chi2_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1.chi2  ( h2 )     
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : VE ( x.chi2 ( y ) , 0 ) ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : VE ( x.chi2 ( y ) , 0 ) , _v_chi2_ )
 # =============================================================================
 ##  ``Average'' of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2164,7 +2483,7 @@ def _h1_mean_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1.average  ( h2 )     
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : x.mean ( y ) ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : x.mean ( y ) , _v_mean_ )
 
 # =============================================================================
 ## 'pow' the histograms 
@@ -2234,7 +2553,7 @@ def _h1_idiv_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 /=  h2     
     """
-    return _h1_ioper_ ( h1 , h2 , lambda x,y : x/y ) 
+    return _h1_ioper_ ( h1 , h2 , lambda x,y : x/y , _v_div_ )
 
 # =============================================================================
 ## Multiplication with the histograms 
@@ -2246,7 +2565,7 @@ def _h1_imul_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 *=  h2     
     """
-    return _h1_ioper_ ( h1 , h2 , lambda x,y : x*y ) 
+    return _h1_ioper_ ( h1 , h2 , lambda x,y : x*y , _v_mul_ )
 
 # =============================================================================
 ## Addition with the histograms 
@@ -2258,7 +2577,7 @@ def _h1_iadd_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 +=  h2     
     """
-    return _h1_ioper_ ( h1 , h2 , lambda x,y : x+y ) 
+    return _h1_ioper_ ( h1 , h2 , lambda x,y : x+y , _v_add_ )
 # =============================================================================
 ##  Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2269,7 +2588,7 @@ def _h1_isub_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 -=  h2     
     """
-    return _h1_ioper_ ( h1 , h2 , lambda x,y : x-y ) 
+    return _h1_ioper_ ( h1 , h2 , lambda x,y : x-y , _v_sub_ )
 
 # =============================================================================
 ## Division with the histograms 
@@ -2281,7 +2600,7 @@ def _h1_rdiv_ ( h1 , h2 ) :
     >>> obj    = ...
     >>> result = obj / h1 
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : y/x ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : y/x , _v_rdiv_ )
 # =============================================================================
 ## Multiplication with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2292,7 +2611,7 @@ def _h1_rmul_ ( h1 , h2 ) :
     >>> obj    = ...
     >>> result = obj * h1 
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : y*x ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : y*x , _v_rmul_ )
 
 # =============================================================================
 ## Addition with the histograms 
@@ -2304,7 +2623,7 @@ def _h1_radd_ ( h1 , h2 ) :
     >>> obj    = ...
     >>> result = obj + h1 
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : y+x )
+    return _h1_oper_ ( h1 , h2 , lambda x,y : y+x , _v_radd_ )
 
 # =============================================================================
 ## Subtraction of the histograms 
@@ -2316,7 +2635,7 @@ def _h1_rsub_ ( h1 , h2 ) :
     >>> obj    = ...
     >>> result = obj - h1 
     """
-    return _h1_oper_ ( h1 , h2 , lambda x,y : y-x ) 
+    return _h1_oper_ ( h1 , h2 , lambda x,y : y-x , _v_rsub_ )
 
 # =============================================================================
 ## Feed the histogram from other object, e.g. function
@@ -2641,7 +2960,7 @@ ROOT.TH1D.random = lambda s : s.GetRandom()
 ## operation with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2011-06-07
-def _h2_oper_ ( h1 , h2 , oper ) :
+def _h2_oper_ ( h1 , h2 , oper , voper = None ) :
     """Operation with the histogram        
     >>> h1     = ...
     >>> h2     = ...
@@ -2653,6 +2972,9 @@ def _h2_oper_ ( h1 , h2 , oper ) :
     result = h1.Clone( hID() )
     if not result.GetSumw2() : result.Sumw2()
     #
+    ## try the vectorised engine 
+    if _h_voper_ ( h1 , h2 , voper , result ) : return result 
+    #
     f2 = objectAsFunction ( h2 )
     # 
     for ix1,iy1,x1,y1,z1 in h1.iteritems() :
@@ -2675,13 +2997,16 @@ def _h2_oper_ ( h1 , h2 , oper ) :
 ## operation with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2012-06-03
-def _h2_ioper_ ( h1 , h2 , oper ) :
+def _h2_ioper_ ( h1 , h2 , oper , voper = None ) :
     """
     Operation with the histogram 
     """
     if                                 not h1.GetSumw2() : h1.Sumw2()
     if hasattr ( h2 , 'GetSumw2' ) and not h2.GetSumw2() : h2.Sumw2()
     #
+    ## try the vectorised engine 
+    if _h_voper_ ( h1 , h2 , voper , h1 ) : return h1 
+    #
     f2 = objectAsFunction ( h2 )
     # 
     for ix1,iy1,x1,y1,z1 in h1.iteritems() :
@@ -2711,7 +3036,7 @@ def _h2_div_ ( h1 , h2 ) :
     >>> result = h1 / h2
     
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : x/y ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : x/y , _v_div_ )
 # =============================================================================
 ## Division with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2722,7 +3047,7 @@ def _h2_mul_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 * h2 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : x*y ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : x*y , _v_mul_ )
 # =============================================================================
 ## Addition with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2733,7 +3058,7 @@ def _h2_add_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 + h2 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : x+y ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : x+y , _v_add_ )
 # =============================================================================
 ## Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2744,7 +3069,7 @@ def _h2_sub_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 - h2 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : x-y ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : x-y , _v_sub_ )
 
 
 
@@ -2759,7 +3084,7 @@ def _h2_rdiv_ ( h1 , h2 ) :
     >>> result = h1 / h2
     
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : y/x ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : y/x , _v_rdiv_ )
 # =============================================================================
 ## Division with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2770,7 +3095,7 @@ def _h2_rmul_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 * h2 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : y*x ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : y*x , _v_rmul_ )
 # =============================================================================
 ## Addition with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2781,7 +3106,7 @@ def _h2_radd_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 + h2 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : y+x ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : y+x , _v_radd_ )
 # =============================================================================
 ## Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2792,7 +3117,7 @@ def _h2_rsub_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 - h2 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : y-x ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : y-x , _v_rsub_ )
 
 
 # =============================================================================
@@ -2805,7 +3130,7 @@ def _h2_frac_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> frac   = h1.frac ( h2 )
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : x.frac(y) ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : x.frac(y) , _v_frac_ )
 # =============================================================================
 ## ``Asymmetry'' of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2816,7 +3141,7 @@ def _h2_asym_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> asym   = h1.asym ( h2 )
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : x.asym(y) ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : x.asym(y) , _v_asym_ )
 # =============================================================================
 ## ``Difference'' of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2827,7 +3152,7 @@ def _h2_diff_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> diff   = h1.diff ( h2 )
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : 2*x.asym(y) ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : 2*x.asym(y) , _v_diff_ )
 # =============================================================================
 ##  ``Chi2-tension'' the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2838,7 +3163,7 @@ def _h2_chi2_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> chi2   = h1.chi2 ( h2 ) 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : VE ( x.chi2 ( y ) , 0 ) ) 
+    return _h2_oper_ ( h1 , h2 , lambda x,y : VE ( x.chi2 ( y ) , 0 ) , _v_chi2_ )
 
 # =============================================================================
 ##  ``Average'' the histograms 
@@ -2850,7 +3175,7 @@ def _h2_mean_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> mean   = h1.average ( h2 ) 
     """
-    return _h2_oper_ ( h1 , h2 , lambda x,y : x.mean ( y ) )  
+    return _h2_oper_ ( h1 , h2 , lambda x,y : x.mean ( y ) , _v_mean_ )
 
 # =============================================================================
 ## 'pow' the histograms 
@@ -2916,7 +3241,7 @@ def _h2_idiv_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 /=  h2     
     """
-    return _h2_ioper_ ( h1 , h2 , lambda x,y : x/y ) 
+    return _h2_ioper_ ( h1 , h2 , lambda x,y : x/y , _v_div_ )
 # =============================================================================
 ## Division with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2927,7 +3252,7 @@ def _h2_imul_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 *=  h2     
     """
-    return _h2_ioper_ ( h1 , h2 , lambda x,y : x*y ) 
+    return _h2_ioper_ ( h1 , h2 , lambda x,y : x*y , _v_mul_ )
 
 # =============================================================================
 ## Addition with the histograms 
@@ -2939,7 +3264,7 @@ def _h2_iadd_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 +=  h2     
     """
-    return _h2_ioper_ ( h1 , h2 , lambda x,y : x+y ) 
+    return _h2_ioper_ ( h1 , h2 , lambda x,y : x+y , _v_add_ )
 # =============================================================================
 ## Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -2950,7 +3275,7 @@ def _h2_isub_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 -=  h2     
     """
-    return _h2_ioper_ ( h1 , h2 , lambda x,y : x-y ) 
+    return _h2_ioper_ ( h1 , h2 , lambda x,y : x-y , _v_sub_ )
 # =============================================================================
 
 def _h2_box_   ( self , opts = '' ) : return self.Draw ( opts + ' box'   )
@@ -2997,7 +3322,7 @@ for t in ( ROOT.TH2F , ROOT.TH2D ) :
 ## operation with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2011-06-07
-def _h3_oper_ ( h1 , h2 , oper ) :
+def _h3_oper_ ( h1 , h2 , oper , voper = None ) :
     """ Operation with the 3D-histogram     
     >>> h1 = ...
     >>> h2 = ...
@@ -3009,6 +3334,9 @@ def _h3_oper_ ( h1 , h2 , oper ) :
     result = h1.Clone( hID() )
     if not result.GetSumw2() : result.Sumw2()
     #
+    ## try the vectorised engine 
+    if _h_voper_ ( h1 , h2 , voper , result ) : return result 
+    #
     f2 = objectAsFunction ( h2 ) 
     # 
     for ix1,iy1,iz1,x1,y1,z1,v1 in h1.iteritems() :
@@ -3033,12 +3361,15 @@ def _h3_oper_ ( h1 , h2 , oper ) :
 ## operation with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2012-06-03
-def _h3_ioper_ ( h1 , h2 , oper ) :
+def _h3_ioper_ ( h1 , h2 , oper , voper = None ) :
     """Operation with the 3D-histogram 
     """
     if                                 not h1.GetSumw2() : h1.Sumw2()
     if hasattr ( h2 , 'GetSumw2' ) and not h2.GetSumw2() : h2.Sumw2()
     #
+    ## try the vectorised engine 
+    if _h_voper_ ( h1 , h2 , voper , h1 ) : return h1 
+    #
     f2 = objectAsFunction ( h2 ) 
     # 
     for ix1,iy1,iz1,x1,y1,z1,v1 in h1.iteritems() :
@@ -3067,7 +3398,7 @@ def _h3_div_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1 / h2 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : x/y ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : x/y , _v_div_ )
 # =============================================================================
 ##  Division with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3078,7 +3409,7 @@ def _h3_mul_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1 * h2 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : x*y ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : x*y , _v_mul_ )
 # =============================================================================
 ##  Addition with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3089,7 +3420,7 @@ def _h3_add_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1 + h2 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : x+y ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : x+y , _v_add_ )
 # =============================================================================
 ##  Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3100,7 +3431,7 @@ def _h3_sub_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1 - h2 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : x-y ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : x-y , _v_sub_ )
 # =============================================================================
 ##  ``Fraction'' of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3111,7 +3442,7 @@ def _h3_frac_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1.frac ( h2 )    
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : x.frac(y) )
+    return _h3_oper_ ( h1 , h2 , lambda x,y : x.frac(y) , _v_frac_ )
 
 # =============================================================================
 ##  ``Asymmetry'' of the histograms 
@@ -3123,7 +3454,7 @@ def _h3_asym_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1.asym ( h2 )    
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : x.asym(y) ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : x.asym(y) , _v_asym_ )
 # =============================================================================
 ##  ``Chi2-tension'' the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3134,7 +3465,7 @@ def _h3_chi2_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1.chi2 ( h2 )    
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : VE ( x.chi2 ( y ) , 0 ) ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : VE ( x.chi2 ( y ) , 0 ) , _v_chi2_ )
 # =============================================================================
 ##  ``Average'' the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3145,7 +3476,7 @@ def _h3_mean_ ( h1 , h2 ) :
     >>> h2 = ...
     >>> h3 = h1.average ( h2 ) 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : x.mean ( y ) )  
+    return _h3_oper_ ( h1 , h2 , lambda x,y : x.mean ( y ) , _v_mean_ )
 
 
 
@@ -3188,7 +3519,7 @@ def _h3_rdiv_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 / h2    
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : y/x ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : y/x , _v_rdiv_ )
 # =============================================================================
 ## Division with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3199,7 +3530,7 @@ def _h3_rmul_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 * h2 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : y*x ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : y*x , _v_rmul_ )
 
 
 
@@ -3213,7 +3544,7 @@ def _h3_radd_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 + h2 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : y+x ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : y+x , _v_radd_ )
 # =============================================================================
 ## Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3224,7 +3555,7 @@ def _h3_rsub_ ( h1 , h2 ) :
     >>> h2     = ...
     >>> result = h1 - h2 
     """
-    return _h3_oper_ ( h1 , h2 , lambda x,y : y-x ) 
+    return _h3_oper_ ( h1 , h2 , lambda x,y : y-x , _v_rsub_ )
 
 
 # =============================================================================
@@ -3263,7 +3594,7 @@ def _h3_idiv_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 /=  h2 
     """
-    return _h3_ioper_ ( h1 , h2 , lambda x,y : x/y ) 
+    return _h3_ioper_ ( h1 , h2 , lambda x,y : x/y , _v_div_ )
 # =============================================================================
 ## Division with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3274,7 +3605,7 @@ def _h3_imul_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 *=  h2     
     """
-    return _h3_ioper_ ( h1 , h2 , lambda x,y : x*y ) 
+    return _h3_ioper_ ( h1 , h2 , lambda x,y : x*y , _v_mul_ )
 # =============================================================================
 ## Addition with the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3285,7 +3616,7 @@ def _h3_iadd_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 +=  h2     
     """
-    return _h3_ioper_ ( h1 , h2 , lambda x,y : x+y ) 
+    return _h3_ioper_ ( h1 , h2 , lambda x,y : x+y , _v_add_ )
 # =============================================================================
 ## Subtraction of the histograms 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
@@ -3296,7 +3627,7 @@ def _h3_isub_ ( h1 , h2 ) :
     >>> h2  = ...
     >>> h1 -=  h2     
     """
-    return _h3_ioper_ ( h1 , h2 , lambda x,y : x-y ) 
+    return _h3_ioper_ ( h1 , h2 , lambda x,y : x-y , _v_sub_ )
 # =============================================================================
 
 
@@ -6469,6 +6800,11 @@ _new_methods_   = (
     ROOT.TH1F  . __call__     ,
     ROOT.TH1D  . __call__     ,
     #
+    ROOT.TH1F  . evaluate     ,
+    ROOT.TH1D  . evaluate     ,
+    ROOT.TH2   . evaluate     ,
+    ROOT.TH3   . evaluate     ,
+    #
     ROOT.TH1   . __len__      ,
     ROOT.TH1   .   size       ,
     ROOT.TH1   . __contains__ ,
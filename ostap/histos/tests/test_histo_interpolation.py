@@ -170,6 +170,39 @@ def test_3D2() :
                         v = h ( x,y,z, interpolate = itype ) 
         
 
+
+# =============================================================================
+##  test vectorised interpolation: compare with point-by-point evaluation 
+def test_evaluate() :
+
+    import numpy
+    N  = 1000
+    xs = numpy.random.uniform ( -0.1 , 1.1 , N )
+    ys = numpy.random.uniform ( -0.1 , 1.1 , N )
+    zs = numpy.random.uniform ( -0.1 , 1.1 , N )
+
+    for t in ( 0 , 1 , 2 , 3 ) :
+        for edges in ( False , True ) :
+            for extrapolate in ( False , True ) :
+                
+                kw = dict ( edges = edges , extrapolate = extrapolate ) 
+
+                values , errors = h1.evaluate ( xs , interpolate = t , **kw )
+                for x , v , e in zip ( xs , values , errors ) :
+                    vh = h1 ( x , interpolate = t , **kw )
+                    assert vh.value() == v and vh.error() == e , 'Mismatch in 1D evaluate'
+                    
+                values , errors = h2.evaluate ( xs , ys , interpolate = ( t , t ) , **kw )
+                for x , y , v , e in zip ( xs , ys , values , errors ) :
+                    vh = h2 ( x , y , interpolate = ( t , t ) , **kw )
+                    assert vh.value() == v and vh.error() == e , 'Mismatch in 2D evaluate'
+
+                values , errors = h3.evaluate ( xs , ys , zs , interpolate = ( t , t , t ) , **kw )
+                for x , y , z , v , e in zip ( xs , ys , zs , values , errors ) :
+                    vh = h3 ( x , y , z , interpolate = ( t , t , t ) , **kw )
+                    assert vh.value() == v and vh.error() == e , 'Mismatch in 3D evaluate'
+
+    logger.info ( 'Vectorised interpolation is consistent with point-by-point evaluation' ) 
         
 # =============================================================================
 if '__main__' == __name__ :
@@ -178,6 +211,7 @@ if '__main__' == __name__ :
     test_2D  () ## test interpolation for 2D-histograms
     test_3D  () ## test interpolation for 3D-histograms
     test_3D2 () ## test interpolation for 3D-histograms
+    test_evaluate () ## test vectorised interpolation 
     
 # =============================================================================
 # The END 
@@ -319,6 +319,79 @@ def test_efficiency() :
                     
             
 
+# =============================================================================
+## Test for vectorised arithmetic: compare with per-bin operations 
+def test_vectorised () :
+
+    logger.info ( 'Test for vectorised arithmetic with histograms')
+
+    from ostap.histos.histos import ( _h1_oper_ , _h2_oper_ ,
+                                      _v_add_ , _v_sub_ , _v_mul_ , _v_div_  ,
+                                      _v_frac_, _v_asym_, _v_chi2_, _v_mean_ )
+    
+    h1 = ROOT.TH1D ( hID() , '' , 20 , 0 , 1 ) 
+    h2 = ROOT.TH1D ( hID() , '' , 20 , 0 , 1 ) 
+    for i in range ( 1000 ) :
+        h1.Fill ( random.uniform ( 0 , 1 ) )
+        h2.Fill ( random.uniform ( 0 , 1 ) )
+    h2 [ 5 ] = VE ( 0 , 0 ) ## division by zero 
+    
+    g1 = ROOT.TH2F ( hID() , '' , 10 , 0 , 1 , 10 , 0 , 1 ) 
+    g2 = ROOT.TH2F ( hID() , '' , 10 , 0 , 1 , 10 , 0 , 1 ) 
+    for i in range ( 1000 ) :
+        g1.Fill ( random.uniform ( 0 , 1 ) , random.uniform ( 0 , 1 ) )
+        g2.Fill ( random.uniform ( 0 , 1 ) , random.uniform ( 0 , 1 ) )
+        
+    for oper , voper in ( ( lambda x,y : x+y , _v_add_ ) ,
+                          ( lambda x,y : x-y , _v_sub_ ) ,
+                          ( lambda x,y : x*y , _v_mul_ ) ,
+                          ( lambda x,y : x/y , _v_div_ ) ,
+                          ( lambda x,y : x.frac(y)   , _v_frac_ ) ,
+                          ( lambda x,y : x.asym(y)   , _v_asym_ ) ,
+                          ( lambda x,y : VE ( x.chi2 ( y ) , 0 ) , _v_chi2_ ) ,
+                          ( lambda x,y : x.mean ( y ) , _v_mean_ ) ) :
+        
+        for a , b , fun in ( ( h1 , h2 , _h1_oper_ ) , ( h1 , VE ( 2 , 0.1 ) , _h1_oper_ ) ,
+                             ( g1 , g2 , _h2_oper_ ) , ( g1 , 3.0           , _h2_oper_ ) ) :
+            r1 = fun ( a , b , oper         ) ## per-bin 
+            r2 = fun ( a , b , oper , voper ) ## vectorised
+            for i in r1 :
+                assert abs ( r1[i].value() - r2[i].value() ) <= 1.e-5 * ( 1 + abs ( r1[i].value() ) ) , \
+                       'Mismatch in values %s vs %s' % ( r1[i] , r2[i] ) 
+                assert abs ( r1[i].error() - r2[i].error() ) <= 1.e-5 * ( 1 + abs ( r1[i].error() ) ) , \
+                       'Mismatch in errors %s vs %s' % ( r1[i] , r2[i] ) 
+
+# =============================================================================
+## Test for vectorised arithmetic: profiles keep the per-bin operations 
+def test_vectorised_profile () :
+
+    logger.info ( 'Test for vectorised arithmetic with profiles')
+
+    from ostap.histos.histos import _h1_oper_ , _h_np_ok_ , _v_mul_ , _v_add_
+    
+    h1 = ROOT.TH1D     ( hID() , '' , 20 , 0 , 1 ) 
+    p1 = ROOT.TProfile ( hID() , '' , 20 , 0 , 1 ) 
+    for i in range ( 1000 ) :
+        x = random.uniform ( 0 , 1 )
+        h1.Fill ( x )
+        p1.Fill ( x , random.gauss ( 10 * x , 1 ) )
+    p2 = ROOT.TProfile2D ( hID() , '' , 5 , 0 , 1 , 5 , 0 , 1 ) 
+    p3 = ROOT.TProfile3D ( hID() , '' , 5 , 0 , 1 , 5 , 0 , 1 , 5 , 0 , 1 ) 
+    for p in ( p1 , p2 , p3 ) : 
+        assert not _h_np_ok_ ( p ) , 'Profile %s is accepted for vectorised operations' % type ( p )
+
+    ## the profile as the second operand: the bin means are used 
+    for oper , voper in ( ( lambda x,y : x*y , _v_mul_ ) ,
+                          ( lambda x,y : x+y , _v_add_ ) ) :
+        r1 = _h1_oper_ ( h1 , p1 , oper         ) ## per-bin 
+        r2 = _h1_oper_ ( h1 , p1 , oper , voper ) ## ``vectorised''
+        for i in r1 :
+            expected = oper ( h1 [ i ] , p1 [ i ] ) 
+            assert abs ( r1[i].value() - r2[i].value() ) <= 1.e-5 * ( 1 + abs ( r1[i].value() ) ) , \
+                   'Mismatch in values %s vs %s' % ( r1[i] , r2[i] ) 
+            assert abs ( expected.value() - r2[i].value() ) <= 1.e-5 * ( 1 + abs ( expected.value() ) ) , \
+                   'Profile arithmetic is changed %s vs %s' % ( expected , r2[i] ) 
+
 # =============================================================================
 if '__main__' == __name__ :
 
@@ -327,6 +400,9 @@ if '__main__' == __name__ :
     test_basic_2D   ()
     
     test_efficiency () 
+
+    test_vectorised () 
+    test_vectorised_profile () 
     
 # =============================================================================
 # The END 
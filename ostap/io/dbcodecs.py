@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+## @file dbcodecs.py
+#
+#  Codecs and serializers for the values of ZipShelf/SQLiteShelf databases
+#
+#  - the registry of compression codecs:
+#    <code>none</code>, <code>zlib</code>, <code>bz2</code> and
+#    (when available) <code>lzma</code>, <code>lz4</code>, <code>zstd</code>
+#  - the registry of serializers (<code>pickle</code> by default)
+#  - the automatic mode: the small or incompressible blobs are stored as they are
+#  - each stored blob is prefixed by the one-byte tag of its codec,
+#    therefore the blobs are self-describing
+#  - the codec and serializer are recorded in the metadata of the database
+#
+#  @code
+#  coder = ValueCoder ( 'zlib:1' )   ## zlib with level 1
+#  coder = ValueCoder ( 'lz4'    )   ## fast LZ-class codec (if available)
+#  coder = ValueCoder ( 'auto'   )   ## the fastest available codec, skip small/incompressible blobs
+#  blob  = coder.dumps ( obj  )
+#  obj   = coder.loads ( blob )
+#  meta  = coder.metadata ()         ## to be recorded in the database
+#  coder = ValueCoder.from_metadata ( meta )
+#  @endcode
+#  @see ZipShelf
+#  @see SQLiteShelf
+#  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
+#  @date   2019-04-24
+# =============================================================================
+"""Codecs and serializers for the values of ZipShelf/SQLiteShelf databases
+
+- the registry of compression codecs:
+  `none`, `zlib`, `bz2` and (when available) `lzma`, `lz4`, `zstd`
+- the registry of serializers (`pickle` by default)
+- the automatic mode: the small or incompressible blobs are stored as they are
+- each stored blob is prefixed by the one-byte tag of its codec,
+  therefore the blobs are self-describing
+- the codec and serializer are recorded in the metadata of the database
+
+>>> coder = ValueCoder ( 'zlib:1' )   ## zlib with level 1
+>>> coder = ValueCoder ( 'lz4'    )   ## fast LZ-class codec (if available)
+>>> coder = ValueCoder ( 'auto'   )   ## the fastest available codec, skip small/incompressible blobs
+>>> blob  = coder.dumps ( obj  )
+>>> obj   = coder.loads ( blob )
+>>> meta  = coder.metadata ()         ## to be recorded in the database
+>>> coder = ValueCoder.from_metadata ( meta )
+"""
+# =============================================================================
+__author__  = "Vanya BELYAEV Ivan.Belyaev@itep.ru"
+__date__    = "2019-04-24"
+__version__ = "$Revision$"
+# =============================================================================
+__all__ = (
+    'ValueCoder'          , ## codec+serializer for the database values
+    'LegacyCoder'         , ## zlib+pickle without tags (old databases)
+    'register_codec'      , ## register new compression codec
+    'register_serializer' , ## register new serializer
+    'available_codecs'    , ## list of available codecs
+    'benchmark'           , ## benchmark codecs for the given objects
+    )
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' == __name__ : logger = getLogger ( 'ostap.io.dbcodecs' )
+else                      : logger = getLogger ( __name__             )
+# =============================================================================
+try:
+    from cPickle import dumps as _pdumps, loads as _ploads, HIGHEST_PROTOCOL
+except ImportError:
+    from  pickle import dumps as _pdumps, loads as _ploads, HIGHEST_PROTOCOL
+import zlib, bz2
+from   collections import namedtuple, OrderedDict
+# =============================================================================
+## the compression codec:
+#  - name       : the name of the codec
+#  - tag        : one-byte tag, prefixed to the blobs
+#  - compress   : <code>compress   ( data , level ) </code>
+#  - decompress : <code>decompress ( data )         </code>
+#  - level      : the default level
+Codec      = namedtuple ( 'Codec'      , ( 'name' , 'tag' , 'compress' , 'decompress' , 'level' ) )
+## the serializer: <code>dumps ( obj , protocol )</code> and <code>loads ( data )</code>
+Serializer = namedtuple ( 'Serializer' , ( 'name' , 'dumps' , 'loads' ) )
+# =============================================================================
+_codecs      = OrderedDict ()
+_tags        = {}
+_serializers = OrderedDict ()
+# =============================================================================
+## register new compression codec
+#  @code
+#  register_codec ( 'mycodec' , 100 , compress , decompress , level = 3 )
+#  @endcode
+def register_codec ( name , tag , compress , decompress , level = None ) :
+    """Register new compression codec
+    >>> register_codec ( 'mycodec' , 100 , compress , decompress , level = 3 )
+    - compress   : compress   ( data , level )
+    - decompress : decompress ( data )
+    """
+    assert isinstance ( tag , int ) and 0 <= tag < 256 , 'Invalid tag %s' % tag
+    assert not chr ( tag ) in _tags or _tags [ chr ( tag ) ].name == name , \
+           'The tag %d is already used by %s' % ( tag , _tags [ chr ( tag ) ].name )
+    codec = Codec ( name , chr ( tag ) , compress , decompress , level )
+    _codecs [ name     ] = codec
+    _tags   [ chr ( tag ) ] = codec
+    return codec
+
+# =============================================================================
+## register new serializer
+#  @code
+#  register_serializer ( 'myserializer' , dumps , loads )
+#  @endcode
+def register_serializer ( name , dumps , loads ) :
+    """Register new serializer
+    >>> register_serializer ( 'myserializer' , dumps , loads )
+    - dumps : dumps ( obj , protocol )
+    - loads : loads ( data )
+    """
+    s = Serializer ( name , dumps , loads )
+    _serializers [ name ] = s
+    return s
+
+## list of available codecs
+def available_codecs () :
+    """List of available codecs"""
+    return tuple ( _codecs.keys() )
+
+# =============================================================================
+## the standard codecs
+# =============================================================================
+register_codec ( 'none' , 0 , lambda d , l : d , lambda d : d )
+register_codec ( 'zlib' , 1 , lambda d , l : zlib.compress ( d , l ) , zlib.decompress , zlib.Z_BEST_COMPRESSION )
+register_codec ( 'bz2'  , 2 , lambda d , l : bz2.compress  ( d , l ) , bz2.decompress  , 9 )
+
+try :
+    try               : import lzma
+    except ImportError: from backports import lzma
+    register_codec ( 'lzma' , 3 ,
+                     lambda d , l : lzma.compress ( d , preset = l ) , lzma.decompress , 6 )
+except ImportError :
+    pass
+
+try :
+    import lz4.frame as _lz4
+    register_codec ( 'lz4'  , 4 ,
+                     lambda d , l : _lz4.compress ( d , compression_level = l ) , _lz4.decompress , 0 )
+except ImportError :
+    pass
+
+try :
+    import zstandard as _zstd
+    register_codec ( 'zstd' , 5 ,
+                     lambda d , l : _zstd.ZstdCompressor ( level = l ).compress ( d ) ,
+                     lambda d     : _zstd.ZstdDecompressor ().decompress ( d ) , 3 )
+except ImportError :
+    pass
+
+register_serializer ( 'pickle' , lambda o , p : _pdumps ( o , p ) , _ploads )
+
+## the modules needed for the optional codecs 
+_codec_modules = { 'lzma' : 'lzma/backports.lzma' , 'lz4' : 'lz4' , 'zstd' : 'zstandard' }
+
+## the preferred (fast) codecs for the automatic mode
+_fast_codecs = ( ( 'lz4' , None ) , ( 'zstd' , 1 ) , ( 'zlib' , 1 ) )
+
+# =============================================================================
+## @class ValueCoder
+#  Codec+serializer for the database values
+#  @code
+#  coder = ValueCoder ( 'zlib'   )  ## zlib with the default (best) compression
+#  coder = ValueCoder ( 'zlib:1' )  ## zlib with level 1
+#  coder = ValueCoder ( 'lzma'   )  ## lzma (if available)
+#  coder = ValueCoder ( 'none'   )  ## no compression
+#  coder = ValueCoder ( 'auto'   )  ## the fastest available codec, skip small/incompressible blobs
+#  coder = ValueCoder ( 'zlib' , auto = True ) ## zlib, skip small/incompressible blobs
+#  blob  = coder.dumps ( obj  )
+#  obj   = coder.loads ( blob )
+#  @endcode
+#  @param codec      the codec name, optionally with the level: 'name:level'
+#  @param level      the compression level (overrides one from the name)
+#  @param serializer the serializer name
+#  @param protocol   the protocol for serializer
+#  @param auto       skip the compression for small or incompressible blobs
+#  @param min_size   blobs smaller than this size are not compressed (automatic mode)
+#  @param min_gain   the blobs are stored uncompressed, if compression gains less (automatic mode)
+class ValueCoder(object) :
+    """Codec+serializer for the database values
+    >>> coder = ValueCoder ( 'zlib'   )  ## zlib with the default (best) compression
+    >>> coder = ValueCoder ( 'zlib:1' )  ## zlib with level 1
+    >>> coder = ValueCoder ( 'lzma'   )  ## lzma (if available)
+    >>> coder = ValueCoder ( 'none'   )  ## no compression
+    >>> coder = ValueCoder ( 'auto'   )  ## the fastest available codec, skip small/incompressible blobs
+    >>> coder = ValueCoder ( 'zlib' , auto = True ) ## zlib, skip small/incompressible blobs
+    >>> blob  = coder.dumps ( obj  )
+    >>> obj   = coder.loads ( blob )
+    - codec      : the codec name, optionally with the level: 'name:level'
+    - level      : the compression level (overrides one from the name)
+    - serializer : the serializer name
+    - protocol   : the protocol for serializer
+    - auto       : skip the compression for small or incompressible blobs
+    - min_size   : blobs smaller than this size are not compressed (automatic mode)
+    - min_gain   : the blobs are stored uncompressed, if compression gains less (automatic mode)
+    """
+    def __init__ ( self                        ,
+                   codec      = 'zlib'         ,
+                   level      = None           ,
+                   serializer = 'pickle'       ,
+                   protocol   = HIGHEST_PROTOCOL ,
+                   auto       = False          ,
+                   min_size   = 256            ,
+                   min_gain   = 0.05           ) :
+
+        if ':' in codec :
+            codec , l = codec.split ( ':' , 1 )
+            if level is None : level = int ( l )
+
+        if 'auto' == codec :
+            auto = True
+            for c , l in _fast_codecs :
+                if c in _codecs :
+                    codec = c
+                    if level is None : level = l
+                    break
+
+        assert codec      in _codecs     , 'Unknown codec %s, available: %s' % ( codec , available_codecs() )
+        assert serializer in _serializers, 'Unknown serializer %s' % serializer
+
+        self.__codec      = _codecs      [ codec      ]
+        self.__serializer = _serializers [ serializer ]
+        self.__level      = level if not level is None else self.__codec.level
+        self.__protocol   = protocol
+        self.__auto       = True if auto else False
+        self.__min_size   = min_size
+        self.__min_gain   = min_gain
+
+    @property
+    def codec      ( self ) :
+        """``codec'' : the name of compression codec"""
+        return self.__codec.name
+    @property
+    def level      ( self ) :
+        """``level'' : the compression level"""
+        return self.__level
+    @property
+    def serializer ( self ) :
+        """``serializer'' : the name of serializer"""
+        return self.__serializer.name
+    @property
+    def auto       ( self ) :
+        """``auto'' : skip the compression for small or incompressible blobs?"""
+        return self.__auto
+
+    # =========================================================================
+    ## compress the data (and prefix it with the codec tag)
+    def encode ( self , data ) :
+        """Compress the data (and prefix it with the codec tag)"""
+        codec = self.__codec
+        if self.__auto and len ( data ) < self.__min_size : codec = _codecs [ 'none' ]
+        zdata = codec.compress ( data , self.__level )
+        if self.__auto and len ( zdata ) > ( 1 - self.__min_gain ) * len ( data ) :
+            codec , zdata = _codecs [ 'none' ] , data
+        return codec.tag + zdata
+
+    ## decompress the tagged data
+    def decode ( self , blob ) :
+        """Decompress the tagged data"""
+        blob  = str ( blob )
+        codec = _tags.get ( blob [ :1 ] , None )
+        if codec is None : raise TypeError ( "Unknown/unavailable codec with tag %r" % blob [ :1 ] )
+        return codec.decompress ( blob [ 1: ] )
+
+    # =========================================================================
+    ## serialize and compress the object
+    def dumps ( self , obj ) :
+        """Serialize and compress the object"""
+        return self.encode ( self.__serializer.dumps ( obj , self.__protocol ) )
+
+    ## decompress and deserialize the object
+    def loads ( self , blob ) :
+        """Decompress and deserialize the object"""
+        return self.__serializer.loads ( self.decode ( blob ) )
+
+    # =========================================================================
+    ## the metadata to be recorded in the database
+    def metadata ( self ) :
+        """The metadata to be recorded in the database"""
+        return { 'codec'      : self.codec      ,
+                 'level'      : self.level      ,
+                 'serializer' : self.serializer ,
+                 'protocol'   : self.__protocol ,
+                 'auto'       : self.__auto     ,
+                 'min_size'   : self.__min_size ,
+                 'min_gain'   : self.__min_gain }
+
+    ## create the coder from the database metadata
+    #  @attention it fails with <code>ImportError</code> if the recorded codec is not available
+    @classmethod
+    def from_metadata ( klass , meta ) :
+        """Create the coder from the database metadata
+        - it fails with ImportError if the recorded codec is not available
+        """
+        codec = meta [ 'codec' ]
+        if not codec in _codecs :
+            raise ImportError ( "The database is written with codec '%s' (module '%s'), that is not available: %s" % (
+                codec , _codec_modules.get ( codec , codec ) , available_codecs () ) ) 
+        return klass ( codec      = meta [ 'codec'      ] ,
+                       level      = meta.get ( 'level'    , None             ) ,
+                       serializer = meta.get ( 'serializer' , 'pickle'       ) ,
+                       protocol   = meta.get ( 'protocol' , HIGHEST_PROTOCOL ) ,
+                       auto       = meta.get ( 'auto'     , False            ) ,
+                       min_size   = meta.get ( 'min_size' , 256              ) ,
+                       min_gain   = meta.get ( 'min_gain' , 0.05             ) )
+
+    def __repr__ ( self ) :
+        return 'ValueCoder(%s:%s,%s%s)' % ( self.codec , self.level , self.serializer , ',auto' if self.auto else '' )
+    __str__ = __repr__
+
+# =============================================================================
+## @class LegacyCoder
+#  zlib+pickle without tags, as used for old databases without metadata
+class LegacyCoder(object) :
+    """zlib+pickle without tags, as used for old databases without metadata
+    """
+    def __init__ ( self , level = zlib.Z_BEST_COMPRESSION , protocol = HIGHEST_PROTOCOL ) :
+        self.level    = level
+        self.protocol = protocol
+    def dumps ( self , obj  ) : return zlib.compress ( _pdumps ( obj , self.protocol ) , self.level )
+    def loads ( self , blob ) : return _ploads ( zlib.decompress ( str ( blob ) ) )
+    def metadata ( self ) : return {}
+    def __repr__ ( self ) : return 'LegacyCoder(zlib:%s)' % self.level
+    __str__ = __repr__
+
+# =============================================================================
+## benchmark codecs for the given objects: write/read throughput and size
+#  @code
+#  objects = { 'histo' : h2 , 'dataset' : ds }
+#  table   = benchmark ( objects , codecs = ( 'none' , 'zlib' , 'zlib:1' , 'auto' ) )
+#  for codec , size , ratio , wspeed , rspeed in table : ...
+#  @endcode
+#  @return list of ( codec , size , ratio , write-MB/s , read-MB/s )
+def benchmark ( objects , codecs = None , repeat = 3 , silent = False ) :
+    """Benchmark codecs for the given objects: write/read throughput and size
+    >>> objects = { 'histo' : h2 , 'dataset' : ds }
+    >>> table   = benchmark ( objects , codecs = ( 'none' , 'zlib' , 'zlib:1' , 'auto' ) )
+    >>> for codec , size , ratio , wspeed , rspeed in table : ...
+    - return list of ( codec , size , ratio , write-MB/s , read-MB/s )
+    """
+    import time
+    if isinstance ( objects , dict ) : objects = objects.values()
+    if codecs is None :
+        codecs = [ 'none' , 'zlib' , 'zlib:1' ] + [ c for c in _codecs if not c in ( 'none' , 'zlib' ) ] + [ 'auto' ]
+
+    legacy = LegacyCoder ()
+    raw    = sum ( len ( _pdumps ( o , HIGHEST_PROTOCOL ) ) for o in objects )
+    table  = []
+    for c in codecs :
+        coder = ValueCoder ( c ) if c != 'legacy' else legacy
+        t0    = time.time ()
+        for i in range ( repeat ) : blobs = [ coder.dumps ( o ) for o in objects ]
+        t1    = time.time ()
+        for i in range ( repeat ) : [ coder.loads ( b ) for b in blobs ]
+        t2    = time.time ()
+        size  = sum ( len ( b ) for b in blobs )
+        mb    = repeat * raw / 1024.0**2
+        table.append ( ( str ( c ) , size , float ( size ) / max ( raw , 1 ) ,
+                         mb / max ( t1 - t0 , 1.e-9 ) , mb / max ( t2 - t1 , 1.e-9 ) ) )
+
+    if not silent :
+        lines = [ '%-10s %12s %8s %12s %12s' % ( 'codec' , 'size[B]' , 'ratio' , 'write[MB/s]' , 'read[MB/s]' ) ]
+        for row in table : lines.append ( '%-10s %12d %8.3f %12.1f %12.1f' % row )
+        logger.info ( 'Codec benchmark (raw size %d bytes):\n%s' % ( raw , '\n'.join ( lines ) ) )
+
+    return table
+
+# =============================================================================
+if '__main__' == __name__ :
+
+    from ostap.utils.docme import docme
+    docme ( __name__ , logger = logger )
+    logger.info ( 'Available codecs: %s' % list ( available_codecs() ) )
+
+# =============================================================================
+# The END
+# =============================================================================
@@ -0,0 +1,452 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+## @file indexeddb.py
+#
+#  Simple append-only indexed container of (independently compressed) blobs,
+#  used as the storage backend for ZipShelf.
+#
+#  - each value is stored as a separate record, the file is never
+#    compressed/decompressed as a whole, and the database is usable directly
+#  - per-key random access: the index ( key -> offset,size ) is kept in memory
+#  - writes are append-only: the update of the existing key appends
+#    the new record, the deletion appends the ``tombstone'' record
+#  - on close the index is appended as the footer, that allows to open
+#    the database without scanning the records
+#  - the dead records are removed by the compaction, that can be run
+#    in the background thread, or automatically at close
+#
+#  File layout:
+#  @code
+#  MAGIC
+#  record  : <klen:uint32><vlen:uint64><key><value>      ## vlen=2**64-1 for tombstone
+#  meta    : <0xFFFFFFFE:uint32><mlen:uint64><metadata>
+#  ...
+#  footer  : <0xFFFFFFFF:uint32><ilen:uint64><index><offset:uint64><MAGIC>
+#  @endcode
+#
+#  @code
+#  db = IndexedDB ( 'a_db.zdb' , 'c' )
+#  db [ 'key' ] = zlib.compress ( ... )
+#  value = db [ 'key' ]
+#  db.compact ( background = True )
+#  db.close ()
+#  @endcode
+#  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
+#  @date   2019-04-20
+# =============================================================================
+"""Simple append-only indexed container of (independently compressed) blobs,
+used as the storage backend for ZipShelf.
+
+- each value is stored as a separate record, the file is never
+  compressed/decompressed as a whole, and the database is usable directly
+- per-key random access: the index ( key -> offset,size ) is kept in memory
+- writes are append-only: the update of the existing key appends
+  the new record, the deletion appends the ``tombstone'' record
+- on close the index is appended as the footer, that allows to open
+  the database without scanning the records
+- the dead records are removed by the compaction, that can be run
+  in the background thread, or automatically at close
+
+>>> db = IndexedDB ( 'a_db.zdb' , 'c' )
+>>> db [ 'key' ] = zlib.compress ( ... )
+>>> value = db [ 'key' ]
+>>> db.compact ( background = True )
+>>> db.close ()
+"""
+# =============================================================================
+__author__  = "Vanya BELYAEV Ivan.Belyaev@itep.ru"
+__date__    = "2019-04-20"
+__version__ = "$Revision$"
+# =============================================================================
+__all__ = (
+    'IndexedDB'  , ## append-only indexed container of blobs
+    'is_indexed' , ## is the file an indexed container?
+    'open'       , ## open the indexed container
+    )
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' == __name__ : logger = getLogger ( 'ostap.io.indexeddb' )
+else                      : logger = getLogger ( __name__             )
+# =============================================================================
+import os, struct, marshal, threading
+# =============================================================================
+MAGIC      = 'OSTAPIDB'
+_header    = struct.Struct ( '<IQ' ) ## key length, value length
+_trailer   = struct.Struct ( '<Q'  ) ## offset of the footer
+_TOMBSTONE = 2**64 - 1               ## value length for the deleted key
+_FOOTER    = 2**32 - 1               ## key length for the footer
+_META      = 2**32 - 2               ## key length for the metadata record 
+_BLOCK     = 2**20                   ## block size for copying
+# =============================================================================
+## is the file an indexed container?
+def is_indexed ( filename ) :
+    """Is the file an indexed container?"""
+    if not os.path.exists ( filename ) or not os.path.isfile ( filename ) : return False
+    with file ( filename , 'rb' ) as f : return MAGIC == f.read ( len ( MAGIC ) )
+
+# =============================================================================
+## @class IndexedDB
+#  Append-only indexed container of blobs with dict-like interface
+#  (the ``dbm''-replacement for <code>shelve.Shelf</code>)
+#    Modes:
+#    - 'r' Open existing database for reading only
+#    - 'w' Open existing database for reading and writing
+#    - 'c' Open database for reading and writing, creating it if it doesn’t exist (default)
+#    - 'n' Always create a new, empty database, open for reading and writing
+#  @code
+#  db = IndexedDB ( 'a_db.zdb' , 'c' )
+#  db [ 'key' ] = zlib.compress ( ... )
+#  value = db [ 'key' ]
+#  db.close ()
+#  @endcode
+#  @param autocompact  compact the database at close,
+#         if the fraction of dead records exceeds this value
+class IndexedDB(object) :
+    """Append-only indexed container of blobs with dict-like interface
+    (the ``dbm''-replacement for shelve.Shelf)
+    Modes:
+    - 'r'  Open existing database for reading only
+    - 'w'  Open existing database for reading and writing
+    - 'c'  Open database for reading and writing, creating it if it doesn’t exist
+    - 'n'  Always create a new, empty database, open for reading and writing
+    >>> db = IndexedDB ( 'a_db.zdb' , 'c' )
+    >>> db [ 'key' ] = zlib.compress ( ... )
+    >>> value = db [ 'key' ]
+    >>> db.close ()
+    - autocompact : compact the database at close,
+    if the fraction of dead records exceeds this value
+    """
+    def __init__ ( self , filename , mode = 'c' , autocompact = 0.5 ) :
+
+        assert mode in ( 'r' , 'w' , 'c' , 'n' ) , 'IndexedDB: invalid mode %s' % mode
+
+        exists = os.path.exists ( filename )
+        if   mode in ( 'r' , 'w' ) and not exists :
+            raise IOError ( "IndexedDB: non existing file %s" % filename )
+        elif exists and 'n' != mode and not is_indexed ( filename ) :
+            raise IOError ( "IndexedDB: invalid format of %s" % filename )
+
+        self.__filename    = filename
+        self.__readonly    = 'r' == mode
+        self.__autocompact = autocompact
+        self.__lock        = threading.RLock ()
+        self.__compactor   = None
+        self.__index       = {}
+        self.__waste       = 0
+        self.__meta        = {}
+
+        if 'n' == mode or not exists :
+            with file ( filename , 'wb' ) as f : f.write ( MAGIC )
+
+        self.__file = file ( filename , 'rb' if self.__readonly else 'r+b' )
+        self.__end  = self.__load ()
+
+        ## remove the footer: the next records will be written on its place
+        if not self.__readonly :
+            self.__file.seek     ( self.__end )
+            self.__file.truncate ( self.__end )
+
+    # =========================================================================
+    ## load the index: from the footer or by scanning the records
+    def __load ( self ) :
+        f    = self.__file
+        f.seek ( 0 , 2 )
+        size = f.tell ()
+        tl   = _trailer.size + len ( MAGIC )
+        if len ( MAGIC ) + tl <= size :
+            f.seek ( size - tl )
+            trailer = f.read ( tl )
+            if MAGIC == trailer [ _trailer.size : ] :
+                offset , = _trailer.unpack ( trailer [ : _trailer.size ] )
+                f.seek ( offset )
+                klen , ilen = _header.unpack ( f.read ( _header.size ) )
+                if _FOOTER == klen and offset + _header.size + ilen + tl == size :
+                    footer = marshal.loads ( f.read ( ilen ) )
+                    self.__index , self.__waste = footer [ : 2 ]
+                    if 2 < len ( footer ) : self.__meta = footer [ 2 ] 
+                    return offset
+        ## no valid footer: scan the records
+        return self.__scan ( len ( MAGIC ) , size )
+
+    ## scan the records, starting from the given position
+    def __scan ( self , start , size ) :
+        f   = self.__file
+        pos = start
+        while pos + _header.size <= size :
+            f.seek ( pos )
+            klen , vlen = _header.unpack ( f.read ( _header.size ) )
+            if _FOOTER == klen :
+                ## skip the obsolete footer
+                pos += _header.size + vlen + _trailer.size + len ( MAGIC )
+                continue
+            if _META   == klen :
+                ## the metadata record: the last one wins 
+                if size < pos + _header.size + vlen : break
+                if self.__meta : self.__waste += _header.size + len ( marshal.dumps ( self.__meta ) )
+                self.__meta = marshal.loads ( f.read ( vlen ) )
+                pos += _header.size + vlen 
+                continue
+            size_ = vlen if _TOMBSTONE != vlen else 0
+            if size < pos + _header.size + klen + size_ :
+                logger.warning ( "IndexedDB(%s): truncated record at %d is ignored" % ( self.__filename , pos ) )
+                break
+            key   = f.read ( klen )
+            self.__drop ( key )
+            if _TOMBSTONE == vlen : self.__waste += _header.size + klen
+            else                  : self.__index [ key ] = pos + _header.size + klen , vlen
+            pos  += _header.size + klen + size_
+        return min ( pos , size )
+
+    ## account the dead record for the key (if any)
+    def __drop ( self , key ) :
+        entry = self.__index.pop ( key , None )
+        if entry : self.__waste += _header.size + len ( key ) + entry [ 1 ]
+
+    ## append the record, return the position of the value
+    def __append ( self , key , value ) :
+        f = self.__file
+        f.seek  ( self.__end )
+        if value is None : f.write ( _header.pack ( len ( key ) , _TOMBSTONE   ) + key )
+        else             : f.write ( _header.pack ( len ( key ) , len ( value ) ) + key + value )
+        pos         = self.__end + _header.size + len ( key )
+        self.__end  = pos + ( len ( value ) if value is not None else 0 )
+        return pos
+
+    ## append the metadata record 
+    def __append_meta ( self , meta ) :
+        blob = marshal.dumps ( meta )
+        self.__file.seek  ( self.__end )
+        self.__file.write ( _header.pack ( _META , len ( blob ) ) + blob )
+        self.__end += _header.size + len ( blob )
+        return _header.size + len ( blob )
+    
+    ## check the key
+    @staticmethod
+    def __key ( key ) :
+        if isinstance ( key , unicode ) : key = key.encode ( 'utf-8' )
+        assert isinstance ( key , str ) , 'IndexedDB: invalid key type %s' % type ( key )
+        return key
+
+    # =========================================================================
+    ## dict-like interface
+    # =========================================================================
+    def __getitem__ ( self , key ) :
+        key = self.__key ( key )
+        with self.__lock :
+            offset , size = self.__index [ key ]
+            self.__file.seek ( offset )
+            return self.__file.read ( size )
+
+    def __setitem__ ( self , key , value ) :
+        assert not self.__readonly , 'IndexedDB: database is opened in read-only mode'
+        key   = self.__key ( key )
+        value = str ( value )
+        with self.__lock :
+            pos = self.__append ( key , value )
+            self.__drop ( key )
+            self.__index [ key ] = pos , len ( value )
+
+    def __delitem__ ( self , key ) :
+        assert not self.__readonly , 'IndexedDB: database is opened in read-only mode'
+        key = self.__key ( key )
+        with self.__lock :
+            if not key in self.__index : raise KeyError ( key )
+            self.__append ( key , None )
+            self.__drop   ( key )
+            self.__waste += _header.size + len ( key )
+
+    def __contains__ ( self , key ) : return self.__key ( key ) in self.__index
+    def has_key      ( self , key ) : return key in self
+    def __len__      ( self       ) : return len  ( self.__index )
+    def __iter__     ( self       ) : return iter ( self.keys () )
+    def keys         ( self       ) : return self.__index.keys ()
+    def get          ( self , key , default = None ) :
+        return self [ key ] if key in self else default
+
+    @property
+    def filename ( self ) :
+        """``filename'' : the name of the file"""
+        return self.__filename
+    @property
+    def readonly ( self ) :
+        """``readonly'' : is the database opened in read-only mode?"""
+        return self.__readonly
+    @property
+    def meta     ( self ) :
+        """``meta'' : the metadata of the database (dictionary)"""
+        return dict ( self.__meta )
+    @meta.setter
+    def meta     ( self , value ) :
+        assert not self.__readonly , 'IndexedDB: database is opened in read-only mode'
+        value = dict ( value ) 
+        with self.__lock :
+            if self.__meta : self.__waste += _header.size + len ( marshal.dumps ( self.__meta ) )
+            self.__append_meta ( value )
+            self.__meta = value 
+    @property
+    def waste    ( self ) :
+        """``waste'' : the size of the dead records (in bytes)"""
+        return self.__waste
+    @property
+    def size     ( self ) :
+        """``size'' : the size of the records (in bytes)"""
+        return self.__end
+
+    # =========================================================================
+    ## flush the written records
+    def sync ( self ) :
+        """Flush the written records"""
+        if self.__file and not self.__readonly :
+            with self.__lock : self.__file.flush ()
+
+    # =========================================================================
+    ## remove the dead records
+    #  @code
+    #  db.compact ()                                    ## compact now
+    #  db.compact ( background = True )                 ## compact in the background thread
+    #  @endcode
+    #  In the background mode the database is fully usable during the compaction:
+    #  the records, written after the start of compaction are transferred at the end
+    #  @return the compaction thread for the background mode
+    def compact ( self , background = False ) :
+        """Remove the dead records
+        >>> db.compact ()                                    ## compact now
+        >>> db.compact ( background = True )                 ## compact in the background thread
+        In the background mode the database is fully usable during the compaction:
+        the records, written after the start of compaction are transferred at the end
+        - return the compaction thread for the background mode
+        """
+        assert not self.__readonly , 'IndexedDB: database is opened in read-only mode'
+        self.wait ()
+        if not background : return self.__compact ()
+        self.__compactor = threading.Thread ( target = self.__compact , name = 'IndexedDB.compact' )
+        self.__compactor.daemon = True
+        self.__compactor.start ()
+        return self.__compactor
+
+    ## wait for the background compaction (if any)
+    def wait ( self ) :
+        """Wait for the background compaction (if any)"""
+        if self.__compactor :
+            self.__compactor.join ()
+            self.__compactor = None
+
+    ## the actual compaction
+    def __compact ( self ) :
+
+        with self.__lock :
+            self.__file.flush ()
+            snapshot = dict ( self.__index )
+            end      = self.__end
+
+        tmpname = '%s.%d.compact' % ( self.__filename , os.getpid () )
+        index   = {}
+        with file ( self.__filename , 'rb' ) as src , file ( tmpname , 'wb' ) as dst :
+
+            dst.write ( MAGIC )
+            pos = len ( MAGIC )
+            meta = self.__meta 
+            if meta :
+                blob = marshal.dumps ( meta )
+                dst.write ( _header.pack ( _META , len ( blob ) ) + blob )
+                pos += _header.size + len ( blob )
+
+            ## (1) copy the live records in the order of their position
+            for key , ( offset , size ) in sorted ( snapshot.iteritems () , key = lambda i : i[1][0] ) :
+                src.seek  ( offset )
+                dst.write ( _header.pack ( len ( key ) , size ) + key )
+                pos += _header.size + len ( key )
+                index [ key ] = pos , size
+                while 0 < size :
+                    block = src.read ( min ( size , _BLOCK ) )
+                    dst.write ( block )
+                    size -= len ( block )
+                    pos  += len ( block )
+
+            ## (2) transfer the records, written after the start of compaction and swap files
+            with self.__lock :
+
+                self.__file.flush ()
+                waste = 0
+                for key in index.keys () :
+                    if not key in self.__index :
+                        waste += _header.size + len ( key ) + index.pop ( key ) [ 1 ]
+                for key , ( offset , size ) in self.__index.iteritems () :
+                    if offset < end : continue
+                    if key in index : waste += _header.size + len ( key ) + index [ key ] [ 1 ]
+                    src.seek  ( offset )
+                    value = src.read ( size )
+                    dst.write ( _header.pack ( len ( key ) , size ) + key + value )
+                    pos += _header.size + len ( key )
+                    index [ key ] = pos , size
+                    pos += size
+
+                if not meta is self.__meta : ## metadata are updated during the compaction 
+                    blob = marshal.dumps ( self.__meta )
+                    dst.write ( _header.pack ( _META , len ( blob ) ) + blob )
+                    pos   += _header.size + len ( blob )
+                    if meta : waste += _header.size + len ( marshal.dumps ( meta ) ) 
+                    
+                dst.flush ()
+                os.fsync  ( dst.fileno () )
+                dst.close ()
+
+                before = self.__end
+                self.__file.close ()
+                os.rename ( tmpname , self.__filename )
+                self.__file  = file ( self.__filename , 'r+b' )
+                self.__index = index
+                self.__end   = pos
+                self.__waste = waste
+
+        logger.debug ( "IndexedDB(%s): compacted %d -> %d bytes" % ( self.__filename , before , pos ) )
+
+    # =========================================================================
+    ## close the database (and write the index)
+    def close ( self ) :
+        """Close the database (and write the index)"""
+        if not self.__file : return
+        self.wait ()
+        if not self.__readonly :
+            if self.__autocompact and self.__waste > self.__autocompact * self.__end :
+                self.__compact ()
+            with self.__lock :
+                f     = self.__file
+                blob  = marshal.dumps ( ( self.__index , self.__waste , self.__meta ) )
+                f.seek     ( self.__end )
+                f.write    ( _header.pack ( _FOOTER , len ( blob ) ) + blob + _trailer.pack ( self.__end ) + MAGIC )
+                f.truncate ()
+        self.__file.close ()
+        self.__file = None
+
+    def __enter__ ( self      ) : return self
+    def __exit__  ( self , *_ ) : self.close ()
+    def __del__   ( self      ) :
+        try    : self.close ()
+        except : pass
+
+    def __repr__ ( self ) :
+        return "IndexedDB('%s'): %d object(s)" % ( self.__filename , len ( self ) )
+    __str__ = __repr__
+
+# =============================================================================
+## open the indexed container
+#  @code
+#  db = open ( 'a_db.zdb' , 'c' )
+#  @endcode
+def open ( filename , mode = 'c' , autocompact = 0.5 ) :
+    """Open the indexed container
+    >>> db = open ( 'a_db.zdb' , 'c' )
+    """
+    return IndexedDB ( filename , mode , autocompact )
+
+# =============================================================================
+if '__main__' == __name__ :
+
+    from ostap.utils.docme import docme
+    docme ( __name__ , logger = logger )
+
+# =============================================================================
+# The END
+# =============================================================================
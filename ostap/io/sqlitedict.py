@@ -23,6 +23,24 @@ Pickle is used internally to serialize the values. Keys are strings.
 If you don't use autocommit (default is no autocommit for performance), then
 don't forget to call `mydict.commit()` when done with a transaction.
 
+Many writes can be grouped into a single transaction::
+
+>>> with mydict.transaction():
+...     for k, v in results: mydict[k] = v
+>>> mydict.update_many(results)   # parallel encoding + executemany in one transaction
+
+The iteration is streamed from the database in batches (server-side pagination),
+the key selection by prefix or by glob-pattern is performed by SQLite::
+
+>>> for key in mydict.iterkeys(prefix='fit/'): ...
+>>> for key, value in mydict.iteritems(pattern='*MC*', ordered=True): ...
+
+Several processes can write to the same database concurrently (WAL journal,
+short write transactions, retry with backoff while the database is locked);
+each process opens its own `SqliteDict`::
+
+>>> mydict = SqliteDict('some.db', concurrent=True)
+
 """
 
 import sqlite3
@@ -30,6 +48,8 @@ import os
 import tempfile
 import random
 import logging
+import time
+from contextlib import contextmanager
 from cPickle import dumps, loads, HIGHEST_PROTOCOL as PICKLE_PROTOCOL
 from UserDict import DictMixin
 from Queue import Queue
@@ -55,9 +75,52 @@ def decode(obj):
     return loads(str(obj))
 
 
+def prefix_end(prefix):
+    """The smallest string that is greater than all strings with the given prefix
+    (None if there is no such string)."""
+    prefix = prefix.rstrip('\xff')
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def key_filter(prefix=None, pattern=None):
+    """
+    The SQL condition (list of terms and list of arguments) for the selection of keys
+    by `prefix` and/or by shell-style `pattern` (as `fnmatch.fnmatchcase`).
+    The prefix (including the literal prefix of the pattern) is converted into the range
+    of keys, therefore the primary key index is used.
+
+    """
+    where, args = [], []
+    if pattern:
+        if isinstance(pattern, unicode):
+            pattern = pattern.encode('utf-8')
+        where.append('key GLOB ?')
+        args.append(pattern.replace('[!', '[^'))
+        literal = pattern
+        for c in '*?[':
+            literal = literal.split(c, 1)[0]
+        if not prefix or (literal.startswith(prefix) and len(literal) > len(prefix)):
+            prefix = literal
+    if prefix:
+        if isinstance(prefix, unicode):
+            prefix = prefix.encode('utf-8')
+        where.append('key >= ?')
+        args.append(prefix)
+        end = prefix_end(prefix)
+        if end is not None:
+            where.append('key < ?')
+            args.append(end)
+    return where, args
+
+
 class SqliteDict(object, DictMixin):
+    ## the number of rows fetched from the database per request during iteration
+    batch_size = 1000
+
     def __init__(self, filename=None, tablename='unnamed', flag='c',
-                 autocommit=False, journal_mode="DELETE"):
+                 autocommit=False, journal_mode="DELETE", concurrent=False, timeout=60):
         """
         Initialize a thread-safe sqlite-backed dictionary. The dictionary will
         be a table `tablename` in database file `filename`. A single file (=database)
@@ -73,6 +136,13 @@ class SqliteDict(object, DictMixin):
         Set `journal_mode` to 'OFF' if you're experiencing sqlite I/O problems
         or if you need performance and don't care about crash-consistency.
 
+        Set `concurrent` to allow the simultaneous writes from several processes,
+        each of them opening the database by itself: the `WAL` journal is used,
+        each write is committed immediately (`autocommit`) or in a short
+        `transaction()`, and the requests are retried with the randomized
+        exponential backoff while the database is locked by other processes,
+        up to `timeout` seconds.
+
         The `flag` parameter:
           'c': default mode, open for read/write, creating the db/table if necessary.
           'w': open for r/w, but drop `tablename` contents first (start with empty table)
@@ -96,7 +166,11 @@ class SqliteDict(object, DictMixin):
 
         logger.info("opening Sqlite table %r in %s" % (tablename, filename))
         MAKE_TABLE = 'CREATE TABLE IF NOT EXISTS %s (key TEXT PRIMARY KEY, value BLOB)' % self.tablename
-        self.conn = SqliteMultithread(filename, autocommit=autocommit, journal_mode=journal_mode)
+        if concurrent:
+            autocommit, journal_mode = True, 'WAL'
+        self.conn = SqliteMultithread(filename, autocommit=autocommit, journal_mode=journal_mode,
+                                      concurrent=concurrent, timeout=timeout)
+        self._tx_depth = 0
         self.conn.execute(MAKE_TABLE)
         self.conn.commit()
         if flag == 'w':
@@ -126,20 +200,63 @@ class SqliteDict(object, DictMixin):
         GET_LEN = 'SELECT MAX(ROWID) FROM %s' % self.tablename
         return self.conn.select_one(GET_LEN) is not None
 
-    def iterkeys(self):
-        GET_KEYS = 'SELECT key FROM %s ORDER BY rowid' % self.tablename
-        for key in self.conn.select(GET_KEYS):
+    def _iterselect(self, columns, prefix=None, pattern=None, ordered=False):
+        """
+        Iterate over the selected rows with server-side (keyset) pagination:
+        the rows are fetched in batches of `batch_size` as
+        `... WHERE rowid > last ORDER BY rowid LIMIT batch_size`
+        (or by `key` for `ordered=True`, using the primary key index).
+        The next batch is requested before the current one is consumed, therefore
+        at most two batches are in memory, and other requests (e.g. `mydict[key]`
+        inside the loop) are processed between the batches.
+
+        """
+        order = 'key' if ordered else 'rowid'
+        where, args = key_filter(prefix, pattern)
+        # the rowid and the key are always selected for the paging cursor
+        SELECT = 'SELECT rowid, key, %s FROM %s WHERE %s ORDER BY %s LIMIT %d'
+        first = SELECT % (columns, self.tablename, ' AND '.join(where) or '1', order, self.batch_size)
+        where.append('%s > ?' % order)
+        following = SELECT % (columns, self.tablename, ' AND '.join(where), order, self.batch_size)
+
+        pending = self.conn.request(first, args)
+        while pending is not None:
+            rows = self.conn.result(pending)
+            pending = None
+            if self.batch_size <= len(rows):
+                last = rows[-1][1] if ordered else rows[-1][0]
+                pending = self.conn.request(following, args + [last])
+            for row in rows:
+                yield row[2:]
+
+    def iterkeys(self, prefix=None, pattern=None, ordered=False):
+        """
+        Iterate over the keys (in the order of insertion, or sorted for `ordered=True`),
+        optionally selected by `prefix` and/or by shell-style `pattern`.
+
+        >>> for key in mydict.iterkeys(prefix='fit/', ordered=True): ...
+
+        """
+        for key in self._iterselect('key', prefix, pattern, ordered):
             yield key[0]
 
-    def itervalues(self):
-        GET_VALUES = 'SELECT value FROM %s ORDER BY rowid' % self.tablename
-        for value in self.conn.select(GET_VALUES):
-            yield decode(value[0])
+    def encode_value(self, value):
+        """Serialize the value into the blob (to be redefined in subclasses)."""
+        return encode(value)
+
+    def decode_value(self, blob):
+        """Deserialize the value from the blob (to be redefined in subclasses)."""
+        return decode(blob)
 
-    def iteritems(self):
-        GET_ITEMS = 'SELECT key, value FROM %s ORDER BY rowid' % self.tablename
-        for key, value in self.conn.select(GET_ITEMS):
-            yield key, decode(value)
+    def itervalues(self, prefix=None, pattern=None, ordered=False):
+        """Iterate over the values, see `iterkeys`; the values are decoded one-by-one."""
+        for value in self._iterselect('value', prefix, pattern, ordered):
+            yield self.decode_value(value[0])
+
+    def iteritems(self, prefix=None, pattern=None, ordered=False):
+        """Iterate over the (key, value) pairs, see `iterkeys`; the values are decoded one-by-one."""
+        for key, value in self._iterselect('key, value', prefix, pattern, ordered):
+            yield key, self.decode_value(value)
 
     def __contains__(self, key):
         HAS_ITEM = 'SELECT 1 FROM %s WHERE key = ?' % self.tablename
@@ -151,11 +268,11 @@ class SqliteDict(object, DictMixin):
         if item is None:
             raise KeyError(key)
 
-        return decode(item[0])
+        return self.decode_value(item[0])
 
     def __setitem__(self, key, value):
         ADD_ITEM = 'REPLACE INTO %s (key, value) VALUES (?,?)' % self.tablename
-        self.conn.execute(ADD_ITEM, (key, encode(value)))
+        self.conn.execute(ADD_ITEM, (key, self.encode_value(value)))
 
     def __delitem__(self, key):
         if key not in self:
@@ -164,24 +281,101 @@ class SqliteDict(object, DictMixin):
         self.conn.execute(DEL_ITEM, (key,))
 
     def update(self, items=(), **kwds):
-        try:
-            items = [(k, encode(v)) for k, v in items.iteritems()]
-        except AttributeError:
-            pass
+        if hasattr(items, 'iteritems'):
+            items = items.iteritems()
+        items = [(k, self.encode_value(v)) for k, v in items]
 
         UPDATE_ITEMS = 'REPLACE INTO %s (key, value) VALUES (?, ?)' % self.tablename
-        self.conn.executemany(UPDATE_ITEMS, items)
+        with self.transaction():
+            self.conn.executemany(UPDATE_ITEMS, items)
         if kwds:
             self.update(kwds)
 
-    def keys(self):
-        return list(self.iterkeys())
+    @contextmanager
+    def transaction(self):
+        """
+        Group all writes inside the `with` block into a single transaction,
+        even in `autocommit` mode. The transaction is committed at the exit
+        (and rolled back in case of exception). Nested blocks join the outer transaction.
+
+        >>> with mydict.transaction():
+        ...     for k, v in results: mydict[k] = v
 
-    def values(self):
-        return list(self.itervalues())
+        """
+        self._tx_depth += 1
+        if 1 == self._tx_depth:
+            self.conn.begin()
+        ok = False
+        try:
+            yield self
+            ok = True
+        finally:
+            self._tx_depth -= 1
+            if 0 == self._tx_depth:
+                if ok:
+                    self.conn.end(commit=True) # re-raises the first failed write
+                else:
+                    try:
+                        self.conn.end(commit=False)
+                    except Exception:
+                        pass # keep the original exception
+
+    def update_many(self, items, nthreads=None, chunk_size=1000, silent=True):
+        """
+        Write many items in a single transaction: the values are serialized
+        (and compressed) in parallel by the pool of `nthreads` threads,
+        and written chunk-by-chunk with the real `executemany`.
+        Returns the tuple (number of items, total size of blobs in bytes, time in seconds).
 
-    def items(self):
-        return list(self.iteritems())
+        >>> mydict.update_many(results)                  # dict or iterable of (key, value)
+        >>> mydict.update_many(results, silent=False)    # report the throughput
+
+        """
+        from multiprocessing.pool import ThreadPool
+        from multiprocessing import cpu_count
+        if hasattr(items, 'iteritems'):
+            items = items.iteritems()
+
+        UPDATE_ITEMS = 'REPLACE INTO %s (key, value) VALUES (?, ?)' % self.tablename
+        encode_item = lambda kv: (kv[0], self.encode_value(kv[1]))
+
+        start = time.time()
+        nitems, nbytes = 0, 0
+        pool = ThreadPool(nthreads if nthreads else cpu_count())
+        try:
+            with self.transaction():
+                chunk = []
+                for item in items:
+                    chunk.append(item)
+                    if chunk_size <= len(chunk):
+                        blobs = pool.map(encode_item, chunk)
+                        self.conn.executemany(UPDATE_ITEMS, blobs)
+                        nitems += len(blobs)
+                        nbytes += sum(len(b[1]) for b in blobs)
+                        chunk = []
+                if chunk:
+                    blobs = pool.map(encode_item, chunk)
+                    self.conn.executemany(UPDATE_ITEMS, blobs)
+                    nitems += len(blobs)
+                    nbytes += sum(len(b[1]) for b in blobs)
+        finally:
+            pool.close()
+            pool.join()
+
+        elapsed = max(time.time() - start, 1.e-9)
+        if not silent:
+            logger.info("update_many: %d items, %.2f MB in %.2f s: %.1f items/s, %.2f MB/s" % (
+                nitems, nbytes / 1024.0**2, elapsed, nitems / elapsed, nbytes / 1024.0**2 / elapsed))
+        return nitems, nbytes, elapsed
+
+    def keys(self, prefix=None, pattern=None, ordered=False):
+        return list(self.iterkeys(prefix, pattern, ordered))
+
+    def values(self, prefix=None, pattern=None, ordered=False):
+        return list(self.itervalues(prefix, pattern, ordered))
+
+    def items(self, prefix=None, pattern=None, ordered=False):
+        return list(self.iteritems(prefix, pattern, ordered))
 
     def __iter__(self):
         return self.iterkeys()
@@ -243,38 +437,134 @@ class SqliteMultithread(Thread):
     in a separate thread (in the same order they arrived).
 
     """
-    def __init__(self, filename, autocommit, journal_mode):
+    def __init__(self, filename, autocommit, journal_mode, concurrent=False, timeout=60):
         super(SqliteMultithread, self).__init__()
         self.filename = filename
         self.autocommit = autocommit
         self.journal_mode = journal_mode
+        self.concurrent = concurrent
+        self.timeout = timeout
+        self.batch_size = 1000 # the rows are sent to the result queue in batches (`fetchmany`)
         self.reqs = Queue() # use request queue of unlimited size
         self.setDaemon(True) # python2.5-compatible
+        self.ready = Queue() # the result of the connection setup in the worker thread
         self.start()
+        rec = self.ready.get()
+        if isinstance(rec, Exception):
+            self.join()
+            raise rec
 
-    def run(self):
+    def retry(self, func, *args):
+        """
+        Call `func(*args)`; in the concurrent mode retry it with the randomized
+        exponential backoff while the database is locked by other processes.
+
+        """
+        delay, start = 0.001, time.time()
+        while True:
+            try:
+                return func(*args)
+            except sqlite3.OperationalError, e:
+                message = str(e)
+                if not self.concurrent or time.time() - start > self.timeout or \
+                   not ('locked' in message or 'busy' in message):
+                    raise
+                time.sleep(delay * (1 + random.random()))
+                delay = min(2 * delay, 0.5)
+
+    def connect(self):
+        """
+        Open the connection. The journal mode is changed only if it differs from
+        the current one; the `WAL` mode of the database, written in the concurrent
+        mode, is kept: leaving it requires the exclusive access to the database.
+
+        """
+        timeout = self.timeout if self.concurrent else 5.0
         if self.autocommit:
-            conn = sqlite3.connect(self.filename, isolation_level=None, check_same_thread=False)
+            conn = sqlite3.connect(self.filename, isolation_level=None, check_same_thread=False, timeout=timeout)
         else:
-            conn = sqlite3.connect(self.filename, check_same_thread=False)
-        conn.execute('PRAGMA journal_mode = %s' % self.journal_mode)
-        conn.text_factory = str
+            conn = sqlite3.connect(self.filename, check_same_thread=False, timeout=timeout)
+        try:
+            current = str(self.retry(conn.execute, 'PRAGMA journal_mode').fetchone()[0]).upper()
+            if current != self.journal_mode.upper() and current != 'WAL':
+                self.retry(conn.execute, 'PRAGMA journal_mode = %s' % self.journal_mode)
+            conn.text_factory = str
+            conn.execute('PRAGMA synchronous=OFF')
+        except:
+            conn.close()
+            raise
+        return conn
+
+    def run(self):
+        try:
+            conn = self.connect()
+        except Exception, e:
+            self.ready.put(e) # the error is raised in the caller thread
+            return
+        self.ready.put('--ready--')
         cursor = conn.cursor()
-        cursor.execute('PRAGMA synchronous=OFF')
+        in_transaction = False
+        failure = None # the first error inside the transaction, re-raised by `end`
         while True:
             req, arg, res = self.reqs.get()
             if req == '--close--':
                 break
             elif req == '--commit--':
-                conn.commit()
-            else:
-                cursor.execute(req, arg)
-                if res:
-                    for rec in cursor:
-                        res.put(rec)
-                    res.put('--no more--')
-                if self.autocommit:
+                try:
+                    self.retry(conn.commit)
+                except Exception, e:
+                    logger.error("commit failed for %s: %s" % (self.filename, e))
+            elif req == '--begin--':
+                in_transaction, failure = True, None
+                try:
+                    if self.autocommit:
+                        # take the write lock at once: no deadlocks between concurrent writers
+                        self.retry(cursor.execute, 'BEGIN IMMEDIATE' if self.concurrent else 'BEGIN')
+                    else:
+                        # the rollback of the transaction must not undo the earlier writes
+                        self.retry(conn.commit)
+                except Exception, e:
+                    failure = e
+            elif req == '--end--':
+                try:
+                    if arg and failure is None:
+                        self.retry(conn.commit)
+                    else:
+                        conn.rollback()
+                    res.put(failure if failure is not None else '--no more--')
+                except Exception, e:
+                    res.put(e)
+                in_transaction, failure = False, None
+            elif res:
+                try:
+                    self.retry(cursor.execute, req, arg)
+                    while True:
+                        rows = cursor.fetchmany(self.batch_size)
+                        if not rows:
+                            break
+                        res.put(rows)
+                except Exception, e:
+                    res.put(e)
+                res.put('--no more--')
+                if self.autocommit and not in_transaction:
                     conn.commit()
+            elif in_transaction and failure is not None:
+                continue # the transaction is already rolled back: skip the rest of it
+            else:
+                try:
+                    if req == '--many--':
+                        self.retry(cursor.executemany, *arg)
+                    else:
+                        self.retry(cursor.execute, req, arg)
+                    if self.autocommit and not in_transaction:
+                        conn.commit()
+                except Exception, e:
+                    if in_transaction:
+                        # remember the first error, undo the transaction, report it from `end`
+                        failure = e
+                        conn.rollback()
+                    else:
+                        logger.error("request failed for %s: %s" % (self.filename, e))
         conn.close()
 
     def execute(self, req, arg=None, res=None):
@@ -285,8 +575,51 @@ class SqliteMultithread(Thread):
         self.reqs.put((req, arg or tuple(), res))
 
     def executemany(self, req, items):
-        for item in items:
-            self.execute(req, item)
+        """
+        `executemany` calls are non-blocking: the whole list of items is queued as
+        a single request and executed with the native `executemany`.
+
+        """
+        self.reqs.put(('--many--', (req, list(items)), None))
+
+    def begin(self):
+        """Start the transaction: no commits after each request until `end`."""
+        self.execute('--begin--')
+
+    def end(self, commit=True):
+        """
+        Finish the transaction: commit (or rollback) and wait until it is done.
+        If any write inside the transaction failed, the transaction is rolled back
+        and the first error is re-raised here.
+
+        """
+        res = Queue()
+        self.reqs.put(('--end--', commit, res))
+        rec = res.get()
+        if isinstance(rec, Exception):
+            raise rec
+
+    def request(self, req, arg=None):
+        """
+        Queue the SELECT request and return immediately; the rows are
+        retrieved later with `result`.
+
+        """
+        res = Queue() # results of the select will appear as batches of rows in this queue
+        self.execute(req, arg, res)
+        return res
+
+    def result(self, res):
+        """Wait for the result of the request (the list of rows)."""
+        rows = []
+        while True:
+            rec = res.get()
+            if isinstance(rec, Exception):
+                raise rec
+            elif isinstance(rec, list):
+                rows.extend(rec)
+            else:
+                return rows
 
     def select(self, req, arg=None):
         """
@@ -295,15 +628,18 @@ class SqliteMultithread(Thread):
         The result of `select` starts filling up with values as soon as the
         request is dequeued, and although you can iterate over the result normally
         (`for res in self.select(): ...`), the entire result will be in memory.
+        For large tables use the keyset pagination (as `SqliteDict.iterkeys`).
 
         """
-        res = Queue() # results of the select will appear as items in this queue
-        self.execute(req, arg, res)
+        res = self.request(req, arg)
         while True:
             rec = res.get()
-            if rec == '--no more--':
+            if isinstance(rec, Exception):
+                raise rec
+            elif not isinstance(rec, list):
                 break
-            yield rec
+            for row in rec:
+                yield row
 
     def select_one(self, req, arg=None):
         """Return only the first row of the SELECT, or None if there are no matching rows."""
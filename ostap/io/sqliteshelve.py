@@ -57,6 +57,33 @@
 #
 # @endcode 
 #
+# Bulk writes in a single transaction:
+#
+# @code
+#
+# >>> with db.transaction () :                  ## group many writes 
+# ...     for k , v in results : db [ k ] = v
+# >>> db.update_many ( results , silent = False ) ## parallel pickling/compression + executemany 
+#
+# @endcode 
+#
+# Streaming iteration and selection of keys (performed by SQLite):
+#
+# @code
+#
+# >>> for key in db.iterkeys ( prefix = 'fit/' ) : print key
+# >>> for key , obj in db.iteritems ( pattern = '*MC*' , ordered = True ) : ... 
+#
+# @endcode 
+#
+# Concurrent writes from several processes (each process opens the database):
+#
+# @code
+#
+# >>> db = DBASE.open ( 'a_db' , 'c' , concurrent = True ) ## in each worker 
+# >>> db [ 'result-%d' % jobid ] = result 
+#
+# @endcode 
 # 
 # @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 # @date   2010-04-30
@@ -116,7 +143,7 @@ if '__main__' == __name__ : logger = getLogger ( 'ostap.io.sqliteshelve' )
 else                      : logger = getLogger ( __name__ )
 # =============================================================================
 from   ostap.io.sqlitedict import SqliteDict
-import zlib 
+import zlib, sqlite3 
 # =============================================================================
 _modes_ = {
     # =========================================================================
@@ -143,6 +170,8 @@ _modes_ = {
     'update'   : 'w' ,        
     'append'   : 'w' ,        
     }
+## the table with metadata (codec and serializer) for all tables 
+_meta_table_ = 'ostap_metadata'
 # =============================================================================
 ## @class SQLiteShelf
 #  SQLite-based ``shelve-like'' database with compressed content.
@@ -205,7 +234,11 @@ class SQLiteShelf(SqliteDict):
                    tablename      = 'Ostap'   ,
                    writeback      = True      , ## original name: "autocommit"
                    compress_level = zlib.Z_BEST_COMPRESSION , 
-                   journal_mode   = "DELETE"  ) :
+                   journal_mode   = "DELETE"  ,
+                   codec          = None      ,
+                   serializer     = 'pickle'  ,
+                   concurrent     = False     ,
+                   timeout        = 60        ) :
         """Initialize a thread-safe sqlite-backed dictionary.
         The dictionary will be a table ``tablename`` in database file
         ``filename``. A single file (=database) may contain multiple tables.
@@ -228,6 +261,16 @@ class SQLiteShelf(SqliteDict):
         - 'c': default mode, open for read/write, creating the db/table if necessary.
         - 'w': open for r/w, but drop `tablename` contents first (start with empty table)
         - 'n': create a new database (erasing any existing tables, not just `tablename`!).
+
+        The ``codec`` for values ( e.g. 'zlib', 'zlib:1', 'lzma', 'lz4', 'none', 'auto')
+        and the ``serializer`` are recorded in the metadata of the new table
+        (see ostap.io.dbcodecs). By default zlib with ``compress_level`` is used.
+
+        Set ``concurrent`` to write to the same database from several processes
+        (e.g. from the workers of ostap.parallel): each process opens the database
+        by itself, the ``WAL`` journal and autocommit are used, and the writes are
+        retried with the randomized backoff while the database is locked
+        (up to ``timeout`` seconds).
         
         Modes: %s 
         """ % _modes_ 
@@ -252,9 +295,56 @@ class SQLiteShelf(SqliteDict):
                               tablename    = tablename    ,
                               flag         = mode         ,
                               autocommit   = writeback    ,
-                              journal_mode = journal_mode )
+                              journal_mode = journal_mode ,
+                              concurrent   = concurrent   ,
+                              timeout      = timeout      )
         
         self.compression = compress_level 
+        self.__coder     = self.__make_coder ( codec , serializer , compress_level , 'r' == mode ) 
+
+    ## create the codec+serializer for values
+    def __make_coder ( self , codec , serializer , compress_level , readonly = False ) :
+        """Create the codec+serializer for values:
+        - it is recorded in the metadata table (not in the read-only mode)
+        - old tables (without metadata) use zlib+pickle without tags
+        """
+        from ostap.io.dbcodecs import ValueCoder, LegacyCoder
+        import json
+        if readonly :
+            ## the read-only mode: nothing is written to the file
+            has_meta = self.conn.select_one ( "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?" , ( _meta_table_ , ) )
+        else :
+            self.conn.execute ( 'CREATE TABLE IF NOT EXISTS %s (tablename TEXT PRIMARY KEY, meta TEXT)' % _meta_table_ )
+            has_meta = True 
+        row   = self.conn.select_one ( 'SELECT meta FROM %s WHERE tablename = ?' % _meta_table_ , ( self.tablename , ) ) if has_meta else None 
+        empty = 0 == len ( self )
+        if row and not ( empty and codec and not readonly ) :
+            return ValueCoder.from_metadata ( json.loads ( row [ 0 ] ) )
+        elif empty :
+            if codec is None : coder = ValueCoder ( 'zlib' , compress_level , serializer )
+            else             : coder = ValueCoder ( codec  , None           , serializer )
+            if not readonly : 
+                self.conn.execute ( 'REPLACE INTO %s (tablename, meta) VALUES (?,?)' % _meta_table_ ,
+                                    ( self.tablename , json.dumps ( coder.metadata () ) ) )
+                self.conn.commit  ()
+            return coder
+        if codec : logger.warning ( "The codec '%s' is ignored for the old table %s" % ( codec , self.tablename ) )
+        return LegacyCoder ( compress_level )
+    
+    @property
+    def coder ( self ) :
+        """``coder'' : codec+serializer for the values (see ostap.io.dbcodecs)"""
+        return self.__coder
+
+    ## serialize and compress the value (used also by update/update_many)
+    def encode_value ( self , value ) :
+        """Serialize and compress the value (used also by update/update_many)"""
+        return sqlite3.Binary ( self.coder.dumps ( value ) )
+
+    ## decompress and deserialize the value 
+    def decode_value ( self , blob ) :
+        """Decompress and deserialize the value"""
+        return self.coder.loads ( blob ) 
 
     ## list the avilable keys 
     def __dir ( self , pattern = '' ) :
@@ -267,14 +357,8 @@ class SQLiteShelf(SqliteDict):
         >>> db.ls ('*MC*')
         
         """
-        keys_ = self.keys()
-        keys_.sort()
-        if pattern :
-            import fnmatch
-            _keys = [ k for k in keys_ if fnmatch.fnmatchcase ( k , pattern ) ]
-            keys_ = _keys
-        #
-        for key in keys_ : print key
+        ## the keys are selected and sorted by SQLite (using the index) and streamed in batches 
+        for key in self.iterkeys ( pattern = pattern , ordered = True ) : print key
         
     ## list the avilable keys 
     def ls    ( self , pattern = '' ) :
@@ -290,17 +374,6 @@ class SQLiteShelf(SqliteDict):
         return self.__dir( pattern )
 
 
-# =============================================================================
-try:
-    from cPickle import Pickler, Unpickler, HIGHEST_PROTOCOL
-except ImportError:
-    from  pickle import Pickler, Unpickler, HIGHEST_PROTOCOL 
-
-try:
-    from cStringIO import StringIO
-except ImportError:
-    from  StringIO import StringIO
- 
 # =============================================================================
 ## ``get-and-uncompress-item'' from dbase 
 def _zip_getitem (self, key):
@@ -310,12 +383,8 @@ def _zip_getitem (self, key):
     item = self.conn.select_one(GET_ITEM, (key,))
     if item is None: raise KeyError(key)
     
-    f     = StringIO ( zlib.decompress ( str ( item[0] ) ) ) 
-    value = Unpickler(f).load()
-
-    return value
+    return self.decode_value ( item [ 0 ] )
 
-import sqlite3
 # =============================================================================
 ## ``set-and-compress-item'' to dbase 
 def _zip_setitem ( self , key , value ) :
@@ -323,22 +392,14 @@ def _zip_setitem ( self , key , value ) :
     """
     ADD_ITEM = 'REPLACE INTO %s (key, value) VALUES (?,?)' % self.tablename
     
-    f     = StringIO()
-    p     = Pickler(f, HIGHEST_PROTOCOL  )
-    p.dump(value)
-    blob  = f.getvalue() 
-    zblob = zlib.compress ( blob , self.compression ) 
-    self.conn.execute(ADD_ITEM, (key, sqlite3.Binary( zblob ) ) )
+    self.conn.execute(ADD_ITEM, (key, self.encode_value ( value ) ) )
 
                       
 SQLiteShelf.__setitem__ = _zip_setitem
 SQLiteShelf.__getitem__ = _zip_getitem
 
 def _sql_enter_ ( self      ) : return self
-def _sql_exit_  ( self , *_ ) :
-    try :
-        os.close()
-    except : pass
+def _sql_exit_  ( self , *_ ) : self.close() 
 
 SQLiteShelf.__enter__ = _sql_enter_
 SQLiteShelf.__exit__  = _sql_exit_ 
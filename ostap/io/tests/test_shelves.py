@@ -129,9 +129,236 @@ def test_shelves():
         d.ls()
 
 
+# =============================================================================
+def test_indexed () :
+
+    from ostap.io.indexeddb import is_indexed 
+    db_name = tempfile.mktemp ( suffix = '.zdb.gz' )
+
+    ## ``.gz''-database is the indexed container: no global gzip/gunzip 
+    with timing ( 'Write ZIP/indexed' ) :
+        with zipshelve.open ( db_name , 'c' ) as db :
+            for k in data : db [ k ] = data [ k ]
+            ## overwrite: dead records 
+            for i in range ( 5 ) : db [ 'histo-2D' ] = h2
+            
+    assert is_indexed ( db_name ) , 'The database is not an indexed container'
+
+    with timing ( 'Update ZIP/indexed' ) :
+        with zipshelve.open ( db_name , 'w' ) as db :
+            db [ 'extra' ] = m1 
+            del db [ 'both' ]
+            db.compact ( background = True )
+            db [ 'more' ] = h1 ## write during the compaction 
+
+    with timing ( 'Read ZIP/indexed' ) :
+        with zipshelve.open ( db_name , 'r' ) as db :
+            assert sorted ( db.keys() ) == [ 'extra' , 'histo-1D' , 'histo-2D' , 'more' ] , \
+                   'Invalid keys %s' % db.keys() 
+            h2_zip = db [ 'histo-2D' ]
+            for i in h2_zip :
+                v = h2_zip [ i ] - h2 [ i ]
+                if not iszero ( v.value() ) :
+                    logger.error('Large difference for 2D histogram(3)!')
+
+    logger.info ( 'ZipShelve/indexed size: %d ' % os.path.getsize ( db_name ) )
+    os.remove ( db_name ) 
+
+# =============================================================================
+def test_codecs () :
+
+    from ostap.io.dbcodecs import benchmark, available_codecs
+
+    logger.info ( 'Available codecs: %s' % list ( available_codecs () ) )
+    
+    ## write/read throughput and size for typical objects 
+    benchmark ( data , codecs = [ 'legacy' , 'none' , 'zlib' , 'zlib:1' , 'auto' ] ) 
+
+    for codec in ( 'none' , 'zlib:1' , 'auto' ) :
+        
+        db_zip_name = tempfile.mktemp ( suffix = '.zdb'  )
+        db_sql_name = tempfile.mktemp ( suffix = '.msql' )
+
+        with timing ( 'Write %s' % codec ) : 
+            with zipshelve   .open ( db_zip_name , 'c' , codec = codec ) as db_zip :
+                for k in data : db_zip [ k ] = data [ k ]
+            with sqliteshelve.open ( db_sql_name , 'c' , codec = codec ) as db_sql :
+                for k in data : db_sql [ k ] = data [ k ]
+
+        ## the codec is recorded in the database metadata 
+        with zipshelve   .open ( db_zip_name , 'r' ) as db_zip :
+            assert db_zip.coder.codec == codec.split(':')[0] or 'auto' == codec , 'Invalid codec %s' % db_zip.coder 
+            h2_zip = db_zip [ 'histo-2D' ]
+        with sqliteshelve.open ( db_sql_name , 'r' ) as db_sql :
+            assert db_sql.coder.codec == codec.split(':')[0] or 'auto' == codec , 'Invalid codec %s' % db_sql.coder 
+            h2_sql = db_sql [ 'histo-2D' ]
+
+        for i in h2 :
+            if not iszero ( ( h2_zip [ i ] - h2 [ i ] ).value () ) or \
+               not iszero ( ( h2_sql [ i ] - h2 [ i ] ).value () ) :
+                logger.error ( 'Large difference for 2D histogram, codec %s' % codec )
+                break
+
+        logger.info ( 'Codec %-8s: ZIP %d / SQL %d bytes' % ( codec ,
+                                                              os.path.getsize ( db_zip_name ) ,
+                                                              os.path.getsize ( db_sql_name ) ) )
+        os.remove ( db_zip_name )
+        os.remove ( db_sql_name )
+        
+# =============================================================================
+def test_readonly () :
+
+    from ostap.io.dbcodecs import ValueCoder
+    
+    db_sql_name = tempfile.mktemp ( suffix = '.msql' )
+    with sqliteshelve.open ( db_sql_name , 'c' , codec = 'zlib:1' ) as db :
+        for k in data : db [ k ] = data [ k ]
+        
+    with open ( db_sql_name , 'rb' ) as f : content = f.read ()
+    
+    ## the read-only open does not write to the file 
+    with sqliteshelve.open ( db_sql_name , 'r' ) as db :
+        assert 'zlib' == db.coder.codec , 'Invalid codec %s' % db.coder
+        h1_sql = db [ 'histo-1D' ]
+        
+    with open ( db_sql_name , 'rb' ) as f :
+        assert content == f.read () , 'The read-only open modifies the database'
+    os.remove ( db_sql_name ) 
+
+    ## the codec, recorded in metadata, is not available 
+    try :
+        ValueCoder.from_metadata ( { 'codec' : 'no-such-codec' } )
+        assert False , 'No error for the missing codec'
+    except ImportError as e :
+        assert 'no-such-codec' in str ( e ) , 'The missing codec is not named: %s' % e 
+    
+# =============================================================================
+def test_bulk () :
+
+    db_sql_name = tempfile.mktemp ( suffix = '.msql' )
+    results     = [ ( 'result-%d' % i , ( i , VE ( i , i ) , { 'h' : h1 if 0 == i % 100 else None } ) ) for i in range ( 2000 ) ] 
+
+    with sqliteshelve.open ( db_sql_name , 'c' ) as db :
+        
+        with timing ( 'SQL: single writes' ) :
+            for k , v in results [ :500 ] : db [ k ] = v 
+            
+        with timing ( 'SQL: transaction  ' ) :
+            with db.transaction () :
+                for k , v in results [ :500 ] : db [ k ] = v 
+
+        with timing ( 'SQL: update_many  ' ) :
+            n , size , t = db.update_many ( results , silent = False )
+        assert len ( results ) == n , 'Invalid number of written items %s' % n
+
+        ## rollback of the failed transaction 
+        try : 
+            with db.transaction () :
+                db [ 'failed' ] = 1
+                raise ValueError ( 'failure' )
+        except ValueError :
+            pass
+        
+        assert not 'failed' in db         , 'The failed transaction is not rolled back'
+
+        ## the failed write: the error is re-raised, no deadlock, the transaction is rolled back 
+        import sqlite3 
+        try :
+            db.update_many ( [ ( 'bad-1' , 1 ) , ( ( 'bad' , 'key' ) , 1 ) ] )
+            assert False , 'No error for the invalid key'
+        except sqlite3.Error :
+            pass
+        assert not 'bad-1' in db          , 'The failed update_many is not rolled back'
+        
+        assert len ( results ) == len ( db ) , 'Invalid number of items %s' % len ( db ) 
+
+    with sqliteshelve.open ( db_sql_name , 'r' ) as db :
+        assert db [ 'result-1234' ][0] == 1234 , 'Invalid content'
+
+    os.remove ( db_sql_name ) 
+    
+# =============================================================================
+def test_streaming () :
+
+    import fnmatch 
+    db_sql_name = tempfile.mktemp ( suffix = '.msql' )
+    keys        = [ 'key-%06d/%s' % ( i , 'MC' if 0 == i % 7 else 'RD' ) for i in range ( 100000 ) ]
+
+    with sqliteshelve.open ( db_sql_name , 'c' ) as db :
+
+        db.update_many ( ( k , i ) for i , k in enumerate ( keys ) )
+        db.batch_size = 777 
+
+        with timing ( 'SQL: all keys     ' ) : assert keys == db.keys ()      , 'Invalid keys'
+        with timing ( 'SQL: all values   ' ) : assert range ( len ( keys ) ) == db.values () , 'Invalid values'
+        with timing ( 'SQL: sorted values' ) :
+            assert [ i for k , i in sorted ( ( k , i ) for i , k in enumerate ( keys ) ) ] == db.values ( ordered = True ) , \
+                   'Invalid ordered values'
+        with timing ( 'SQL: prefix       ' ) :
+            assert db.keys ( prefix = 'key-0012' ) == [ k for k in keys if k.startswith ( 'key-0012' ) ] , 'Invalid prefix selection'
+        with timing ( 'SQL: pattern      ' ) :
+            pattern = 'key-00[!0]*MC'
+            assert db.keys ( pattern = pattern , ordered = True ) == \
+                   sorted ( k for k in keys if fnmatch.fnmatchcase ( k , pattern ) ) , 'Invalid pattern selection'
+
+        ## other requests are processed between the batches
+        for k , v in db.iteritems ( prefix = 'key-000' ) :
+            assert db [ k ] == v , 'Invalid value for %s' % k
+            
+        db.ls ( 'key-0999*MC' )
+        
+    os.remove ( db_sql_name ) 
+    
+# =============================================================================
+## the worker for test_concurrent: it opens the database by itself
+def _concurrent_writer ( dbname , worker , nitems ) :
+    with sqliteshelve.open ( dbname , 'c' , concurrent = True ) as db :
+        keys = [ 'worker-%d/item-%d' % ( worker , i ) for i in range ( nitems ) ]
+        ## single writes
+        for i in range ( 0 , nitems // 3 ) :
+            db [ keys [ i ] ] = ( worker , i , VE ( i , i ) )
+        ## short transaction
+        with db.transaction () :
+            for i in range ( nitems // 3 , 2 * nitems // 3 ) :
+                db [ keys [ i ] ] = ( worker , i , VE ( i , i ) )
+        ## bulk write
+        db.update_many ( ( keys [ i ] , ( worker , i , VE ( i , i ) ) ) for i in range ( 2 * nitems // 3 , nitems ) )
+        
+def test_concurrent () :
+
+    import multiprocessing
+    
+    dbname   = tempfile.mktemp ( suffix = '.msql' )
+    nworkers = 2 * multiprocessing.cpu_count ()
+    nitems   = 300
+
+    with sqliteshelve.open ( dbname , 'n' , concurrent = True ) as db :
+        db [ 'histo-1D' ] = h1
+
+    with timing ( 'SQL: %d concurrent writers' % nworkers ) :
+        workers = [ multiprocessing.Process ( target = _concurrent_writer , args = ( dbname , w , nitems ) ) for w in range ( nworkers ) ]
+        for w in workers : w.start ()
+        for w in workers : w.join  ()
+    assert all ( 0 == w.exitcode for w in workers ) , 'Some writers failed'
+
+    with sqliteshelve.open ( dbname , 'r' ) as db :
+        assert nworkers * nitems + 1 == len ( db ) , 'Invalid number of items %s' % len ( db ) 
+        for w in range ( nworkers ) :
+            for i in range ( nitems ) :
+                assert ( w , i ) == db [ 'worker-%d/item-%d' % ( w , i ) ] [ :2 ] , 'Invalid content'
+        assert h1.GetEntries () == db [ 'histo-1D' ].GetEntries () , 'Invalid histogram'
+
+    os.remove ( dbname )
+    
 # =============================================================================
 if '__main__' == __name__ :    
     test_shelves()
+    test_indexed()
+    test_codecs ()
+    test_readonly ()
+    test_bulk   ()
+    test_streaming ()
+    test_concurrent ()
 
 # =============================================================================
 # The END
@@ -13,9 +13,11 @@
 #
 # However is contains several new features:
 # 
-#  - Optionally it is possible to perform the compression
-#    of the whole data base, that can be rathe useful fo data base
-#    with large amout of keys 
+#  - the values are stored in the append-only indexed container
+#    (see ostap.io.indexeddb), with per-key random access and
+#    optional (background) compaction 
+#  - the codec for values is selectable per database and is recorded
+#    in its metadata (see ostap.io.dbcodecs) 
 #
 # The module has been developed and used with great success in
 # ``Kali, framework for fine calibration of LHCb Electormagnetic Calorimeter''
@@ -61,8 +63,10 @@
 #
 # @endcode 
 #
-# @attention: In case DB-name has extention "gz", the whole data base
-#             will be gzipped. 
+# @attention: The old-style databases with extension "gz", where the whole
+#             data base is gzipped, are converted into indexed containers
+#             when opened in update mode, and gunzipped into temporary
+#             location when opened in read-only mode
 #
 # @author Vanya BELYAEV Ivan.Belyaev@cern.ch
 # @date   2010-04-30
@@ -78,9 +82,11 @@ The actual code has been inspired by zipshelve ( see Google...)
 
 However is contains several new features:
 
- - Optionally it is possible to perform the compression
-   of the whole data base, that can be rathe useful fo data base
-   with large amout of keys 
+ - the values are stored in the append-only indexed container
+   (see ostap.io.indexeddb), with per-key random access and
+   optional (background) compaction 
+ - the codec for values is selectable per database and is recorded
+   in its metadata (see ostap.io.dbcodecs) 
    
 The module has been developed and used with great success in
  ``Kali, framework for fine calibration of LHCb Electormagnetic Calorimeter''
@@ -113,7 +119,9 @@ The module has been developed and used with great success in
  ...
  >>> abcd = db['some_key']
  
- In case DB-name has extension 'gz', the whole data base will be gzipped
+ The old-style databases with extension 'gz', where the whole data base is
+ gzipped, are converted into indexed containers when opened in update mode,
+ and gunzipped into temporary location when opened in read-only mode
 
 """
 # =============================================================================
@@ -135,11 +143,6 @@ try:
     from cPickle   import Pickler, Unpickler, HIGHEST_PROTOCOL
 except ImportError:
     from  pickle   import Pickler, Unpickler, HIGHEST_PROTOCOL 
-# =============================================================================
-try:
-    from cStringIO import StringIO
-except ImportError:
-    from  StringIO import StringIO
 # ==============================================================================
 import os
 import zlib        ## use zlib to compress DB-content 
@@ -198,7 +201,11 @@ class ZipShelf(shelve.Shelf):
         protocol  = HIGHEST_PROTOCOL           , 
         compress  = zlib.Z_BEST_COMPRESSION    ,
         writeback = False                      ,
-        silent    = False                      ) :
+        silent    = False                      ,
+        indexed   = True                       ,
+        autocompact = 0.5                      ,
+        codec     = None                       ,
+        serializer = 'pickle'                  ) :
 
         ## the mode 
         mode = _modes_.get( mode.lower() , '' )
@@ -213,7 +220,6 @@ class ZipShelf(shelve.Shelf):
         filename  = os.path.expandvars ( filename )
         filename  = os.path.expandvars ( filename )
         
-        self.__gzip          = False 
         self.__filename      = filename
         self.__remove        = False
         self.__silent        = silent
@@ -221,58 +227,80 @@ class ZipShelf(shelve.Shelf):
 
         if not self.__silent :
             logger.info ( 'Open DB: %s' % filename ) 
+
+        from ostap.io.indexeddb import IndexedDB, is_indexed
         
-        if filename.endswith( '.gz' ) :
-            
-            if os.path.exists ( filename ) and 'r' == mode :
-                ## gunzip into temporary location
-                filename_ = self._gunzip ( filename ) 
-                if not os.path.exists ( filename_ ) :
-                    raise TypeError ( "Unable to gunzip properly: %s" % filename )
-                if not self.__silent : 
-                    size1 = os.path.getsize ( filename  ) 
-                    size2 = os.path.getsize ( filename_ )
-                    logger.info("GZIP uncompression %s: %.1f%%" %  ( filename , (size2*100.0)/size1 ) )
-                filename        = filename_ 
-                self.__filename = filename_
-                self.__remove   = True
-            elif os.path.exists ( filename ) and 'r' != mode :
-                ## unzip in place
-                filename_     = filename[:-3]
-                # remove existing file (if needed) 
-                if os.path.exists ( filename_ ) : os.remove ( filename_ )
+        import whichdb 
+        exists = os.path.exists ( filename )
+        if   'n' == mode : pass 
+        elif exists and is_indexed ( filename ) : indexed = True 
+        elif exists and filename.endswith ( '.gz' ) :
+            ## old-style database: the whole file is gzipped  
+            filename_ = self._gunzip ( filename ) 
+            if not os.path.exists ( filename_ ) :
+                raise TypeError ( "Unable to gunzip properly: %s" % filename )
+            if not self.__silent : 
                 size1 = os.path.getsize ( filename  ) 
-                # gunzip in place 
-                self.__in_place_gunzip  ( filename ) 
-                ##
-                if not os.path.exists ( filename_ ) :
-                    raise TypeError ( "Unable to gunzip properly: %s" % filename )
-                if not self.__silent : 
-                    size2 = os.path.getsize ( filename_ )
-                    logger.info("GZIP uncompression %s: %.1f%%" %  ( filename , (size2*100.0)/size1 ) ) 
-                filename        = filename_ 
-                self.__gzip     = True 
+                size2 = os.path.getsize ( filename_ )
+                logger.info("GZIP uncompression %s: %.1f%%" %  ( filename , (size2*100.0)/size1 ) )
+            if 'r' == mode :
+                ## read-only: use the uncompressed copy 
                 self.__filename = filename_
-                self.__remove   = False
-            else : 
-                ## 
-                filename        = filename[:-3]
-                self.__gzip     = True 
-                self.__filename = filename
-
-        import anydbm
+                self.__remove   = True
+                indexed         = False 
+            else :
+                ## convert in place into the indexed container, no gzip/gunzip anymore 
+                self.__convert ( filename_ , filename )
+                indexed = True 
+        elif whichdb.whichdb ( filename ) : indexed = False ## existing ``dbm''-database
+
+        if indexed : 
+            dbase = IndexedDB ( self.__filename , mode , autocompact )
+        else :
+            import anydbm
+            dbase = anydbm.open ( self.__filename , mode ) 
+            
         shelve.Shelf.__init__ (
-            self                                   ,
-            anydbm.open ( self.__filename , mode ) ,
-            protocol                               ,
-            writeback                              )
+            self      ,
+            dbase     , 
+            protocol  ,
+            writeback )
         
         self.compresslevel = compress
+        self.__coder       = self.__make_coder ( codec , serializer , compress , protocol ) 
         self.__opened      = True
 
         ## keep in the list of known/opened databases 
         #_dbases.append ( self )
 
+    ## create the codec+serializer for values 
+    def __make_coder ( self , codec , serializer , compress , protocol ) :
+        """Create the codec+serializer for values:
+        - for the indexed container it is recorded in the metadata
+        - old databases (without metadata) use zlib+pickle without tags
+        """
+        from ostap.io.indexeddb import IndexedDB
+        from ostap.io.dbcodecs  import ValueCoder, LegacyCoder 
+        dbase = self.dict 
+        if isinstance ( dbase , IndexedDB ) :
+            meta  = dbase.meta
+            empty = not dbase.readonly and 0 == len ( dbase ) 
+            if meta.get ( 'codec' , None ) and not ( empty and codec ) : 
+                return ValueCoder.from_metadata ( meta ) 
+            elif empty :
+                if codec is None : coder = ValueCoder ( 'zlib' , compress , serializer , protocol )
+                else             : coder = ValueCoder ( codec  , None     , serializer , protocol )
+                dbase.meta = coder.metadata () 
+                return coder
+        if codec and not self.__silent :
+            logger.warning ( "The codec '%s' is ignored for the old database %s" % ( codec , self.__filename ) )
+        return LegacyCoder ( compress , protocol )
+
+    @property
+    def coder ( self ) :
+        """``coder'' : codec+serializer for the values (see ostap.io.dbcodecs)"""
+        return self.__coder
+    
     def filename ( self ) : return self.__filename
     def opened   ( self ) : return self.__opened
 
@@ -321,9 +349,28 @@ class ZipShelf(shelve.Shelf):
         """
         for k in self.ikeys( pattern ): print k
         
-    ## close and gzip (if needed)
+    ## remove the dead records from the indexed container
+    #  @code
+    #  db = ...
+    #  db.compact ()                    ## compact now 
+    #  db.compact ( background = True ) ## compact in the background thread 
+    #  @endcode
+    #  @see ostap.io.indexeddb.IndexedDB.compact 
+    def compact ( self , background = False ) :
+        """Remove the dead records from the indexed container
+        >>> db = ...
+        >>> db.compact ()                    ## compact now 
+        >>> db.compact ( background = True ) ## compact in the background thread 
+        - see ostap.io.indexeddb.IndexedDB.compact 
+        """
+        from ostap.io.indexeddb import IndexedDB
+        if isinstance ( self.dict , IndexedDB ) :
+            return self.dict.compact ( background ) 
+        logger.warning ( 'compact: not an indexed container, skip' )
+        
+    ## close the database 
     def close ( self ) :
-        """ Close the file (and gzip it if required) 
+        """ Close the database 
         """
         if not self.opened() : return 
         ##
@@ -332,70 +379,31 @@ class ZipShelf(shelve.Shelf):
         ##
         if self.__remove and os.path.exists ( self.__filename ) :
             if not self.__silent :
-                logger.info( 'REMOVE: ', self.__filename )
+                logger.info( 'REMOVE: %s' % self.__filename )
             os.remove ( self.__filename )
         ##
-        if self.__gzip and os.path.exists ( self.__filename ) :
-            # get the initial size 
-            size1 = os.path.getsize ( self.__filename )
-            # gzip the file
-            self.__in_place_gzip ( self.__filename ) 
-            #
-            if not os.path.exists ( self.__filename + '.gz' ) :
-                logger.warning( 'Unable to compress the file %s ' % self.__filename  )
-            size2 = os.path.getsize( self.__filename + '.gz' )
-            if not self.__silent : 
-                logger.info( 'GZIP compression %s: %.1f%%' % ( self.__filename, (size2*100.0)/size1 ) ) 
-
         ## remove from list of known databases 
         if self in _dbases :
             _dbases.remove ( self )
             
-    ## gzip the file (``in-place'') 
-    def __in_place_gzip   ( self , filein ) :
-        """Gzip the file ``in-place''
-        
-        It is better to use here ``os.system'' or ``popen''-family,
-        but it does not work properly for multiprocessing environemnt        
+    ## convert the old-style (gzipped ``dbm'') database into the indexed container
+    def __convert ( self , dbmfile , filename ) :
+        """Convert the old-style (gzipped ``dbm'') database into the indexed container
+        - the values are copied as they are, without decompression
         """
-        if os.path.exists ( filein + '.gz' ) : os.remove ( filein + '.gz' )
-        #
-        # gzip the file 
-        fileout = self._gzip ( filein )
-        # 
-        if os.path.exists ( fileout ) :
-            # rename the temporary file 
-            shutil.move ( fileout , filein + '.gz' )
-            #
-            import time
-            time.sleep( 3 )
-            #
-            # remove the original
-            os.remove   ( filein ) 
-
-    ## gunzip the file (``in-place'') 
-    def __in_place_gunzip   ( self , filein ) :
-        """Gunzip the file ``in-place''
-        
-        It is better to use here ``os.system'' or ``popen''-family,
-        but unfortunately it does not work properly for multithreaded environemnt        
-        """
-        #
-        filename = filein[:-3]            
-        if os.path.exists ( filename ) : os.remove ( filename )
-        #
-        # gunzip the file 
-        fileout = self._gunzip ( filein )
-        #        
-        if os.path.exists ( fileout ) :
-            # rename the temporary file 
-            shutil.move ( fileout , filename )
-            #
-            import time
-            time.sleep( 3 )
-            #
-            # remove the original
-            os.remove   ( filein ) 
+        import anydbm
+        from ostap.io.indexeddb import IndexedDB
+        tmpname = '%s.%d.tmp' % ( filename , os.getpid() )
+        old     = anydbm.open ( dbmfile , 'r' )
+        try :
+            with IndexedDB ( tmpname , 'n' ) as new :
+                for key in old.keys() : new [ key ] = old [ key ]
+        finally :
+            old.close() 
+        os.rename ( tmpname , filename ) 
+        os.remove ( dbmfile ) 
+        if not self.__silent :
+            logger.info ( 'Converted into the indexed container: %s' % filename )
 
     ## gzip the file into temporary location, keep original
     def _gzip   ( self , filein ) :
@@ -404,21 +412,14 @@ class ZipShelf(shelve.Shelf):
         if not os.path.exists  ( filein  ) :
             raise NameError ( "GZIP: non existing file: " + filein )
         #
-        fin  =      file ( filein  , 'r' )
-        #
-        import tempfile 
-        fd,fileout = tempfile.mkstemp ( prefix = 'tmp_' , suffix = '_zdb.gz' )
+        import tempfile , gzip 
+        fd , fileout = tempfile.mkstemp ( prefix = 'tmp_' , suffix = '_zdb.gz' )
+        os.close ( fd ) 
         #
-        import gzip 
-        fout = gzip.open ( fileout , 'w' )
-        #
-        try : 
-            for all in fin : fout.write ( all )
-        finally:
-            fout.close()
-            fin .close()   
-            import time
-            time.sleep( 3 ) 
+        with file ( filein , 'rb' ) as fin : 
+            fout = gzip.open ( fileout , 'wb' )
+            try     : shutil.copyfileobj ( fin , fout , 2**20 )
+            finally : fout.close()
         return fileout
         
     ## gzip the file into temporary location, keep original
@@ -428,20 +429,14 @@ class ZipShelf(shelve.Shelf):
         if not os.path.exists  ( filein  ) :
             raise NameError ( "GUNZIP: non existing file: " + filein )
         #
-        import gzip 
-        fin  = gzip.open ( filein  , 'r' )
-        #
-        import tempfile 
-        fd,fileout = tempfile.mkstemp ( prefix = 'tmp_' , suffix = '_zdb' )
-        fout = file ( fileout , 'w' )
+        import tempfile , gzip 
+        fd , fileout = tempfile.mkstemp ( prefix = 'tmp_' , suffix = '_zdb' )
+        os.close ( fd ) 
         #
-        try : 
-            for all in fin : fout.write ( all )
-        finally: 
-            fout.close()
-            fin .close()
-            import time
-            time.sleep( 3 ) 
+        with file ( fileout , 'wb' ) as fout :
+            fin = gzip.open ( filein , 'rb' )
+            try     : shutil.copyfileobj ( fin , fout , 2**20 )
+            finally : fin.close()
         return fileout
 
     #
@@ -476,8 +471,7 @@ def _zip_getitem (self, key):
     try:
         value = self.cache[key]
     except KeyError:
-        f = StringIO(zlib.decompress(self.dict[key]))
-        value = Unpickler(f).load()
+        value = self.coder.loads ( self.dict [ key ] )
         if self.writeback:
             self.cache[key] = value
     return value
@@ -489,10 +483,7 @@ def _zip_setitem ( self , key , value ) :
     """
     if self.writeback:
         self.cache[key] = value
-    f = StringIO()
-    p = Pickler(f, self._protocol)
-    p.dump(value)
-    self.dict[key] = zlib.compress( f.getvalue(), self.compresslevel)
+    self.dict [ key ] = self.coder.dumps ( value ) 
 
 ZipShelf.__getitem__ = _zip_getitem
 ZipShelf.__setitem__ = _zip_setitem
@@ -535,7 +526,11 @@ def open ( filename                                   ,
            protocol      = HIGHEST_PROTOCOL           ,
            compresslevel = zlib.Z_BEST_COMPRESSION    , 
            writeback     = False                      ,
-           silent        = True                       ) : 
+           silent        = True                       ,
+           indexed       = True                       ,
+           autocompact   = 0.5                        ,
+           codec         = None                       ,
+           serializer    = 'pickle'                   ) : 
     """Open a persistent dictionary for reading and writing.
     
     The filename parameter is the base filename for the underlying
@@ -545,6 +540,13 @@ def open ( filename                                   ,
     anydbm.open(). The optional protocol parameter specifies the
     version of the pickle protocol (0, 1, or 2).
     
+    The new databases are created as indexed containers
+    (see ostap.io.indexeddb), unless indexed = False 
+
+    The codec for values ( e.g. 'zlib', 'zlib:1', 'lzma', 'lz4', 'none', 'auto')
+    and the serializer are recorded in the metadata of the new database
+    (see ostap.io.dbcodecs). By default zlib with ``compresslevel'' is used 
+    
     See the module's __doc__ string for an overview of the interface.
     """
     
@@ -553,7 +555,11 @@ def open ( filename                                   ,
                       protocol      ,
                       compresslevel ,
                       writeback     ,
-                      silent        )
+                      silent        ,
+                      indexed       ,
+                      autocompact   ,
+                      codec         ,
+                      serializer    )
 
 
 
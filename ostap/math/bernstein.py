@@ -24,6 +24,7 @@
 # - lcm                : find the least common multiple 
 # - interpolate        : construct Bernstein interpolant
 # - generate&shoot     : generate random  numbers         
+# - sample             : generate array of random numbers (numpy)
 #
 #  @author Vanya BELYAEV Ivan.Belyaev@cern.ch
 #  @date   2011-12-01
@@ -47,6 +48,7 @@
 - lcm                : find the least common multiple 
 - interpolate        : construct Bernstein interpolant
 - generate&shoot     : generate random  numbers         
+- sample             : generate array of random numbers (numpy)
 """
 # =============================================================================
 __version__ = "$Revision$"
@@ -78,6 +80,7 @@ __all__     = (
     #
     'generate'          , ## generate random  numbers         
     'shoot'             , ## generate random  numbers         
+    'sample'            , ## generate array of random numbers 
     )
 # =============================================================================
 import  ROOT, math  
@@ -811,15 +814,28 @@ def interpolate ( func , abscissas , xmin = 0 , xmax = 1 ) :
 
 # =============================================================================
 ## generate random numbers from bernstein-like distribuitions
+#  - the numbers are generated in batches using <code>sample</code>,
+#    if numpy is available
 #  @code
 #  >>> func = ...
 #  >>> for x in func.generate( 1000 ) : print x 
 #  @endcode
+#  @see sample
 def generate ( fun , num ) :
     """Generate random numbers from bernstein-like distribuitions
+    - the numbers are generated in batches using `sample`, if numpy is available 
     >>> func = ...
     >>> for x in func.generate( 1000 ) : print x 
     """
+    try :
+        import numpy
+    except ImportError :
+        numpy = None
+        
+    if numpy :
+        for x in _sample_chunks_ ( sample , fun , num ) : yield float ( x )
+        return
+    
     b   = fun.bernstein() 
     xmn = b.xmin ()
     xmx = b.xmax ()
@@ -848,6 +864,124 @@ def shoot ( fun ) :
     for x in  generate ( fun , 1 ) :
         return x
 
+# =============================================================================
+## split the requested number of random numbers into batches 
+def _sample_chunks_ ( sampler , fun , num , chunk = 10000 ) :
+    """Split the requested number of random numbers into batches"""
+    while 0 < num :
+        n    = min ( num , chunk )
+        for x in sampler ( fun , n ) : yield x
+        num -= n
+
+# =============================================================================
+## the matrix of Bernstein basis polynomials \f$ C^n_k t^k (1-t)^{n-k}\f$
+#  for the array of points  \f$ 0\le t \le 1 \f$
+#  @return numpy array of shape <code>(len(t),n+1)</code>
+def _basis_matrix_ ( n , t ) :
+    """The matrix of Bernstein basis polynomials  C(n,k) t^k (1-t)^(n-k)
+    for the array of points 0<=t<=1
+    - it returns numpy array of shape (len(t),n+1)
+    """
+    import numpy
+    c = numpy.ones ( n + 1 )
+    for k in range ( 1 , n + 1 ) : c [ k ] = c [ k - 1 ] * ( n - k + 1 ) / float ( k ) 
+    k = numpy.arange ( n + 1 )
+    t = numpy.asarray ( t , dtype = float ).reshape ( -1 , 1 )
+    return c * t ** k * ( 1 - t ) ** ( n - k )
+
+# =============================================================================
+## generate random numbers from (tensor product of) Bernstein polynomials
+#  with the given table of coefficients and the limits.
+#  All basis functions have equal integrals, therefore:
+#  - the cell (k1,k2,...) is choosen with the probability \f$ \propto c_{k_1k_2...}\f$
+#  - inside the cell each coordinate is distributed as 
+#    \f$ \mathrm{Beta}(k_i+1,n_i-k_i+1)\f$
+#  For non-negative coefficients it is an exact inversion without rejections.
+#  Otherwise the positive part of the control net is used as an envelope,
+#  and the vectorised accept-reject is applied.
+#  @param pars   numpy array of coefficients with shape (n1+1,n2+1,...)
+#  @param limits list of (low,high) pairs for each dimension 
+#  @param num    number of random numbers 
+#  @return numpy array of shape (num,dim)
+def _bernstein_sample_ ( pars , limits , num , nmax = 1000000 ) :
+    """Generate random numbers from (tensor product of) Bernstein polynomials
+    with the given table of coefficients and the limits.
+    All basis functions have equal integrals, therefore:
+    - the cell (k1,k2,...) is choosen with the probability ~ c(k1,k2,...)
+    - inside the cell each coordinate is distributed as Beta(k_i+1,n_i-k_i+1)
+    For non-negative coefficients it is an exact inversion without rejections.
+    Otherwise the positive part of the control net is used as an envelope,
+    and the vectorised accept-reject is applied
+    - it returns numpy array of shape (num,dim)
+    """
+    import numpy
+    
+    pars  = numpy.asarray ( pars , dtype = float )
+    dim   = pars.ndim
+    degs  = [ s - 1 for s in pars.shape ]
+    
+    pos   = numpy.maximum ( pars , 0.0 )
+    total = pars.sum ()
+    wsum  = pos .sum ()
+    assert 0 < total and 0 < wsum , "sample: the distribution is not positive!"
+    
+    exact = ( 0 <= pars ).all() 
+    eff   = total / wsum                   ## acceptance efficiency 
+    cprob = numpy.cumsum ( pos.ravel () ) 
+
+    ## rule to evaluate the polynomials for the arrays of basis matrices
+    cells = 'lmnopq' [ : dim ]
+    rule  = ','.join ( 'i' + c for c in cells ) + ',' + cells + '->i'
+    
+    results = []
+    nres    = 0 
+    while nres < num :
+        
+        m   = num - nres 
+        if not exact : m = int ( 1.1 * m / eff ) + 10 
+        m   = min ( m , nmax )
+        
+        ## choose the cells 
+        idx = numpy.searchsorted ( cprob , numpy.random.uniform ( 0 , cprob [ -1 ] , m ) , side = 'right' )
+        idx = numpy.minimum ( idx , cprob.size - 1 )
+        ks  = numpy.unravel_index ( idx , pars.shape )
+        
+        ## sample inside the cells 
+        ts  = [ numpy.random.beta ( k + 1 , n - k + 1 ) for k , n in zip ( ks , degs ) ]
+        
+        if not exact :
+            basis = [ _basis_matrix_ ( n , t ) for n , t in zip ( degs , ts ) ]
+            f     = numpy.einsum ( rule , * ( basis + [ pars ] ) )
+            g     = numpy.einsum ( rule , * ( basis + [ pos  ] ) )
+            keep  = numpy.random.uniform ( 0 , 1 , m ) * g <= f 
+            ts    = [ t [ keep ] for t in ts ]
+
+        xs = [ a + ( b - a ) * t for t , ( a , b ) in zip ( ts , limits ) ]
+        xs = numpy.column_stack ( xs ) 
+        results.append ( xs )
+        nres += len    ( xs )
+        
+    return numpy.concatenate ( results ) [ : num ]
+
+# =============================================================================
+## generate the array of random numbers from bernstein-like distribuitions
+#  @code
+#  >>> func = ...
+#  >>> xs   = func.sample ( 100000 ) ## numpy array 
+#  @endcode
+#  For the non-negative control polygon it is an exact inversion,
+#  without any rejections
+#  @see _bernstein_sample_
+def sample ( fun , num ) :
+    """Generate the array of random numbers from bernstein-like distribuitions
+    >>> func = ...
+    >>> xs   = func.sample ( 100000 ) ## numpy array 
+    For the non-negative control polygon it is an exact inversion,
+    without any rejections
+    """
+    b = fun.bernstein()
+    return _bernstein_sample_ ( list ( b.pars() ) , [ ( b.xmin() , b.xmax() ) ] , num ) [ : , 0 ]
+
 # =============================================================================
 ##  Long polynomial division
 #   f(x) = q(x)*g(x)+r(x), where  deg(f)=m >= def(g)=n, and
@@ -1067,6 +1201,7 @@ for  p in ( Ostap.Math.Bernstein     ,
     #
     p.generate          =           generate
     p.shoot             =              shoot
+    p.sample            =             sample
 
     p.__setitem__  = _p_set_par_
     p.__getitem__  = _p_get_par_
@@ -1105,23 +1240,75 @@ for p in ( Ostap.Math.Positive2D     ,
 
 
 
+# =============================================================================
+## get the underlying Bernstein polynomial and the full table of its coefficients
+#  (for symmetric polynomials the table is symmetrized)
+def _b_table_ ( fun ) :
+    """Get the underlying Bernstein polynomial and the full table of its coefficients
+    (for symmetric polynomials the table is symmetrized)
+    """
+    b = fun.bernstein() if hasattr ( fun , 'bernstein' ) else fun
+    import numpy
+    if hasattr ( b , 'nZ' ) :
+        table = numpy.array ( [ [ [ b.par ( l , m , n ) for n in range ( b.nZ () + 1 ) ]
+                                  for m in range ( b.nY () + 1 ) ]
+                                for l in range ( b.nX () + 1 ) ] )
+    else : 
+        table = numpy.array ( [ [ b.par ( l , m ) for m in range ( b.nY () + 1 ) ]
+                                for l in range ( b.nX () + 1 ) ] )
+    return b , table 
+
+# =============================================================================
+## generate the array of random numbers from 2D bernstein-like distribuitions
+#  @code
+#  >>> func = ...
+#  >>> xy   = func.sample ( 100000 ) ## numpy array of shape (100000,2)
+#  @endcode
+#  For the non-negative coefficients it is an exact inversion,
+#  without any rejections
+#  @see _bernstein_sample_
+def sample2 ( fun , num ) :
+    """Generate the array of random numbers from 2D bernstein-like distribuitions
+    >>> func = ...
+    >>> xy   = func.sample ( 100000 ) ## numpy array of shape (100000,2)
+    For the non-negative coefficients it is an exact inversion,
+    without any rejections
+    """
+    b , table = _b_table_ ( fun )
+    return _bernstein_sample_ ( table , [ ( b.xmin () , b.xmax () ) ,
+                                          ( b.ymin () , b.ymax () ) ] , num ) 
+    
 # =============================================================================
 ## generate random numbers from bernstein-like distribuitions
+#  - the numbers are generated in batches using <code>sample</code>,
+#    if numpy is available
 #  @code
 #  >>> func = ...
 #  >>> for x,y in func.generate( 1000 ) : print x,y 
 #  @endcode
+#  @see sample2 
 def generate2( fun , num ) :
     """Generate random numbers from bernstein-like distribuitions
+    - the numbers are generated in batches using `sample`, if numpy is available 
     >>> func = ...
     >>> for x,y in func.generate( 1000 ) : print x,y 
     """
-    b   = fun.bernstein() 
+    try :
+        import numpy
+    except ImportError :
+        numpy = None
+        
+    if numpy :
+        for x , y in _sample_chunks_ ( sample2 , fun , num ) : yield float ( x ) , float ( y ) 
+        return
+    
+    b   = fun.bernstein() if hasattr ( fun , 'bernstein' ) else fun 
     xmn = b.xmin ()
     xmx = b.xmax ()
     ymn = b.ymin ()
     ymx = b.ymax ()
-    vmx = max ( b.pars() )
+    ## basis functions are normalized densities 
+    vmx = max ( b.pars() ) * ( b.nX () + 1 ) * ( b.nY () + 1 ) / ( ( xmx - xmn ) * ( ymx - ymn ) )
     i   = 0 
     from random import uniform as _uniform_
     while i < num : 
@@ -1233,28 +1420,66 @@ for  p in ( Ostap.Math.Bernstein2D    ,
             Ostap.Math.Positive2DSym  ) :
     p.generate = generate2
     p.shoot    = shoot2
+    p.sample   = sample2
     
 
 
+# =============================================================================
+## generate the array of random numbers from 3D bernstein-like distribuitions
+#  @code
+#  >>> func = ...
+#  >>> xyz  = func.sample ( 100000 ) ## numpy array of shape (100000,3)
+#  @endcode
+#  For the non-negative coefficients it is an exact inversion,
+#  without any rejections
+#  @see _bernstein_sample_
+def sample3 ( fun , num ) :
+    """Generate the array of random numbers from 3D bernstein-like distribuitions
+    >>> func = ...
+    >>> xyz  = func.sample ( 100000 ) ## numpy array of shape (100000,3)
+    For the non-negative coefficients it is an exact inversion,
+    without any rejections
+    """
+    b , table = _b_table_ ( fun )
+    return _bernstein_sample_ ( table , [ ( b.xmin () , b.xmax () ) ,
+                                          ( b.ymin () , b.ymax () ) ,
+                                          ( b.zmin () , b.zmax () ) ] , num ) 
+
 # =============================================================================
 ## generate random numbers from bernstein-like distribuitions
+#  - the numbers are generated in batches using <code>sample</code>,
+#    if numpy is available
 #  @code
 #  >>> func = ...
 #  >>> for x,y,z in func.generate( 1000 ) : print x,y,z 
 #  @endcode
+#  @see sample3 
 def generate3( fun , num ) :
     """Generate random numbers from bernstein-like distribuitions
+    - the numbers are generated in batches using `sample`, if numpy is available 
     >>> func = ...
     >>> for x,y,z in func.generate( 1000 ) : print x,y,z 
     """
-    b   = fun.bernstein() 
+    try :
+        import numpy
+    except ImportError :
+        numpy = None
+        
+    if numpy :
+        for x , y , z in _sample_chunks_ ( sample3 , fun , num ) :
+            yield float ( x ) , float ( y ) , float ( z ) 
+        return
+    
+    b   = fun.bernstein() if hasattr ( fun , 'bernstein' ) else fun 
     xmn = b.xmin ()
     xmx = b.xmax ()
     ymn = b.ymin ()
     ymx = b.ymax ()
-    zmn = b.ymin ()
-    zmx = b.ymax ()
-    vmx = max ( b.pars() )
+    zmn = b.zmin ()
+    zmx = b.zmax ()
+    ## basis functions are normalized densities 
+    vmx = max ( b.pars() ) * ( b.nX () + 1 ) * ( b.nY () + 1 ) * ( b.nZ () + 1 ) 
+    vmx /= ( xmx - xmn ) * ( ymx - ymn ) * ( zmx - zmn )
     i   = 0 
     from random import uniform as _uniform_
     while i < num : 
@@ -1372,6 +1597,7 @@ for  p in ( Ostap.Math.Bernstein3D    ,
     
     p.generate = generate3
     p.shoot    = shoot3
+    p.sample   = sample3
     
 # =============================================================================
 _decorated_classes_ = set( [
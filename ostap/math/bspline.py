@@ -15,6 +15,7 @@
 # - interpolate          : construct interpolating B-spline 
 # - approximate          : construct approximating B-spline
 # - generate&shoot       : generate random numbers 
+# - sample               : generate array of random numbers (numpy)
 #
 #  @author Vanya BELYAEV Ivan.Belyaev@cern.ch
 #  @date   2011-12-01
@@ -29,6 +30,7 @@
 - interpolate          : construct interpolating B-spline 
 - approximate          : construct approximating B-spline
 - generate&shoot       : generate random numbers 
+- sample               : generate array of random numbers (numpy)
 #"""
 # =============================================================================
 __version__ = "$Revision$"
@@ -45,6 +47,7 @@ __all__     = (
     'approximate'          , ## variation diminishing approximation 
     'generate'             , ## generate random numbers 
     'shoot'                , ## generate random numbers 
+    'sample'               , ## generate array of random numbers 
     )
 # =============================================================================
 import  ROOT, math  
@@ -448,15 +451,29 @@ def solve ( bs , C = 0 , split = 5 ) :
 
 # =============================================================================
 ## generate random numbers from b-spline-distribuitions
+#  - the numbers are generated in batches using <code>sample</code>,
+#    if numpy is available
 #  @code
 #  >>> func = ...
 #  >>> for x in func.generate( 1000 ) : print x 
 #  @endcode
+#  @see sample 
 def generate ( fun , num ) :
     """Generate random numbers from bspline-like distribuitions
+    - the numbers are generated in batches using `sample`, if numpy is available 
     >>> func = ...
     >>> for x in func.generate( 1000 ) : print x 
     """
+    try :
+        import numpy
+    except ImportError :
+        numpy = None
+        
+    if numpy :
+        from ostap.math.bernstein import _sample_chunks_
+        for x in _sample_chunks_ ( sample , fun , num ) : yield float ( x )
+        return
+    
     bs  = fun.bspline() 
     xmn = bs.xmin ()
     xmx = bs.xmax ()
@@ -470,7 +487,104 @@ def generate ( fun , num ) :
         if v >= y :
             i+= 1 
             yield x
+
+# =============================================================================
+## the matrix of B-spline basis functions for the array of points
+#  (Cox-de Boor recursion)
+#  @return numpy array of shape <code>(len(x),len(knots)-order-1)</code>
+def _basis_matrix_ ( knots , order , x ) :
+    """The matrix of B-spline basis functions for the array of points
+    (Cox-de Boor recursion)
+    - it returns numpy array of shape (len(x),len(knots)-order-1)
+    """
+    import numpy
+    t = numpy.asarray ( knots , dtype = float )
+    x = numpy.asarray ( x     , dtype = float ).reshape ( -1 , 1 ) 
+    B = ( ( t [ :-1 ] <= x ) & ( x < t [ 1: ] ) ).astype ( float )
+    ## the right edge belongs to the last non-empty interval 
+    last = numpy.nonzero ( t [ :-1 ] < t [ 1: ] ) [ 0 ] [ -1 ]
+    B [ x [ : , 0 ] >= t [ last + 1 ] , last ] = 1.0 
+    for d in range ( 1 , order + 1 ) :
+        n  = len ( t ) - 1 - d
+        dl = t [ d     : d + n     ] - t [     : n     ]
+        dr = t [ d + 1 : d + 1 + n ] - t [ 1   : 1 + n ]
+        wl = numpy.where ( 0 < dl , ( x - t [ : n ] ) / numpy.where ( 0 < dl , dl , 1 ) , 0.0 )
+        wr = numpy.where ( 0 < dr , ( t [ d + 1 : d + 1 + n ] - x ) / numpy.where ( 0 < dr , dr , 1 ) , 0.0 )
+        B  = wl * B [ : , : n ] + wr * B [ : , 1 : n + 1 ]
+    return B
+
+# =============================================================================
+## generate the array of random numbers from b-spline-distribuitions
+#  @code
+#  >>> func = ...
+#  >>> xs   = func.sample ( 100000 ) ## numpy array 
+#  @endcode
+#  The normalized basis spline \f$ M_i(x)\f$ is the density of
+#  \f$ x = \sum_j w_j t_{i+j} \f$, where \f$ w\f$ is uniformly distributed
+#  over the simplex (Curry-Schoenberg), therefore:
+#  - the basis spline is choosen with the probability 
+#    \f$ \propto c_i (t_{i+k+1}-t_i)\f$
+#  - the point is the random convex combination of its knots 
+#  For non-negative coefficients it is an exact inversion without rejections.
+#  Otherwise the positive part of the control polygon is used as an envelope,
+#  and the vectorised accept-reject is applied.
+def sample ( fun , num , nmax = 1000000 ) :
+    """Generate the array of random numbers from b-spline-distribuitions
+    >>> func = ...
+    >>> xs   = func.sample ( 100000 ) ## numpy array 
+    The normalized basis spline M_i(x) is the density of x = sum_j w_j t_{i+j},
+    where w is uniformly distributed over the simplex (Curry-Schoenberg), therefore:
+    - the basis spline is choosen with the probability ~ c_i*(t_{i+k+1}-t_i)
+    - the point is the random convex combination of its knots 
+    For non-negative coefficients it is an exact inversion without rejections.
+    Otherwise the positive part of the control polygon is used as an envelope,
+    and the vectorised accept-reject is applied.
+    """
+    import numpy
+    
+    bs    = fun.bspline()
+    k     = bs.order() 
+    t     = numpy.array ( list ( bs.knots () ) , dtype = float )
+    pars  = numpy.array ( list ( bs.pars  () ) , dtype = float )
+    
+    pos   = numpy.maximum ( pars , 0.0 )
+    width = t [ k + 1 : k + 1 + len ( pars ) ] - t [ : len ( pars ) ]
+    total = numpy.dot ( pars , width )
+    wsum  = numpy.dot ( pos  , width )
+    assert 0 < total and 0 < wsum , "sample: the distribution is not positive!"
+    
+    exact = ( 0 <= pars ).all()
+    eff   = total / wsum                  ## acceptance efficiency 
+    cprob = numpy.cumsum ( pos * width )
+    
+    results = []
+    nres    = 0
+    while nres < num :
+
+        m   = num - nres 
+        if not exact : m = int ( 1.1 * m / eff ) + 10 
+        m   = min ( m , nmax )
+
+        ## choose the basis splines 
+        idx = numpy.searchsorted ( cprob , numpy.random.uniform ( 0 , cprob [ -1 ] , m ) , side = 'right' )
+        idx = numpy.minimum ( idx , len ( pars ) - 1 )
+
+        ## random convex combinations of the knots 
+        w   = numpy.random.exponential ( 1.0 , ( m , k + 2 ) )
+        w  /= w.sum ( axis = 1 ).reshape ( -1 , 1 )
+        x   = ( w * t [ idx.reshape ( -1 , 1 ) + numpy.arange ( k + 2 ) ] ).sum ( axis = 1 )
+        
+        if not exact :
+            basis = _basis_matrix_ ( t , k , x )
+            f     = numpy.dot ( basis , pars )
+            g     = numpy.dot ( basis , pos  )
+            x     = x [ numpy.random.uniform ( 0 , 1 , m ) * g <= f ]
             
+        results.append ( x )
+        nres += len    ( x )
+
+    return numpy.concatenate ( results ) [ : num ]
+
 # =============================================================================
 ## generate random numbers from b-spline-distribuitions
 #  @code
@@ -558,6 +672,7 @@ for  p in ( Ostap.Math.BSpline          ,
     p.solve             =              solve
     p.generate          =           generate
     p.shoot             =              shoot
+    p.sample            =             sample
     
     p.__setitem__  = _p_set_par_
     p.__getitem__  = _p_get_par_
@@ -60,6 +60,9 @@ __all__     = (
     'genzmalik3'     , ## (3D) numerical integration using Genz&Malik's method
     ##
     "IntegralCache"  , ## (1D) numerical integration (as object, using scipy is if ssible)
+    ##
+    "IntegralMemo"   , ## LRU-cache of integrals, keyed by function parameters and range
+    "integral_memo"  , ## the default instance of LRU-cache of integrals
     ##    
     ) 
 # =============================================================================
@@ -482,6 +485,7 @@ def _split3_ ( xlims , ylims , zlims ) :
              
 # =============================================================================
 ## Driving routine for Adaptive numerical 2D/3D integration using Genz&Malik's basic rule
+#  The sub-regions are kept in the heap, ordered by the error estimate 
 # 
 #  A.C. Genz, A.A. Malik, ``Remarks on algorithm 006: An adaptive algorithm for
 #  numerical integration over an N-dimensional rectangular region'',
@@ -490,8 +494,9 @@ def _split3_ ( xlims , ylims , zlims ) :
 #  @see https://doi.org/10.1016/0771-050X(80)90039-X.
 #  @see http://www.sciencedirect.com/science/article/pii/0771050X8090039X)
 def _genzmalik_( func , limits , basic_rule , splitter ,
-                 args = () ,  epsabs = 1.5e-7 , epsrel = 1.5e-7 ) :
+                 args = () ,  epsabs = 1.5e-7 , epsrel = 1.5e-7 , maxeval = 10**7 ) :
     """Driving routine for Adaptive numerical 2D/3D integration using Genz&Malik's basic rule
+    - the sub-regions are kept in the heap, ordered by the error estimate 
     
     A.C. Genz, A.A. Malik, ``Remarks on algorithm 006: An adaptive algorithm for
     numerical integration over an N-dimensional rectangular region'',
@@ -500,64 +505,256 @@ def _genzmalik_( func , limits , basic_rule , splitter ,
     - see https://doi.org/10.1016/0771-050X(80)90039-X.
     - see http://www.sciencedirect.com/science/article/pii/0771050X8090039X)
     """
+    import heapq
+    
+    npoints = 1 + 4 * len ( limits ) + 2 * len ( limits ) * ( len ( limits ) - 1 ) + 2 ** len ( limits ) 
 
     i7,i5 = basic_rule ( func , *limits , args = args )
+    nfc   = npoints
+
+    ## heap of regions: ( -error , counter , region , integral ) 
+    heap    = [ ( -abs ( i7 - i5 ) , 0 , limits , i7 ) ]
+    result  = i7
+    error   = abs ( i7 - i5 )
+    counter = 1 
     
-    nfc   = 17
-    
-    err     =  abs ( i7 -  i5 )
-    relerr  =  0.5 *  ( abs(i7) + abs(i5) ) * epsrel 
+    while error > max ( epsabs , epsrel * abs ( result ) ) :
+
+        if maxeval <= nfc :
+            logger.warning ( "Genz&Malik: maximal number of evaluations %d is reached" % maxeval )
+            break
+        
+        ## get the region with the largest error 
+        e , c , r , v = heapq.heappop ( heap )
+        result -= v
+        error  += e
+        
+        for nr in splitter ( *r ) :
+            r7 , r5  = basic_rule ( func , *nr , args = args )
+            nfc     += npoints
+            counter += 1 
+            heapq.heappush ( heap , ( -abs ( r7 - r5 ) , counter , nr , r7 ) )
+            result  += r7
+            error   += abs ( r7 - r5 )
+
+    ## recalculate the sums to avoid the accumulation of rounding errors 
+    result = math.fsum (  entry[3] for entry in heap )
+    error  = math.fsum ( -entry[0] for entry in heap )
     
-    if   err <= epsabs : return i7, err, nfc , 1 
-    elif err <= relerr : return i7, err, nfc , 1 
+    return result , error , nfc , len ( heap ) 
+
+# =============================================================================
+## the nodes and weights of Genz&Malik's basic rules in unit coordinates
+#  @return ( nodes , weights7 , weights5 ) as numpy arrays 
+_gm_tables = {} 
+def _genzmalik_nodes_ ( dim ) :
+    """The nodes and weights of Genz&Malik's basic rules in unit coordinates
+    - it returns ( nodes , weights7 , weights5 ) as numpy arrays 
+    """
+    if dim in _gm_tables : return _gm_tables [ dim ]
     
-    stack = {}
-    r     = limits 
+    import numpy, itertools 
+    w7 = _w2  if 2 == dim else _w3 
+    w5 = _w2p if 2 == dim else _w3p
     
-    stack [ r ] = err, i7
-
-    while 1 < 2 :
+    nodes , ws7 , ws5 = [] , [] , []
+    def _add_ ( node , i ) :
+        nodes.append ( node )
+        ws7  .append ( w7 [ i ] if 4 != i else w7 [ 4 ] / 2 ** dim ) 
+        ws5  .append ( w5 [ i ] if 4 != i else 0.0 )
         
-        serr =  0    ## (current) sum of errors
-        res  =  0    ## (current) result 
-        rmx  =  None ## (current) region with the maximal error 
-        emx  = -1    ## (current) maximal error
-
-        for r,entry in stack.iteritems() :
+    _add_ ( [ 0.0 ] * dim , 0 )
+    for i , l in ( ( 1 , _l2 ) , ( 2 , _l3 ) ) :
+        for k in range ( dim ) :
+            for s in ( +1 , -1 ) :
+                node = [ 0.0 ] * dim
+                node [ k ] = s * l 
+                _add_ ( node , i )
+    for k1 , k2 in itertools.combinations ( range ( dim ) , 2 ) :
+        for s1 , s2 in itertools.product ( ( +1 , -1 ) , repeat = 2 ) :
+            node = [ 0.0 ] * dim
+            node [ k1 ] = s1 * _l4
+            node [ k2 ] = s2 * _l4 
+            _add_ ( node , 3 ) 
+    for signs in itertools.product ( ( +1 , -1 ) , repeat = dim ) :
+        _add_ ( [ s * _l5 for s in signs ] , 4 )
+        
+    table = numpy.array ( nodes ) , numpy.array ( ws7 ) , numpy.array ( ws5 )
+    _gm_tables [ dim ] = table
+    return table 
 
-            err     = entry[0]            
-            serr   += err
-            res    += entry[1]
+# =============================================================================
+## evaluate the function for the chunk of points (helper for the process pool)
+def _genzmalik_chunk_ ( item ) :
+    """Evaluate the function for the chunk of points (helper for the process pool)"""
+    func , args , points = item
+    return [ float ( func ( *( tuple ( p ) + args ) ) ) for p in points ]
 
-            if 0 > emx or err >= emx :
-                emx = err
-                rmx = r 
+# =============================================================================
+## @class _GMEvaluator
+#  Helper class to evaluate the integrand for the array of points:
+#  - in a single vectorised call, if the integrand accepts numpy arrays 
+#  - using the process pool for expensive integrands
+#  - point-by-point otherwise 
+class _GMEvaluator(object) :
+    """Helper class to evaluate the integrand for the array of points:
+    - in a single vectorised call, if the integrand accepts numpy arrays 
+    - using the process pool for expensive integrands
+    - point-by-point otherwise 
+    """
+    def __init__ ( self , func , args = () , vectorized = None , ncpus = None ) :
+        self.func       = func
+        self.args       = tuple ( args )
+        self.vectorized = vectorized
+        self.pool       = None
+        self.ncpus      = ncpus if ncpus and 1 < ncpus else 1 
+            
+    ## the process pool: created at the first use, when the integrand is known
+    #  to be not vectorised (no processes are started for vectorised integrands)
+    def get_pool ( self ) :
+        """The process pool: created at the first use, when the integrand is known
+        to be not vectorised (no processes are started for vectorised integrands)
+        """
+        if self.pool is None and 1 < self.ncpus and self.vectorized is False :
+            import multiprocessing
+            self.pool = multiprocessing.Pool ( self.ncpus )
+        return self.pool
+    
+    def close ( self ) :
+        if self.pool :
+            self.pool.close ()
+            self.pool.join  ()
+            self.pool = None
+            
+    ## point-by-point evaluation 
+    def scalar ( self , points ) :
+        import numpy 
+        pool = self.get_pool () if self.ncpus < len ( points ) else None 
+        if pool : 
+            chunks = numpy.array_split ( points , self.ncpus )
+            values = pool.map ( _genzmalik_chunk_ , [ ( self.func , self.args , c ) for c in chunks ] )
+            return numpy.concatenate ( [ numpy.asarray ( v , dtype = float ) for v in values ] )
+        return numpy.asarray ( _genzmalik_chunk_ ( ( self.func , self.args , points ) ) , dtype = float )
+
+    ## vectorised evaluation 
+    def vector ( self , points ) :
+        import numpy 
+        values = self.func ( *( tuple ( points.T ) + self.args ) )
+        values = numpy.asarray ( values , dtype = float )
+        if values.shape != ( len ( points ) , ) : raise TypeError ( 'Invalid shape %s' % str ( values.shape ) ) 
+        return values 
+    
+    def __call__ ( self , points ) :
+        
+        if self.vectorized is None :
+            ## check, if the function accepts arrays 
+            try :
+                values = self.vector ( points )
+                check  = self.scalar ( points [ :2 ] )
+                import numpy
+                self.vectorized = bool ( numpy.allclose ( values [ :2 ] , check , rtol = 1.e-12 , atol = 0 ) )
+            except Exception :
+                self.vectorized = False
+            if self.vectorized : return values
+            
+        return self.vector ( points ) if self.vectorized else self.scalar ( points )
 
-            if   serr <= 0.5 * epsabs : pass
-            elif serr <= 0.5 * relerr : pass
-            else                      : break ##  BREAK
+# =============================================================================
+## Driving routine for Adaptive numerical 2D/3D integration using Genz&Malik's basic rule
+#  Vectorised version:
+#  - the sub-regions are kept in the heap, ordered by the error estimate
+#  - at each step several regions with the largest errors are split
+#  - the basic rule is applied for all new regions at once, and the integrand is
+#    called for all nodes in a single vectorised call (if it accepts numpy arrays),
+#    or using the process pool (if <code>ncpus</code> is specified)
+#
+#  A.C. Genz, A.A. Malik, ``Remarks on algorithm 006: An adaptive algorithm for
+#  numerical integration over an N-dimensional rectangular region'',
+#  in Journal of Computational and Applied Mathematics, Volume 6, Issue 4, 1980, Pages 295,
+#   ISSN 0377-0427
+#  @see https://doi.org/10.1016/0771-050X(80)90039-X.
+#  @see http://www.sciencedirect.com/science/article/pii/0771050X8090039X)
+def _genzmalik_v_ ( func , limits , splitter , args = () ,
+                    epsabs = 1.5e-7 , epsrel = 1.5e-7 , 
+                    vectorized = None , ncpus = None , nbatch = 64 , maxeval = 10**7 ) :
+    """Driving routine for Adaptive numerical 2D/3D integration using Genz&Malik's basic rule
+    Vectorised version:
+    - the sub-regions are kept in the heap, ordered by the error estimate
+    - at each step several regions with the largest errors are split
+    - the basic rule is applied for all new regions at once, and the integrand is
+    called for all nodes in a single vectorised call (if it accepts numpy arrays),
+    or using the process pool (if ncpus is specified)
+    
+    A.C. Genz, A.A. Malik, ``Remarks on algorithm 006: An adaptive algorithm for
+    numerical integration over an N-dimensional rectangular region'',
+    in Journal of Computational and Applied Mathematics, Volume 6, Issue 4, 1980, Pages 295,
+    ISSN 0377-0427
+    - see https://doi.org/10.1016/0771-050X(80)90039-X.
+    - see http://www.sciencedirect.com/science/article/pii/0771050X8090039X)
+    """
+    import numpy, heapq
+
+    dim              = len ( limits )
+    nodes , w7 , w5  = _genzmalik_nodes_ ( dim )
+    npoints          = len ( nodes ) 
+    evaluator        = _GMEvaluator ( func , args , vectorized , ncpus )
+
+    ## apply the basic rule for many regions at once 
+    def _rule_ ( regions ) :
+        lims   = numpy.array ( regions , dtype = float )          ## ( m , dim , 2 )
+        center = 0.5 * ( lims [ : , : , 1 ] + lims [ : , : , 0 ] ) ## ( m , dim )
+        half   = 0.5 * ( lims [ : , : , 1 ] - lims [ : , : , 0 ] ) ## ( m , dim )
+        points = center [ : , None , : ] + half [ : , None , : ] * nodes [ None , : , : ] 
+        values = evaluator ( points.reshape ( -1 , dim ) ).reshape ( len ( regions ) , npoints )
+        volume = numpy.prod ( 2 * half , axis = 1 ) 
+        return values.dot ( w7 ) * volume , values.dot ( w5 ) * volume
+
+    try :
+        
+        i7 , i5 = _rule_ ( [ limits ] )
+        nfc     = npoints
+        
+        heap    = [ ( -abs ( i7[0] - i5[0] ) , 0 , limits , i7[0] ) ]
+        result  = i7[0]
+        error   = abs ( i7[0] - i5[0] )
+        counter = 1 
+        
+        while error > max ( epsabs , epsrel * abs ( result ) ) :
 
-        else :
-            # cumulated uncertainty is small enough, return  
-            lstack = len(stack)
-            del stack 
-            return res, serr, nfc , lstack
+            if maxeval <= nfc :
+                logger.warning ( "Genz&Malik: maximal number of evaluations %d is reached" % maxeval )
+                break
 
-        ##  ??? 
-        if not rmx : break     ## BREAK 
-        
-        rr = splitter ( *rmx )
-        for r in  rr :
-            r7,r5  = basic_rule (  func , *r , args = args )
-            nfc   += 17 
-            stack[ r ] = abs(r7-r5),r7
-        ## remove large region from the stack 
-        del stack[rmx]            
+            tolerance = max ( epsabs , epsrel * abs ( result ) )
+            
+            ## get several regions with the largest errors 
+            regions = []
+            while heap and len ( regions ) < nbatch :
+                e , c , r , v = heapq.heappop ( heap )
+                result -= v
+                error  += e
+                regions.append ( r )
+                if error <= tolerance : break
+
+            new      = [ nr for r in regions for nr in splitter ( *r ) ]
+            r7 , r5  = _rule_ ( new ) 
+            nfc     += npoints * len ( new )
+            
+            for nr , v7 , v5 in zip ( new , r7 , r5 ) :
+                counter += 1 
+                heapq.heappush ( heap , ( -abs ( v7 - v5 ) , counter , nr , v7 ) )
+                
+            result  += r7.sum ()
+            error   += abs ( r7 - r5 ).sum () 
+            
+    finally :
+        evaluator.close () 
 
-    lstack = len(stack)
-    del stack 
-    return res, serr, nfc , lstack
-        
+    ## recalculate the sums to avoid the accumulation of rounding errors 
+    result = math.fsum (  entry[3] for entry in heap )
+    error  = math.fsum ( -entry[0] for entry in heap )
+    
+    return result , error , nfc , len ( heap ) 
 
 # =============================================================================
 ## Adaptive numerical 2D integration using Genz&Malik's basic rule
@@ -572,8 +769,12 @@ def _genzmalik_( func , limits , basic_rule , splitter ,
 #  func   = lambda x,y : x*x + y*y
 #  r      = genzmalik2 ( func , xmin=-1 , xmax=2 , ymin=-1 , ymax=2 )
 #  print 'Integral: %s ' % r 
-#  @endcode 
-def genzmalik2 ( func , xmin , xmax , ymin ,  ymax , args = () , err = False , epsabs = 1.5e-7 , epsrel = 1.5e-7 ) :
+#  @endcode
+#  If numpy is available, the integrand is evaluated for many nodes at once:
+#  - in a single vectorised call, if it accepts numpy arrays (<code>vectorized=None</code>: check it) 
+#  - using the process pool with <code>ncpus</code> processes (the integrand must be picklable)
+def genzmalik2 ( func , xmin , xmax , ymin ,  ymax , args = () , err = False , epsabs = 1.5e-7 , epsrel = 1.5e-7 ,
+                 vectorized = None , ncpus = None ) :
     """ Adaptive numerical 2D integration using Genz&Malik's basic rule
     
     A.C. Genz, A.A. Malik, ``Remarks on algorithm 006: An adaptive algorithm for
@@ -589,11 +790,19 @@ def genzmalik2 ( func , xmin , xmax , ymin ,  ymax , args = () , err = False , e
     >>> func   = lambda x,y : x*x + y*y
     >>> r      = genzmalik2 ( func , xmin=-1 , xmax=2 , ymin=-1 , ymax=2 )
     >>> print 'Integral: %s ' % r 
-    
+
+    If numpy is available, the integrand is evaluated for many nodes at once:
+    - in a single vectorised call, if it accepts numpy arrays (vectorized=None: check it) 
+    - using the process pool with ncpus processes (the integrand must be picklable)
     """
 
     limits  = ( xmin , xmax ) , ( ymin , ymax ) 
-    r,e,n,s = _genzmalik_ ( func , limits , _genzmalik2_ , _split2_ , args , abs(epsabs) , abs(epsrel) )
+    try :
+        import numpy 
+        r,e,n,s = _genzmalik_v_ ( func , limits , _split2_ , args , abs(epsabs) , abs(epsrel) ,
+                                  vectorized = vectorized , ncpus = ncpus )
+    except ImportError :
+        r,e,n,s = _genzmalik_   ( func , limits , _genzmalik2_ , _split2_ , args , abs(epsabs) , abs(epsrel) )
     
     return VE ( r , e * e )  if err else r 
 
@@ -611,7 +820,11 @@ def genzmalik2 ( func , xmin , xmax , ymin ,  ymax , args = () , err = False , e
 #  r      = genzmalik3 ( func , xmin=-1 , xmax=2 , ymin=-1 , ymax=2 , zmin = -4, zmax = 7)
 #  print 'Integral: %s ' % r 
 #  @endcode 
-def genzmalik3 ( func , xmin , xmax , ymin ,  ymax , zmin ,  zmax , args = () , err = False , epsabs = 1.5e-7 , epsrel = 1.5e-7 ) :
+#  If numpy is available, the integrand is evaluated for many nodes at once:
+#  - in a single vectorised call, if it accepts numpy arrays (<code>vectorized=None</code>: check it) 
+#  - using the process pool with <code>ncpus</code> processes (the integrand must be picklable)
+def genzmalik3 ( func , xmin , xmax , ymin ,  ymax , zmin ,  zmax , args = () , err = False , epsabs = 1.5e-7 , epsrel = 1.5e-7 ,
+                 vectorized = None , ncpus = None ) :
     """ Adaptive numerical 3D integration using Genz&Malik's basic rule
     
     A.C. Genz, A.A. Malik, ``Remarks on algorithm 006: An adaptive algorithm for
@@ -627,11 +840,19 @@ def genzmalik3 ( func , xmin , xmax , ymin ,  ymax , zmin ,  zmax , args = () ,
     >>> func   = lambda x,y : x*x + y*y + z*z 
     >>> r      = genzmalik3 ( func , xmin=-1 , xmax=2 , ymin=-1 , ymax=2 , zmin = -4, zmax = 7)
     >>> print 'Integral: %s ' % r 
-    
+
+    If numpy is available, the integrand is evaluated for many nodes at once:
+    - in a single vectorised call, if it accepts numpy arrays (vectorized=None: check it) 
+    - using the process pool with ncpus processes (the integrand must be picklable)
     """
 
     limits  = ( xmin , xmax ) , ( ymin , ymax ) , ( zmin , zmax ) 
-    r,e,n,s = _genzmalik_ ( func , limits , _genzmalik3_ , _split3_ , args , abs(epsabs) , abs(epsrel) )
+    try :
+        import numpy 
+        r,e,n,s = _genzmalik_v_ ( func , limits , _split3_ , args , abs(epsabs) , abs(epsrel) ,
+                                  vectorized = vectorized , ncpus = ncpus )
+    except ImportError :
+        r,e,n,s = _genzmalik_   ( func , limits , _genzmalik3_ , _split3_ , args , abs(epsabs) , abs(epsrel) )
     
     return VE ( r , e * e )  if err else r 
 
@@ -645,7 +866,13 @@ try :
     #  @code 
     #  func = lambda x,y : x*x + y*y
     #  v    = integral2 ( func , 0 , 1 ,  -2 , 2 )
-    #  @endcode 
+    #  @endcode
+    #  With <code>vectorized</code> or <code>ncpus</code> keywords
+    #  the Genz&Malik's method is used 
+    #  @code 
+    #  v    = integral2 ( func , 0 , 1 ,  -2 , 2 , vectorized = True )
+    #  @endcode
+    #  @see genzmalik2
     #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
     #  @date   2014-06-06
     def integral2 ( fun  ,
@@ -658,7 +885,12 @@ try :
         
         >>> func = lambda x,y : x*x+y*y 
         >>> v = integral2(func,0,1,-2,2)
+
+        With ``vectorized'' or ``ncpus'' keywords the Genz&Malik's method is used 
+        >>> v = integral2(func,0,1,-2,2,vectorized=True)
         """
+        if 'vectorized' in kwargs or 'ncpus' in kwargs :
+            return genzmalik2 ( fun , xmin , xmax , ymin , ymax , args = args , err = err , **kwargs )
         func   = lambda x,y : float ( fun ( x , y , *args ) ) 
         import warnings
         with warnings.catch_warnings():
@@ -686,6 +918,12 @@ try :
     #  func = lambda x,y,z: x*x+y*y+z*z
     #  v    = integral3 ( func , 0 , 1 ,  0, 2 , 0 , 3 )
     #  @endcode 
+    #  With <code>vectorized</code> or <code>ncpus</code> keywords
+    #  the Genz&Malik's method is used 
+    #  @code 
+    #  v    = integral3 ( func , 0 , 1 ,  0, 2 , 0 , 3 , vectorized = True )
+    #  @endcode
+    #  @see genzmalik3
     #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
     #  @date   2014-06-06
     def integral3 ( fun  ,
@@ -699,7 +937,12 @@ try :
         
         >>> func = lambda x,y,z : x*x+y*y+z*z
         >>> v = integral3(func,0,1,0,2,0,3)
+
+        With ``vectorized'' or ``ncpus'' keywords the Genz&Malik's method is used 
+        >>> v = integral3(func,0,1,0,2,0,3,vectorized=True)
         """
+        if 'vectorized' in kwargs or 'ncpus' in kwargs :
+            return genzmalik3 ( fun , xmin , xmax , ymin , ymax , zmin , zmax , args = args , err = err , **kwargs )
         func   = lambda x,y,z : float ( fun ( x , y , z , *args ) ) 
         import warnings
         with warnings.catch_warnings():
@@ -741,10 +984,12 @@ class IntegralBase(object) :
         
     ## Calculate the integral for the 1D-function
     def _integrate_1D_ ( self , func , xmn , xmx , args = () ) :
-        args = args if args else self.args
+        args   = args if args else self.args
+        ## keywords for the vectorised 2D/3D integration are not used here 
+        kwargs = dict ( ( k , v ) for k , v in self.kwargs.iteritems() if not k in ( 'vectorized' , 'ncpus' ) ) 
         return integral  ( func       ,
                            xmn , xmx  ,
-                           args = args , err = self.err , **self.kwargs )
+                           args = args , err = self.err , **kwargs )
 
     ## Calculate the integral for the 2D-function
     def _integrate_2D_ ( self , func , xmn , xmx , ymn , ymx , args = () ) :
@@ -1472,7 +1717,273 @@ class Integrate3D_YZ(Integrate3D_Y) :
         return self.__zmax
 
 
+# =============================================================================
+## LRU-cache of integrals
+# =============================================================================
 
+# =============================================================================
+## get the parameters of the function, if exposed via <code>pars()</code>
+def _func_pars_ ( func ) :
+    """Get the parameters of the function, if exposed via `pars()`"""
+    obj  = getattr ( func , '__self__' , None )
+    obj  = func if obj is None else obj 
+    pars = getattr ( obj  , 'pars'     , None )
+    if pars is None : return None 
+    try :
+        return tuple ( float ( p ) for p in pars () )
+    except :
+        return None
+
+## fixed probe positions (in units of the range) for the fingerprint of functions
+_memo_probes_ = ( 0.1234 , 0.3690 , 0.5147 , 0.7071 , 0.8862 )
+
+## map the probe u in (0,1) into the (possibly infinite) range
+def _memo_point_ ( u , low , high ) :
+    """Map the probe u in (0,1) into the (possibly infinite) range"""
+    lfin = not math.isinf ( low  )
+    hfin = not math.isinf ( high )
+    if   lfin and hfin : return low  + ( high - low ) * u
+    elif lfin          : return low  + u / ( 1 - u ) 
+    elif hfin          : return high - u / ( 1 - u )
+    return math.tan ( math.pi * ( u - 0.5 ) )
+
+# =============================================================================
+## @class IntegralMemo
+#  LRU-cache of integrals (and other expensive quantities) for the functions,
+#  keyed by (function identity, parameter vector, integration range, arguments).
+#  The parameter vector is taken from <code>pars()</code> method, if exposed,
+#  and it is complemented by the values of the function at few fixed probe points,
+#  therefore the change of parameters of the function invalidates the cached entries.
+#  The functions without <code>pars()</code> are cached only if the explicit
+#  <code>version</code> (any hashable object, that changes together with the function)
+#  is specified, otherwise they are integrated each time.
+#  The cache keeps the references to the functions, therefore their identities
+#  can't be reused while the entries are in the cache.
+#  @code
+#  memo = IntegralMemo ( maxsize = 1000 ) 
+#  fun  = Ostap.Math.Gauss ( ... )
+#  v1   = memo.integral ( fun , -1 , 1 ) ## calculate
+#  v2   = memo.integral ( fun , -1 , 1 ) ## take from the cache
+#  fun.setSigma ( 2 ) 
+#  v3   = memo.integral ( fun , -1 , 1 ) ## recalculate
+#  print memo
+#  @endcode
+#  @see integral_memo 
+class IntegralMemo(object) :
+    """LRU-cache of integrals (and other expensive quantities) for the functions,
+    keyed by (function identity, parameter vector, integration range, arguments).
+    The parameter vector is taken from `pars()` method, if exposed,
+    and it is complemented by the values of the function at few fixed probe points,
+    therefore the change of parameters of the function invalidates the cached entries.
+    The functions without `pars()` are cached only if the explicit `version`
+    (any hashable object, that changes together with the function) is specified,
+    otherwise they are integrated each time.
+    The cache keeps the references to the functions, therefore their identities
+    can't be reused while the entries are in the cache.
+    >>> memo = IntegralMemo ( maxsize = 1000 ) 
+    >>> fun  = Ostap.Math.Gauss ( ... )
+    >>> v1   = memo.integral ( fun , -1 , 1 ) ## calculate
+    >>> v2   = memo.integral ( fun , -1 , 1 ) ## take from the cache
+    >>> fun.setSigma ( 2 ) 
+    >>> v3   = memo.integral ( fun , -1 , 1 ) ## recalculate
+    >>> print memo
+    """
+    def __init__ ( self , maxsize = 1000 ) :
+        
+        assert isinstance ( maxsize , ( int , long ) ) and 0 < maxsize , \
+               "IntegralMemo: invalid maximal size %s" % maxsize
+        
+        from collections import OrderedDict
+        self.__cache     = OrderedDict ()
+        self.__maxsize   = maxsize
+        self.__hits      = 0
+        self.__misses    = 0
+        self.__evictions = 0
+        
+    # =========================================================================
+    ## build the key for the function, range and arguments
+    #  @code
+    #  key = memo.key ( fun , [ ( -1 , 1 ) ] , args = () , tag = 'norm' ) 
+    #  key = memo.key ( fun , [ ( -1 , 1 ) ] , version = fun_version ) 
+    #  @endcode
+    #  @param version the explicit version of the function without <code>pars()</code>
+    #  @return the key or <code>None</code> if the function can't be cached 
+    def key ( self , func , limits , args = () , tag = None , version = None ) :
+        """Build the key for the function, range and arguments
+        >>> key = memo.key ( fun , [ ( -1 , 1 ) ] , args = () , tag = 'norm' )
+        >>> key = memo.key ( fun , [ ( -1 , 1 ) ] , version = fun_version ) 
+        - version : the explicit version of the function without `pars()` 
+        - it returns `None` if the function can't be cached 
+        """
+        pars = _func_pars_ ( func )
+        ## no parameters and no explicit version: the function can't be cached 
+        if pars is None and version is None : return None
+        
+        obj  = getattr ( func , '__self__' , None )
+        if obj is None : ident = id ( func ) , getattr ( func , '__code__' , None )
+        else           : ident = id ( obj  ) , getattr ( func , '__name__' , None )
+        
+        limits = tuple ( ( float ( a ) , float ( b ) ) for a , b in limits )
+        
+        ## fingerprint: the values at fixed probe points 
+        try :
+            nprobes = len ( _memo_probes_ ) 
+            probes  = tuple ( float ( func ( * ( tuple ( _memo_point_ ( _memo_probes_ [ ( i + j ) % nprobes ] , a , b )
+                                                         for j , ( a , b ) in enumerate ( limits ) ) + tuple ( args ) ) ) )
+                              for i in range ( nprobes ) ) 
+        except :
+            probes  = None
+
+        key = ident , type ( func ).__name__ , pars , version , probes , limits , tuple ( args ) , tag
+        try :
+            hash ( key )
+        except TypeError :
+            return None 
+        return key 
+
+    # =========================================================================
+    ## get the value from the cache or calculate (and store) it
+    #  @code
+    #  value = memo.cached ( key , lambda : ... , func ) 
+    #  @endcode 
+    #  @param func the function: the reference is kept together with the value,
+    #         therefore its identity can't be reused 
+    def cached ( self , key , calculate , func = None ) :
+        """Get the value from the cache or calculate (and store) it
+        >>> value = memo.cached ( key , lambda : ... , func ) 
+        - func : the function: the reference is kept together with the value,
+        therefore its identity can't be reused 
+        """
+        if key is None : return calculate ()
+        
+        if key in self.__cache :
+            self.__hits += 1
+            entry = self.__cache.pop ( key )
+            self.__cache [ key ] = entry         ## mark as recently used 
+            return entry [ 1 ]
+        
+        self.__misses += 1 
+        value = calculate ()
+        self.__cache [ key ] = func , value
+        while self.__maxsize < len ( self.__cache ) :
+            self.__cache.popitem ( last = False ) ## the least recently used
+            self.__evictions += 1 
+        return value 
+    
+    # =========================================================================
+    ## cached 1D-integration
+    #  @code
+    #  value = memo.integral ( fun , xmin , xmax )
+    #  @endcode
+    #  @param integrand the actual integrand (if differs from <code>func</code>)
+    #  @param tag       the tag to distinguish the different integrands for the same function
+    #  @param version   the explicit version of the function without <code>pars()</code>
+    #  @see integral 
+    def integral ( self , func , xmin , xmax , args = () , err = False ,
+                   integrand = None , tag = None , version = None , **kwargs ) :
+        """Cached 1D-integration
+        >>> value = memo.integral ( fun , xmin , xmax )
+        - integrand : the actual integrand (if differs from `func`)
+        - tag       : the tag to distinguish the different integrands for the same function
+        - version   : the explicit version of the function without `pars()`
+        """
+        fun = func if integrand is None else integrand 
+        key = self.key ( func , [ ( xmin , xmax ) ] , args ,
+                         ( tag , err , tuple ( sorted ( kwargs.items () ) ) ) , version )
+        return self.cached ( key , lambda : integral ( fun , xmin , xmax , args = args , err = err , **kwargs ) , func )
+    
+    # =========================================================================
+    ## cached 2D-integration
+    #  @code
+    #  value = memo.integral2 ( fun , xmin , xmax , ymin , ymax )
+    #  @endcode
+    #  @see integral2 
+    def integral2 ( self , func , xmin , xmax , ymin , ymax , args = () , err = False ,
+                    integrand = None , tag = None , version = None , **kwargs ) :
+        """Cached 2D-integration
+        >>> value = memo.integral2 ( fun , xmin , xmax , ymin , ymax )
+        """
+        fun = func if integrand is None else integrand 
+        key = self.key ( func , [ ( xmin , xmax ) , ( ymin , ymax ) ] , args ,
+                         ( tag , err , tuple ( sorted ( kwargs.items () ) ) ) , version )
+        return self.cached ( key , lambda : integral2 ( fun , xmin , xmax , ymin , ymax ,
+                                                        args = args , err = err , **kwargs ) , func )
+    
+    # =========================================================================
+    ## cached 3D-integration
+    #  @code
+    #  value = memo.integral3 ( fun , xmin , xmax , ymin , ymax , zmin , zmax )
+    #  @endcode
+    #  @see integral3 
+    def integral3 ( self , func , xmin , xmax , ymin , ymax , zmin , zmax , args = () , err = False ,
+                    integrand = None , tag = None , version = None , **kwargs ) :
+        """Cached 3D-integration
+        >>> value = memo.integral3 ( fun , xmin , xmax , ymin , ymax , zmin , zmax )
+        """
+        fun = func if integrand is None else integrand 
+        key = self.key ( func , [ ( xmin , xmax ) , ( ymin , ymax ) , ( zmin , zmax ) ] , args ,
+                         ( tag , err , tuple ( sorted ( kwargs.items () ) ) ) , version )
+        return self.cached ( key , lambda : integral3 ( fun , xmin , xmax , ymin , ymax , zmin , zmax ,
+                                                        args = args , err = err , **kwargs ) , func )
+
+    ## clear the cache (and the statistics) 
+    def clear ( self ) :
+        """Clear the cache (and the statistics)"""
+        self.__cache.clear()
+        self.__hits      = 0
+        self.__misses    = 0
+        self.__evictions = 0
+
+    @property
+    def maxsize ( self ) :
+        """``maxsize'' : the maximal number of cached entries"""
+        return self.__maxsize
+    @maxsize.setter
+    def maxsize ( self , value ) :
+        assert isinstance ( value , ( int , long ) ) and 0 < value , \
+               "IntegralMemo: invalid maximal size %s" % value
+        self.__maxsize = value
+        while self.__maxsize < len ( self.__cache ) :
+            self.__cache.popitem ( last = False )
+            self.__evictions += 1 
+
+    @property
+    def hits ( self ) :
+        """``hits'' : number of cache hits"""
+        return self.__hits
+    
+    @property
+    def misses ( self ) :
+        """``misses'' : number of cache misses"""
+        return self.__misses
+
+    @property
+    def evictions ( self ) :
+        """``evictions'' : number of evicted entries"""
+        return self.__evictions
+
+    ## the cache statistics: (hits, misses, evictions, size)
+    def stats ( self ) :
+        """The cache statistics: (hits, misses, evictions, size)"""
+        return self.__hits , self.__misses , self.__evictions , len ( self.__cache )
+    
+    def __len__ ( self ) : return len ( self.__cache )
+    
+    def __str__ ( self ) :
+        return "IntegralMemo(#%d/%d,hits=%d,misses=%d,evictions=%d)" % ( len ( self ) , self.__maxsize ,
+                                                                         self.__hits  , self.__misses   ,
+                                                                         self.__evictions )
+    __repr__ = __str__
+
+# =============================================================================
+## the default (global) instance of the integral cache
+#  @code
+#  from ostap.math.integral import integral_memo
+#  print integral_memo
+#  integral_memo.clear() 
+#  @endcode 
+#  @see IntegralMemo
+integral_memo = IntegralMemo ( 10000 ) 
 
 # =============================================================================
 if '__main__' == __name__ :
@@ -350,6 +350,9 @@ def _f_max_mode_ ( f ) :
 
 # =============================================================================
 ## make 1D- numerical integration
+#  - the results are cached for the functions with parameters ( <code>pars()</code> ),
+#    keyed by the function parameters and range
+#  @see ostap.math.integral.integral_memo
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date 2014-12-01
 def sp_integrate_1D ( func , xmin , xmax , *args , **kwargs ) :
@@ -358,11 +361,14 @@ def sp_integrate_1D ( func , xmin , xmax , *args , **kwargs ) :
     >>> func = ...
     >>> print func.sp_integrate ( -10 , 10 )    
     """    
-    from ostap.math.integral import integral as _integral 
-    return _integral ( func , xmin , xmax , *args , **kwargs )
+    from ostap.math.integral import integral_memo 
+    return integral_memo.integral ( func , xmin , xmax , *args , **kwargs )
 
 # =============================================================================
 ## make 2D numerical integration 
+#  - the results are cached for the functions with parameters ( <code>pars()</code> ),
+#    keyed by the function parameters and range
+#  @see ostap.math.integral.integral_memo
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date 2014-12-01
 def sp_integrate_2D ( func  ,
@@ -375,14 +381,17 @@ def sp_integrate_2D ( func  ,
     >>> print func.sp_integrate ( -10  , 10   , -20  , 20   ) 
 
     """
-    from ostap.math.inntegral import integral2 as _integral2 
-    return _integral2 ( func  ,
-                        xmin  , xmax ,
-                        ymin  , ymax ,
-                        *args , **kwargs )
+    from ostap.math.integral import integral_memo 
+    return integral_memo.integral2 ( func  ,
+                                     xmin  , xmax ,
+                                     ymin  , ymax ,
+                                     *args , **kwargs )
 
 # =============================================================================
 ## make 3D numerical integration 
+#  - the results are cached for the functions with parameters ( <code>pars()</code> ),
+#    keyed by the function parameters and range
+#  @see ostap.math.integral.integral_memo
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date 2014-12-01
 def sp_integrate_3D ( func  ,
@@ -395,12 +404,12 @@ def sp_integrate_3D ( func  ,
     ##                            xmin , xmax , ymin , ymax   zmin zmax 
     >>> print func.sp_integrate ( -10  , 10   , -20  , 20   , -1 ,   1 ) 
     """
-    from ostap.math.inntegral import integral2 as _integral3 
-    return _integral3 ( func  ,
-                        xmin  , xmax ,
-                        ymin  , ymax ,
-                        zmin  , zmax ,
-                        *args , **kwargs )
+    from ostap.math.integral import integral_memo 
+    return integral_memo.integral3 ( func  ,
+                                     xmin  , xmax ,
+                                     ymin  , ymax ,
+                                     zmin  , zmax ,
+                                     *args , **kwargs )
 
 # =============================================================================
 ## make 1D numerical integration
@@ -411,7 +420,7 @@ def sp_integrate_1D_ ( pdf , xmin , xmax , *args , **kwargs ) :
     """
     if hasattr ( pdf , 'setPars' ) : pdf.setPars() 
     func = pdf.function()
-    return func.sp_integrate_1D ( xmin , xmax , *args , **kwargs ) 
+    return func.sp_integrate ( xmin , xmax , *args , **kwargs ) 
 
 # =============================================================================
 ## make 2D numerical integration
@@ -424,7 +433,7 @@ def sp_integrate_2D_ ( pdf   ,
     """
     if hasattr ( pdf , 'setPars' ) : pdf.setPars() 
     func = pdf.function()
-    return func.sp_integrate_2D ( xmin , xmax , ymin , ymax , *args , **kwargs ) 
+    return func.sp_integrate ( xmin , xmax , ymin , ymax , *args , **kwargs ) 
 
 # =============================================================================
 ## make 3D numerical integration 
@@ -439,7 +448,7 @@ def sp_integrate_3D_  ( pdf   ,
     """
     if hasattr ( pdf , 'setPars' ) : pdf.setPars() 
     func = pdf.function()
-    return func.sp_integrate_3D ( xmin , xmax , ymin , ymax , zmin , zmax , *args , **kwargs ) 
+    return func.sp_integrate ( xmin , xmax , ymin , ymax , zmin , zmax , *args , **kwargs ) 
 
 
 from ostap.stats.moments import moment   as sp_moment
@@ -869,125 +878,25 @@ for f in ( Ostap.Math.Bernstein2D    ,
 
 
 # =============================================================================
-## random generators 
-# =============================================================================
-from random import uniform as _uniform_
-
-
-# =============================================================================
-## generate random numbers from 2D bernstein-like distribuitions
-#  @code
-#  >>> func = ...
-#  >>> for x,y in func.generate( 1000 ) : print x,y 
-#  @endcode
-def _random_generate_bernstein2D_ ( fun , num = 1 ) :
-    """Generate random numbers from 2D bernstein-like distribuitions
-    >>> func = ...
-    >>> for x,y in func.generate( 1000 ) : print x,y 
-    """
-    xmn = fun.xmin ()
-    xmx = fun.xmax ()
-    ymn = fun.ymin ()
-    ymx = fun.ymax ()
-    vmx = max ( fun.bernstein().pars() )
-    i   = 0 
-    while i < num : 
-        x = _uniform_ ( xmn , xmx ) 
-        y = _uniform_ ( ymn , ymx ) 
-        if fun ( x , y ) >= _uniform_ (   0 , vmx ) : 
-            i+= 1 
-            yield x,y
-
-# =============================================================================
-## generate random numbers from 3D bernstein-like distribuitions
-#  @code
-#  >>> func = ...
-#  >>> for x,y,z in func.generate( 1000 ) : print x,y,z 
-#  @endcode
-def _random_generate_bernstein3D_ ( fun , num = 1 ) :
-    """Generate random numbers from 2D bernstein-like distribuitions
-    >>> func = ...
-    >>> for x,y,z in func.generate( 1000 ) : print x,y,z 
-    """
-    xmn = fun.xmin ()
-    xmx = fun.xmax ()
-    ymn = fun.ymin ()
-    ymx = fun.ymax ()
-    zmn = fun.zmin ()
-    zmx = fun.zmax ()
-    vmx = max ( fun.bernstein().pars() )
-    i   = 0 
-    while i < num : 
-        x = _uniform_ ( xmn , xmx ) 
-        y = _uniform_ ( ymn , ymx ) 
-        z = _uniform_ ( zmn , zmx )
-        if v >= _uniform_ ( 0 , vmx ) :
-            i+= 1 
-            yield x,y,z
-
-# =============================================================================
-## Get random number from 2D bernstein-like distribuitions
-#  @code
-#  >>> func = ...
-#  >>> print fun.shoot() 
-#  @endcode
-def _random_shoot_bernstein2D_ ( fun ) :
-    """Get random number from 2D bernstein-like distribuitions
-    >>> func = ...
-    >>> print func.shoot()  
-    """
-    xmn = fun.xmin ()
-    xmx = fun.xmax ()
-    ymn = fun.ymin ()
-    ymx = fun.ymax ()
-    
-    vmx = max ( fun.bernstein().pars() )
-    while True : 
-        x = _uniform_ ( xmn , xmx ) 
-        y = _uniform_ ( ymn , ymx ) 
-        if fun ( x , y ) >= _uniform_ (   0 , vmx ) : 
-            return x,y
-
+## random generators: vectorised samplers from ostap.math.bernstein
+#  @see ostap.math.bernstein.sample2
+#  @see ostap.math.bernstein.sample3
 # =============================================================================
-## Get random number from 3D bernstein-like distributions
-#  @code
-#  >>> func = ...
-#  >>> print fun.shoot() 
-#  @endcode
-def _random_shoot_bernstein3D_ ( fun ) :
-    """Get random number from 3D bernstein-like distribuitions
-    >>> func = ...
-    >>> print func.shoot()  
-    """
-    xmn = fun.xmin ()
-    xmx = fun.xmax ()
-    ymn = fun.ymin ()
-    ymx = fun.ymax ()
-    zmn = fun.zmin ()
-    zmx = fun.zmax ()
+from ostap.math.bernstein import generate2 , shoot2 , sample2 
+from ostap.math.bernstein import generate3 , shoot3 , sample3 
+
+for p in ( Ostap.Math.Positive2D    ,
+           Ostap.Math.Positive2DSym ) :
+    p.generate = generate2
+    p.shoot    = shoot2
+    p.sample   = sample2 
     
-    vmx = max ( fun.bernstein().pars() )
-    while True : 
-        x = _uniform_ ( xmn , xmx ) 
-        y = _uniform_ ( ymn , ymx ) 
-        z = _uniform_ ( zmn , zmx ) 
-        if fun ( x , y , z ) >= _uniform_ ( 0 , vmx ) : 
-            return x,y,z 
-
-
-
-Ostap.Math.Positive2D    .generate = _random_generate_bernstein2D_
-Ostap.Math.Positive2D    .shoot    = _random_shoot_bernstein2D_
-
-Ostap.Math.Positive2DSym .generate = _random_generate_bernstein2D_
-Ostap.Math.Positive2DSym .shoot    = _random_shoot_bernstein2D_
-
 for p in ( Ostap.Math.Positive3D    ,
            Ostap.Math.Positive3DSym ,
            Ostap.Math.Positive3DMix ) :
-    p.generate = _random_generate_bernstein3D_
-    p.shoot    = _random_shoot_bernstein3D_
-         
+    p.generate = generate3
+    p.shoot    = shoot3
+    p.sample   = sample3 
 
 # =============================================================================
 ## add complex amplitudes 
@@ -413,6 +413,42 @@ def test_transformation () :
 
     logger.info ('Transformation  is  OK' )
 
+# =============================================================================
+## test vectorised random generation 
+def test_sample () :
+    """Test for vectorised random generation
+    """
+    try :
+        import numpy
+    except ImportError :
+        logger.warning ('No numpy is available, skip the test')
+        return
+    
+    from ostap.math.integral import romberg 
+    
+    ## non-negative control polygon: exact inversion 
+    p = Ostap.Math.Positive ( 5 , 0 , 2 )
+    for i in p : p[i] = random.uniform ( -3 , 3 ) 
+
+    ## negative coefficient, but positive polynomial: accept-reject 
+    b = Ostap.Math.Bernstein ( [ 1.0 , -0.2 , 1.0 ] , 0 , 2 ) 
+    
+    N = 100000 
+    for f in ( p , b ) :
+        
+        xs = f.sample ( N )
+        assert N == len ( xs ) , 'Invalid size of sample %s' % len ( xs ) 
+        assert f.xmin() <= xs.min() and xs.max() <= f.xmax() , 'Sample is out of range'
+
+        mean = romberg ( lambda x : x * f ( x ) , f.xmin() , f.xmax() ) / f.integral()
+        rms  = xs.std() / N ** 0.5 
+        if abs ( xs.mean() - mean ) > 5 * rms :
+            raise ValueError ( 'Invalid mean of sample %s vs %s' % ( xs.mean() , mean ) ) 
+
+    assert 1000 == len ( list ( p.generate ( 1000 ) ) ) , 'Invalid length of generate'
+    
+    logger.info ('Sampling        is  OK' )
+
 # =============================================================================
 if '__main__' == __name__ :
         
@@ -428,6 +464,7 @@ if '__main__' == __name__ :
     test_elevatereduce  ()
     test_integration    ()
     test_transformation ()
+    test_sample         ()
     
 # =============================================================================
 # The END 
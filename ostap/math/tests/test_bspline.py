@@ -98,12 +98,48 @@ def test_approximation  ():
     
     
     
+# =============================================================================
+## test vectorised random generation 
+def test_sample () :
+    """Test for vectorised random generation
+    """
+    try :
+        import numpy
+    except ImportError :
+        logger.warning ('No numpy is available, skip the test')
+        return
+
+    from ostap.math.integral import romberg 
+
+    ## non-negative coefficients: exact sampling 
+    p = Ostap.Math.PositiveSpline ( 0 , 2 , 3 , 3 )
+    for i in p : p[i] = random.uniform ( -3 , 3 ) 
+
+    ## negative coefficient, but positive spline: accept-reject 
+    b = Ostap.Math.BSpline ( 0 , 2 , 1 , 2 ) 
+    for i , v in enumerate ( ( 1.0 , 2.0 , -0.1 , 2.0 ) ) : b[i] = v 
+
+    N = 100000
+    for f in ( p , b ) :
+
+        xs = f.sample ( N )
+        assert N == len ( xs ) , 'Invalid size of sample %s' % len ( xs ) 
+        assert f.xmin() <= xs.min() and xs.max() <= f.xmax() , 'Sample is out of range'
+
+        mean = romberg ( lambda x : x * f ( x ) , f.xmin() , f.xmax() ) / f.integral()
+        rms  = xs.std() / N ** 0.5 
+        if abs ( xs.mean() - mean ) > 5 * rms :
+            raise ValueError ( 'Invalid mean of sample %s vs %s' % ( xs.mean() , mean ) ) 
+
+    logger.info ('Sampling is OK' )
+    
 # =============================================================================
 if '__main__' == __name__ :
 
     test_solve         ()
     test_interpolation ()
     test_approximation ()
+    test_sample        ()
     
 # =============================================================================
 # The END 
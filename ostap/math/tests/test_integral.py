@@ -91,15 +91,94 @@ def test_integral_3D ():
         logger.info ( '%20s: Delta/I  %-20s %-20s'         % ( entry[0] , (v1-vv)/vv         , (v2 - vv)/vv         ) ) 
         logger.info ( '%20s: Delta/E  %-20s %-20s'         % ( entry[0] , (v1-vv)/v1.error() , (v2 - vv)/v2.error() ) ) 
                 
+def test_integral_vectorised ():
 
+    try :
+        import numpy
+    except ImportError :
+        logger.warning('Numpy is not availabe, skip test')
+        return
 
+    from math import sin, exp
+    from ostap.math.integral import  genzmalik2, genzmalik3, integral3, Integrate3D_XY 
+    
+    f2s = lambda x,y : x*exp(x)+y*sin(y)
+    f2v = lambda x,y : x*numpy.exp(x)+y*numpy.sin(y)
+    
+    v1  = genzmalik2 ( f2s , -2 , 1 , -2 , 2 , err = True , vectorized = False )
+    v2  = genzmalik2 ( f2v , -2 , 1 , -2 , 2 , err = True , vectorized = True  )
+    v3  = genzmalik2 ( f2v , -2 , 1 , -2 , 2 , err = True ) ## autodetect 
+    vv  = 12.07356999835915445374
+    logger.info ( 'Vectorised 2D: %s %s %s %s' % ( v1 , v2 , v3 , vv ) )
+    assert abs ( v2 - vv ) < 1.e-5 and abs ( v3 - vv ) < 1.e-5 , 'Invalid vectorised 2D integral'
+    
+    f3v = lambda x,y,z : x*numpy.exp(x)+numpy.sin(y)*abs(y)+z*z*numpy.exp(z)
+    v4  = genzmalik3 ( f3v , -1 , 2 , -1 , 2 , -1 , 2 , err = True , vectorized = True )
+    v5  = integral3  ( f3v , -1 , 2 , -1 , 2 , -1 , 2 , err = True , vectorized = True )
+    vv  = 202.53557154832049036486
+    logger.info ( 'Vectorised 3D: %s %s %s' % ( v4 , v5 , vv ) )
+    assert abs ( v4 - vv ) < 1.e-3 and abs ( v5 - vv ) < 1.e-3 , 'Invalid vectorised 3D integral'
+
+    fz  = Integrate3D_XY ( f3v , -1 , 2 , -1 , 2 , vectorized = True )
+    logger.info ( 'Vectorised partial 3D integral: %s' % fz ( 0.5 ) ) 
         
+def test_integral_memo ():
+
+    from math import exp
+    from ostap.math.integral import IntegralMemo
+    from ostap.stats.moments import mean, rms 
+
+    class Gauss(object) :
+        def __init__ ( self , sigma ) : self.sigma = sigma 
+        def __call__ ( self , x     ) : return exp ( -0.5 * ( x / self.sigma ) ** 2 )
+        def pars     ( self         ) : return self.sigma ,
+        
+    class Step(object) :
+        def __init__ ( self , x0    ) : self.x0 = x0
+        def __call__ ( self , x     ) : return 1.0 if x < self.x0 else 0.0 
+
+    memo = IntegralMemo ( maxsize = 2 )
+    g    = Gauss ( 1.0 )
+    
+    v1   = memo.integral ( g , -3 , 3 )
+    v2   = memo.integral ( g , -3 , 3 ) ## from the cache 
+    assert v1 == v2 and 1 == memo.hits , 'Invalid cache hit: %s' % memo 
+
+    g.sigma = 2.0                       ## new parameters: recalculate  
+    v3   = memo.integral ( g , -3 , 3 )
+    assert v3 != v1 and 2 == memo.misses , 'Invalid cache miss: %s' % memo
+
+    memo.integral ( g , -2 , 2 )
+    memo.integral ( g , -1 , 1 )        ## LRU eviction 
+    assert 2 == len ( memo ) and 1 == memo.evictions , 'Invalid eviction: %s' % memo 
+
+    ## no parameters: no caching, the change is always seen 
+    memo.clear () 
+    s    = Step ( 0.2 )
+    s1   = memo.integral ( s , 0 , 1 )
+    s.x0 = 0.3                          ## invisible at the probe points 
+    s2   = memo.integral ( s , 0 , 1 )
+    assert 0 == len ( memo ) and abs ( s2 - 0.3 ) < 1.e-2 , 'Stale integral: %s/%s' % ( s2 , memo )
+    
+    ## explicit version 
+    s3   = memo.integral ( s , 0 , 1 , version = 1 )
+    s.x0 = 0.4 
+    s4   = memo.integral ( s , 0 , 1 , version = 2 )
+    assert 2 == memo.misses and abs ( s4 - 0.4 ) < 1.e-2 , 'Invalid versioned integral: %s/%s' % ( s4 , memo )
+
+    ## moments share the normalization integral 
+    m = mean ( g , -3 , 3 )
+    r = rms  ( g , -3 , 3 )
+    logger.info ( 'Integral cache: %s, mean=%s rms=%s' % ( memo , m , r ) )
+    
 # =============================================================================
 if '__main__' == __name__ :
 
     test_integral    ()
     test_integral_2D ()
     test_integral_3D ()
+    test_integral_vectorised ()
+    test_integral_memo       ()
     
 # =============================================================================
 # The END 
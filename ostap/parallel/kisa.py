@@ -19,11 +19,18 @@ __date__    = "2011-06-07"
 __all__     = (
     'GenericTask' , ## "Generic Task" from three  basic functions 
     'ProjectTask' , ## "Project task" for very looooong chains/trees 
+    'SharedProjectTask' , ## "Project task" with accumulation in shared memory 
+    'ProjectManyTask' , ## "Project task" for many histograms in a single pass 
     'FillTask'    , ## "Fill task" for loooong chains/trees  
+    'HistoPacket' , ## compact transport of histograms between processes 
     'cproject'    , ##  project looong TChain into historgam   
     'tproject'    , ##  project looong TTree into histogram
+    'cproject_many' , ##  project looong TChain into many histograms at once
+    'StatPlanTask'  , ## "Stat plan task": many statistics in a single pass 
+    'pStatPlan'     , ##  collect many statistics for looong TChain in a single pass 
     'fillDataSet' ,
-    'WorkManager' 
+    'WorkManager' ,
+    'shutdown_pool' , ## shutdown the persistent pool of workers 
     ) 
 # =============================================================================
 # logging 
@@ -35,8 +42,10 @@ else                       : logger = getLogger ( __name__     )
 logger.debug ( 'Multiprocessing functionality for Ostap')
 # =============================================================================
 import operator
+import ROOT
 import ostap.parallel.parallel as Parallel
-WorkManager = Parallel.WorkManager 
+WorkManager   = Parallel.WorkManager 
+shutdown_pool = Parallel.shutdown_pool 
 # =============================================================================
 n_large = 2**63 - 1  ## ROOT.TVirtualTreePlayer.kMaxEntries
 ## n_large = ROOT.TVirtualTreePlayer.kMaxEntries
@@ -105,6 +114,92 @@ class GenericTask(Parallel.Task) :
         """
         return self.__initializer
     
+# =============================================================================
+## @class HistoPacket
+#  Compact representation of the histogram content for transport between processes:
+#  raw arrays of bin contents and sum of squared weights (including under/overflow bins)
+#  and the histogram statistics. It is added to the target histogram in place.
+#  @code
+#  packet = HistoPacket ( histo1 ) ## in the worker process
+#  ...
+#  packet.add_to ( histo2 )        ## in the parent process 
+#  @endcode 
+class HistoPacket(object) :
+    """Compact representation of the histogram content for transport between processes:
+    raw arrays of bin contents and sum of squared weights (including under/overflow bins)
+    and the histogram statistics. It is added to the target histogram in place.
+    >>> packet = HistoPacket ( histo1 ) ## in the worker process
+    >>> packet.add_to ( histo2 )        ## in the parent process 
+    """
+    __slots__ = ( 'contents' , 'sumw2' , 'stats' , 'entries' )
+    
+    def __init__ ( self , histo ) :
+        
+        import numpy, array
+        
+        n     = histo.GetSize()
+        dtype = numpy.float32 if isinstance ( histo , ROOT.TArrayF ) else numpy.float64
+        
+        self.contents = numpy.array ( numpy.frombuffer ( histo.GetArray() , dtype = dtype , count = n ) ,
+                                      dtype = numpy.float64 , copy = True ) 
+        self.sumw2    = None 
+        if 0 < histo.GetSumw2N() :
+            self.sumw2 = numpy.array ( numpy.frombuffer ( histo.GetSumw2().GetArray() , count = n ) , copy = True )
+            
+        stats = array.array ( 'd' , 13 * [ 0.0 ] )
+        histo.GetStats ( stats )
+        self.stats   = numpy.array ( stats , dtype = numpy.float64 ) 
+        self.entries = histo.GetEntries()
+
+    ## pickling
+    def __getstate__ ( self ) :
+        return self.contents , self.sumw2 , self.stats , self.entries
+    def __setstate__ ( self , state ) :
+        self.contents , self.sumw2 , self.stats , self.entries = state
+            
+    ## add the content of the packet to the histogram (in place)
+    def add_to ( self , histo ) :
+        """Add the content of the packet to the histogram (in place)"""
+        
+        import numpy, array
+        
+        n = histo.GetSize() 
+        assert n == len ( self.contents ) , 'HistoPacket: mismatch in number of bins %s/%s' % ( n , len ( self.contents ) )
+        
+        dtype = numpy.float32 if isinstance ( histo , ROOT.TArrayF ) else numpy.float64
+        
+        stats = array.array ( 'd' , 13 * [ 0.0 ] )
+        histo.GetStats ( stats )
+        stats    = numpy.array ( stats , dtype = numpy.float64 ) + self.stats 
+        entries  = histo.GetEntries() + self.entries
+
+        contents = numpy.frombuffer ( histo.GetArray() , dtype = dtype , count = n ) + self.contents
+        sumw2    = None 
+        if self.sumw2 is not None : 
+            if 0 == histo.GetSumw2N() : histo.Sumw2()
+            sumw2 = numpy.frombuffer ( histo.GetSumw2().GetArray() , count = n ) + self.sumw2
+            
+        histo.SetContent ( contents )
+        if sumw2 is not None : histo.GetSumw2().Set ( n , sumw2 )
+        histo.PutStats   ( stats   )
+        histo.SetEntries ( entries )
+        
+        return histo
+
+# =============================================================================
+## pack the histogram for transport (if possible)
+#  @see HistoPacket 
+def pack_histo ( histo ) :
+    """Pack the histogram for transport (if possible)
+    - see HistoPacket
+    """
+    if not isinstance ( histo , ROOT.TH1 ) : return histo
+    if not isinstance ( histo , ( ROOT.TArrayD , ROOT.TArrayF ) ) : return histo
+    try :
+        return HistoPacket ( histo )
+    except ImportError :
+        return histo
+
 # =============================================================================
 ## The simple task object for more efficient projection of loooong chains/trees 
 #  into histogarms
@@ -180,14 +275,99 @@ class ProjectTask(Parallel.Task) :
     ## finalization (executed at the end at parent process)
     def finalize ( self ) : pass 
 
+    ## compact output for transport: raw bin contents instead of the histogram
+    def _packOutput ( self ) :
+        """Compact output for transport: raw bin contents instead of the histogram"""
+        return self.output[0] , pack_histo ( self.output[1] ) 
+        
     ## merge results 
     def _mergeResults ( self , result ) :
         filtered    = self.output[0] + result[0] 
-        self.output[1].Add ( result[1] )
+        if isinstance ( result[1] , HistoPacket ) :
+            result[1].add_to ( self.output[1] )
+        else : 
+            self.output[1].Add ( result[1] )
+            result[1].Delete () 
         self.output = filtered, self.output[1]
-        result[1].Delete () 
  
    
+# =============================================================================
+## The task object for projection of loooong chains/trees into histograms
+#  with accumulation in shared memory:
+#  - each worker process adds its results into its own memory-mapped ``slab''
+#    (a file with raw arrays of bin contents and sum of squared weights)
+#  - only the number of selected entries and the histogram statistics are sent back
+#  - at the end all slabs are reduced by a single vectorised sum in the parent process
+#  It is useful for fine-binned 2D/3D histograms, where the per-chunk serialisation
+#  of the histogram dominates 
+#  @see ProjectTask
+#  @see HistoPacket
+class SharedProjectTask(ProjectTask) :
+    """The task object for projection of loooong chains/trees into histograms
+    with accumulation in shared memory:
+    - each worker process adds its results into its own memory-mapped ``slab''
+    - only the number of selected entries and the histogram statistics are sent back
+    - at the end all slabs are reduced by a single vectorised sum in the parent process
+    """
+    ## local initialization (executed once in parent process)
+    def initializeLocal   ( self ) :
+        """Local initialization (executed once in parent process)
+        """
+        ProjectTask.initializeLocal ( self )
+        from ostap.utils.utils import CleanUp
+        self.slabs   = CleanUp.tempdir ( prefix = 'slabs_' ) 
+        self.ncells  = self.histo.GetSize() 
+        self.output  = 0 , None , 0.0  
+
+    ## get the (memory-mapped) slab for the current process 
+    def _slab ( self ) :
+        """Get the (memory-mapped) slab for the current process"""
+        import os, numpy 
+        fname = os.path.join ( self.slabs , 'slab_%d.dat' % os.getpid() )
+        mode  = 'r+' if os.path.exists ( fname ) else 'w+' 
+        return numpy.memmap ( fname , dtype = numpy.float64 , mode = mode , shape = ( 2 , self.ncells ) )
+    
+    ## the actual processing: project and add the result to the slab 
+    def process ( self , item ) :
+        """The actual processing: project and add the result to the slab 
+        """
+        ProjectTask.process ( self , item )
+        filtered , histo = self.output
+        packet = HistoPacket ( histo )
+        slab   = self._slab ()
+        slab [ 0 ] += packet.contents
+        slab [ 1 ] += packet.contents if packet.sumw2 is None else packet.sumw2  
+        slab.flush ()
+        del slab
+        histo.Delete() 
+        self.output = filtered , packet.stats , packet.entries 
+
+    ## nothing to pack: the output is already compact 
+    def _packOutput ( self ) : return self.output 
+    
+    ## merge results: only counters and statistics 
+    def _mergeResults ( self , result ) :
+        filtered , stats , entries = self.output
+        stats    = result[1] if stats is None else stats + result[1]
+        self.output = filtered + result[0] , stats , entries + result[2]
+        
+    ## finalization (executed at the end at parent process): reduce all slabs 
+    def finalize ( self ) :
+        """Finalization (executed at the end at parent process): reduce all slabs"""
+        import os, glob, numpy
+        filtered , stats , entries = self.output
+        histo = self.histo.clone()
+        files = glob.glob ( os.path.join ( self.slabs , 'slab_*.dat' ) )
+        if files : 
+            total = numpy.zeros ( ( 2 , self.ncells ) , dtype = numpy.float64 ) 
+            for f in files :
+                total += numpy.memmap ( f , dtype = numpy.float64 , mode = 'r' , shape = ( 2 , self.ncells ) )
+                os.remove ( f ) 
+            packet = HistoPacket.__new__ ( HistoPacket )
+            packet.__setstate__ ( ( total[0] , total[1] , stats , entries ) )
+            packet.add_to ( histo ) 
+        self.output = filtered , histo 
+        
 # =============================================================================  
 ## make a projection of the loooooooong chain into histogram using
 #  multiprocessing functionality for per-file parallelisation
@@ -199,6 +379,10 @@ class ProjectTask(Parallel.Task) :
 #  >>> chain.cproject ( histo , 'mass' , 'pt>0' ) ## ditto 
 #  @endcode
 #  For 12-core machine, clear speedup factor of about 8 is achieved 
+#  @param balanced use cost-aware splitting of the chain (largest chunks first)
+#  @param shared   accumulate the histogram in shared memory
+#  @see Chain.balanced_split 
+#  @see SharedProjectTask
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2014-09-23
 def  cproject ( chain                ,
@@ -208,7 +392,9 @@ def  cproject ( chain                ,
                 nentries   = -1      ,
                 first      =  0      ,
                 chunk_size = 1000000 ,
-                silent     = False   ) :
+                silent     = False   ,
+                balanced   = True    ,
+                shared     = False   ) :
     """Make a projection of the loooong chain into histogram
     >>> chain = ... ## large chain
     >>> histo = ... ## histogram template 
@@ -216,15 +402,19 @@ def  cproject ( chain                ,
     >>> chain.ppropject ( histo , 'mass' , 'pt>0' ) ## ditto 
     >>> chain.cpropject ( histo , 'mass' , 'pt>0' ) ## ditto     
     For 12-core machine, clear speedup factor of about 8 is achieved     
+    - balanced : use cost-aware splitting (see Chain.balanced_split), ``chunk_size'' is ignored 
+    - shared   : accumulate in shared memory (see SharedProjectTask)
     """
     #
     
     from ostap.trees.trees import Chain
     ch    = Chain ( chain , first = first , nevents = nentries )
     
-    task  = ProjectTask            ( histo , what , cuts )
+    task  = SharedProjectTask ( histo , what , cuts ) if shared else ProjectTask ( histo , what , cuts )
     wmgr  = Parallel.WorkManager   ( silent = silent )
-    wmgr.process ( task, ch.split  ( chunk_size  = chunk_size  ) )
+    if balanced : items = ch.balanced_split ( ncpus      = wmgr.ncpus )
+    else        : items = ch.split          ( chunk_size = chunk_size )
+    wmgr.process ( task, items , progress = not silent )
     
     filtered   = task.output[0] 
     histo     += task.output[1]
@@ -254,6 +444,8 @@ ROOT.TChain.pproject = cproject
 #  @param nentries   number of entries to process  (>0: all entries in th tree)
 #  @param first      the first entry to process
 #  @param maxentries chunk size for parallel processing 
+#  @param shared     accumulate the histogram in shared memory
+#  @see SharedProjectTask
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2014-09-23
 def  tproject ( tree                 ,   ## the tree 
@@ -263,7 +455,8 @@ def  tproject ( tree                 ,   ## the tree
                 nentries   = -1      ,   ## number of entries 
                 first      =  0      ,   ## the first entry 
                 chunk_size = 1000000 ,   ## chunk size 
-                silent     = False   ) : ## silent processing 
+                silent     = False   ,   ## silent processing 
+                shared     = False   ) : ## accumulate in shared memory 
     """Make a projection of the loooong tree into histogram
     >>> tree  = ... ## large chain
     >>> histo = ... ## histogram template 
@@ -279,14 +472,15 @@ def  tproject ( tree                 ,   ## the tree
     - nentries   number of entries to process  (>0: all entries in th tree)
     - first      the first entry to process
     - maxentries chunk size for parallel processing 
+    - shared     accumulate in shared memory (see SharedProjectTask)
     """
 
     from ostap.trees.trees import Tree
     ch    = Tree ( tree , first = first , nevents = nevents )
     
-    task  = ProjectTask            ( histo , what , cuts )
+    task  = SharedProjectTask ( histo , what , cuts ) if shared else ProjectTask ( histo , what , cuts )
     wmgr  = Parallel.WorkManager   ( silent     = silent       )
-    wmgr.process ( task, ch.split  ( chunk_size = chunk_size ) )
+    wmgr.process ( task, ch.split  ( chunk_size = chunk_size ) , progress = not silent )
     
     filtered   = task.output[0] 
     histo     += task.output[1]
@@ -297,6 +491,184 @@ import ROOT
 ROOT.TTree.tproject = tproject
 ROOT.TTree.pproject = tproject
 
+# =============================================================================
+## The task object for parallel single-pass projection of
+#  loooong chains/trees into many histograms
+#  @see Ostap::HistoProject::projectMany
+#  @see ProjectTask
+class ProjectManyTask(Parallel.Task) :
+    """The task object for parallel single-pass projection of
+    loooong chains/trees into many histograms
+    """
+    ## constructor: dictionary { histo : ( what , cuts ) }  
+    def __init__ ( self , histos , cuts = '' ) :
+        """Constructor: dictionary { histo : ( what , cuts ) } or { histo : what } 
+        """
+        items = histos.items() if isinstance ( histos , dict ) else histos
+        self.items = []
+        for histo , item in items :
+            if isinstance ( item , ( tuple , list ) ) : what , hcuts = item
+            else                                      : what , hcuts = item , cuts
+            if isinstance ( what , ROOT.TCut ) : what = str ( what ) 
+            self.items.append ( ( histo , what , str ( hcuts ) ) )
+            histo.Reset()
+            
+    ## local initialization (executed once in parent process)
+    def initializeLocal   ( self ) :
+        """Local initialization (executed once in parent process)
+        """
+        import ostap.core.pyrouts
+        self.output = [ h.clone() for h , w , c in self.items ]
+        
+    ## the actual processing
+    def process ( self , item ) :
+        """The actual processing
+        """
+        import ROOT
+        from ostap.logger.utils import logWarning
+        with logWarning() : import ostap.core.pyrouts 
+        import ostap.trees.trees
+        
+        chain    = item.chain 
+        histos   = [ h.Clone() for h , w , c in self.items ]
+        pairs    = [ ( h , ( i[1] , i[2] ) ) for h , i in zip ( histos , self.items ) ]
+        chain.project_many ( pairs , nentries = item.nevents , first = item.first ) 
+        self.output = histos 
+
+    ## compact output for transport: raw bin contents instead of the histograms
+    def _packOutput ( self ) :
+        """Compact output for transport: raw bin contents instead of the histograms"""
+        return [ pack_histo ( h ) for h in self.output ]
+    
+    ## merge results 
+    def _mergeResults ( self , result ) :
+        for h , r in zip ( self.output , result ) :
+            if isinstance ( r , HistoPacket ) : r.add_to ( h )
+            else :
+                h.Add    ( r )
+                r.Delete ()
+                
+# =============================================================================  
+## make the single-pass projection of the loooooooong chain/tree into many histograms
+#  using multiprocessing functionality
+#  @code
+#  >>> chain = ... ## large chain
+#  >>> h1 , h2 = ... ## histogram templates 
+#  >>> cproject_many ( chain , { h1 : ( 'pt' , 'y>2' ) , h2 : 'eta' } , 'chi2<10' )
+#  >>> chain.pproject_many ( { h1 : ( 'pt' , 'y>2' ) , h2 : 'eta' } , 'chi2<10' ) ## ditto 
+#  @endcode
+#  @see ROOT.TTree.project_many 
+def cproject_many ( chain                ,
+                    histos               ,
+                    cuts       = ''      ,
+                    nentries   = -1      ,
+                    first      =  0      ,
+                    chunk_size = 1000000 ,
+                    silent     = False   ,
+                    balanced   = True    ) :
+    """Make the single-pass projection of the loooooooong chain/tree into many histograms
+    >>> chain = ... ## large chain
+    >>> h1 , h2 = ... ## histogram templates 
+    >>> cproject_many ( chain , { h1 : ( 'pt' , 'y>2' ) , h2 : 'eta' } , 'chi2<10' )
+    >>> chain.pproject_many ( { h1 : ( 'pt' , 'y>2' ) , h2 : 'eta' } , 'chi2<10' ) ## ditto 
+    - see ROOT.TTree.project_many 
+    """
+    from ostap.trees.trees import Chain
+    ch    = Chain ( chain , first = first , nevents = nentries )
+    
+    task  = ProjectManyTask        ( histos , cuts )
+    wmgr  = Parallel.WorkManager   ( silent = silent )
+    if balanced : items = ch.balanced_split ( ncpus      = wmgr.ncpus )
+    else        : items = ch.split          ( chunk_size = chunk_size )
+    wmgr.process ( task, items , progress = not silent )
+
+    for ( h , w , c ) , r in zip ( task.items , task.output ) : h += r
+    
+    return histos
+
+ROOT.TTree .pproject_many = cproject_many
+ROOT.TChain.pproject_many = cproject_many
+
+# =============================================================================
+## The task object for parallel single-pass collection of many statistics
+#  @see ostap.stats.statplan.StatPlan
+class StatPlanTask(Parallel.Task) :
+    """The task object for parallel single-pass collection of many statistics
+    - see ostap.stats.statplan.StatPlan
+    """
+    def __init__ ( self , plan , cuts = '' , chunk = 10**6 ) :
+        self.plan  = plan
+        self.cuts  = str ( cuts )
+        self.chunk = chunk
+
+    ## local initialization (executed once in parent process)
+    def initializeLocal   ( self ) :
+        """Local initialization (executed once in parent process)
+        """
+        self.output = self.plan.accumulators ()
+
+    ## the actual processing
+    def process ( self , item ) :
+        """The actual processing
+        """
+        import ROOT
+        from ostap.logger.utils import logWarning
+        with logWarning() : import ostap.core.pyrouts
+        import ostap.trees.trees
+
+        last = item.first + item.nevents if 0 <= item.nevents else -1
+        self.output = self.plan.process ( item.chain , self.cuts , item.first , last , self.chunk )
+
+    ## merge results
+    def _mergeResults ( self , result ) :
+        for name , acc in result.iteritems () : self.output [ name ] += acc
+
+# =============================================================================
+## collect many statistics for the loooooooong chain/tree in a single pass
+#  using multiprocessing functionality
+#  @code
+#  >>> chain = ... ## large chain
+#  >>> plan  = StatPlan ()
+#  >>> ...
+#  >>> accs  = pStatPlan ( chain , plan , 'chi2<10' )
+#  @endcode
+#  @see ostap.stats.statplan.StatPlan
+#  @return the dictionary of accumulators
+#  @param chunk      the size of chunk for the columnar readout 
+#  @param balanced   use cost-aware splitting (see Chain.balanced_split)
+#  @param chunk_size the size of items for the regular splitting (see Chain.split)
+def pStatPlan ( chain             ,
+                plan              ,
+                cuts     = ''     ,
+                first    = 0      ,
+                last     = -1     ,
+                chunk    = 10**6  ,
+                silent   = False  ,
+                balanced = True   ,
+                chunk_size = 1000000 ) :
+    """Collect many statistics for the loooooooong chain/tree in a single pass
+    >>> chain = ... ## large chain
+    >>> plan  = StatPlan ()
+    >>> ...
+    >>> accs  = pStatPlan ( chain , plan , 'chi2<10' )
+    - see ostap.stats.statplan.StatPlan
+    - return the dictionary of accumulators
+    - chunk      : the size of chunk for the columnar readout 
+    - balanced   : use cost-aware splitting (see Chain.balanced_split)
+    - chunk_size : the size of items for the regular splitting (see Chain.split)
+    """
+    from ostap.trees.trees import Chain
+    nevents = last - first if 0 <= last else -1
+    ch      = Chain ( chain , first = first , nevents = nevents )
+
+    task    = StatPlanTask         ( plan , cuts , chunk )
+    wmgr    = Parallel.WorkManager ( silent = silent )
+    if balanced : items = ch.balanced_split ( ncpus      = wmgr.ncpus )
+    else        : items = ch.split          ( chunk_size = chunk_size )
+    wmgr.process ( task, items , progress = not silent )
+
+    return task.output
+
  
 # =============================================================================
 ## The simple task object for more efficient fill of RooDataSet from TChain 
@@ -309,16 +681,27 @@ ROOT.TTree.pproject = tproject
 class  FillTask(Parallel.Task) :
     """The single task object for more efficient fill of RooDataSet from TChain 
     - for 12-core machine, clear speed-up factor of about 8 is achieved 
+    - with ``shards=True'' each worker writes its part of data as a compact
+    columnar shard (ROOT file with TTree, one branch per variable) and only the
+    file name is sent back; the final RooDataSet is built in a single bulk
+    import from the chain of all shards (no quadratic RooDataSet.append)
+    - ``files'' : the files of the original chain: the shards are merged in
+    the order of these files (and the first entry), as in the sequential processing 
     """
     ## 
-    def __init__ ( self ,  variables , selection , trivial = False ) :
+    def __init__ ( self ,  variables , selection , trivial = False , shards = False , files = () ) :
         
         self.variables = variables 
         self.selection = selection 
         self.trivial   = trivial  
+        self.shards    = shards 
+        self.positions = dict ( ( f , i ) for i , f in enumerate ( files ) ) 
         self.output    = ()  
 
-    def initializeLocal   ( self ) : pass
+    def initializeLocal   ( self ) :
+        if self.shards :
+            from ostap.utils.utils import CleanUp
+            self.shards_dir = CleanUp.tempdir ( prefix = 'shards_' ) 
     def initializeRemote  ( self ) : pass
 
     ## the actual processing 
@@ -330,6 +713,7 @@ class  FillTask(Parallel.Task) :
 
         import ostap.trees.trees
         from   ostap.fitting.selectors import SelectorWithVars
+        from   ostap.fitting.roofit    import useStorage
         
         ## reconstruct chain from the item 
         chain    = item.chain
@@ -339,21 +723,27 @@ class  FillTask(Parallel.Task) :
         nevents  = item.nevents 
 
         all = 0 == first and ( nevents < 0 or ll <= nevents )
+
+        ## for shards the dataset must have TTree-based storage 
+        storage = ROOT.RooAbsData.Tree if self.shards else ROOT.RooAbsData.getDefaultStorageType() 
         
         if self.trivial and all : 
             import ostap.fitting.selectors
-            self.output = chain.make_dataset ( self.variables , self.selection , silent = True ) 
+            with useStorage ( storage ) : 
+                self.output = chain.make_dataset ( self.variables , self.selection , silent = True ) 
+            if self.shards : self.output = self._shard ( item , *self.output ) 
             return
 
-        ## use selector  
-        selector = SelectorWithVars ( self.variables ,
-                                      self.selection ,
-                                      silence = True )
-        
         args = ()  
         if not all  :  args  = nevents, first 
             
-        num = chain.process ( selector , *args , shortcut = all and self.trivial )
+        ## use selector  
+        with useStorage ( storage ) : 
+            selector = SelectorWithVars ( self.variables ,
+                                          self.selection ,
+                                          silence = True )
+            num = chain.process ( selector , *args , shortcut = all and self.trivial )
+            
         self.output = selector.data, selector.stat  
         
         if  num < 0 :
@@ -362,13 +752,84 @@ class  FillTask(Parallel.Task) :
         ##del selector.data
         ##del      selector        
         logger.debug ( 'Processed %s and filled %d entries ' % ( item , len( self.output ) ) )
+        if self.shards : self.output = self._shard ( item , *self.output ) 
 
-    def finalize ( self ) : pass 
+    ## write the dataset into the columnar shard
+    #  @return the tuple ( ( key , shard_file ) , stat ) 
+    def _shard ( self , item , ds , stat ) :
+        """Write the dataset into the columnar shard, return ( ( key , shard_file ) , stat ) 
+        """
+        import os, uuid
+        import ostap.io.root_file 
+        from   ostap.core.core import ROOTCWD
+        
+        ## the position of the files in the original chain, then the first entry 
+        nf    = len ( self.positions ) 
+        key   = tuple ( self.positions.get ( f , nf ) for f in item.files ) , item.first
+        fname = None
+        store = ds.store() if ds else None 
+        tree  = store.tree() if store else None
+        if tree and 0 < len ( ds ) :
+            fname = os.path.join ( self.shards_dir , 'shard_%s.root' % uuid.uuid4().hex )
+            with ROOTCWD() , ROOT.TFile ( fname , 'RECREATE' ) as rfile :
+                rfile [ 'shard' ] = tree 
+        if ds : ds.clear() 
+        return ( key , fname ) , stat 
+        
+    def finalize ( self ) :
+        
+        if not self.shards : return
+        
+        ## build the final dataset in one go from all shards 
+        shards , stat = self.output if self.output else ( [] , ( 0 , 0 , 0 ) )
+        self.output   = self._build ( shards ) , stat 
+
+    ## build the final dataset from the sorted list of shards 
+    def _build ( self , shards ) :
+        """Build the final dataset from the (sorted) list of shards
+        """
+        import os 
+        from   ostap.fitting.selectors import Variable
+        from   ostap.core.core         import dsID, ROOTCWD 
+        
+        varset = ROOT.RooArgSet()
+        for v in self.variables :
+            if   isinstance ( v , str              ) : v = Variable (   v ) 
+            elif isinstance ( v , ROOT.RooAbsReal  ) : v = Variable (   v )
+            elif isinstance ( v , ( tuple , list ) ) : v = Variable (  *v )
+            elif isinstance ( v , dict             ) : v = Variable ( **v )
+            varset.add ( v.var )
 
+        name  = dsID() 
+        chain = ROOT.TChain ( 'shard' )
+        for key , fname in sorted ( shards ) :
+            if fname : chain.Add ( fname )
+
+        from ostap.logger.utils import rooSilent
+        with ROOTCWD() , rooSilent ( ROOT.RooFit.ERROR  , True ) :
+            ROOT.gROOT.cd ()
+            ds = ROOT.RooDataSet ( name , name , chain , varset )
+
+        del chain 
+        for key , fname in shards :
+            if fname and os.path.exists ( fname ) : os.remove ( fname )
+            
+        return ds 
+            
     ## merge results/datasets 
     def _mergeResults(self, result) :
-        
-        if result :
+
+        if result and self.shards :
+            shard , stat = result 
+            if not self.output :
+                self.output = [ shard ] , tuple ( stat ) 
+            else :
+                shards , stat_ = self.output
+                shards.append ( shard ) 
+                self.output = shards , tuple ( a + b for a , b in zip ( stat_ , stat ) )
+            logger.debug ( 'Merging: %d shards ' % len( self.output[0] ) )
+            
+        elif result :
             ds , stat = result
             if not self.output or not self.output[0] :
                 self.output = ds , stat  
@@ -428,11 +889,13 @@ class ChopperTraining(Parallel.Task) :
 #  selector =  ...
 #  chain.pprocess ( selector )
 #  @endcode 
-def _pprocess_ ( chain , selector , nevents = -1 , first = 0 , shortcut = True  , chunk_size = 100000 , ppservers = () , silent = False ) :
+def _pprocess_ ( chain , selector , nevents = -1 , first = 0 , shortcut = True  , chunk_size = 100000 , ppservers = () , silent = False , balanced = False , shards = True ) :
     """ Parallel processing of loooong chain/tree 
     >>>chain    = ...
     >>> selector =  ...
     >>> chain.pprocess ( selector )
+    - balanced : use cost-aware splitting (see Chain.balanced_split)
+    - shards   : workers write columnar shards, the dataset is built at once at the end (see FillTask)
     """
     
     from ostap.trees.trees import Chain
@@ -449,9 +912,12 @@ def _pprocess_ ( chain , selector , nevents = -1 , first = 0 , shortcut = True
         logger.info ("Configuration is ``trivial'': redefine ``chunk-size'' to -1")
         chunk_size = -1
         
-    task  = FillTask ( variables , selection , trivial )
     wmgr  = Parallel.WorkManager( ppservers = ppservers , silent = silent )
-    wmgr.process( task , ch.split ( chunk_size = chunk_size ) )
+    ## shards need the common file system 
+    task  = FillTask ( variables , selection , trivial , shards = shards and 'cluster' != wmgr.mode , files = ch.files )
+    if balanced and 0 < chunk_size : items = ch.balanced_split ( ncpus      = wmgr.ncpus )
+    else                           : items = ch.split          ( chunk_size = chunk_size )
+    wmgr.process( task , items , progress = not silent )
     
     dataset, stat = task.output 
 
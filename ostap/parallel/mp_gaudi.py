@@ -9,35 +9,87 @@
     Two main class are defined: Task and WorkManager
 """
 
-__all__ = [ 'Task','WorkManager' ]
+__all__ = [ 'Task','WorkManager','shutdown_pool' ]
 excluded_varnames = ['HOSTNAME', 'SSH_CLIENT', 'SSH_CONNECTION', 'DISPLAY']
+#--- modules imported once by every worker of the persistent pool
+warmup_modules = ['ROOT', 'ostap.core.pyrouts', 'ostap.trees.trees', 'ostap.fitting.selectors']
 
-import sys, os, time, copy
+import sys, os, time, copy, atexit
 import multiprocessing
+try               : import cPickle as pickle
+except ImportError: import pickle
+
+def _warmup( modules ) :
+    """ Pool initializer: import (and decorate) the heavy modules once per worker """
+    for m in modules :
+        try    : __import__(m)
+        except ImportError : pass
+
+_pools = {}
+def _get_pool( ncpus ) :
+    """ Get the persistent (module-level) pool with ncpus workers, create it if needed """
+    pool = _pools.get(ncpus)
+    if pool is None :
+        pool = multiprocessing.Pool(ncpus, _warmup, (tuple(warmup_modules),))
+        _pools[ncpus] = pool
+    return pool
+def shutdown_pool() :
+    """ Shutdown all persistent worker pools (the next WorkManager starts fresh ones) """
+    while _pools :
+        ncpus, pool = _pools.popitem()
+        pool.close()
+        pool.join()
+atexit.register(shutdown_pool)
 
 def _prefunction( f, task, item) :
     return f((task,item))
 def _ppfunction( args ) :
     #--- Unpack arguments
     task, item = args
+    if isinstance(task, TaskRef) : task = task.get()
     stat = Statistics()
     #--- Initialize the remote side (at least once)
-    if not task.__class__._initializeDone :
+    if not task._initializeDone :
         for k,v in task.environ.items() :
             if k not in excluded_varnames : os.environ[k] = v
         task.initializeRemote()
-        task.__class__._initializeDone = True
+        #--- the persistent workers serve many tasks of the same class:
+        #    the task from TaskRef is initialized once per task instance
+        if isinstance(args[0], TaskRef) : task._initializeDone = True
+        else                            : task.__class__._initializeDone = True
     #--- Reset the task output
     task._resetOutput()
     #--- Call processing
     task.process(item)
     #--- Collect statistics
     stat.stop()
-    return (copy.deepcopy(task.output), stat)
+    #--- the output is pickled on the way back anyway: no need in deepcopy
+    return (task._packOutput(), stat)
+
+_remote_tasks = {}
+class TaskRef(object) :
+    """ Light-weight reference to the task: the task (with its configuration and
+        environment) is pickled only once into a temporary file and unpickled only
+        once per worker, while only this small reference travels with every item """
+    def __init__(self, task) :
+        import tempfile, uuid
+        fd, self.fname = tempfile.mkstemp(prefix='task_', suffix='.pkl')
+        with os.fdopen(fd, 'wb') as f : pickle.dump(task, f, pickle.HIGHEST_PROTOCOL)
+        self.token = uuid.uuid4().hex
+    def get(self) :
+        task = _remote_tasks.get(self.token)
+        if task is None :
+            with open(self.fname, 'rb') as f : task = pickle.load(f)
+            task._initializeDone = False   # --- new task instance: not initialized yet
+            _remote_tasks.clear()   # --- keep only the current task
+            _remote_tasks[self.token] = task
+        return task
+    def remove(self) :
+        if os.path.exists(self.fname) : os.remove(self.fname)
 
 class Statistics(object):
     def __init__(self):
-        self.name  = os.getenv('HOSTNAME')
+        self.name  = '%s:%d' % ( os.getenv('HOSTNAME') , os.getpid() )
         self.start = time.time()
         self.time  = 0.0
         self.njob  = 0
@@ -92,6 +144,10 @@ class Task(object) :
                 elif hasattr(self.output[i],'__iadd__') : self.output[i] += result[i]
                 elif hasattr(self.output[i],'__add__') : self.output[i] = self.output[i] + result[i]
                 else : raise TypeError('result cannot be added')
+    def _packOutput(self):
+        """ Output as it is sent back to the parent process, the tasks can override
+        it to provide more compact representation (to be understood by _mergeResults) """
+        return self.output
     def _resetOutput(self):
         output =  (type(self.output) is dict) and self.output.values() or self.output
         for o in output :
@@ -103,7 +159,12 @@ class WorkManager(object) :
         the workers. They can be local (using other cores) or remote
         using other nodes in the local cluster """
 
-    def __init__( self, ncpus='autodetect', ppservers=None , silent = False ) :
+    def __init__( self, ncpus='autodetect', ppservers=None , silent = False , persistent = True ) :
+        """ With persistent=True (default) the multicore workers are taken from the
+        module-level pool, that survives the WorkManager and keeps the workers with
+        ROOT/ostap already imported; use shutdown_pool() to release them.
+        Note: the persistent workers are forked once, objects defined in __main__
+        after that are not known to them (use persistent=False for such tasks) """
         if ncpus == 'autodetect' : self.ncpus = multiprocessing.cpu_count()
         else :                     self.ncpus = ncpus
         if ppservers :
@@ -112,20 +173,33 @@ class WorkManager(object) :
             self.sessions = [ SshSession(srv) for srv in ppservers ]
             self.server = pp.Server(ncpus=self.ncpus, ppservers=self.ppservers)
             self.mode = 'cluster'
+        elif persistent :
+            self.pool = _get_pool(self.ncpus)
+            self.mode = 'multicore'
         else :
-            self.pool = multiprocessing.Pool(self.ncpus)
+            self.pool = multiprocessing.Pool(self.ncpus, _warmup, (tuple(warmup_modules),))
             self.mode = 'multicore'
+        self.persistent = persistent
         self.stats = {}
+        self.elapsed = 0.0
         self.silent = True if silent  else False 
 
     def __del__(self):
         if hasattr(self,'server') : self.server.destroy()
+        if hasattr(self,'pool') and not self.persistent : self.pool.terminate()
 
-    def process(self, task, items, timeout=90000):
+    def process(self, task, items, timeout=90000, streaming=True, window=None, progress=False):
+        """ Process all items with the given task.
+        In ``streaming'' mode (default for multicore) the results are merged as
+        soon as they arrive (in arbitrary order) and at most ``window'' items
+        (default: 2*ncpus) are in flight, so the parent keeps only few partial
+        results in memory. Otherwise all items are submitted at once and merged
+        at the end (the original map_async behaviour) """
         if not isinstance(task,Task) :
             raise TypeError("task argument needs to be an 'Task' instance")
         # --- Call the Local initialialization
         task.initializeLocal()
+        self.stats = {}
         # --- Schedule all the jobs ....
         if self.mode == 'cluster' :
             jobs = [self.server.submit(_prefunction, (_ppfunction, task, item), (), ('GaudiMP.Parallel','time')) for item in items]
@@ -135,26 +209,86 @@ class WorkManager(object) :
                 self._mergeStatistics(stat)
             self._printStatistics()
             self.server.print_stats()
+        elif self.mode == 'multicore' and streaming :
+            start = time.time()
+            ref = TaskRef(task)
+            try     : self._streamJobs(ref, task, items, timeout, window, progress)
+            finally : ref.remove()
+            end = time.time()
+            self.elapsed = end - start
+            if not self.silent : 
+                self._printStatistics()
+                print 'Time elapsed since server creation %f' %(end-start)
         elif self.mode == 'multicore' :
             start = time.time()
-            jobs = self.pool.map_async(_ppfunction, zip([task for i in items] , items ))
-            for result, stat in  jobs.get(timeout) :
-                task._mergeResults(result)
-                self._mergeStatistics(stat)
+            ref = TaskRef(task)
+            try :
+                jobs = self.pool.map_async(_ppfunction, zip([ref for i in items] , items ))
+                for result, stat in  jobs.get(timeout) :
+                    task._mergeResults(result)
+                    self._mergeStatistics(stat)
+            finally : ref.remove()
             end = time.time()
+            self.elapsed = end - start
             if not self.silent : 
                 self._printStatistics()
                 print 'Time elapsed since server creation %f' %(end-start)
         # --- Call the Local Finalize
         task.finalize()
+    def _streamJobs(self, ref, task, items, timeout, window, progress):
+        """ Submit items with bounded number of in-flight jobs and merge
+        each result as soon as it is ready (imap_unordered-like) """
+        if not window or window <= 0 : window = 2 * self.ncpus
+        try              : nitems = len(items)
+        except TypeError : nitems = None
+        from ostap.utils.progress_bar import ProgressBar, RunningBar
+        if nitems is None : bar = RunningBar  ( silent = not progress )
+        else              : bar = ProgressBar ( max_value = nitems , silent = not progress )
+        deadline = time.time() + timeout
+        pending  = []
+        source   = iter(items)
+        exhausted = False
+        with bar :
+            while True :
+                # --- keep the window filled
+                while not exhausted and len(pending) < window :
+                    try : item = next(source)
+                    except StopIteration :
+                        exhausted = True
+                        break
+                    pending.append(self.pool.apply_async(_ppfunction, ((ref, item),)))
+                if not pending : break
+                # --- collect whatever is ready (in order of arrival)
+                ready = [ job for job in pending if job.ready() ]
+                if not ready :
+                    if time.time() > deadline : raise multiprocessing.TimeoutError()
+                    pending[0].wait(0.01)
+                    continue
+                for job in ready :
+                    pending.remove(job)
+                    result, stat = job.get()
+                    task._mergeResults(result)
+                    self._mergeStatistics(stat)
+                    del result
+                    bar += 1
     def _printStatistics(self):
         njobs = 0
         for stat in self.stats.values():
             njobs += stat.njob
         print 'Job execution statistics:'
-        print 'job count | % of all jobs | job time sum | time per job | job server'
+        print 'job count | % of all jobs | job time sum | time per job | utilisation | job server'
         for name, stat  in self.stats.items():
-            print '       %d |        %6.2f |     %8.3f |    %8.3f | %s' % (stat.njob, 100.*stat.njob/njobs, stat.time, stat.time/stat.njob, name)
+            print '       %d |        %6.2f |     %8.3f |    %8.3f |      %6.2f | %s' % (stat.njob, 100.*stat.njob/njobs, stat.time, stat.time/stat.njob, self._utilisation(stat), name)
+        if self.elapsed > 0 and self.stats :
+            print 'Average worker utilisation %6.2f%%' % self.utilisation()
+    def _utilisation(self, stat):
+        """ Fraction (in %) of the elapsed wall time the worker was busy """
+        return 100.*stat.time/self.elapsed if self.elapsed > 0 else 0.0
+    def utilisation(self):
+        """ Average utilisation (in %) of ncpus workers for the last processing """
+        if self.elapsed <= 0 : return 0.0
+        busy = sum( stat.time for stat in self.stats.values() )
+        return 100.*busy/(self.elapsed*self.ncpus)
 
     def _mergeStatistics(self, stat):
         if stat.name not in self.stats : self.stats[stat.name] = Statistics()
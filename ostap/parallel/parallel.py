@@ -22,6 +22,7 @@ __date__    = '2016-02-23'
 __all__     = (
     'Task'        , ## the base class for task
     'WorkManager' , ## task manager 
+    'shutdown_pool' , ## shutdown the persistent pool of workers 
     )
 # =============================================================================
 from ostap.logger.logger import getLogger
@@ -40,7 +41,7 @@ else                      : logger = getLogger ( __name__         )
 ##     logger.info  ('Use Task and TaskManager from GaudiMP.Parallel'    )
 
 
-from ostap.parallel.mp_gaudi import Task, WorkManager 
+from ostap.parallel.mp_gaudi import Task, WorkManager, shutdown_pool 
 logger.info  ('Use Task and TaskManager from GaudiMP.Parallel'    )
     
     
@@ -105,6 +105,114 @@ def test_kisa2 () :
     ##logger.info ( 'Dataset: %s' % ds )
 
 
+# =============================================================================
+def test_kisa_shared () :
+    """Parallel projection with accumulation in shared memory"""
+    h1 = ROOT.TH1D( 'hs1' , '' , 200 , 3 , 3.2 )
+    h2 = h1.clone()
+    chain = data.chain
+    chain. project ( h1 , 'mass' , '3<=mass && mass<=3.2 && 0<=c2dtf && c2dtf<5' )
+    with timing('SHARED(%s):' % len(chain) , logger ) :
+        chain.pproject ( h2 , 'mass' , '3<=mass && mass<=3.2 && 0<=c2dtf && c2dtf<5' , silent = True , shared = True )
+    assert h1.GetEntries() == h2.GetEntries() , 'Invalid number of entries!'
+    assert abs ( h1.Integral() - h2.Integral() ) < 1.e-6 , 'Invalid integral!'
+
+
+# =============================================================================
+def test_kisa_shards () :
+    """Parallel fill of dataset via columnar shards"""
+    from ostap.fitting.selectors import SelectorWithVars, Variable  
+    variables = [
+        Variable   ( 'mass'  , 'mass(mu+mu-)' ,  3.09 , 3.11 ) , 
+        Variable   ( 'c2dtf' , 'chi2(dtf)'    , -1    , 10   ) , 
+        ]
+    selection = '2<=mass && mass<4 && 0<=c2dtf && c2dtf<5'
+    results   = []
+    for shards in ( False , True ) :
+        selector = SelectorWithVars ( variables = variables , selection = selection , silence = True )
+        with timing('SHARDS=%s(%s):' % ( shards , len ( data.chain ) ) , logger ) :
+            data.chain.pprocess ( selector , silent = True , chunk_size = 100 , shards = shards )
+        results.append ( ( len ( selector.data ) , selector.stat ) ) 
+    assert results[0] == results[1] , 'Different results with/without shards %s' % results 
+
+    ## the files are not sorted by name: the rows follow the order of the chain
+    chain = ROOT.TChain ( data.chain.GetName() )
+    for f in reversed ( data.files ) : chain.Add ( f )
+    s1 = SelectorWithVars ( variables = variables , selection = selection , silence = True )
+    chain.process  ( s1 , shortcut = False )
+    s2 = SelectorWithVars ( variables = variables , selection = selection , silence = True )
+    chain.pprocess ( s2 , silent = True , chunk_size = 100 , shards = True )
+    assert len ( s1.data ) == len ( s2.data ) , 'Different number of entries' 
+    for i in range ( len ( s1.data ) ) :
+        assert s1.data.get ( i ).getRealValue ( 'mass' ) == s2.data.get ( i ).getRealValue ( 'mass' ) , \
+               'Different order of entries with shards'
+
+
+# =============================================================================
+def test_kisa_many () :
+    """Single-pass projection into many histograms"""
+    chain = data.chain
+    cuts  = '0<=c2dtf && c2dtf<5'
+    h1 = ROOT.TH1D ( 'hm1' , '' , 200 , 3 , 3.2 )
+    h2 = ROOT.TH1D ( 'hm2' , '' , 100 , 0 , 5   )
+    h3 = ROOT.TH2D ( 'hm3' , '' ,  50 , 3 , 3.2 , 20 , 0 , 5 )
+    r1 , r2 , r3 = h1.clone() , h2.clone() , h3.clone() 
+    chain.project ( r1 , 'mass'       , cuts  )
+    chain.project ( r2 , 'c2dtf'      , 'mass<3.1' )
+    chain.project ( r3 , 'c2dtf:mass' , cuts  )
+    histos = { h1 : 'mass' , h2 : ( 'c2dtf' , 'mass<3.1' ) , h3 : 'c2dtf:mass' }
+    for method in ( chain.project_many , chain.pproject_many ) :
+        method ( histos , cuts = cuts )
+        for h , r in ( ( h1 , r1 ) , ( h2 , r2 ) , ( h3 , r3 ) ) :
+            assert abs ( h.Integral() - r.Integral() ) < 1.e-6 , 'Invalid integral for %s' % h.GetName()
+
+
+# =============================================================================
+def test_kisa_balanced () :
+    """Cost-aware splitting of the chain"""
+    from ostap.trees.trees import Chain
+    chain  = data.chain 
+    chunks = Chain ( chain ).balanced_split ( ncpus = 4 , min_size = 10 )
+    assert sum ( c.entries for c in chunks ) == len ( chain ), 'Invalid balanced split!'
+    costs  = [ c.cost for c in chunks ]
+    assert costs == sorted ( costs , reverse = True ) , 'Chunks are not ordered by cost!'
+
+
+# =============================================================================
+def test_kisa_packet () :
+    """Compact transport of histograms"""
+    from ostap.parallel.kisa import HistoPacket
+    import pickle 
+    h1 = ROOT.TH2D ( 'h2p1' , '' , 20 , 0 , 1 , 20 , 0 , 1 ) ; h1.Sumw2()
+    h2 = h1.clone()
+    h3 = h1.clone()
+    for i in range ( 10000 ) :
+        x , y = random.random () , random.random ()
+        h1.Fill ( x , y , 2 )
+        h3.Fill ( x , y , 2 )
+    h2.Fill ( 0.5 , 0.5 ) 
+    h3.Fill ( 0.5 , 0.5 ) 
+    packet = pickle.loads ( pickle.dumps ( HistoPacket ( h1 ) , 2 ) )
+    packet.add_to ( h2 )
+    assert h2.GetEntries () == h3.GetEntries () , 'Invalid number of entries!'
+    for i in range ( h2.GetSize() ) :
+        assert abs ( h2.GetBinContent ( i ) - h3.GetBinContent ( i ) ) < 1.e-9 , 'Invalid content!'
+        assert abs ( h2.GetBinError   ( i ) - h3.GetBinError   ( i ) ) < 1.e-9 , 'Invalid error!'
+
+
+def _square_ ( x ) : return [ x * x ]
+# =============================================================================
+def test_kisa_streaming () :
+    """Streaming (bounded window) merging of results"""
+    from ostap.parallel.kisa import GenericTask, WorkManager
+    items = range ( 1000 )
+    task  = GenericTask ( processor = _square_ , initializer = list )
+    wmgr  = WorkManager ( silent = True )
+    with timing('STREAMING(%s):' % len(items) , logger ) :
+        wmgr.process ( task , items , streaming = True , window = 4 )
+    assert sorted ( task.output ) == [ x * x for x in items ], 'Invalid streaming merge!'
+
+
 ## # =============================================================================
 ## def test_kisa3 () :
 
@@ -141,6 +249,12 @@ if '__main__' == __name__ :
 
     test_kisa  ()
     test_kisa2 ()
+    test_kisa_streaming ()
+    test_kisa_shared    ()
+    test_kisa_shards    ()
+    test_kisa_many      ()
+    test_kisa_balanced  ()
+    test_kisa_packet    ()
     #test_kisa3 ()
     
     pass
@@ -33,6 +33,11 @@
 #  - mode
 #  - width
 #  - cl_symm and sl_asymm 
+#
+#  For many queries for the same function the ``distribution summary''
+#  tabulates CDF only once
+#  - Summary
+#  - summary 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2014-06-06  
 # =============================================================================
@@ -67,6 +72,11 @@ All objects exists as classes/functors and as standalone simlpe functions
 - mode
 - width
 - cl_symm and sl_asymm 
+
+For many queries for the same function the ``distribution summary''
+tabulates CDF only once
+- Summary
+- summary 
 """
 # =============================================================================
 __version__ = "$Revision$"
@@ -88,6 +98,7 @@ __all__     = (
     "Width"         , ## calculate "width"    for functions/distribitions, etc (brentq)
     "CL_symm"       , ## calcualte symmetrical confidence intervals            (brentq)
     "CL_asymm"      , ## calcualte asymmetrical confidence intervals           (brentq)
+    "Summary"       , ## tabulated CDF for quantiles, median, mode, width and intervals 
     ##
     ## stat-quantities   
     "moment"        , ## calculate N-th moment of functions/distribitions, etc 
@@ -103,6 +114,7 @@ __all__     = (
     "width"         , ## calculate "width"    for functions/distribitions, etc (brentq
     "cl_symm"       , ## calculate symmetrical confidence intervals            (brentq)
     "cl_asymm"      , ## calculate asymmetrical confidence intervals           (brentq)
+    "summary"       , ## tabulated CDF for quantiles, median, mode, width and intervals 
     ##
     ) 
 # =============================================================================
@@ -145,11 +157,12 @@ class Moment(object) :
         self._args = args
         self._moms = {}
 
-    ## make an integral 
-    def _integral_ ( self , func , xmn , xmx , *args ) :
-        from ostap.math.integral import IntegralCache 
-        integrator = IntegralCache ( func , xmn , err = self._err , args = args )
-        return integrator ( xmx , *args )
+    ## make an integral
+    #  the integrals are cached for the functions with pars(), keyed by the parameters and range
+    #  @see ostap.math.integral.integral_memo
+    def _integral_ ( self , func , xmn , xmx , *args , **kwargs ) :
+        from ostap.math.integral import integral_memo
+        return integral_memo.integral ( func , xmn , xmx , args = args , err = self._err , **kwargs )
     
     ## calculate un-normalized 0-moment  
     def _moment0_ ( self , func , *args ) :
@@ -163,7 +176,8 @@ class Moment(object) :
         """
         x0     = self._x0 if mu is None else mu 
         func_N = lambda x,*a : func( x , *a ) * ( ( x - x0 ) ** k  )
-        return self._integral_ ( func_N , self._xmin , self._xmax , *args )
+        return self._integral_ ( func , self._xmin , self._xmax , *args ,
+                                 integrand = func_N , tag = ( 'moment' , k , x0 ) )
     
     ## calculate the moment 
     def __call__ ( self , func , *args ) :
@@ -466,8 +480,13 @@ class Median(RMS) :
             
         return result
 
-    ## calculate the median 
+    ## calculate the median
+    #  for the finite interval the tabulated CDF is used
+    #  @see Summary 
     def __call__ ( self , func , *args ) :
+        args = args if args else self._args
+        if _finite_ ( self._xmin ) and _finite_ ( self._xmax ) :
+            return _summary_ ( func , self._xmin , self._xmax , args ).median ()
         return self._median_ ( func , self._xmin , self._xmax ,  *args )
 
     def __str__ ( self ) :
@@ -494,14 +513,16 @@ class Quantile(Median) :
     def __init__ ( self , Q , xmin , xmax ) :
         Median.__init__ ( self , xmin , xmax )
         #
-        if Q < 0 : raise ArrtibuteError ( 'Quantile is invalid %s' % Q )
-        if Q > 1 : raise ArrtibuteError ( 'Quantile is invalid %s' % Q )
+        if Q < 0 : raise AttributeError ( 'Quantile is invalid %s' % Q )
+        if Q > 1 : raise AttributeError ( 'Quantile is invalid %s' % Q )
         self._Q = float( Q ) 
         
     def __str__ ( self ) :
         return "Quantile(%s,%s,%s)" % ( self._Q , self._xmin , self._xmax )
 
-    ## calculate the median 
+    ## calculate the quantile
+    #  for the finite interval the tabulated CDF is used
+    #  @see Summary 
     def __call__ ( self , func , *args ) :
         ##
 
@@ -509,6 +530,10 @@ class Quantile(Median) :
         elif  0.0 == self._Q : return self._xmin
         elif  1.0 == self._Q : return self._xmax
 
+        args = args if args else self._args
+        if _finite_ ( self._xmin ) and _finite_ ( self._xmax ) :
+            return _summary_ ( func , self._xmin , self._xmax , args ).quantile ( self._Q )
+
         ## need to know the integral
         from ostap.math.integral import IntegralCache
         iint = IntegralCache ( func, self._xmin, err = False ,  args = args )
@@ -678,11 +703,18 @@ class CL_symm(object) :
         return "CL_sym(%s,%s,%s,%s)" % ( self._prob ,
                                          self._xmin , self._xmax , self._x0   )
 
+    ## for the finite interval the tabulated CDF is used
+    #  @see Summary 
     def __call__ ( self , func , *args ) :
 
         ## additional arguments
         args   = args if args else self._args
 
+        if _finite_ ( self._xmin ) and _finite_ ( self._xmax ) :
+            x0 = self._x0
+            if x0 is None and hasattr ( func , 'mean' ) : x0 = func.mean()
+            return _summary_ ( func , self._xmin , self._xmax , args ).cl_symm ( self._prob , x0 )
+        
         #
         ## define integration rules
         #
@@ -788,10 +820,15 @@ class CL_asymm(object) :
         return optimize.brentq (  ifun , xmn , xmx , args = args )
 
                    
+    ## for the finite interval the tabulated CDF is used
+    #  @see Summary 
     def __call__ ( self , func , *args ) :
 
         ## additional arguments
         args   = args if args else self._args
+
+        if _finite_ ( self._xmin ) and _finite_ ( self._xmax ) :
+            return _summary_ ( func , self._xmin , self._xmax , args ).cl_asymm ( self._prob )
         
         #
         ## define integration rules
@@ -868,6 +905,428 @@ class CL_asymm(object) :
         return x1 , x2 
 
  
+# =============================================================================
+## Gauss-Legendre 5-point rule on [-1,1]: (node, weight) 
+_gl5_ = ( (  0.0                , 0.5688888888888889 ) ,
+          ( -0.5384693101056831 , 0.4786286704993665 ) ,
+          ( +0.5384693101056831 , 0.4786286704993665 ) ,
+          ( -0.9061798459386640 , 0.2369268850561891 ) ,
+          ( +0.9061798459386640 , 0.2369268850561891 ) )
+# =============================================================================
+## check that the value is a finite number 
+def _finite_ ( x ) :
+    """Check that the value is a finite number"""
+    import math 
+    return isinstance ( x , ( float , int , long ) ) and not math.isinf ( x ) and not math.isnan ( x )
+
+# =============================================================================
+## @class Summary
+#  ``Distribution summary'': the CDF for the given function on (xmin,xmax)
+#  is tabulated once on the adaptive grid (adaptive Simpson with error control),
+#  and then any number of quantile, median, mode, width and interval queries
+#  are answered using the interpolation of the tabulated CDF
+#  plus (optionally) one local refinement
+#  @code
+#  fun = lambda x : exp( -0.5*x*x)
+#  s   = Summary ( fun , -10 , 10 )
+#  print s.median () , s.quantile ( 0.1 ) , s.quantile ( 0.9 ) 
+#  print s.mode   () , s.width    ()
+#  print s.cl_symm ( 0.68 ) , s.cl_asymm ( 0.68 )
+#  @endcode
+#  Assumptions on function
+#  - nonnegative
+#  - positive integral between (xmin,xmax)
+#  - zero outside interval     (xmin,xmax)
+#  - finite xmin and xmax
+#  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
+#  @date 2019-03-10
+class Summary(object) :
+    """``Distribution summary'': the CDF for the given function on (xmin,xmax)
+    is tabulated once on the adaptive grid (adaptive Simpson with error control),
+    and then any number of quantile, median, mode, width and interval queries
+    are answered using the interpolation of the tabulated CDF
+    plus (optionally) one local refinement
+    
+    >>> fun = lambda x : exp( -0.5*x*x)
+    >>> s   = Summary ( fun , -10 , 10 )
+    >>> print s.median () , s.quantile ( 0.1 ) , s.quantile ( 0.9 ) 
+    >>> print s.mode   () , s.width    ()
+    >>> print s.cl_symm ( 0.68 ) , s.cl_asymm ( 0.68 )
+    
+    Assumptions on function
+    - nonnegative
+    - positive integral between (xmin,xmax)
+    - zero outside interval     (xmin,xmax)
+    - finite xmin and xmax
+    """
+    def __init__ ( self             ,
+                   func             ,
+                   xmin             ,
+                   xmax             ,
+                   args     = ()    ,
+                   epsrel   = 1.e-7 ,
+                   nstart   = 32    ,
+                   maxeval  = 100000 ) :
+
+        if not _finite_ ( xmin ) or not _finite_ ( xmax ) or not xmin < xmax :
+            raise AttributeError ( "Summary: invalid interval (%s,%s)" % ( xmin , xmax ) )
+        if not 0 < epsrel < 1 :
+            raise AttributeError ( "Summary: invalid precision %s" % epsrel ) 
+        
+        self.__func   = func
+        self.__args   = tuple ( args ) 
+        self.__xmin   = float ( xmin )
+        self.__xmax   = float ( xmax )
+        self.__epsrel = float ( epsrel ) 
+        self.__neval  = 0 
+        
+        self.__tabulate ( max ( 1 , int ( nstart ) ) , maxeval )
+        
+        if 0 >= self.__norm :
+            raise AttributeError ( "Summary: normalization integral is not positive %s" % self.__norm )
+
+    ## evaluate the function 
+    def __f ( self , x ) :
+        self.__neval += 1 
+        return float ( self.__func ( x , *self.__args ) )
+    
+    ## tabulate CDF on the adaptive grid 
+    def __tabulate ( self , nstart , maxeval ) :
+
+        f      = self.__f 
+        xmin   = self.__xmin
+        xmax   = self.__xmax 
+        length = xmax - xmin
+        
+        h      = length / nstart 
+        pts    = [ xmin + 0.5 * i * h for i in range ( 2 * nstart + 1 ) ]
+        pts[-1] = xmax 
+        vals   = [ f ( x ) for x in pts ]
+        
+        start  = [ ( pts [ 2 * i ] , pts [ 2 * i + 2 ] , vals [ 2 * i ] , vals [ 2 * i + 1 ] , vals [ 2 * i + 2 ] )
+                   for i in range ( nstart ) ] 
+        
+        scale  = sum ( ( b - a ) * ( abs ( fa ) + 4 * abs ( fm ) + abs ( fb ) ) / 6.0
+                       for a , b , fa , fm , fb in start )
+        tol    = 15 * self.__epsrel * max ( scale , 1.e-300 ) / length 
+        
+        result = []
+        error  = 0.0 
+        stack  = start [ ::-1 ]
+        while stack :
+            
+            a , b , fa , fm , fb = stack.pop ()
+            m  = 0.5 * ( a + b )
+            fl = f ( 0.5 * ( a + m ) )
+            fr = f ( 0.5 * ( m + b ) )
+            
+            s1 = ( b - a ) * ( fa +     4 * fm +                 fb ) /  6.0
+            s2 = ( b - a ) * ( fa + 4 * fl  + 2 * fm + 4 * fr  + fb ) / 12.0
+            
+            if abs ( s2 - s1 ) <= tol * ( b - a ) or self.__neval >= maxeval or m in ( a , b ) :
+                result.append ( ( a , m , fa , fl , fm ) )
+                result.append ( ( m , b , fm , fr , fb ) )
+                error += abs ( s2 - s1 ) / 15.0 
+            else :
+                stack.append  ( ( m , b , fm , fr , fb ) ) 
+                stack.append  ( ( a , m , fa , fl , fm ) )
+
+        if self.__neval >= maxeval :
+            logger.warning ( "Summary: maximal number of evaluations %d is reached" % maxeval ) 
+            
+        self.__x  = [ r[0] for r in result ] + [ xmax ]
+        self.__fa = [ r[2] for r in result ]
+        self.__fm = [ r[3] for r in result ]
+        self.__fb = [ r[4] for r in result ]
+        
+        cum = [ 0.0 ]
+        for a , b , fa , fm , fb in result :
+            cum.append ( cum [ -1 ] + ( b - a ) * ( fa + 4 * fm + fb ) / 6.0 )
+        self.__cum   = cum
+        self.__norm  = cum [ -1 ]
+        self.__error = error 
+
+    @property
+    def xmin ( self ) :
+        """``xmin'' : the low edge of the interval"""
+        return self.__xmin
+    @property
+    def xmax ( self ) :
+        """``xmax'' : the high edge of the interval"""
+        return self.__xmax
+    @property
+    def norm ( self ) :
+        """``norm'' : the integral of the function over (xmin,xmax)"""
+        return self.__norm
+    @property
+    def error ( self ) :
+        """``error'' : the estimated absolute error of the tabulated integral"""
+        return self.__error
+    @property
+    def neval ( self ) :
+        """``neval'' : number of function evaluations"""
+        return self.__neval
+    
+    def __len__ ( self ) :
+        return len ( self.__fa ) 
+
+    ## the interval index for the given x 
+    def __index ( self , x ) :
+        import bisect
+        i = bisect.bisect_right ( self.__x , x ) - 1
+        return min ( max ( i , 0 ) , len ( self.__fa ) - 1 )
+
+    ## integral of the quadratic interpolant over [a_i,x]
+    def __local ( self , i , x ) :
+        a , b = self.__x [ i ] , self.__x [ i + 1 ]
+        h     = b - a 
+        t     = ( x - a ) / h
+        t2    = t  * t
+        t3    = t2 * t
+        i0    = 2 * t3 / 3.0 - 1.5 * t2 + t
+        i1    = 2 * t2 - 4 * t3 / 3.0 
+        i2    = 2 * t3 / 3.0 - 0.5 * t2
+        return h * ( self.__fa [ i ] * i0 + self.__fm [ i ] * i1 + self.__fb [ i ] * i2 )
+
+    ## integral of the function over [a_i,x] (Gauss-Legendre)
+    def __exact ( self , i , x ) :
+        a  = self.__x [ i ]
+        c  = 0.5 * ( x + a )
+        h  = 0.5 * ( x - a )
+        return h * sum ( w * self.__f ( c + h * t ) for t , w in _gl5_ ) 
+        
+    ## un-normalized CDF
+    def __cdf ( self , x ) :
+        if   x <= self.__xmin : return 0.0
+        elif x >= self.__xmax : return self.__norm
+        i = self.__index ( x )
+        return self.__cum [ i ] + self.__local ( i , x )
+
+    # =========================================================================
+    ## get the (normalized) CDF at the given point 
+    def cdf ( self , x ) :
+        """Get the (normalized) CDF at the given point"""
+        return self.__cdf ( x ) / self.__norm
+
+    # =========================================================================
+    ## get the quantile
+    #  @param prob    the probability 
+    #  @param refine  make one local refinement of the interpolated result?
+    def quantile ( self , prob , refine = True ) :
+        """Get the quantile
+        - prob   : the probability
+        - refine : make one local refinement of the interpolated result?
+        """
+        if not 0 <= prob <= 1 :
+            raise AttributeError ( "Summary: invalid quantile %s" % prob )
+        
+        if   0 == prob : return self.__xmin
+        elif 1 == prob : return self.__xmax
+
+        import bisect 
+        target = prob * self.__norm
+        i      = bisect.bisect_right ( self.__cum , target ) - 1
+        i      = min ( max ( i , 0 ) , len ( self.__fa ) - 1 )
+
+        a , b  = self.__x [ i ] , self.__x [ i + 1 ]
+        ## solve the local (monotone) equation by bisection 
+        lo , hi = a , b 
+        for k in range ( 60 ) :
+            m = 0.5 * ( lo + hi )
+            if self.__cum [ i ] + self.__local ( i , m ) < target : lo = m
+            else                                                   : hi = m
+        x = 0.5 * ( lo + hi )
+
+        if refine :
+            ## one Newton step with the accurate local integral 
+            fx = self.__f ( x )
+            if 0 < fx :
+                xn = x - ( self.__cum [ i ] + self.__exact ( i , x ) - target ) / fx
+                if a <= xn <= b : x = xn 
+            
+        return x 
+
+    # =========================================================================
+    ## get the median 
+    def median ( self , refine = True ) :
+        """Get the median"""
+        return self.quantile ( 0.5 , refine )
+
+    # =========================================================================
+    ## get the mean value
+    def mean ( self ) :
+        """Get the mean value"""
+        s = 0.0
+        for i in range ( len ( self.__fa ) ) :
+            a , b = self.__x [ i ] , self.__x [ i + 1 ]
+            s    += ( b - a ) * ( a * self.__fa [ i ] + 2 * ( a + b ) * self.__fm [ i ] + b * self.__fb [ i ] ) / 6.0
+        return s / self.__norm
+    
+    # =========================================================================
+    ## get the variance 
+    def variance ( self ) :
+        """Get the variance"""
+        mu = self.mean ()
+        s  = 0.0
+        for i in range ( len ( self.__fa ) ) :
+            a , b = self.__x [ i ] , self.__x [ i + 1 ]
+            m     = 0.5 * ( a + b ) 
+            s    += ( b - a ) * ( ( a - mu ) ** 2 * self.__fa [ i ] + 4 * ( m - mu ) ** 2 * self.__fm [ i ] + ( b - mu ) ** 2 * self.__fb [ i ] ) / 6.0
+        return s / self.__norm
+
+    # =========================================================================
+    ## get the rms 
+    def rms ( self ) :
+        """Get the rms"""
+        return self.variance () ** 0.5
+    
+    ## all tabulated points and values 
+    def __points ( self ) :
+        xs , fs = [] , []
+        for i in range ( len ( self.__fa ) ) :
+            a , b = self.__x [ i ] , self.__x [ i + 1 ]
+            xs += [ a , 0.5 * ( a + b ) ]
+            fs += [ self.__fa [ i ] , self.__fm [ i ] ]
+        xs.append ( self.__xmax   )
+        fs.append ( self.__fb[-1] )
+        return xs , fs 
+
+    # =========================================================================
+    ## get the mode
+    #  the maximal tabulated point is refined with the successive parabolic interpolation 
+    def mode ( self , niter = 10 ) :
+        """Get the mode
+        - the maximal tabulated point is refined with the successive parabolic interpolation 
+        """
+        xs , fs = self.__points ()
+        k = max ( range ( len ( fs ) ) , key = lambda j : fs [ j ] )
+        if 0 == k or len ( fs ) - 1 == k : return xs [ k ]
+        
+        x0 , x1 , x2 = xs [ k - 1 ] , xs [ k ] , xs [ k + 1 ]
+        f0 , f1 , f2 = fs [ k - 1 ] , fs [ k ] , fs [ k + 1 ]
+
+        for i in range ( niter ) : 
+            
+            d = ( x1 - x0 ) * ( f1 - f2 ) - ( x1 - x2 ) * ( f1 - f0 )
+            if 0 == d : break 
+            
+            n = ( x1 - x0 ) ** 2 * ( f1 - f2 ) - ( x1 - x2 ) ** 2 * ( f1 - f0 )
+            x = x1 - 0.5 * n / d
+            if not x0 < x < x2 or abs ( x - x1 ) <= 1.e-10 * ( x2 - x0 ) : break
+            
+            fx = self.__f ( x )
+            if   x < x1 and f1 <= fx : x0 , x1 , x2 , f0 , f1 , f2 = x0 , x  , x1 , f0 , fx , f1 
+            elif x < x1              : x0 , f0 = x , fx
+            elif f1 <= fx            : x0 , x1 , x2 , f0 , f1 , f2 = x1 , x  , x2 , f1 , fx , f2
+            else                     : x2 , f2 = x , fx
+            
+        return x1 
+
+    ## find the crossings of the level around the mode using the tabulated values 
+    def __crossings ( self , level , xs , fs , k ) :
+
+        x1 = xs [ 0 ]
+        for j in range ( k , 0 , -1 ) :
+            if fs [ j - 1 ] < level <= fs [ j ] :
+                x1 = xs [ j - 1 ] + ( xs [ j ] - xs [ j - 1 ] ) * ( level - fs [ j - 1 ] ) / ( fs [ j ] - fs [ j - 1 ] )
+                break
+        x2 = xs [ -1 ]
+        for j in range ( k , len ( fs ) - 1 ) :
+            if fs [ j + 1 ] < level <= fs [ j ] :
+                x2 = xs [ j ] + ( xs [ j + 1 ] - xs [ j ] ) * ( fs [ j ] - level ) / ( fs [ j ] - fs [ j + 1 ] )
+                break
+        return x1 , x2 
+    
+    # =========================================================================
+    ## get the full width at the given fraction of the height
+    #  @code
+    #  x1 , x2 = s.width ()
+    #  fwhm    = x2 - x1 
+    #  @endcode 
+    def width ( self , height_factor = 0.5 ) :
+        """Get the full width at the given fraction of the height
+        >>> x1 , x2 = s.width ()
+        >>> fwhm    = x2 - x1 
+        """
+        xs , fs = self.__points ()
+        k       = max ( range ( len ( fs ) ) , key = lambda j : fs [ j ] )
+        level   = height_factor * fs [ k ]
+        return self.__crossings ( level , xs , fs , k )
+
+    # =========================================================================
+    ## get the symmetric confidence interval around x0 (mean by default)
+    #  @return VE ( x0 , s*s ) , where  \f$ \int_{x_0-s}^{x_0+s} f(t)dt = p \int f(t)dt \f$
+    def cl_symm ( self , prob , x0 = None ) :
+        """Get the symmetric confidence interval around x0 (mean by default)
+        - it returns VE ( x0 , s*s ), where the integral over (x0-s,x0+s)
+        is the given fraction of the total integral 
+        """
+        if not 0.0 < prob < 1.0 :
+            raise AttributeError ("Invalid value of prob/CL=%g" % prob)
+        
+        if x0 is None : x0 = self.mean ()
+        x0 = float ( x0 ) 
+        
+        if not self.__xmin <= x0 <= self.__xmax :
+            raise AttributeError ("Invalid x0 value %s<=%s<=%s" % ( self.__xmin , x0 , self.__xmax ) )
+        
+        target  = prob * self.__norm
+        lo , hi = 0.0 , max ( self.__xmax - x0 , x0 - self.__xmin )
+        for k in range ( 100 ) :
+            s = 0.5 * ( lo + hi )
+            v = self.__cdf ( x0 + s ) - self.__cdf ( x0 - s )
+            if v < target : lo = s
+            else          : hi = s 
+        s = 0.5 * ( lo + hi ) 
+        
+        from ostap.math.ve import VE 
+        return VE ( x0 , s * s )
+    
+    # =========================================================================
+    ## get the asymmetric confidence interval (x1,x2), such as
+    #  \f$ \begin{array}{l} f(x_1)=f(x_2)            \\
+    #  \int_{x_1}^{x_2}f(t)dr = p \int_{x_{min}}^{x_{max}}f(t)ft \end{array}\f$
+    #  The function is assumed to be unimodal 
+    def cl_asymm ( self , prob ) :
+        """Get the asymmetric confidence interval (x1,x2), such as f(x1)=f(x2)
+        and the integral over (x1,x2) is the given fraction of the total integral 
+        - the function is assumed to be unimodal
+        """
+        if not 0.0 < prob < 1.0 :
+            raise AttributeError ("Invalid value of prob/CL=%g" % prob)
+        
+        xs , fs = self.__points ()
+        k       = max ( range ( len ( fs ) ) , key = lambda j : fs [ j ] )
+
+        target  = prob * self.__norm
+        lo , hi = 0.0 , fs [ k ]
+        x1 , x2 = self.__xmin , self.__xmax 
+        for i in range ( 100 ) :
+            level   = 0.5 * ( lo + hi ) 
+            x1 , x2 = self.__crossings ( level , xs , fs , k )
+            v       = self.__cdf ( x2 ) - self.__cdf ( x1 )
+            if v < target : hi = level
+            else          : lo = level 
+            
+        return x1 , x2 
+
+    def __str__ ( self ) :
+        return "Summary(%s,%s,#%d)" % ( self.__xmin , self.__xmax , len ( self ) )
+    __repr__ = __str__ 
+
+# =============================================================================
+## get the (cached) distribution summary
+#  the tabulations are cached for the functions with pars(), keyed by the parameters and range
+#  @see Summary
+#  @see ostap.math.integral.integral_memo
+def _summary_ ( func , xmin , xmax , args = () ) :
+    """Get the (cached) distribution summary
+    - the tabulations are cached for the functions with pars(), keyed by the parameters and range
+    """
+    from ostap.math.integral import integral_memo
+    key = integral_memo.key ( func , [ ( xmin , xmax ) ] , args , 'summary' )
+    return integral_memo.cached ( key , lambda : Summary ( func , xmin , xmax , args ) , func )
+
 # =============================================================================
 ## calculate some statistical quantities of variable,
 #  considering function to be PDF 
@@ -1146,6 +1605,26 @@ def cl_asymm ( func , prob , xmin = None , xmax = None ) :
     ## and use it! 
     return sp_action ( func , actor , xmin , xmax )
 
+# =============================================================================
+## get the ``distribution summary'' with tabulated CDF 
+#  @code 
+#  fun = lambda x : exp( - 0.5 * x * x ) 
+#  s   = summary ( fun , -10 , 10 )
+#  print s.median() , s.quantile ( 0.1 ) , s.cl_symm ( 0.68 ) 
+#  @endcode
+#  @see Summary 
+#  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
+#  @date 2019-03-10
+def summary ( func , xmin = None , xmax = None , *args ) :
+    """Get the ``distribution summary'' with tabulated CDF
+    >>> fun = lambda x : exp( - 0.5 * x * x )
+    >>> s   = summary ( fun , -10 , 10 )
+    >>> print s.median() , s.quantile ( 0.1 ) , s.cl_symm ( 0.68 )
+    """
+    ## get the functions
+    actor = lambda x1,x2 : ( lambda f : _summary_ ( f , x1 , x2 , args ) )
+    ## and use it! 
+    return sp_action ( func , actor , xmin , xmax )
 
 # =============================================================================
 if '__main__' == __name__ :
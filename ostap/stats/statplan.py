@@ -0,0 +1,840 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+## @file ostap/stats/statplan.py
+#  ``Statistical plan'': collect many statistics for trees and datasets
+#  in a single pass over the data.
+#
+#  Many expressions, selections and requested statistics
+#  (counts, sums, moments, covariances, min/max and approximate quantiles)
+#  are declared first, and then all of them are obtained from
+#  the single (chunked, columnar) pass over the tree/chain/dataset.
+#  All accumulators are mergeable, therefore the processing
+#  can be split and parallelised using <code>ostap.parallel</code>
+#
+#  @code
+#  plan = StatPlan ()
+#  plan.count      (                  'pt>1'   , name = 'n1' )
+#  plan.stat       ( 'mass'         , 'pt>1'   )
+#  plan.stat       ( 'pt'           , order = 4 )
+#  plan.covariance ( ( 'pt' , 'eta' ) )
+#  plan.quantiles  ( 'mass'         , 10  ) ## deciles
+#  results = plan.run ( tree , 'chi2<10' )
+#  print results['n1'].nEntries()
+#  print results['mass ; pt>1'].mean() , results['pt'].skewness()
+#  print results['mass']
+#  results = plan.run ( chain , parallel = True ) ## parallel processing
+#  @endcode
+#  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
+#  @date   2019-04-12
+# =============================================================================
+""" ``Statistical plan'': collect many statistics for trees and datasets
+in a single pass over the data.
+
+Many expressions, selections and requested statistics
+(counts, sums, moments, covariances, min/max and approximate quantiles)
+are declared first, and then all of them are obtained from
+the single (chunked, columnar) pass over the tree/chain/dataset.
+All accumulators are mergeable, therefore the processing
+can be split and parallelised using `ostap.parallel`
+
+>>> plan = StatPlan ()
+>>> plan.count      (                  'pt>1'   , name = 'n1' )
+>>> plan.stat       ( 'mass'         , 'pt>1'   )
+>>> plan.stat       ( 'pt'           , order = 4 )
+>>> plan.covariance ( ( 'pt' , 'eta' ) )
+>>> plan.quantiles  ( 'mass'         , 10  ) ## deciles
+>>> results = plan.run ( tree , 'chi2<10' )
+>>> print results['n1'].nEntries()
+>>> print results['mass ; pt>1'].mean() , results['pt'].skewness()
+>>> print results['mass']
+>>> results = plan.run ( chain , parallel = True ) ## parallel processing
+"""
+# =============================================================================
+__version__ = "$Revision$"
+__author__  = "Vanya BELYAEV Ivan.Belyaev@itep.ru"
+__date__    = "2019-04-12"
+__all__     = (
+    'StatPlan'       , ## single-pass collection of many statistics
+    'MomentCounter'  , ## mergeable weighted counter of moments
+    'CovCounter'     , ## mergeable weighted counter of covariances
+    'QuantileSketch' , ## mergeable streaming sketch for approximate quantiles
+    )
+# =============================================================================
+import ROOT, math, random
+from   ostap.core.core import VE
+# =============================================================================
+# logging
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' ==  __name__ : logger = getLogger ( 'ostap.stats.statplan' )
+else                       : logger = getLogger ( __name__               )
+# =============================================================================
+## binomial coefficient (small arguments)
+def _choose_ ( n , k ) :
+    r = 1
+    for i in range ( 1 , k + 1 ) : r = r * ( n - k + i ) // i
+    return r
+
+# =============================================================================
+## @class MomentCounter
+#  Mergeable weighted counter of moments (up to the given order), min and max.
+#  The power sums are accumulated relative to the ``shift'' (the mean of the first
+#  chunk), that keeps the numerical precision for the large offsets
+#  @code
+#  cnt = MomentCounter ( order = 4 )
+#  cnt.update ( values , weights )
+#  cnt += another
+#  print cnt.mean() , cnt.rms() , cnt.skewness() , cnt.kurtosis() , cnt.minmax()
+#  @endcode
+class MomentCounter(object) :
+    """Mergeable weighted counter of moments (up to the given order), min and max.
+    The power sums are accumulated relative to the ``shift'' (the mean of the first
+    chunk), that keeps the numerical precision for the large offsets
+    >>> cnt = MomentCounter ( order = 4 )
+    >>> cnt.update ( values , weights )
+    >>> cnt += another
+    >>> print cnt.mean() , cnt.rms() , cnt.skewness() , cnt.kurtosis() , cnt.minmax()
+    """
+    def __init__ ( self , order = 2 ) :
+        assert isinstance ( order , ( int , long ) ) and 1 <= order , \
+               'MomentCounter: invalid order %s' % order
+        self.__order = order
+        self.__n     = 0
+        self.__sumw2 = 0.0
+        self.__shift = None
+        self.__sums  = [ 0.0 ] * ( order + 1 ) ## sum w*(x-shift)**k , k=0..order
+        self.__min   =  float ( 'inf' )
+        self.__max   = -float ( 'inf' )
+
+    # =========================================================================
+    ## update the counter with arrays of values and (optionally) weights
+    def update ( self , values , weights = None ) :
+        """Update the counter with arrays of values and (optionally) weights
+        """
+        import numpy
+        values = numpy.asarray ( values , dtype = numpy.float64 )
+        if weights is not None :
+            weights = numpy.asarray ( weights , dtype = numpy.float64 )
+            mask    = weights != 0
+            values  = values  [ mask ]
+            weights = weights [ mask ]
+        if not len ( values ) : return self
+
+        if self.__shift is None :
+            self.__shift = float ( values.mean () )
+
+        d  = values - self.__shift
+        p  = weights if weights is not None else numpy.ones_like ( d )
+        for k in range ( self.__order + 1 ) :
+            self.__sums [ k ] += float ( p.sum() )
+            if k < self.__order : p = p * d
+
+        self.__n     += len ( values )
+        self.__sumw2 += float ( ( weights * weights ).sum () ) if weights is not None else len ( values )
+        self.__min    = min ( self.__min , float ( values.min () ) )
+        self.__max    = max ( self.__max , float ( values.max () ) )
+        return self
+
+    ## the power sums, relative to another shift
+    def __shifted ( self , shift ) :
+        d = self.__shift - shift
+        return [ sum ( _choose_ ( k , j ) * d ** ( k - j ) * self.__sums [ j ] for j in range ( k + 1 ) )
+                 for k in range ( self.__order + 1 ) ]
+
+    # =========================================================================
+    ## merge with another counter
+    def __iadd__ ( self , other ) :
+        if not isinstance ( other , MomentCounter ) : return NotImplemented
+        assert self.__order == other.order , \
+               'MomentCounter: cannot merge counters of different order'
+        if not other.nEntries () : return self
+        if self.__shift is None  : self.__shift = other.__shift
+        sums = other.__shifted ( self.__shift )
+        self.__sums   = [ a + b for a , b in zip ( self.__sums , sums ) ]
+        self.__n     += other.__n
+        self.__sumw2 += other.__sumw2
+        self.__min    = min ( self.__min , other.__min )
+        self.__max    = max ( self.__max , other.__max )
+        return self
+
+    def __add__ ( self , other ) :
+        if not isinstance ( other , MomentCounter ) : return NotImplemented
+        r  = MomentCounter ( self.__order )
+        r += self
+        r += other
+        return r
+
+    @property
+    def order ( self ) :
+        """``order'' : the maximal order of the moments"""
+        return self.__order
+
+    ## number of entries
+    def nEntries ( self ) :
+        """Number of (non-zero weight) entries"""
+        return self.__n
+    ## sum of weights
+    def sumw     ( self ) :
+        """Sum of weights"""
+        return self.__sums[0]
+    ## sum of squared weights
+    def sumw2    ( self ) :
+        """Sum of squared weights"""
+        return self.__sumw2
+    ## effective number of entries
+    def nEff     ( self ) :
+        """Effective number of entries"""
+        return self.__sums[0] ** 2 / self.__sumw2 if self.__sumw2 else 0.0
+    ## the weighted sum of values
+    def sum      ( self ) :
+        """The weighted sum of values"""
+        if not self.__n : return 0.0
+        return self.__sums[1] + self.__shift * self.__sums[0]
+    ## minimal value
+    def min      ( self ) :
+        """Minimal value"""
+        return self.__min
+    ## maximal value
+    def max      ( self ) :
+        """Maximal value"""
+        return self.__max
+    ## minimal and maximal values
+    def minmax   ( self ) :
+        """Minimal and maximal values"""
+        return self.__min , self.__max
+
+    ## central moment of order k
+    def central_moment ( self , k ) :
+        """Central moment of order k"""
+        assert isinstance ( k , ( int , long ) ) and 0 <= k <= self.__order , \
+               'MomentCounter: invalid order of moment %s' % k
+        if not self.__sums[0] : return 0.0
+        m = self.sum() / self.__sums[0]
+        return self.__shifted ( m ) [ k ] / self.__sums[0]
+
+    ## the mean value (with uncertainty)
+    def mean     ( self ) :
+        """The mean value (with uncertainty)"""
+        if not self.__sums[0] : return VE ( 0 , 0 )
+        m  = self.sum() / self.__sums[0]
+        if self.__order < 2   : return VE ( m , 0 )
+        return VE ( m , self.variance() / self.nEff() )
+    ## variance
+    def variance ( self ) :
+        """Variance"""
+        return self.central_moment ( 2 )
+    ## RMS
+    def rms      ( self ) :
+        """RMS"""
+        return math.sqrt ( max ( 0.0 , self.variance() ) )
+    ## skewness
+    def skewness ( self ) :
+        """Skewness"""
+        v = self.variance ()
+        return self.central_moment ( 3 ) / v ** 1.5 if 0 < v else 0.0
+    ## (excess) kurtosis
+    def kurtosis ( self ) :
+        """(Excess) kurtosis"""
+        v = self.variance ()
+        return self.central_moment ( 4 ) / v ** 2 - 3.0 if 0 < v else 0.0
+
+    def __str__ ( self ) :
+        if not self.__n : return 'MomentCounter(#0)'
+        return 'MomentCounter(#%d,sumw=%.5g,mean=%s,rms=%.5g,min/max=%.5g/%.5g)' % (
+            self.__n , self.sumw () , self.mean().toString ( '%.5g+-%.3g' ) ,
+            self.rms () if 2 <= self.__order else 0 , self.__min , self.__max )
+    __repr__ = __str__
+
+# =============================================================================
+## @class CovCounter
+#  Mergeable weighted counter of means and covariances for several variables
+#  @code
+#  cnt = CovCounter ( 3 )
+#  cnt.update ( matrix , weights ) ## matrix of shape (N,3)
+#  cnt += another
+#  print cnt.means() , cnt.cov() , cnt.corr()
+#  @endcode
+class CovCounter(object) :
+    """Mergeable weighted counter of means and covariances for several variables
+    >>> cnt = CovCounter ( 3 )
+    >>> cnt.update ( matrix , weights ) ## matrix of shape (N,3)
+    >>> cnt += another
+    >>> print cnt.means() , cnt.cov() , cnt.corr()
+    """
+    def __init__ ( self , nvars ) :
+        assert isinstance ( nvars , ( int , long ) ) and 1 <= nvars , \
+               'CovCounter: invalid number of variables %s' % nvars
+        self.__nvars = nvars
+        self.__n     = 0
+        self.__sumw  = 0.0
+        self.__sumw2 = 0.0
+        self.__shift = None
+        self.__s1    = None ## sum w*(x-shift)
+        self.__s2    = None ## sum w*(x-shift)(x-shift)^T
+
+    # =========================================================================
+    ## update the counter with the matrix (N,nvars) of values and (optionally) weights
+    def update ( self , values , weights = None ) :
+        """Update the counter with the matrix (N,nvars) of values and (optionally) weights
+        """
+        import numpy
+        values = numpy.asarray ( values , dtype = numpy.float64 )
+        assert 2 == values.ndim and self.__nvars == values.shape[1] , \
+               'CovCounter: invalid shape %s' % str ( values.shape )
+        if weights is not None :
+            weights = numpy.asarray ( weights , dtype = numpy.float64 )
+            mask    = weights != 0
+            values  = values  [ mask ]
+            weights = weights [ mask ]
+        else : weights = numpy.ones ( len ( values ) , dtype = numpy.float64 )
+        if not len ( values ) : return self
+
+        if self.__shift is None :
+            self.__shift = values.mean ( axis = 0 )
+            self.__s1    = numpy.zeros (   self.__nvars                 )
+            self.__s2    = numpy.zeros ( ( self.__nvars , self.__nvars ) )
+
+        d  = values - self.__shift
+        wd = d * weights [ : , None ]
+        self.__s1    += wd.sum ( axis = 0 )
+        self.__s2    += numpy.dot ( wd.T , d )
+        self.__n     += len ( values )
+        self.__sumw  += float ( weights.sum () )
+        self.__sumw2 += float ( ( weights * weights ).sum () )
+        return self
+
+    # =========================================================================
+    ## merge with another counter
+    def __iadd__ ( self , other ) :
+        if not isinstance ( other , CovCounter ) : return NotImplemented
+        assert self.__nvars == other.__nvars , \
+               'CovCounter: cannot merge counters of different dimensions'
+        if not other.__n : return self
+        import numpy
+        if self.__shift is None :
+            self.__shift = other.__shift.copy()
+            self.__s1    = numpy.zeros (   self.__nvars                 )
+            self.__s2    = numpy.zeros ( ( self.__nvars , self.__nvars ) )
+        ## move the sums of other counter to my shift
+        d  = other.__shift - self.__shift
+        s1 = other.__s1 + other.__sumw * d
+        s2 = other.__s2 + numpy.outer ( other.__s1 , d ) + numpy.outer ( d , other.__s1 ) \
+             + other.__sumw * numpy.outer ( d , d )
+        self.__s1    += s1
+        self.__s2    += s2
+        self.__n     += other.__n
+        self.__sumw  += other.__sumw
+        self.__sumw2 += other.__sumw2
+        return self
+
+    def __add__ ( self , other ) :
+        if not isinstance ( other , CovCounter ) : return NotImplemented
+        r  = CovCounter ( self.__nvars )
+        r += self
+        r += other
+        return r
+
+    ## number of entries
+    def nEntries ( self ) :
+        """Number of (non-zero weight) entries"""
+        return self.__n
+    ## sum of weights
+    def sumw     ( self ) :
+        """Sum of weights"""
+        return self.__sumw
+    ## effective number of entries
+    def nEff     ( self ) :
+        """Effective number of entries"""
+        return self.__sumw ** 2 / self.__sumw2 if self.__sumw2 else 0.0
+    ## the mean values (numpy array)
+    def means    ( self ) :
+        """The mean values (numpy array)"""
+        import numpy
+        if not self.__sumw : return numpy.zeros ( self.__nvars )
+        return self.__shift + self.__s1 / self.__sumw
+    ## the covariance matrix (numpy array)
+    def cov      ( self ) :
+        """The covariance matrix (numpy array)"""
+        import numpy
+        if not self.__sumw : return numpy.zeros ( ( self.__nvars , self.__nvars ) )
+        m = self.__s1 / self.__sumw
+        return self.__s2 / self.__sumw - numpy.outer ( m , m )
+    ## the correlation matrix (numpy array)
+    def corr     ( self ) :
+        """The correlation matrix (numpy array)"""
+        import numpy
+        c = self.cov ()
+        s = numpy.sqrt ( numpy.maximum ( numpy.diag ( c ) , 0 ) )
+        s [ s == 0 ] = 1
+        return c / numpy.outer ( s , s )
+
+    def __str__ ( self ) :
+        return 'CovCounter(#%d,nvars=%d,sumw=%.5g)' % ( self.__n , self.__nvars , self.__sumw )
+    __repr__ = __str__
+
+# =============================================================================
+## @class QuantileSketch
+#  Mergeable streaming sketch for approximate quantiles (KLL-like compactors).
+#
+#  The values are kept in the ``levels'': each item at level h represents
+#  2**h original values. When the level exceeds its capacity <code>k</code>,
+#  it is sorted and every second element (with the random offset)
+#  is promoted to the next level. Each such compaction changes the rank
+#  of any value by not more than the weight 2**h, and the sum of these
+#  weights gives the rigorous (and mergeable) bound for the rank error,
+#  see QuantileSketch.error.
+#  With the capacity <code>k=ceil(32/eps)</code> the relative rank error
+#  never exceeds <code>eps</code> for up to 2**32 entries,
+#  while the typical error is much smaller.
+#  Up to <code>k</code> entries the quantiles are exact.
+#  @code
+#  sketch = QuantileSketch ( eps = 0.001 )
+#  sketch.update ( values )
+#  sketch += another
+#  print sketch.quantile  ( 0.5 ) , sketch.error ()
+#  print sketch.quantiles ( [ 0.1 , 0.5 , 0.9 ] )
+#  @endcode
+#  @attention the weights are used only as selection criteria
+#             (zero/non-zero), the sketch is not weighted
+class QuantileSketch(object) :
+    """Mergeable streaming sketch for approximate quantiles (KLL-like compactors).
+
+    The values are kept in the ``levels'': each item at level h represents
+    2**h original values. When the level exceeds its capacity k,
+    it is sorted and every second element (with the random offset)
+    is promoted to the next level. Each such compaction changes the rank
+    of any value by not more than the weight 2**h, and the sum of these
+    weights gives the rigorous (and mergeable) bound for the rank error,
+    see QuantileSketch.error.
+    With the capacity k=ceil(32/eps) the relative rank error
+    never exceeds eps for up to 2**32 entries,
+    while the typical error is much smaller.
+    Up to k entries the quantiles are exact.
+
+    >>> sketch = QuantileSketch ( eps = 0.001 )
+    >>> sketch.update ( values )
+    >>> sketch += another
+    >>> print sketch.quantile  ( 0.5 ) , sketch.error ()
+    >>> print sketch.quantiles ( [ 0.1 , 0.5 , 0.9 ] )
+    - the weights are used only as selection criteria (zero/non-zero),
+    the sketch is not weighted
+    """
+    def __init__ ( self , eps = 0.001 ) :
+        assert isinstance ( eps , float ) and 0 < eps < 0.5 , \
+               'QuantileSketch: invalid precision %s' % eps
+        self.__eps    = eps
+        self.__k      = int ( math.ceil ( 32.0 / eps ) )
+        self.__levels = []
+        self.__n      = 0
+        self.__err    = 0    ## the accumulated bound for the rank error
+        self.__min    =  float ( 'inf' )
+        self.__max    = -float ( 'inf' )
+
+    @property
+    def eps      ( self ) :
+        """``eps'' : the declared relative rank precision"""
+        return self.__eps
+    @property
+    def capacity ( self ) :
+        """``capacity'' : the capacity of each level"""
+        return self.__k
+
+    ## number of entries
+    def nEntries ( self ) :
+        """Number of entries"""
+        return self.__n
+    ## the actual bound for the relative rank error
+    def error    ( self ) :
+        """The actual bound for the relative rank error"""
+        return float ( self.__err ) / self.__n if self.__n else 0.0
+    ## number of stored items
+    def size     ( self ) :
+        """Number of stored items"""
+        return sum ( len ( l ) for l in self.__levels )
+
+    ## compact the levels
+    def __compact ( self ) :
+        import numpy
+        h = 0
+        while h < len ( self.__levels ) :
+            level = self.__levels [ h ]
+            if self.__k <= len ( level ) :
+                level = numpy.sort ( level )
+                m     = len ( level ) - len ( level ) % 2
+                r     = random.randint ( 0 , 1 )
+                up    = level [ r : m : 2 ]
+                self.__levels [ h ] = level [ m: ]
+                if h + 1 == len ( self.__levels ) : self.__levels.append ( up )
+                else : self.__levels [ h + 1 ] = numpy.concatenate ( [ self.__levels [ h + 1 ] , up ] )
+                self.__err += 2 ** h
+            h += 1
+
+    # =========================================================================
+    ## update the sketch with array of values and (optionally) weights/selection
+    def update ( self , values , weights = None ) :
+        """Update the sketch with array of values and (optionally) weights/selection
+        """
+        import numpy
+        values = numpy.asarray ( values , dtype = numpy.float64 ).ravel()
+        if weights is not None :
+            values = values [ numpy.asarray ( weights ) != 0 ]
+        if not len ( values ) : return self
+        self.__n   += len ( values )
+        self.__min  = min ( self.__min , float ( values.min () ) )
+        self.__max  = max ( self.__max , float ( values.max () ) )
+        if not self.__levels : self.__levels.append ( values.copy() )
+        else : self.__levels [ 0 ] = numpy.concatenate ( [ self.__levels [ 0 ] , values ] )
+        self.__compact ()
+        return self
+
+    # =========================================================================
+    ## merge with another sketch
+    def __iadd__ ( self , other ) :
+        if not isinstance ( other , QuantileSketch ) : return NotImplemented
+        if not other.__n : return self
+        import numpy
+        for h , level in enumerate ( other.__levels ) :
+            if h < len ( self.__levels ) :
+                self.__levels [ h ] = numpy.concatenate ( [ self.__levels [ h ] , level ] )
+            else : self.__levels.append ( level.copy () )
+        self.__n   += other.__n
+        self.__err += other.__err
+        self.__min  = min ( self.__min , other.__min )
+        self.__max  = max ( self.__max , other.__max )
+        self.__eps  = max ( self.__eps , other.__eps )
+        self.__k    = min ( self.__k   , other.__k   )
+        self.__compact ()
+        return self
+
+    def __add__ ( self , other ) :
+        if not isinstance ( other , QuantileSketch ) : return NotImplemented
+        r  = QuantileSketch ( self.__eps )
+        r += self
+        r += other
+        return r
+
+    # =========================================================================
+    ## get the approximate quantiles
+    #  @code
+    #  sketch = ...
+    #  q1 , q2 , q3 = sketch.quantiles ( [ 0.25 , 0.50 , 0.75 ] )
+    #  @endcode
+    def quantiles ( self , quantiles ) :
+        """Get the approximate quantiles
+        >>> sketch = ...
+        >>> q1 , q2 , q3 = sketch.quantiles ( [ 0.25 , 0.50 , 0.75 ] )
+        """
+        assert self.__n , 'QuantileSketch: no entries!'
+        import numpy
+        values  = numpy.concatenate ( self.__levels )
+        weights = numpy.concatenate ( [ numpy.full ( len ( l ) , 2.0 ** h ) for h , l in enumerate ( self.__levels ) ] )
+        order   = numpy.argsort ( values , kind = 'mergesort' )
+        values  = values  [ order ]
+        cumw    = numpy.cumsum ( weights [ order ] )
+        result  = []
+        for q in quantiles :
+            assert 0 <= q <= 1 , 'QuantileSketch: invalid quantile %s' % q
+            ## the smallest value with the rank not less than q*n
+            i = numpy.searchsorted ( cumw , q * cumw[-1] , side = 'left' )
+            i = min ( max ( i , 0 ) , len ( values ) - 1 )
+            result.append ( float ( values [ i ] ) )
+        return tuple ( result )
+
+    ## get the approximate quantile
+    def quantile ( self , q ) :
+        """Get the approximate quantile"""
+        return self.quantiles ( [ q ] ) [ 0 ]
+
+    ## get the approximate median
+    def median   ( self ) :
+        """Get the approximate median"""
+        return self.quantile  ( 0.5 )
+
+    ## minimal and maximal values
+    def minmax   ( self ) :
+        """Minimal and maximal values"""
+        return self.__min , self.__max
+
+    def __str__ ( self ) :
+        return 'QuantileSketch(#%d,eps=%.3g,size=%d,error<%.3g)' % ( self.__n , self.__eps , self.size () , self.error () )
+    __repr__ = __str__
+
+# =============================================================================
+## the list of quantiles from various specifications:
+#  - single quantile
+#  - list of quantiles
+#  - number of equal intervals, e.g. 10 for deciles
+def quantiles_list ( quantiles ) :
+    """The list of quantiles from various specifications:
+    - single quantile
+    - list of quantiles
+    - number of equal intervals, e.g. 10 for deciles
+    """
+    if   isinstance ( quantiles , float ) and 0 < quantiles < 1 :
+        quantiles = [ quantiles ]
+    elif isinstance ( quantiles , ( int , long ) ) and 1 < quantiles :
+        N         = quantiles
+        quantiles = ( float ( i ) / N for i in xrange ( 1 , N ) )
+    qq = []
+    for q in quantiles :
+        assert isinstance ( q , float ) and 0 < q < 1 , 'Invalid quantile:%s' % q
+        qq.append ( q )
+    qq.sort ()
+    return tuple ( qq )
+
+# =============================================================================
+## @class StatPlan
+#  ``Statistical plan'': declare many statistics and collect all of them
+#  in a single pass over the tree/chain/dataset
+#  @code
+#  plan = StatPlan ()
+#  plan.count      (                  'pt>1'    , name = 'n1' )
+#  plan.stat       ( 'mass'         , 'pt>1'    ) ## name: 'mass ; pt>1'
+#  plan.stat       ( 'pt'           , order = 4 ) ## name: 'pt'
+#  plan.covariance ( ( 'pt' , 'eta' ) )           ## name: 'pt , eta'
+#  plan.quantiles  ( 'mass'         , 10        ) ## name: 'mass'
+#  results = plan.run ( tree , 'chi2<10' )
+#  @endcode
+#  The results are
+#  - MomentCounter for <code>count</code> and <code>stat</code>
+#  - CovCounter    for <code>covariance</code>
+#  - tuple of quantiles (the same format as for <code>data_quantiles</code>)
+#    for <code>quantiles</code>
+#  The ``cuts'' of individual requests are selection/weight expressions,
+#  the global ``cuts'' in <code>run</code> are selection applied to all requests
+#  @attention for datasets the dataset weight is not applied automatically,
+#             use the weight variable in the cuts
+class StatPlan(object) :
+    """``Statistical plan'': declare many statistics and collect all of them
+    in a single pass over the tree/chain/dataset
+    >>> plan = StatPlan ()
+    >>> plan.count      (                  'pt>1'    , name = 'n1' )
+    >>> plan.stat       ( 'mass'         , 'pt>1'    ) ## name: 'mass ; pt>1'
+    >>> plan.stat       ( 'pt'           , order = 4 ) ## name: 'pt'
+    >>> plan.covariance ( ( 'pt' , 'eta' ) )           ## name: 'pt , eta'
+    >>> plan.quantiles  ( 'mass'         , 10        ) ## name: 'mass'
+    >>> results = plan.run ( tree , 'chi2<10' )
+    The results are
+    - MomentCounter for `count` and `stat`
+    - CovCounter    for `covariance`
+    - tuple of quantiles (the same format as for `data_quantiles`) for `quantiles`
+    The ``cuts'' of individual requests are selection/weight expressions,
+    the global ``cuts'' in `run` are selection applied to all requests
+    - for datasets the dataset weight is not applied automatically,
+    use the weight variable in the cuts
+    """
+    def __init__ ( self ) :
+        self.__requests = []
+
+    ## add the request
+    def __add ( self , kind , exprs , cuts , name , arg ) :
+        cuts = str ( cuts ).strip ()
+        if not name :
+            name = ' , '.join ( exprs )
+            if cuts : name = '%s ; %s' % ( name , cuts )
+        assert not name in self.names () , 'StatPlan: duplicated name %s' % name
+        self.__requests.append ( ( name , kind , exprs , cuts , arg ) )
+        return name
+
+    ## the names of all requests
+    def names ( self ) :
+        """The names of all requests"""
+        return tuple ( r[0] for r in self.__requests )
+
+    def __len__ ( self ) : return len ( self.__requests )
+
+    # =========================================================================
+    ## count the entries (and the sum of weights)
+    #  @code
+    #  plan.count ( 'pt>1' , name = 'n1' )
+    #  @endcode
+    #  @return the name of the request
+    def count ( self , cuts = '' , name = None ) :
+        """Count the entries (and the sum of weights)
+        >>> plan.count ( 'pt>1' , name = 'n1' )
+        - return the name of the request
+        """
+        if not name : name = 'count ; %s' % str ( cuts ).strip() if str ( cuts ).strip() else 'count'
+        return self.__add ( 'stat' , ( '1' , ) , cuts , name , 1 )
+
+    # =========================================================================
+    ## collect the sum, moments (up to the given order) and min/max for the expression
+    #  @code
+    #  plan.stat ( 'mass' , 'pt>1' , order = 4 )
+    #  @endcode
+    #  @return the name of the request
+    def stat ( self , expression , cuts = '' , order = 2 , name = None ) :
+        """Collect the sum, moments (up to the given order) and min/max for the expression
+        >>> plan.stat ( 'mass' , 'pt>1' , order = 4 )
+        - return the name of the request
+        """
+        expression = str ( expression ).strip()
+        assert expression , 'StatPlan: empty expression'
+        assert isinstance ( order , ( int , long ) ) and 1 <= order , 'StatPlan: invalid order %s' % order
+        return self.__add ( 'stat' , ( expression , ) , cuts , name , order )
+
+    # =========================================================================
+    ## collect the means and covariance matrix for several expressions
+    #  @code
+    #  plan.covariance ( ( 'pt' , 'eta' , 'mass' ) , 'pt>1' )
+    #  @endcode
+    #  @return the name of the request
+    def covariance ( self , expressions , cuts = '' , name = None ) :
+        """Collect the means and covariance matrix for several expressions
+        >>> plan.covariance ( ( 'pt' , 'eta' , 'mass' ) , 'pt>1' )
+        - return the name of the request
+        """
+        from ostap.trees.trees import _vars_
+        expressions = tuple ( _vars_ ( expressions ) )
+        assert expressions , 'StatPlan: empty list of expressions'
+        return self.__add ( 'cov' , expressions , cuts , name , len ( expressions ) )
+
+    # =========================================================================
+    ## collect the approximate quantiles for the expression using the streaming sketch
+    #  @code
+    #  plan.quantiles ( 'mass' , 10 ) ## deciles
+    #  plan.quantiles ( 'mass' , ( 0.1 , 0.5 , 0.9 ) , 'pt>1' , eps = 1.e-4 )
+    #  @endcode
+    #  @return the name of the request
+    #  @see QuantileSketch
+    def quantiles ( self , expression , quantiles , cuts = '' , eps = 0.001 , name = None ) :
+        """Collect the approximate quantiles for the expression using the streaming sketch
+        >>> plan.quantiles ( 'mass' , 10 ) ## deciles
+        >>> plan.quantiles ( 'mass' , ( 0.1 , 0.5 , 0.9 ) , 'pt>1' , eps = 1.e-4 )
+        - return the name of the request
+        - see QuantileSketch
+        """
+        expression = str ( expression ).strip()
+        assert expression , 'StatPlan: empty expression'
+        return self.__add ( 'quantiles' , ( expression , ) , cuts , name ,
+                            ( quantiles_list ( quantiles ) , eps ) )
+
+    # =========================================================================
+    ## all columns, needed for the plan
+    def columns ( self ) :
+        """All columns, needed for the plan"""
+        columns = []
+        for name , kind , exprs , cuts , arg in self.__requests :
+            for e in exprs + ( ( cuts , ) if cuts else () ) :
+                if not e in columns : columns.append ( e )
+        return tuple ( columns )
+
+    # =========================================================================
+    ## create the fresh (empty) accumulators
+    def accumulators ( self ) :
+        """Create the fresh (empty) accumulators"""
+        accs = {}
+        for name , kind , exprs , cuts , arg in self.__requests :
+            if   'stat' == kind : accs [ name ] = MomentCounter  ( arg )
+            elif 'cov'  == kind : accs [ name ] = CovCounter     ( arg )
+            else                : accs [ name ] = QuantileSketch ( arg[1] )
+        return accs
+
+    # =========================================================================
+    ## fill the accumulators from the structured array
+    def fill ( self , accumulators , block ) :
+        """Fill the accumulators from the structured array"""
+        import numpy
+        for name , kind , exprs , cuts , arg in self.__requests :
+            weights = block [ cuts ] if cuts else None
+            acc     = accumulators [ name ]
+            if 'cov' == kind :
+                values = numpy.column_stack ( [ block [ e ] for e in exprs ] )
+            else :
+                values = block [ exprs [ 0 ] ]
+            acc.update ( values , weights )
+        return accumulators
+
+    # =========================================================================
+    ## process the tree/chain/dataset and fill the accumulators (single pass)
+    #  @code
+    #  accs = plan.process ( tree , 'chi2<10' )
+    #  @endcode
+    def process ( self , data , cuts = '' , first = 0 , last = -1 , chunk = 10**6 , progress = False ) :
+        """Process the tree/chain/dataset and fill the accumulators (single pass)
+        >>> accs = plan.process ( tree , 'chi2<10' )
+        """
+        accs    = self.accumulators ()
+        columns = self.columns      ()
+        if not columns : return accs
+
+        if isinstance ( data , ROOT.RooAbsData ) :
+            store = data.store()
+            if store and store.tree() : data = store.tree()
+            else :
+                from ostap.fitting.roofit import useStorage
+                from ostap.core.core      import dsID
+                with useStorage () : cloned = data.Clone ( dsID () )
+                try     : return self.process ( cloned , cuts , first , last , chunk , progress )
+                finally :
+                    cloned.reset ()
+                    del cloned
+
+        import ostap.trees.trees
+        for block in data.iter_arrays ( columns , cuts , chunk , first , last , progress ) :
+            self.fill ( accs , block )
+        return accs
+
+    # =========================================================================
+    ## convert the accumulators into results
+    def results ( self , accumulators ) :
+        """Convert the accumulators into results"""
+        results = {}
+        for name , kind , exprs , cuts , arg in self.__requests :
+            acc = accumulators [ name ]
+            if 'quantiles' == kind :
+                results [ name ] = acc.quantiles ( arg [ 0 ] ) if acc.nEntries() else ()
+            else : results [ name ] = acc
+        return results
+
+    # =========================================================================
+    ## collect all requested statistics in a single pass over the data
+    #  @code
+    #  plan    = ...
+    #  results = plan.run ( tree  , 'chi2<10' )
+    #  results = plan.run ( chain , 'chi2<10' , parallel = True )
+    #  @endcode
+    #  @param data     TTree/TChain or RooAbsData
+    #  @param cuts     global selection
+    #  @param first    the first entry to process
+    #  @param last     the last entry to process
+    #  @param chunk    the size of chunk for the columnar readout
+    #  @param parallel use the parallel processing (only for TTree/TChain)
+    #  @param silent   silent processing
+    #  @return the dictionary of results (keyed by the request names)
+    def run ( self , data , cuts = '' , first = 0 , last = -1 , chunk = 10**6 ,
+              parallel = False , silent = True ) :
+        """Collect all requested statistics in a single pass over the data
+        >>> plan    = ...
+        >>> results = plan.run ( tree  , 'chi2<10' )
+        >>> results = plan.run ( chain , 'chi2<10' , parallel = True )
+        - data     : TTree/TChain or RooAbsData
+        - cuts     : global selection
+        - first    : the first entry to process
+        - last     : the last entry to process
+        - chunk    : the size of chunk for the columnar readout
+        - parallel : use the parallel processing (only for TTree/TChain)
+        - silent   : silent processing
+        Return the dictionary of results (keyed by the request names)
+        """
+        if parallel and isinstance ( data , ROOT.TTree ) :
+            from ostap.parallel.kisa import pStatPlan
+            accs = pStatPlan ( data , self , cuts , first , last , chunk , silent )
+        else :
+            accs = self.process ( data , cuts , first , last , chunk , progress = not silent )
+        return self.results ( accs )
+
+    def __str__ ( self ) :
+        return 'StatPlan(%s)' % ','.join ( self.names () )
+    __repr__ = __str__
+
+# =============================================================================
+if '__main__' == __name__ :
+
+    from ostap.utils.docme import docme
+    docme ( __name__ , logger = logger )
+
+# =============================================================================
+# The END
+# =============================================================================
@@ -22,6 +22,9 @@
 - data_quartiles       - get three quartiles 
 - data_quintiles       - get four  quintiles 
 - data_deciles         - get nine  deciles
+- data_sketch          - get the streaming sketch for approximate quantiles
+- data_approx_quantile - get the approximate quantile  (streaming sketch)
+- data_approx_quantiles- get the approximate quantiles (streaming sketch)
 """
 # =============================================================================
 __version__ = "$Revision$"
@@ -43,6 +46,9 @@ __all__     = (
     'data_quartiles'      , ## get three quartiles 
     'data_quintiles'      , ## get four  quintiles 
     'data_deciles'        , ## get nine  deciles
+    'data_sketch'           , ## get the streaming sketch for approximate quantiles 
+    'data_approx_quantile'  , ## get the approximate quantile  (streaming sketch)
+    'data_approx_quantiles' , ## get the approximate quantiles (streaming sketch)
     'data_decorate'       , ## technical function to decorate the class
     )
 # =============================================================================
@@ -52,7 +58,9 @@ from ostap.logger.logger import getLogger
 if '__main__' ==  __name__ : logger = getLogger ( 'ostap.stats.statvars' )
 else                       : logger = getLogger ( __name__               )
 # =============================================================================
-from ostap.core.core import Ostap 
+import ROOT 
+from ostap.core.core      import Ostap 
+from ostap.stats.statplan import quantiles_list 
 StatVar = Ostap.StatVar 
 # =============================================================================
 ## get the moment of order 'order' relative to 'center'
@@ -164,16 +172,23 @@ def data_kurtosis ( data , expression , cuts  = '' , *args ) :
 #  data =  ...
 #  print data_quantile ( data , 0.10 , 'mass' , 'pt>1' ) 
 #  print data.quantile (        0.10 , 'mass' , 'pt>1' ) ## ditto
+#  print data.quantile (        0.10 , 'mass' , 'pt>1' , approximate = True ) ## streaming sketch 
 #  @endcode
 #  @see Ostap::StatVar::quantile
-def  data_quantile ( data , q , expression , cuts  = '' , *args ) :
+#  @see data_approx_quantile 
+def  data_quantile ( data , q , expression , cuts  = '' , *args , **kwargs ) :
     """Get the quantile
     >>> data =  ...
     >>> print data_quantile ( data , 0.1 , 'mass' , 'pt>1' ) 
     >>> print data.quantile (        0.1 , 'mass' , 'pt>1' ) ## ditto
+    >>> print data.quantile (        0.1 , 'mass' , 'pt>1' , approximate = True ) ## streaming sketch 
     - see Ostap::StatVar::quantile
+    - see data_approx_quantile 
     """
     assert isinstance ( q , float ) and 0 < q < 1 , 'Invalid quantile:%s' % q 
+    if kwargs.pop ( 'approximate' , False ) :
+        return data_approx_quantile ( data , q , expression , cuts , *args , **kwargs )
+    assert not kwargs , 'Invalid keyword arguments: %s' % kwargs.keys()
     return StatVar.quantile ( data , q , expression , cuts , *args )
 
 # =============================================================================
@@ -208,14 +223,14 @@ def data_interval ( data , qmin ,  qmax , expression , cuts = '' , *args ) :
 #  print data.median (        'mass' , 'pt>1' ) ## ditto
 #  @endcode 
 #  @see Ostap::StatVar::quantile
-def data_median ( data , expression , cuts = '' , *args ) :
+def data_median ( data , expression , cuts = '' , *args , **kwargs ) :
     """Get the median
     >>> data =  ...
     >>> print data_median ( data , 'mass' , 'pt>1' ) 
     >>> print data.median (        'mass' , 'pt>1' ) ##  ditto
     - see Ostap::StatVar::quantile
     """
-    return data_quantile ( data , 0.5 , expression , cuts  , *args ) 
+    return data_quantile ( data , 0.5 , expression , cuts  , *args , **kwargs ) 
 
 # =============================================================================
 ## get the  quantiles 
@@ -227,9 +242,11 @@ def data_median ( data , expression , cuts = '' , *args ) :
 #  print data.quantiles (        [0.1,0.3,0.5] , 'mass' , 'pt>1' ) 
 #  print data.quantiles (        0.12  , 'mass' , 'pt>1' ) 
 #  print data.quantiles (        20    , 'mass' , 'pt>1' ) 
+#  print data.quantiles (        20    , 'mass' , 'pt>1' , approximate = True , eps = 1.e-4 ) ## streaming sketch 
 #  @endcode
 #  @see Ostap::StatVar::quantile
-def data_quantiles ( data , quantiles , expression , cuts  = '' , *args ) :
+#  @see data_approx_quantiles 
+def data_quantiles ( data , quantiles , expression , cuts  = '' , *args , **kwargs ) :
     """Get the quantiles
     >>> data =  ...
     >>> print data_quantiles ( data , 0.1       , 'mass' , 'pt>1' ) ## quantile 
@@ -238,19 +255,15 @@ def data_quantiles ( data , quantiles , expression , cuts  = '' , *args ) :
     >>> print data.quantiles (        0.1       , 'mass' , 'pt>1' ) ## quantile 
     >>> print data.quantiles (        (0.1,0.5) , 'mass' , 'pt>1' )
     >>> print data.quantiles (        10        , 'mass' , 'pt>1' ) ## deciles!     
+    >>> print data.quantiles (        10        , 'mass' , 'pt>1' , approximate = True , eps = 1.e-4 ) ## streaming sketch 
     - see Ostap::StatVar::quantile
+    - see data_approx_quantiles 
     """
-    if   isinstance ( quantiles , float ) and 0 < quantiles < 1 : 
-        quantiles = [ quantiles ]
-    elif isinstance ( quantiles , int   ) and 1 < quantiles     :
-        N         = quantiles 
-        quantiles =  ( float ( i ) / N for i in xrange ( 1 , N ) )
-
-    qq = [] 
-    for q in quantiles :
-        assert isinstance ( q , float ) and 0 < q < 1 , 'Invalid quantile:%s' % q
-        qq.append ( q )
-    qq.sort ()
+    if kwargs.pop ( 'approximate' , False ) :
+        return data_approx_quantiles ( data , quantiles , expression , cuts , *args , **kwargs )
+    assert not kwargs , 'Invalid keyword arguments: %s' % kwargs.keys()
+    
+    qq = quantiles_list ( quantiles ) 
 
     from ostap.math.base import doubles
     rr = StatVar.quantiles ( data , doubles ( qq )  , expression , cuts , *args )
@@ -265,14 +278,14 @@ def data_quantiles ( data , quantiles , expression , cuts  = '' , *args ) :
 #  print data.terciles(        'mass' , 'pt>1' )   ##  ditto
 #  @endcode 
 #  @see Ostap::StatVar::quantile
-def data_terciles ( data , expression , cuts = '' , *args ) :
+def data_terciles ( data , expression , cuts = '' , *args , **kwargs ) :
     """Get the terciles
     >>> data =  ...
     >>> print data_terciles ( data , 'mass' , 'pt>1' ) 
     >>> print data.terciles (        'mass' , 'pt>1' ) ## ditto
     - see Ostap::StatVar::quantile
     """
-    return data_quantiles ( data  , 3 , expression  , cuts , *args ) 
+    return data_quantiles ( data  , 3 , expression  , cuts , *args , **kwargs ) 
 
 # =============================================================================
 ## Get the quartiles 
@@ -282,14 +295,14 @@ def data_terciles ( data , expression , cuts = '' , *args ) :
 #  print data.quartiles(        'mass' , 'pt>1' ) ##  ditto
 #  @endcode 
 #  @see Ostap::StatVar::quantile
-def data_quartiles ( data , expression , cuts = '' , *args ) :
+def data_quartiles ( data , expression , cuts = '' , *args , **kwargs ) :
     """Get the quartiles
     >>> data =  ...
     >>> print data_quartiles ( data , 'mass' , 'pt>1' ) 
     >>> print data.quartiles (        'mass' , 'pt>1' ) ##  ditto
     - see Ostap::StatVar::quantile
     """
-    return data_quantiles ( data  , 4 , expression  , cuts , *args ) 
+    return data_quantiles ( data  , 4 , expression  , cuts , *args , **kwargs ) 
 
 # =============================================================================
 ## Get the quintiles
@@ -299,14 +312,14 @@ def data_quartiles ( data , expression , cuts = '' , *args ) :
 #  print data.quintiles(        'mass' , 'pt>1' ) ## ditto
 #  @endcode 
 #  @see Ostap::StatVar::quantile
-def data_quintiles ( data , expression , cuts = '' , *args ) :
+def data_quintiles ( data , expression , cuts = '' , *args , **kwargs ) :
     """Get the quartiles
     >>> data =  ...
     >>> print data.quintiles ( 'mass' , 'pt>1' ) 
     >>> print data.quintiles ( 'mass' , 'pt>1' ) ## ditto
     - see Ostap::StatVar::quantile
     """
-    return data_quantiles ( data  , 5 , expression  , cuts , *args ) 
+    return data_quantiles ( data  , 5 , expression  , cuts , *args , **kwargs ) 
 
 # =============================================================================
 ## Get the deciles 
@@ -316,14 +329,14 @@ def data_quintiles ( data , expression , cuts = '' , *args ) :
 #  print data.deciles(        'mass' , 'pt>1' ) ## ditto
 #  @endcode 
 #  @see Ostap::StatVar::quantile
-def data_deciles ( data , expression , cuts = '' , *args ) :
+def data_deciles ( data , expression , cuts = '' , *args , **kwargs ) :
     """Get the deciles
     >>> data =  ...
     >>> print data_deciles ( data , 'mass' , 'pt>1' ) 
     >>> print data.deciles (        'mass' , 'pt>1' ) ## ditto
     - see Ostap::StatVar::quantile
     """
-    return data_quantiles ( data  , 10 , expression  , cuts , *args ) 
+    return data_quantiles ( data  , 10 , expression  , cuts , *args , **kwargs ) 
 
 # =============================================================================
 ## Get the mean (with uncertainty):
@@ -357,6 +370,100 @@ def data_rms ( data , expression , cuts  = '' , *args ) :
     """
     return data_central_moment ( data , 2 , expression , cuts , *args )**0.5
 
+# =============================================================================
+## get the streaming sketch for approximate quantiles in a single pass over the data
+#  The sketch is mergeable, therefore for TTree/TChain the processing
+#  can be parallelised (<code>Chain.split</code> + <code>WorkManager</code>)
+#  @code
+#  data   = ...
+#  sketch = data_sketch ( data , 'mass' , 'pt>1' , eps = 1.e-4 )
+#  sketch = data_sketch ( data , 'mass' , 'pt>1' , parallel = True ) 
+#  print sketch.quantiles ( [ 0.1 , 0.5 , 0.9 ] ) , sketch.error () 
+#  @endcode
+#  @param data     TTree/TChain or RooAbsData 
+#  @param cuts     selection 
+#  @param first    the first entry to process 
+#  @param last     the last entry to process 
+#  @param eps      the declared bound for the relative rank error 
+#  @param parallel use the parallel processing (only for TTree/TChain)
+#  @param balanced use cost-aware splitting for the parallel processing (see Chain.balanced_split)
+#  @param chunk_size the size of items for the regular splitting (see Chain.split)
+#  @see ostap.stats.statplan.QuantileSketch
+def data_sketch ( data , expression , cuts = '' , first = 0 , last = -1 , eps = 0.001 ,
+                  parallel = False , balanced = True , chunk_size = 1000000 , silent = True ) :
+    """Get the streaming sketch for approximate quantiles in a single pass over the data
+    The sketch is mergeable, therefore for TTree/TChain the processing
+    can be parallelised (Chain.split + WorkManager) 
+    >>> data   = ...
+    >>> sketch = data_sketch ( data , 'mass' , 'pt>1' , eps = 1.e-4 )
+    >>> sketch = data_sketch ( data , 'mass' , 'pt>1' , parallel = True ) 
+    >>> print sketch.quantiles ( [ 0.1 , 0.5 , 0.9 ] ) , sketch.error () 
+    - data       : TTree/TChain or RooAbsData 
+    - cuts       : selection 
+    - first      : the first entry to process 
+    - last       : the last entry to process 
+    - eps        : the declared bound for the relative rank error 
+    - parallel   : use the parallel processing (only for TTree/TChain)
+    - balanced   : use cost-aware splitting for the parallel processing (see Chain.balanced_split)
+    - chunk_size : the size of items for the regular splitting (see Chain.split)
+    - see ostap.stats.statplan.QuantileSketch
+    """
+    from ostap.stats.statplan import StatPlan
+    plan = StatPlan ()
+    name = plan.quantiles ( expression , 0.5 , eps = eps , name = 'sketch' )
+    if parallel and isinstance ( data , ROOT.TTree ) :
+        from ostap.parallel.kisa import pStatPlan 
+        accs = pStatPlan ( data , plan , cuts , first , last , silent = silent ,
+                           balanced = balanced , chunk_size = chunk_size )
+    else :
+        accs = plan.process ( data , cuts , first , last , progress = not silent )
+    return accs [ name ]
+
+# =============================================================================
+## get the approximate quantiles using the mergeable streaming sketch,
+#  the result has the same format as for <code>data_quantiles</code>
+#  @code
+#  data =  ...
+#  print data_approx_quantiles ( data , 10 , 'mass' , 'pt>1' , eps = 1.e-4 )
+#  print data_approx_quantiles ( data , 10 , 'mass' , 'pt>1' , parallel = True )
+#  print data.quantiles        (        10 , 'mass' , 'pt>1' , approximate = True ) ## ditto 
+#  @endcode
+#  The relative rank error of each quantile does not exceed <code>eps</code>
+#  @see data_sketch
+#  @see ostap.stats.statplan.QuantileSketch
+def data_approx_quantiles ( data , quantiles , expression , cuts = '' , *args , **kwargs ) :
+    """Get the approximate quantiles using the mergeable streaming sketch,
+    the result has the same format as for `data_quantiles`
+    >>> data =  ...
+    >>> print data_approx_quantiles ( data , 10 , 'mass' , 'pt>1' , eps = 1.e-4 )
+    >>> print data_approx_quantiles ( data , 10 , 'mass' , 'pt>1' , parallel = True )
+    >>> print data.quantiles        (        10 , 'mass' , 'pt>1' , approximate = True ) ## ditto 
+    - the relative rank error of each quantile does not exceed eps
+    - see data_sketch
+    - see ostap.stats.statplan.QuantileSketch
+    """
+    qq     = quantiles_list ( quantiles ) 
+    sketch = data_sketch    ( data , expression , cuts , *args , **kwargs )
+    return sketch.quantiles ( qq ) 
+
+# =============================================================================
+## get the approximate quantile using the mergeable streaming sketch
+#  @code
+#  data =  ...
+#  print data_approx_quantile ( data , 0.1 , 'mass' , 'pt>1' , eps = 1.e-4 )
+#  print data.quantile        (        0.1 , 'mass' , 'pt>1' , approximate = True ) ## ditto 
+#  @endcode
+#  @see data_approx_quantiles 
+def data_approx_quantile ( data , q , expression , cuts = '' , *args , **kwargs ) :
+    """Get the approximate quantile using the mergeable streaming sketch
+    >>> data =  ...
+    >>> print data_approx_quantile ( data , 0.1 , 'mass' , 'pt>1' , eps = 1.e-4 )
+    >>> print data.quantile        (        0.1 , 'mass' , 'pt>1' , approximate = True ) ## ditto 
+    - see data_approx_quantiles 
+    """
+    assert isinstance ( q , float ) and 0 < q < 1 , 'Invalid quantile:%s' % q 
+    return data_approx_quantiles ( data , q , expression , cuts , *args , **kwargs ) [ 0 ]
+
 data_get_moment      .__doc__ += '\n' + StatVar.get_moment     .__doc__  
 data_moment          .__doc__ += '\n' + StatVar.moment         .__doc__
 data_central_moment  .__doc__ += '\n' + StatVar.central_moment .__doc__ 
@@ -22,7 +22,8 @@ from   ostap.stats.moments import  ( Mean          ,
                                      cl_asymm      ,
                                      skewness      ,
                                      quantile      ,
-                                     kurtosis      )
+                                     kurtosis      ,
+                                     Summary       )
 # ============================================================================= 
 # logging 
 # =============================================================================
@@ -120,11 +121,33 @@ def test_moments2 () :
     
     logger.info ( 80*'*' ) 
 
+# ============================================================================= 
+def test_summary () :
+    
+    from math import exp, sqrt, pi 
+    gau = lambda x : exp(-0.5*x*x)
+
+    s   = Summary ( gau , -10 , 10 )
+    logger.info ( 'Summary(gauss,-10,10): %s, #evaluations %d' % ( s , s.neval ) ) 
+
+    assert abs ( s.norm - sqrt ( 2 * pi ) ) < 1.e-6 , 'Invalid normalization %s' % s.norm 
+    assert abs ( s.median ()                      ) < 1.e-6 , 'Invalid median'
+    assert abs ( s.quantile ( 0.1 ) + 1.281551566 ) < 1.e-6 , 'Invalid quantile'
+    assert abs ( s.quantile ( 0.9 ) - 1.281551566 ) < 1.e-6 , 'Invalid quantile'
+    assert abs ( s.mode     ()                    ) < 1.e-6 , 'Invalid mode'
+    
+    x1 , x2 = s.cl_asymm ( 0.682689492 )
+    assert abs ( x1 + 1 ) < 1.e-5 and abs ( x2 - 1 ) < 1.e-5 , 'Invalid interval (%s,%s)' % ( x1 , x2 )
+
+    logger.info ( 'CL(gauss,0.68,-10,10)  %s ' % s.cl_symm  ( 0.68 ) )
+    logger.info ( 'CLa(gauss,0.68,-10,10) (%.3f,%.3f) ' % s.cl_asymm ( 0.68 ) ) 
+    
 # =============================================================================
 if '__main__' == __name__ :
 
     test_moments1()
     test_moments2()
+    test_summary ()
         
 # =============================================================================
 # The END 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Copyright (c) Ostap developpers.
+# =============================================================================
+""" Test module for ostap/stats/statplan.py
+- single-pass collection of many statistics
+- streaming approximate quantiles 
+"""
+# =============================================================================
+import ROOT, array, random
+import ostap.trees.trees
+from   ostap.stats.statplan import StatPlan, QuantileSketch
+from   ostap.stats.statvars import data_sketch 
+# =============================================================================
+# logging
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' ==  __name__ : logger = getLogger ( 'test_statplan' )
+else                       : logger = getLogger ( __name__        )
+# =============================================================================
+
+def make_tree ( nentries = 10000 ) :
+
+    tree = ROOT.TTree ( 'tree_statplan' , 'tree for stat plan' )
+    x    = array.array ( 'd' , [ 0 ] )
+    y    = array.array ( 'd' , [ 0 ] )
+    tree.Branch ( 'x' , x , 'x/D' )
+    tree.Branch ( 'y' , y , 'y/D' )
+    for i in range ( nentries ) :
+        x[0] = random.uniform ( 0 , 10 )
+        y[0] = random.gauss   ( 1000 , 1 )
+        tree.Fill()
+    return tree
+
+# =============================================================================
+def test_statplan () :
+
+    tree = make_tree ()
+
+    plan = StatPlan ()
+    plan.count      (            'x<5'     , name = 'n'  )
+    plan.stat       ( 'y'      , 'x<5'     , order = 4   )
+    plan.stat       ( 'x'      , 'y>1000'  )
+    plan.covariance ( 'x , y'  )
+    plan.quantiles  ( 'x'      , 10        )
+
+    results = plan.run ( tree )
+    logger.info ( 'Plan %s' % plan )
+    for name in plan.names () : logger.info ( '%-14s : %s' % ( name , results [ name ] ) )
+
+    ## compare with the regular (one pass per statistic) approach
+    sy = tree.statVar ( 'y' , 'x<5'    )
+    sx = tree.statVar ( 'x' , 'y>1000' )
+    assert results [ 'n' ].nEntries () == tree.statVar ( '1' , 'x<5' ).nEntries () , 'Invalid count'
+    assert results [ 'y ; x<5'    ].nEntries () == sy.nEntries () , 'Invalid number of entries'
+    assert abs ( results [ 'y ; x<5'    ].mean ().value () - sy.mean ().value () ) < 1.e-8 , 'Invalid mean'
+    assert abs ( results [ 'y ; x<5'    ].rms  ()          - sy.rms  ()          ) < 1.e-6 , 'Invalid rms'
+    assert abs ( results [ 'x ; y>1000' ].sum  ()          - sx.sum  ()          ) < 1.e-6 , 'Invalid sum'
+    assert results [ 'x ; y>1000' ].minmax () == ( sx.min () , sx.max () ) , 'Invalid min/max'
+
+    cov = results [ 'x , y' ]
+    assert abs ( cov.corr () [ 0 , 1 ] ) < 0.1 , 'Invalid correlation'
+
+    ## quantiles are exact for the small number of entries
+    qq = results [ 'x' ]
+    ex = tree.quantiles ( 10 , 'x' )
+    assert max ( abs ( a - b ) for a , b in zip ( qq , ex ) ) < 0.01 , 'Invalid quantiles %s vs %s' % ( qq , ex )
+
+    ## mergeable accumulators
+    n    = len ( tree )
+    acc1 = plan.process ( tree , first = 0      , last = n // 3 )
+    acc2 = plan.process ( tree , first = n // 3 , last = n      )
+    for name in plan.names () : acc1 [ name ] += acc2 [ name ]
+    r2   = plan.results ( acc1 )
+    assert abs ( r2 [ 'y ; x<5' ].mean ().value () - sy.mean ().value () ) < 1.e-8 , 'Invalid merged mean'
+    assert abs ( r2 [ 'y ; x<5' ].kurtosis () - results [ 'y ; x<5' ].kurtosis () ) < 1.e-6 , 'Invalid merged kurtosis'
+
+# =============================================================================
+def test_sketch () :
+
+    import numpy
+    values = numpy.random.normal ( size = 10**6 )
+    sketch = QuantileSketch ( eps = 0.01 )
+    for chunk in numpy.array_split ( values , 7 ) :
+        s = QuantileSketch ( eps = 0.01 )
+        s.update ( chunk )
+        sketch += s
+
+    logger.info ( 'Sketch: %s' % sketch )
+    assert sketch.nEntries () == len ( values ) , 'Invalid number of entries'
+    assert sketch.error    () <= sketch.eps     , 'Invalid error bound'
+
+    values.sort ()
+    for q in ( 0.01 , 0.1 , 0.5 , 0.9 , 0.99 ) :
+        v    = sketch.quantile ( q )
+        rank = numpy.searchsorted ( values , v ) / float ( len ( values ) )
+        assert abs ( rank - q ) <= sketch.error () + 1.e-6 , \
+               'Quantile %s: rank %s exceeds the error bound %s' % ( q , rank , sketch.error () )
+
+# =============================================================================
+def test_approx_quantiles () :
+
+    tree  = make_tree ( 100000 )
+
+    exact  = tree.quantiles ( 10 , 'y' , 'x<5' )
+    approx = tree.quantiles ( 10 , 'y' , 'x<5' , approximate = True , eps = 0.01 )
+    sketch = data_sketch    ( tree , 'y' , 'x<5' , eps = 0.01 )
+    
+    logger.info ( 'Exact  deciles: %s' % str ( exact  ) )
+    logger.info ( 'Approx deciles: %s' % str ( approx ) )
+    logger.info ( 'Sketch        : %s' % sketch )
+
+    assert len ( exact ) == len ( approx ) , 'Invalid format of approximate quantiles'
+    assert sketch.error () <= 0.01 , 'Invalid error bound'
+    ## the typical error is much smaller than the declared bound
+    assert max ( abs ( a - b ) for a , b in zip ( exact , approx ) ) < 0.05 , 'Invalid approximate quantiles'
+
+    median = tree.median ( 'y' , 'x<5' , approximate = True )
+    assert abs ( median - 1000 ) < 0.05 , 'Invalid approximate median %s' % median 
+    
+# =============================================================================
+if '__main__' == __name__ :
+
+    test_statplan         ()
+    test_sketch           ()
+    test_approx_quantiles ()
+
+# =============================================================================
+# The END
+# =============================================================================
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ============================================================================= 
+# Copyright (c) Ostap developpers.
+# ============================================================================= 
+""" Test module for ostap/stats/ustat.py.
+"""
+# =============================================================================
+import ROOT, random
+import ostap.fitting.roofit 
+from   ostap.core.core     import Ostap, hID, dsID
+import ostap.stats.ustat   as     uStat 
+# ============================================================================= 
+# logging 
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' ==  __name__ : logger = getLogger ( 'test_ustat' )
+else                       : logger = getLogger ( __name__      )
+# ============================================================================= 
+
+# ============================================================================= 
+def test_ustat () :
+
+    x     = ROOT.RooRealVar ( 'x' , 'x' , -5 , 5 )
+    y     = ROOT.RooRealVar ( 'y' , 'y' , -5 , 5 )
+    mean  = ROOT.RooRealVar ( 'm' , 'm' ,  0 )
+    sigma = ROOT.RooRealVar ( 's' , 's' ,  1 )
+    gx    = ROOT.RooGaussian ( 'gx' , 'gx' , x , mean , sigma )
+    gy    = ROOT.RooGaussian ( 'gy' , 'gy' , y , mean , sigma )
+    pdf   = ROOT.RooProdPdf  ( 'pdf' , 'pdf' , ROOT.RooArgList ( gx , gy ) )
+
+    varset = ROOT.RooArgSet ( x , y )
+    data   = ROOT.RooDataSet ( dsID () , 'data' , varset )
+    for i in range ( 500 ) :
+        x.setVal ( random.gauss ( 0 , 1 ) )
+        y.setVal ( random.gauss ( 0 , 1 ) )
+        data.add ( varset )
+
+    for args in ( ROOT.RooArgSet ( x ) , ROOT.RooArgSet ( x , y ) ) :
+        
+        ## slow C++ engine
+        h1    = ROOT.TH1F ( hID () , 'U-statistics' , 10 , 0 , 1 )
+        t1    = ROOT.Double ( -1 )
+        Ostap.UStat.calculate ( gx if 1 == args.getSize() else pdf , data , h1 , t1 , args )
+
+        ## fast k-d tree engine 
+        h2    = ROOT.TH1F ( hID () , 'U-statistics' , 10 , 0 , 1 )
+        h2 , t2 = uStat.uCalc ( gx if 1 == args.getSize() else pdf , args , data , h2 )
+
+        assert abs ( float ( t1 ) - t2 ) < 1.e-6 * max ( 1 , abs ( t2 ) ) , \
+               'T-statistics differs: %s vs %s' % ( t1 , t2 )
+        for i in range ( 1 , 11 ) :
+            assert h1.GetBinContent ( i ) == h2.GetBinContent ( i ) , 'Histograms differ'
+
+        logger.info ( 'U-statistics (%dD): T=%.5g' % ( args.getSize() , t2 ) )
+        
+# ============================================================================= 
+if '__main__' == __name__ :
+
+    test_ustat ()
+    
+# =============================================================================
+# The END 
+# =============================================================================
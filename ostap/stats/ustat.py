@@ -51,9 +51,12 @@ __date__    = "2010-09-21"
 __version__ = "$Revision$"
 # ============================================================================
 __all__     = (
-    "uPlot" ,  ## make  plot of U-statistics 
-    "uDist" ,  ## calculate  U-statistics 
-    "uCalc" ,  ## calclulate the distance between two data points 
+    "uPlot"    ,  ## make  plot of U-statistics 
+    "uDist"    ,  ## calculate  U-statistics 
+    "uCalc"    ,  ## calclulate the distance between two data points 
+    "uData"    ,  ## numpy copy of the dataset 
+    "uPdf"     ,  ## batch evaluation of PDF for all entries in dataset
+    "uNearest" ,  ## distances to the nearest neighbours (k-d tree)
     )
 # ============================================================================
 import ROOT, math
@@ -95,12 +98,105 @@ def uDist ( x , y ) :
 
     return math.sqrt( dist )
 
+# =============================================================================
+## get the numpy copy of the dataset for the given variables
+#  @code
+#  data  = ...
+#  array = uData ( data , args ) ## 2D-array: ( numEntries , dim )
+#  @endcode 
+def uData ( data , args ) :
+    """Get the numpy copy of the dataset for the given variables
+    >>> data  = ...
+    >>> array = uData ( data , args ) ## 2D-array: ( numEntries , dim )
+    """
+    import numpy
+    import ostap.trees.trees
+    names = [ a.GetName() for a in args ]
+    store = data.store()
+    if store and store.tree() :
+        a = store.tree().arrays ( names )
+        return numpy.column_stack ( [ a [ n ] for n in names ] ).astype ( numpy.float64 )
+    ## convert to tree storage 
+    from ostap.fitting.roofit import useStorage
+    from ostap.core.core      import dsID
+    with useStorage () : cloned = data.Clone ( dsID () )
+    try     : return uData ( cloned , args )
+    finally :
+        cloned.reset ()
+        del cloned 
+
+# =============================================================================
+## evaluate PDF for all entries in dataset (batch evaluation)
+#  @code
+#  values = uPdf ( pdf , data , args ) 
+#  @endcode 
+#  @see Ostap::UStat::evaluate
+def uPdf ( pdf , data , args ) :
+    """Evaluate PDF for all entries in dataset (batch evaluation)
+    >>> values = uPdf ( pdf , data , args ) 
+    - see Ostap.UStat.evaluate
+    """
+    import numpy
+    values = numpy.zeros ( data.numEntries() , dtype = numpy.float64 )
+    if len ( values ) : Ostap.UStat.evaluate ( pdf , data , values , args )
+    return values
+
+# =============================================================================
+## get the distances to the nearest neighbours for all points
+#  - for 1D case the sorting is used
+#  - for multidimensional case the k-d tree from scipy is used
+#  @param points 2D numpy array ( N , dim ) 
+#  @param ncpus  number of parallel jobs for k-d tree queries (-1: all CPUs)
+#  @return numpy array of distances
+def uNearest ( points , ncpus = 1 ) :
+    """Get the distances to the nearest neighbours for all points
+    - for 1D case the sorting is used
+    - for multidimensional case the k-d tree from scipy is used
+    """
+    import numpy
+    
+    num , dim = points.shape
+    if num < 2 : return numpy.full ( num , 1.e+100 )
+    
+    if 1 == dim :
+        
+        x     = points [ : , 0 ]
+        order = numpy.argsort ( x , kind = 'mergesort' )
+        xs    = x [ order ]
+        gaps  = numpy.diff ( xs )
+        nd    = numpy.empty_like ( xs )
+        nd [ 0  ] = gaps [ 0  ]
+        nd [ -1 ] = gaps [ -1 ]
+        nd [ 1:-1 ] = numpy.minimum ( gaps [ :-1 ] , gaps [ 1: ] )
+        result = numpy.empty_like ( nd )
+        result [ order ] = nd
+        return result
+    
+    from scipy.spatial import cKDTree
+    kdtree = cKDTree ( points )
+    try :
+        distances , indices = kdtree.query ( points , k = 2 , workers = ncpus )
+    except TypeError :
+        distances , indices = kdtree.query ( points , k = 2 , n_jobs  = ncpus )
+    return distances [ : , 1 ] 
+
+# =============================================================================
+## the volume of n-ball with unit radius
+def _ball_volume_ ( n ) :
+    """The volume of n-ball with unit radius"""
+    return math.pi ** ( 0.5 * n ) / math.gamma ( 0.5 * n + 1 ) 
+
 # =============================================================================
 ##  calculate U-statistics
+#   - the nearest neighbours are found using the k-d tree (or sorting for 1D)
+#     over the numpy copy of dataset
+#   - PDF is evaluated in batch
+#   - if numpy/scipy are not available, C++ Ostap::UStat::calculate is used 
 #   @param pdf    (input) PDF
 #   @param args   (input) arguments/variables
 #   @param data   (input) dataset 
 #   @param histo  (input) the histogram to be filled 
+#   @param ncpus  (input) number of parallel jobs for k-d tree queries (-1: all CPUs)
 #   @author Vanya Belyaev Ivan.Belyaev@cern.ch
 #   @see Analysis::UStat
 #   @see Analysis::UStat::calculate
@@ -109,67 +205,46 @@ def uCalc ( pdf            ,
             args           , 
             data           ,
             histo          ,
-            silent = False )  :
-    """Calculate U-statistics 
+            silent = False ,
+            ncpus  = 1     )  :
+    """Calculate U-statistics
+    - the nearest neighbours are found using the k-d tree (or sorting for 1D)
+    over the numpy copy of dataset
+    - PDF is evaluated in batch
+    - if numpy/scipy are not available, C++ Ostap::UStat::calculate is used 
     """
-    import sys
-    
-    tStat = ROOT.Double(-1)
-    sc    = Ostap.UStat.calculate ( pdf   ,
-                                    data  ,
-                                    histo ,
-                                    tStat ,
-                                    args  )
-    return histo, tStat 
-    
-    numEntries = data.numEntries ()
-    dim        = args.getSize    ()
-    data_clone = data.Clone      ()
-
-    from ostap.logger.progress_bar import progress_bar 
-    for i in progress_bar ( xrange ( numEntries ) ) : 
-
-        event_x = data_clone.get ( i ) 
-        event_i = event_x.selectCommon ( args )
+    try :
         
-        ## fill args and evaluate PDF 
-        for a in args : a.setVal ( event_i.getRealValue ( a.GetName () ) )        
-        pdfValue = pdf.getVal ( args )
+        import numpy
+        points    = uData    ( data , args ) 
+        distances = uNearest ( points , ncpus )
         
-        small_v = 1.e+100 
-        small_j = 0
-        for j in xrange ( 0 , numEntries ) :
-            
-            if j == i  : continue
-
-            event_y = data.get( j )
-            event_j = event_y.selectCommon ( args ) 
-
-            dist = uDist ( event_i , event_j )
-            
-            if 0 == j or dist < small_v :
-                small_v = dist
-                small_j = j 
-                
-        value = 0 
-        if   1 == dim :
-            value  = small_v
-            value *= numEntries * pdfValue 
-        elif 2 == dim :
-            value  = small_v**2
-            value *= numEntries * pdfValue
-            value *= math.pi 
-        else :
-            logger.error ( ' Not-implemented (yet) %s '  % dim )
-            continue 
-
-        value = math.exp ( -1 * value )
-
-        histo.Fill ( value ) 
+    except ImportError :
+        
+        if not silent : logger.info ( 'uCalc: numpy/scipy are not available, use slow C++ engine' ) 
+        tStat = ROOT.Double(-1)
+        sc    = Ostap.UStat.calculate ( pdf   ,
+                                        data  ,
+                                        histo ,
+                                        tStat ,
+                                        args  )
+        return histo, tStat 
+    
+    num , dim = points.shape
+    values    = uPdf ( pdf , data , args )
+    
+    ## volume of n-ball: 
+    values = numpy.exp ( -_ball_volume_ ( dim ) * distances ** dim * num * values )
+    
+    if len ( values ) : histo.FillN ( len ( values ) , values , numpy.ones_like ( values ) )
 
-    del data_clone 
-    return histo
+    ## T-statistics 
+    values = numpy.sort ( values )
+    e      = numpy.arange ( 1 , num + 1 , dtype = numpy.float64 ) / num
+    tStat  = float ( ( ( values - e ) ** 2 ).sum () )
 
+    return histo , tStat 
+    
 # =============================================================================
 ##  make the plot of U-statistics
 #
@@ -193,11 +268,13 @@ def uCalc ( pdf            ,
 #   @param data   (input) dataset 
 #   @param bins   (input) bumbef of bins in histogram 
 #   @param silent (input) keep the silence 
+#   @param ncpus  (input) number of parallel jobs for k-d tree queries (-1: all CPUs)
 def uPlot ( pdf            ,
             data           ,
             bins   = None  ,
             args   = None  ,
-            silent = False ) :
+            silent = False ,
+            ncpus  = 1     ) :
     """Make the plot of U-statistics 
     
     >>> pdf  = ...               ## pdf
@@ -237,7 +314,8 @@ def uPlot ( pdf            ,
                       args      ,
                       data      ,
                       histo     ,
-                      silent    )    
+                      silent    ,
+                      ncpus     )    
     
     res  = histo.Fit         ( 'pol0' , 'SLQ0+' )
     func = histo.GetFunction ( 'pol0' )
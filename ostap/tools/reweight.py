@@ -90,6 +90,7 @@ class Weight(object) :
         self.__nzeroes = 0 
 
         self.__vars    = [] 
+        self.__columns = [] 
         if not factors : return
 
         ## open database 
@@ -107,10 +108,11 @@ class Weight(object) :
                 funname = wvar.address   ## address  in database 
                 merge   = wvar.merge     ## merge sequence of callables?
                 skip    = wvar.skip      ## skip   some of them?
+                columns = wvar.columns   ## columns for the batch processing 
                 
                 if isinstance ( funval , str ) :
                     varnam = funval 
-                    funval = lambda s : getattr ( s , varnam )
+                    funval = lambda s , v = varnam : getattr ( s , v )
                     
                 ## 
                 functions  = db.get ( funname , [] ) ## db[ funname ]
@@ -157,9 +159,11 @@ class Weight(object) :
                             
                     functions  = [ single_func ]
                     
-                self.__vars += [ ( funname , funval , functions , SE() ) ]
+                self.__vars    += [ ( funname , funval , functions , SE() ) ]
+                self.__columns += [ columns ] 
                 
-        self.__vars = tuple ( self.__vars ) 
+        self.__vars    = tuple ( self.__vars    ) 
+        self.__columns = tuple ( self.__columns ) 
 
     @property
     def variables ( self ) :
@@ -218,6 +222,145 @@ class Weight(object) :
             
         return vw
 
+    # =========================================================================
+    ## calculate the weights for the arrays of data (batch processing)
+    #  @code
+    #  weight  = Weight ( ... )
+    #  weights = weight.evaluate_arrays ( { 'pt' : pt_array , 'y' : y_array } )
+    #  @endcode
+    #  The arrays are addressed through the <code>columns</code> of Weight.Var.
+    #  Histograms are evaluated with the vectorised <code>histo.evaluate</code>
+    #  (with the same interpolation as <code>histo(x)</code>),
+    #  other callables are evaluated element-by-element.
+    #  The statistics (<code>stat</code>, <code>nZeroes</code>) are updated
+    #  @param arrays dictionary { column : array } or numpy structured array 
+    #  @return numpy array of weights 
+    def evaluate_arrays ( self , arrays ) :
+        """Calculate the weights for the arrays of data (batch processing) 
+        >>> weight  = Weight ( ... )
+        >>> weights = weight.evaluate_arrays ( { 'pt' : pt_array , 'y' : y_array } )
+        - the arrays are addressed through the ``columns'' of Weight.Var
+        - histograms are evaluated with the vectorised histo.evaluate
+        (with the same interpolation as histo(x)), other callables are
+        evaluated element-by-element
+        - the statistics (stat, nZeroes) are updated 
+        """
+        import numpy
+        
+        weights = None 
+        for var , columns in zip ( self.__vars , self.__columns ) :
+            
+            funname   = var[0] ## address in database 
+            functions = var[2] ## the functions 
+            
+            assert columns , "Weight: no ``columns'' are specified for ``%s''" % funname
+            
+            args = [ numpy.asarray ( arrays [ c ] , dtype = numpy.float64 ) for c in columns ]
+            
+            ww = numpy.ones ( len ( args [ 0 ] ) , dtype = numpy.float64 )
+            for f in functions : ww *= _batch_call_ ( f , args )
+            
+            ## keep the statistics
+            cnt  = var[3]
+            cnt += _batch_stat_ ( ww ) 
+            
+            ## update the global weight 
+            weights = ww if weights is None else weights * ww
+            
+        if weights is None :
+            n = len ( numpy.asarray ( arrays [ arrays.dtype.names [ 0 ] ] ) ) \
+                if hasattr ( arrays , 'dtype' ) else len ( next ( iter ( arrays.values () ) ) )
+            weights = numpy.ones ( n , dtype = numpy.float64 )
+            
+        self.__counter += _batch_stat_ ( weights )
+        self.__nzeroes += int ( numpy.count_nonzero ( weights == 0 ) )
+        
+        return weights
+
+    # =========================================================================
+    ## get all the columns needed for the batch processing 
+    @property
+    def columns ( self ) :
+        """``columns'' : all columns needed for the batch processing"""
+        result = []
+        for columns in self.__columns :
+            for c in ( columns if columns else () ) :
+                if not c in result : result.append ( c )
+        return tuple ( result ) 
+
+    # =========================================================================
+    ## calculate the weights for TTree/TChain or RooDataSet in chunks
+    #  @code
+    #  weight  = Weight ( ... )
+    #  tree    = ...
+    #  weights = weight.evaluate_data ( tree , chunk = 10**6 )
+    #  @endcode
+    #  For TTree/TChain the columns are TTree-expressions,
+    #  for RooDataSet the columns are names of variables 
+    #  @return numpy array of weights for all entries 
+    def evaluate_data ( self , data , cuts = '' , chunk = 10**6 ) :
+        """Calculate the weights for TTree/TChain or RooDataSet in chunks
+        >>> weight  = Weight ( ... )
+        >>> tree    = ...
+        >>> weights = weight.evaluate_data ( tree , chunk = 10**6 )
+        - for TTree/TChain the columns are TTree-expressions,
+        - for RooDataSet the columns are names of variables 
+        """
+        import numpy
+        import ostap.trees.trees
+        
+        columns = self.columns
+        
+        if isinstance ( data , ROOT.RooAbsData ) :
+            store = data.store()
+            if store and store.tree() : data = store.tree()
+            else :
+                from ostap.fitting.roofit import useStorage
+                from ostap.core.core      import dsID
+                with useStorage () : cloned = data.Clone ( dsID () )
+                try     : return self.evaluate_data ( cloned , cuts , chunk )
+                finally :
+                    cloned.reset ()
+                    del cloned
+                    
+        if not columns : return numpy.ones ( len ( data ) , dtype = numpy.float64 ) 
+        
+        result = [ self.evaluate_arrays ( block ) for block in data.iter_arrays ( columns , cuts , chunk ) ] 
+        if not result : return numpy.empty ( 0 , dtype = numpy.float64 )
+        return numpy.concatenate ( result ) 
+
+    # =========================================================================
+    ## add the column with weights to RooDataSet
+    #  @code
+    #  weight  = Weight ( ... )
+    #  dataset = ...
+    #  weight.add_weight ( dataset , 'weight' )
+    #  @endcode
+    def add_weight ( self , dataset , name = 'weight' , chunk = 10**6 ) :
+        """Add the column with weights to RooDataSet
+        >>> weight  = Weight ( ... )
+        >>> dataset = ...
+        >>> weight.add_weight ( dataset , 'weight' )
+        """
+        assert isinstance ( dataset , ROOT.RooDataSet ) , \
+               "Weight: invalid type of dataset %s" % type ( dataset ) 
+        assert not name in dataset , \
+               "Weight: the variable ``%s'' is already in dataset" % name
+        
+        weights = self.evaluate_data ( dataset , chunk = chunk )
+        
+        from ostap.core.core import dsID
+        wvar    = ROOT.RooRealVar ( name , 'weight' , 0 )
+        wvar.setConstant ( False )
+        varset  = ROOT.RooArgSet  ( wvar )
+        wds     = ROOT.RooDataSet ( dsID() , 'weights' , varset )
+        _fill_dataset_ ( wds , wvar , weights ) 
+        dataset.merge ( wds )
+        wds.reset()
+        del wds
+        
+        return dataset 
+
     # =========================================================================
     ## @class WeightingVar
     #  Helper class to keep information about singe reweighting
@@ -244,28 +387,36 @@ class Weight(object) :
         #   @param address   the address of   reweighintg object in DBASE 
         #   @param merge     merge sequence of reweigthing objects ?
         #   @param skip      skip some reweigting objects ?
+        #   @param columns   the columns for the batch processing 
         def __init__ ( self ,
                        accessor         ,   ## accessor function:  tree -> variable(s) 
                        address          ,   ## the address of   reweighintg object in DBASE 
                        merge     = True ,   ## merge sequence of reweigthing objects ?
-                       skip      = None ) : ## skip some reweigting objects ? 
+                       skip      = None ,   ## skip some reweigting objects ? 
+                       columns   = None ) : ## the columns for the batch processing 
             """Keep information about singe reweighting
             - ``accessor'' : an accessor function that extracts the variable(s) from  TTree/TChain/RooDataSet
             - ``address''  : the  address in DBASE, where reweigftjnig callable(s) is/are stored
             - ``merge''    : merge list of callables from DB into the single callable ?
             - ``skip''     : use only certain elements from the list of callables from DBASE
+            - ``columns''  : the columns for the batch processing, e.g. 'pt' or ('pt','y') 
             
             Schematic data flow to get the weigth for the given event 
             - tree/chain/dataset -> accessor -> database(address) -> weight
             """
             
-            assert callable ( accessor ) , \
+            assert callable ( accessor ) or isinstance ( accessor , str ) , \
                    "Invalid type of ``accessor'' %s/%s" % ( accessor , type( accessor ) )
             
+            if   isinstance ( columns  , str ) : columns = columns ,
+            elif columns                       : columns = tuple ( columns )
+            elif isinstance ( accessor , str ) : columns = accessor ,
+            
             self.__accessor = accessor ,
             self.__address  = str( address )
             self.__merge    = True if merge else False
             self.__skip     = skip if skip  else 0
+            self.__columns  = columns if columns else () 
             
         @property
         def accessor ( self ) :
@@ -295,7 +446,81 @@ class Weight(object) :
             0 > skip ?   - skip last  ``abs(skip)'' elements        
             """
             return self.__skip 
+        @property
+        def columns ( self ) :
+            """``columns'' - the columns for the batch processing, e.g. ('pt','y')
+            The values from the columns are the arguments for the callables from DBASE 
+            """
+            return self.__columns 
+
+
+# =============================================================================
+## evaluate the reweighting callable for the arrays of arguments
+#  - histograms are evaluated using the vectorised <code>histo.evaluate</code>
+#  - other callables are evaluated element-by-element 
+def _batch_call_ ( func , args ) :
+    """Evaluate the reweighting callable for the arrays of arguments
+    - histograms are evaluated using the vectorised histo.evaluate
+    - other callables are evaluated element-by-element 
+    """
+    import numpy
+    import ostap.histos.histos 
+    if   isinstance ( func , ROOT.TH3 ) and 3 == len ( args ) : return func.evaluate ( *args ) [ 0 ]
+    elif isinstance ( func , ROOT.TH2 ) and 2 == len ( args ) : return func.evaluate ( *args ) [ 0 ]
+    elif isinstance ( func , ( ROOT.TH1F , ROOT.TH1D ) ) and 1 == len ( args ) :
+        return func.evaluate ( args [ 0 ] ) [ 0 ]
+    ##
+    n = len ( args [ 0 ] ) 
+    return numpy.fromiter ( ( float ( func ( *a ) ) for a in zip ( *args ) ) ,
+                            dtype = numpy.float64 , count = n )
 
+# =============================================================================
+## C++ helper for the bulk fill of RooDataSet from the array of values
+_fill_code_ = """
+namespace OstapReweight
+{
+  inline unsigned long fill ( RooDataSet& ds , RooRealVar& var , const double* values , unsigned long n )
+  {
+    RooArgSet row ( var ) ;
+    for ( unsigned long i = 0 ; i < n ; ++i ) { var.setVal ( values [ i ] ) ; ds.add ( row ) ; }
+    return n ;
+  }
+}
+"""
+_fill_ready_ = None 
+# =============================================================================
+## fill RooDataSet with the array of values in one call
+#  (the loop over the values is in C++), 
+#  the row-by-row loop is used as the fallback 
+def _fill_dataset_ ( dataset , var , values ) :
+    """Fill RooDataSet with the array of values in one call
+    (the loop over the values is in C++),
+    the row-by-row loop is used as the fallback 
+    """
+    global _fill_ready_
+    import numpy
+    values = numpy.ascontiguousarray ( values , dtype = numpy.float64 )
+    if _fill_ready_ is None :
+        _fill_ready_ = bool ( ROOT.gInterpreter.Declare ( _fill_code_ ) )
+    if _fill_ready_ and len ( values ) :
+        return ROOT.OstapReweight.fill ( dataset , var , values , len ( values ) )
+    ## fallback 
+    row = ROOT.RooArgSet ( var )
+    for v in values :
+        var.setVal  ( float ( v ) )
+        dataset.add ( row )
+    return len ( values ) 
+    
+# =============================================================================
+## the statistics of the array of values as SE 
+def _batch_stat_ ( values ) :
+    """The statistics of the array of values as SE"""
+    if not len ( values ) : return SE ()
+    return SE ( len ( values )                   ,
+                float ( values.sum ()          ) ,
+                float ( ( values * values ).sum () ) ,
+                float ( values.min ()          ) ,
+                float ( values.max ()          ) )
 
 # =============================================================================
 ## @class WeightingPlot
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+## @file test_reweight_arrays.py
+#
+#  Test for batch processing in reweighting machinery
+#
+#  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
+#  @date 2019-03-10
+# =============================================================================
+"""Test for batch processing in reweighting machinery
+"""
+# =============================================================================
+import ROOT, random, os, array 
+import ostap.io.zipshelve as     DBASE
+import ostap.trees.trees
+import ostap.histos.histos
+from   ostap.tools.reweight import Weight
+from   ostap.utils.utils    import CleanUp
+# =============================================================================
+# logging 
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' == __name__  or '__builtin__'  == __name__ : 
+    logger = getLogger ( 'test_reweight_arrays' )
+else : 
+    logger = getLogger ( __name__ )
+# =============================================================================
+tmpdir = CleanUp.tempdir ( prefix = 'reweight_' )
+dbname = os.path.join ( tmpdir , 'weights.db' )
+
+# =============================================================================
+def test_reweight_arrays () :
+
+    ## reweighting histogram
+    h = ROOT.TH1D ( 'hw' , 'weights' , 20 , 0 , 100 )
+    for i in range ( 1 , 21 ) : h.SetBinContent ( i , 0.5 + 0.05 * i )
+    
+    with DBASE.open ( dbname , 'c' ) as db : db [ 'x-reweight' ] = [ h ]
+    
+    tree = ROOT.TTree ( 'tree_reweight' , 'tree for batch reweighting' )
+    x    = array.array ( 'd' , [ 0 ] )
+    tree.Branch ( 'x' , x , 'x/D' )
+    for i in range ( 5000 ) :
+        x[0] = random.uniform ( 0 , 100 )
+        tree.Fill()
+
+    ## event-by-event
+    w1 = Weight ( dbname , [ Weight.Var ( lambda s : s.x , 'x-reweight' , columns = 'x' ) ] )
+    ev = [ w1 ( e ) for e in tree ]
+    
+    ## batch processing 
+    w2 = Weight ( dbname , [ Weight.Var ( 'x' , 'x-reweight' ) ] )
+    bw = w2.evaluate_data ( tree , chunk = 1000 )
+
+    assert len ( ev ) == len ( bw ) , 'Invalid number of weights'
+    assert max ( abs ( a - b ) for a , b in zip ( ev , bw ) ) < 1.e-8 , \
+           'Batch weights differ from event-by-event weights'
+    assert w1.stat.nEntries() == w2.stat.nEntries() , 'Invalid statistics' 
+    
+    logger.info ( 'Event-by-event weights: %s' % w1.stat )
+    logger.info ( 'Batch weights         : %s' % w2.stat )
+
+    ## add the column of weights to the dataset
+    xvar = ROOT.RooRealVar ( 'x' , 'x' , 0 , 100 )
+    ds   = ROOT.RooDataSet ( 'ds_reweight' , 'dataset for batch reweighting' , tree , ROOT.RooArgSet ( xvar ) )
+    w3   = Weight ( dbname , [ Weight.Var ( 'x' , 'x-reweight' ) ] )
+    w3.add_weight ( ds , 'weight' , chunk = 1000 )
+    
+    assert len ( ev ) == len ( ds ) , 'Invalid number of entries in dataset'
+    assert max ( abs ( ds.get ( i ).getRealValue ( 'weight' ) - ev [ i ] ) for i in range ( len ( ds ) ) ) < 1.e-8 , \
+           'Weights in dataset differ from event-by-event weights'
+
+# =============================================================================
+if '__main__' == __name__ :
+
+    test_reweight_arrays ()
+
+# =============================================================================
+# The END 
+# =============================================================================
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Copyright (c) Ostap developpers.
+# =============================================================================
+""" Test module for columnar readout of trees:
+- TTree.arrays, TTree.iter_arrays, TTree.slice, TTree.slices
+"""
+# =============================================================================
+# logging
+# =============================================================================
+from ostap.logger.logger import getLogger
+if '__main__' ==  __name__ : logger = getLogger ( 'test_arrays' )
+else                       : logger = getLogger ( __name__      )
+# =============================================================================
+import ROOT, array, random
+import ostap.trees.trees
+
+def make_tree ( nentries = 1000 ) :
+
+    tree = ROOT.TTree ( 'tree_arrays' , 'tree for columnar readout' )
+    x    = array.array ( 'd' , [ 0 ] )
+    y    = array.array ( 'd' , [ 0 ] )
+    tree.Branch ( 'x' , x , 'x/D' )
+    tree.Branch ( 'y' , y , 'y/D' )
+    for i in range ( nentries ) :
+        x[0] = i
+        y[0] = random.gauss ( 0 , 1 )
+        tree.Fill()
+    return tree
+
+def test_arrays () :
+
+    tree = make_tree ( 1000 )
+
+    ## single pass, structured array
+    a = tree.arrays ( 'x , y , x*y' , 'x<500' )
+    assert 500 == len ( a ) , 'Invalid number of rows: %s' % len ( a )
+    assert ( a['x'] == range ( 500 ) ).all() , 'Invalid order of rows'
+    assert abs ( ( a['x*y'] - a['x'] * a['y'] ) ).max() < 1.e-10 , 'Invalid expression'
+
+    ## chunked iteration gives the same
+    chunks = list ( tree.iter_arrays ( [ 'x' , 'y' ] , 'x<500' , chunk = 128 ) )
+    assert 4 == len ( chunks ) , 'Invalid number of chunks: %s' % len ( chunks )
+    assert sum ( len ( c ) for c in chunks ) == 500 , 'Invalid number of rows'
+
+    ## slices: no sorting, the same rows as in arrays
+    s = tree.slices ( 'x : y' , 'x<500' )
+    assert s.shape == ( 2 , 500 ) , 'Invalid shape %s' % str ( s.shape )
+    assert ( s[0] == a['x'] ).all() and ( s[1] == a['y'] ).all() , 'Invalid slices'
+
+    s1 = tree.slice ( 'y' , 'x<500' )
+    assert ( s1 == a['y'] ).all() , 'Invalid slice'
+
+    logger.info ( 'Columnar readout: %d rows, %d chunks' % ( len ( a ) , len ( chunks ) ) )
+
+def test_batches () :
+
+    tree = make_tree ( 1000 )
+
+    ## event-by-event
+    sum1 = sum ( e.y for e in tree.withCuts ( 'x<500' ) )
+
+    ## batched mode
+    sum2 = sum ( b['y'].sum() for b in tree.withCuts ( 'x<500' , variables = 'y' , batch = 100 ) )
+    sum3 = sum ( b['y'].sum() for b in tree ( 0 , 1000 , 'x<500' , variables = [ 'y' ] ) )
+
+    assert abs ( sum1 - sum2 ) < 1.e-8 and abs ( sum1 - sum3 ) < 1.e-8 , \
+           'Batched iteration differs: %s/%s/%s' % ( sum1 , sum2 , sum3 )
+
+# =============================================================================
+if '__main__' == __name__ :
+
+    test_arrays  ()
+    test_batches ()
+
+# =============================================================================
+# The END
+# =============================================================================
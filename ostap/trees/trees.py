@@ -54,22 +54,42 @@ ROOT.TChain.__bool__    = _tt_nonzero_
 #  @endcode
 #  @attention: TTree::GetEntry is already invoked for accepted events,
 #              no need in second call
+#
+#  In the batched mode (<code>variables</code> are specified)
+#  the blocks of accepted entries are yielded as structured numpy arrays
+#  @code 
+#    >>> for block in tree.withCuts ( 'pt>5' , variables = 'pt,y' , batch = 10**5 ) :
+#    ...     print block['y'].mean() 
+#  @endcode
 #  @see Analysis::PyIterator
 #  @see Ostap::Formula
+#  @see _rt_iter_arrays_ 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2013-05-06
-def _iter_cuts_ ( self , cuts , first = 0 , last = _large , progress = False ) :
+def _iter_cuts_ ( self , cuts , first = 0 , last = _large , progress = False ,
+                  variables = None , batch = 100000 ) :
     """Iterator over ``good events'' in TTree/TChain:
     
     >>> tree = ... # get the tree
     >>> for i in tree.withCuts ( 'pt>5' ) : print i.y
     
     Attention: TTree::GetEntry is already invoked for accepted events,
-    no need in second call 
+    no need in second call
+
+    In the batched mode (`variables` are specified) the blocks of
+    accepted entries are yielded as structured numpy arrays
+    
+    >>> for block in tree.withCuts ( 'pt>5' , variables = 'pt,y' , batch = 10**5 ) :
+    ...     print block['y'].mean() 
     """
     #
     last = min ( last , len ( self )  )
     
+    if variables :
+        for block in _rt_iter_arrays_ ( self , variables , cuts , batch ,
+                                        first , last , progress ) : yield block
+        return
+    
     pit = cpp.Ostap.PyIterator ( self , cuts , first , last )
     if not pit.ok() : raise TypeError ( "Invalid Formula: %s" % cuts )
     #
@@ -117,22 +137,41 @@ ROOT.TTree. __len__   = lambda s : s.GetEntries()
 #    >>> tree = ... # get the tree
 #    >>> for i in tree( 0, 100, 'pt>5' ) : print i.y
 #  @endcode
+#
+#  In the batched mode (<code>variables</code> are specified)
+#  the blocks of accepted entries are yielded as structured numpy arrays
+#  @code 
+#    >>> for block in tree ( 0 , 100 , 'pt>5' , variables = [ 'pt' , 'y' ] ) :
+#    ...     print block['y'].mean() 
+#  @endcode
 #  @see Ostap::PyIterator
 #  @see Ostap::Formula
+#  @see _rt_iter_arrays_ 
 #  @author Vanya BELYAEV Ivan.Belyaev@itep.ru
 #  @date   2013-05-06
-def _tc_call_ ( self , first = 0 , last = -1  , cuts = None , progress = False ) :
+def _tc_call_ ( self , first = 0 , last = -1  , cuts = None , progress = False ,
+                variables = None , batch = 100000 ) :
     """Iterator over ``good events'' in TTree/TChain:
     
     >>> tree = ... # get the tree
     >>> for i in tree(0, 100 , 'pt>5' ) : print i.y
+
+    In the batched mode (`variables` are specified) the blocks of
+    accepted entries are yielded as structured numpy arrays
     
+    >>> for block in tree ( 0 , 100 , 'pt>5' , variables = [ 'pt' , 'y' ] ) :
+    ...     print block['y'].mean() 
     """
     #
-    if last < 0 : last = ROOT.Tree.kMaxEntries
+    if last < 0 : last = ROOT.TTree.kMaxEntries
     
     last = min ( last , len ( self )  )
 
+    if variables :
+        for block in _rt_iter_arrays_ ( self , variables , cuts if cuts else '' , batch ,
+                                        first , last , progress ) : yield block
+        return
+
     from ostap.utils.progress_bar import ProgressBar 
     with ProgressBar ( min_value = first        ,
                        max_value = last         ,
@@ -331,6 +370,95 @@ def _tt_project_ ( tree               ,
 ROOT.TTree .project = _tt_project_
 ROOT.TChain.project = _tt_project_
 
+# =============================================================================
+## decode the projection expression into the (x,y,z) triplet
+#  - the string follows TTree::Project convention: <code>'z:y:x'</code>
+#  - the list/tuple is in natural order: <code>('x','y','z')</code>
+def _xyz_ ( what , dim ) :
+    """Decode the projection expression into the (x,y,z) triplet
+    - the string follows TTree::Project convention: 'z:y:x'
+    - the list/tuple is in natural order: ('x','y','z')
+    """
+    if isinstance ( what , ROOT.TCut ) : what = str ( what )
+    if isinstance ( what , str ) :
+        what = [ w.strip() for w in what.split ( ':' ) ]
+        what.reverse()
+    what = [ str ( w ).strip() for w in what ]
+    if len ( what ) != dim :
+        raise AttributeError ( "project_many: invalid expression %s for %dD-histogram" % ( what , dim ) )
+    return tuple ( what + ( 3 - dim ) * [ '' ] ) 
+
+# =============================================================================
+## make projections of the tree/chain into many histograms in a single pass 
+#  - each entry is read only once
+#  - each distinct expression and selection is compiled and evaluated only once per entry
+#  @code
+#  tree = ...
+#  h1 , h2 , h3 = ...
+#  tree.project_many ( { h1 : ( 'pt'      , 'y>2'  ) ,
+#                        h2 :   'eta'                ,   ## use default cuts 
+#                        h3 : ( 'eta:pt'  , 'y>2'  ) } , ## 2D: TTree::Project convention
+#                      cuts = 'chi2<10' ) 
+#  @endcode
+#  @param tree     the tree
+#  @param histos   dictionary { histo : ( what , cuts ) } or { histo : what } (or list of pairs),
+#                  where <code>what</code> is a string (<code>'y:x'</code>) or a list of expressions (<code>['x','y']</code>) 
+#  @param cuts     default selection/weight for histograms without own cuts 
+#  @param nentries number of entries to process
+#  @param first    the first entry to process 
+#  @return number of filled histograms 
+#  @see Ostap::HistoProject::projectMany
+#  @attention only the first instance of array-like expressions is used 
+def _tt_project_many_ ( tree , histos , cuts = '' , nentries = -1 , first = 0 ) :
+    """Make projections of the tree/chain into many histograms in a single pass
+    - each entry is read only once
+    - each distinct expression and selection is compiled and evaluated only once per entry
+    >>> tree = ...
+    >>> h1 , h2 , h3 = ...
+    >>> tree.project_many ( { h1 : ( 'pt'      , 'y>2'  ) ,
+    ...                       h2 :   'eta'                ,   ## use default cuts 
+    ...                       h3 : ( 'eta:pt'  , 'y>2'  ) } , ## 2D: TTree::Project convention
+    ...                     cuts = 'chi2<10' )
+    - histos: dictionary { histo : ( what , cuts ) } or { histo : what },
+    where ``what'' is a string ('y:x') or list of expressions (['x','y'])
+    - attention: only the first instance of array-like expressions is used 
+    """
+    if isinstance ( cuts , ROOT.TCut ) : cuts = str ( cuts )
+    
+    _histos = cpp.std.vector ( 'TH1*'        ) ()
+    _SV     = cpp.std.vector ( 'std::string' )
+    _xs , _ys , _zs , _cuts = _SV () , _SV () , _SV () , _SV ()
+    
+    items = histos.items() if isinstance ( histos , dict ) else histos
+    for histo , item in items :
+        
+        assert isinstance ( histo , ROOT.TH1 ) , 'project_many: invalid histogram %s' % histo 
+        
+        ## tuple/list is always ( what , cuts ) 
+        if isinstance ( item , ( tuple , list ) ) : what , hcuts = item
+        else                                      : what , hcuts = item , cuts 
+            
+        x , y , z = _xyz_ ( what , histo.GetDimension () )
+        
+        _histos.push_back ( histo )
+        _xs    .push_back ( x     )
+        _ys    .push_back ( y     )
+        _zs    .push_back ( z     )
+        _cuts  .push_back ( str ( hcuts ).strip() ) 
+
+    last = first + nentries if 0 <= nentries else ROOT.TTree.kMaxEntries
+    
+    from ostap.core.core import ROOTCWD
+    with ROOTCWD() :
+        sc = cpp.Ostap.HistoProject.projectMany ( tree , _histos , _xs , _ys , _zs , _cuts , first , last )
+    if sc.isFailure() :
+        logger.error ( 'project_many: error from Ostap::HistoProject::projectMany %s' % sc )
+        
+    return len ( _histos )
+
+ROOT.TTree .project_many = _tt_project_many_
+ROOT.TChain.project_many = _tt_project_many_
+
 
 # =============================================================================
 ## get the statistic for certain expression in Tree/Dataset
@@ -715,6 +843,106 @@ def _rc_getslice_ ( self , start , stop , *step ) :
 
 ROOT.TChain.__getslice__ = _rc_getslice_
 
+# =============================================================================
+## decode the list of variables/expressions for the columnar readout
+#  @code
+#  _vars_ ( 'pt,eta'      ) ## [ 'pt' , 'eta' ] 
+#  _vars_ ( 'pt : eta'    ) ## [ 'pt' , 'eta' ] 
+#  _vars_ ( ['pt','eta']  ) ## [ 'pt' , 'eta' ] 
+#  @endcode 
+def _vars_ ( varnames ) :
+    """ Decode the list of variables/expressions for the columnar readout
+    >>> _vars_ ( 'pt,eta'      ) ## [ 'pt' , 'eta' ] 
+    >>> _vars_ ( 'pt : eta'    ) ## [ 'pt' , 'eta' ] 
+    >>> _vars_ ( ['pt','eta']  ) ## [ 'pt' , 'eta' ] 
+    """
+    if isinstance ( varnames , str ) :
+        for sep in ( ':' , ';' ) : varnames = varnames.replace ( sep , ',' )
+        varnames = varnames.split ( ',' )
+    elif not isinstance ( varnames , ( list , tuple ) ) :
+        raise AttributeError ( 'Invalid type %s' % varnames )
+    ##
+    varnames = [ v.strip() for v in varnames ]
+    varnames = [ v for v in varnames if v ]
+    if not varnames :
+        raise AttributeError ( 'No variables are specified' )
+    return varnames 
+
+# =============================================================================
+## iterate over the tree/chain and get the columns in a form of
+#  structured numpy arrays, chunk-by-chunk.
+#  All expressions are evaluated in a single pass over the tree,
+#  and the memory is bounded by the chunk size 
+#  @code
+#  tree = ...
+#  for a in tree.iter_arrays ( 'pt,eta,mass' , 'pt>3' , chunk = 10**6 ) :
+#     print a['pt'].mean() , a['mass'].std()  
+#  @endcode 
+#  @see Ostap::StatVar::columns 
+#  @attention for array-like variables only the first element is read 
+def _rt_iter_arrays_ ( tree , varnames , cuts = '' , chunk = 10**6 , first = 0 , last = -1 ,
+                       progress = False ) :
+    """ Iterate over the tree/chain and get the columns in a form of
+    structured numpy arrays, chunk-by-chunk.
+    All expressions are evaluated in a single pass over the tree,
+    and the memory is bounded by the chunk size 
+    >>> tree = ...
+    >>> for a in tree.iter_arrays ( 'pt,eta,mass' , 'pt>3' , chunk = 10**6 ) :
+    ...    print a['pt'].mean() , a['mass'].std()  
+    - for array-like variables only the first element is read 
+    """
+    import numpy
+    varnames = _vars_ ( varnames )
+    assert isinstance ( chunk , ( int , long ) ) and 0 < chunk , \
+           "Invalid chunk size %s" % chunk
+    ##
+    nentries = len ( tree )
+    if last < 0 or nentries < last : last = nentries
+    ##
+    vnames   = cpp.std.vector ( 'std::string' )()
+    for v in varnames : vnames.push_back ( v )
+    cuts     = str ( cuts ).strip() 
+    ##
+    nvars    = len ( varnames ) 
+    dtype    = numpy.dtype ( [ ( v , numpy.float64 ) for v in varnames ] )
+    buffer   = numpy.empty ( ( min ( chunk , max ( last - first , 0 ) ) , nvars ) ,
+                             dtype = numpy.float64 )
+    ##
+    _columns = cpp.Ostap.StatVar.columns 
+    from ostap.utils.progress_bar import ProgressBar 
+    with ProgressBar ( min_value = first        ,
+                       max_value = last         ,
+                       silent    = not progress ) as bar :
+        for start in xrange ( first , last , chunk ) :
+            stop = min ( start + chunk , last )
+            rows = _columns ( tree , vnames , cuts , buffer , start , stop )
+            if progress : bar.update_amount ( stop ) 
+            if not rows : continue
+            result = numpy.empty ( rows , dtype = dtype )
+            for i , v in enumerate ( varnames ) : result [ v ] = buffer [ :rows , i ]
+            yield result
+
+# =============================================================================
+## get the columns from the tree/chain in a form of a structured numpy array
+#  @code
+#  tree = ...
+#  a    = tree.arrays ( 'pt,eta,mass' , 'pt>3' )
+#  print a['pt'].mean() , a['mass'].std()  
+#  @endcode 
+#  @see _rt_iter_arrays_ 
+def _rt_arrays_ ( tree , varnames , cuts = '' , chunk = 10**6 , first = 0 , last = -1 ) :
+    """ Get the columns from the tree/chain in a form of a structured numpy array
+    >>> tree = ...
+    >>> a    = tree.arrays ( 'pt,eta,mass' , 'pt>3' )
+    >>> print a['pt'].mean() , a['mass'].std()  
+    """
+    import numpy
+    varnames = _vars_ ( varnames )
+    chunks   = list ( _rt_iter_arrays_ ( tree , varnames , cuts , chunk , first , last ) )
+    if not chunks :
+        return numpy.empty ( 0 , dtype = [ ( v , numpy.float64 ) for v in varnames ] ) 
+    return chunks[0] if 1 == len ( chunks ) else numpy.concatenate ( chunks ) 
+
 # =============================================================================
 ## get "slice" from TTree in a form of numpy.array
 #  @code
@@ -733,45 +961,17 @@ def _rt_slice_ ( tree , varname , cut = '' ) :
     >>> print varr 
     """
     #
-    ## decode the name (if needed)
-    if isinstance ( varname , str ) :
-        varname = varname.strip()
-        varname = varname.replace ( ':' , ',' )
-        varname = varname.replace ( ';' , ',' )
-        varname = varname.replace ( ' ' , ',' )
-        varname = varname.split   (       ',' )
-        if 1 == len ( varname ) : varname = varname[0].strip()
-        else :
-            for i in range( 0 , len(varname) ) : 
-                varname[i] = varname[i].strip()  
-    #
-    if       isinstance ( varname ,  ( list , tuple ) ) :
+    varname = _vars_ ( varname )
+    if 1 < len ( varname ) :
         ## forward to appropriate method 
         return tree.slices ( varname , cut )
-    elif not isinstance ( varname , str ) :
-        raise AttibuteError ( 'Invalid type %s' % varname )
-    
-    ##
-    p1 = varname.find( '[')
-    if 0 < p1 :
-        p2 = varname.find( ']' , p1 + 1 )
-        if p1 < p2 :
-            raise AttributeError("TTree:slice: can't slice array-like variable '%s'" % varname )
-            
-    ge   = long( tree.GetEstimate() ) 
-    tree.SetEstimate ( max ( len ( tree ) , ge ) )
-    ##
-    n    = tree.Draw ( varname , cut , "goff" )
     ##
-    import numpy
-    sl =   numpy.array ( numpy.frombuffer ( tree.GetV1() , count = n ) , copy = True )
-    ##
-    tree.SetEstimate ( ge ) 
-    return sl 
-
+    varname = varname [ 0 ] 
+    return _rt_arrays_ ( tree , [ varname ] , cut ) [ varname ] 
 
 # =============================================================================
 ## get "slices" from TTree in a form of numpy.array
+#  All variables are read in a single pass over the tree 
 #  @code
 #  tree = ...
 #  varrs1 = tree.slices ( ['Pt','eta'] , 'eta>3' )
@@ -782,10 +982,12 @@ def _rt_slice_ ( tree , varname , cut = '' ) :
 #  print varrs3
 #  @endcode 
 #  @see numpy.array 
+#  @see _rt_arrays_ 
 #  @author Albert BURSCHE
 #  @date 2015-07-08  
 def _rt_slices_ ( tree , varnames , cut = '' ) :
     """ Get ``slices'' from TTree in a form of numpy.array
+    - all variables are read in a single pass over the tree 
     
     >>> tree = ...
     
@@ -799,37 +1001,25 @@ def _rt_slices_ ( tree , varnames , cut = '' ) :
     >>> print varrs3
     """
     #
-    varname = varnames 
-    ## decode the name (if needed)
-    for sep in ( ',' , ':' , ';' ) :
-        if isinstance ( varname , str ) :
-            varname = varname.strip() 
-            varname = varname.split( sep )
-            if 1 == len ( varname ) : varname = varname[0].strip()
-            else :
-                for i in range( 0 , len(varname) ) : 
-                    varname[i] = varname[i].strip()  
-    #
-    if       isinstance ( varname , str ) :
+    varname = _vars_ ( varnames )
+    if 1 == len ( varname ) :
         ## forward to appropriate method 
-        return tree.slice ( varname , cut )
-    elif not isinstance ( varname ,  ( list , tuple ) ) :
-        raise AttibuteError ( 'Invalid type %s' % varname )
+        return tree.slice ( varname[0] , cut )
     ##
     import numpy
-    a = numpy.array ( [tree.slice(name, cut) for name in varname ] )
-    a.sort()
-    return a
+    a = _rt_arrays_ ( tree , varname , cut )
+    return numpy.array ( [ a [ v ] for v in varname ] ) 
 
 
-ROOT.TTree .slice  = _rt_slice_
-ROOT.TTree .slices = _rt_slices_
+ROOT.TTree .slice       = _rt_slice_
+ROOT.TTree .slices      = _rt_slices_
+ROOT.TTree .arrays      = _rt_arrays_
+ROOT.TTree .iter_arrays = _rt_iter_arrays_
 
-def _not_implemented_ ( self , method , *args , **kwargs ) :
-    raise NotImplementedError('%s: the method "%s" is not implemented' % ( self.__class__ , method ) ) 
-
-ROOT.TChain.slice  = lambda s,*x : _not_implemented_( s , 'slice'  , *x ) 
-ROOT.TChain.slices = lambda s,*x : _not_implemented_( s , 'slices' , *x ) 
+ROOT.TChain.slice       = _rt_slice_
+ROOT.TChain.slices      = _rt_slices_
+ROOT.TChain.arrays      = _rt_arrays_
+ROOT.TChain.iter_arrays = _rt_iter_arrays_
 
 # =============================================================================
 ## extending the existing chain 
@@ -1001,7 +1191,52 @@ class Chain(CleanUp) :
             nevt += nevents if 0 <= nevents else ll 
             
         return tuple ( trees ) 
+
+    ## split the chain into chunks of similar estimated cost, ordered largest-first
+    #  - the cost of a chunk is estimated as (number of entries)x(bytes per entry),
+    #    where bytes per entry are taken from TTree metadata (TTree::GetTotBytes)
+    #  - each file is cut into pieces of cost about <code>total/(ncpus*chunks_per_cpu)</code>
+    #  - the pieces are ordered by decreasing cost: big chunks are started first
+    #    and the small ones fill the tail, the idle workers pick up (``steal'')
+    #    the next chunk from the common queue
+    #  @code
+    #  chain  = ...
+    #  ch     = Chain ( chain )
+    #  chunks = ch.balanced_split ( ncpus = 12 ) 
+    #  @endcode
+    def balanced_split ( self , ncpus = None , chunks_per_cpu = 4 , min_size = 10000 ) :
+        """Split the chain into chunks of similar estimated cost, ordered largest-first
+        - the cost is estimated as (number of entries)x(bytes per entry) from TTree metadata
+        - each file is cut into pieces with cost about total/(ncpus*chunks_per_cpu)
+        - the pieces are ordered by decreasing cost, big chunks are started first
+        and small ones fill the tail (idle workers pick up the next chunk from the common queue)
+        >>> chain  = ...
+        >>> ch     = Chain ( chain )
+        >>> chunks = ch.balanced_split ( ncpus = 12 ) 
+        """
+        if ncpus is None :
+            import multiprocessing
+            ncpus = multiprocessing.cpu_count()
+            
+        trees = [ t for t in self.split ( chunk_size = -1 ) if 0 < t.entries ]
+        if not trees : return ()
+
+        costs = [ t.cost for t in trees ]
+        total = sum ( costs )
         
+        target = float ( total ) / max ( 1 , ncpus * chunks_per_cpu )
+
+        chunks = []
+        for t , c in zip ( trees , costs ) :
+            
+            n    = max ( 1 , int ( round ( c / target ) ) ) if 0 < target else 1 
+            size = int ( max ( min_size , -( -t.entries // n ) ) ) 
+            bpe  = float ( c ) / t.entries  
+            chunks += [ ( tt.entries * bpe , tt ) for tt in t.split ( chunk_size = size ) ]
+            
+        chunks.sort ( key = lambda p : p[0] , reverse = True )
+        return tuple ( tt for c , tt in chunks ) 
+    
     ##  number of entries in the Tree/Chain
     def  __len__ ( self ) : return len ( self.__chain )
     
@@ -1039,6 +1274,24 @@ class Chain(CleanUp) :
     def nevents ( self ) :
         """``nevents'' : number of events to process"""
         return self.__nevents if 0<= self.__nevents else ROOT.TChain.kMaxEntries
+    @property
+    def entries ( self ) :
+        """``entries'' : actual number of entries to be processed"""
+        return max ( 0 , min ( len ( self ) , self.first + self.nevents ) - self.first )
+    @property
+    def cost    ( self ) :
+        """``cost'' : estimated processing cost: (entries)x(bytes per entry)"""
+        chain  = self.chain
+        ll     = len ( chain ) 
+        nbytes = 0.0
+        entry  = 0
+        while entry < ll :
+            chain.LoadTree ( entry ) 
+            t = chain.GetTree()
+            if not valid_pointer ( t ) or 0 >= t.GetEntries() : break 
+            nbytes += t.GetTotBytes ()
+            entry  += t.GetEntries  ()
+        return nbytes * self.entries / max ( 1 , ll ) 
 
     def __str__ ( self ) :
         r = "Chain('%s',%s" % ( self.name , self.files )
@@ -1131,6 +1384,8 @@ _new_methods_       = (
     #
     ROOT.TTree .project   ,
     ROOT.TChain.project   ,
+    ROOT.TTree .project_many ,
+    ROOT.TChain.project_many ,
     #
     ROOT.TTree .statVar   ,
     ROOT.TChain.statVar   ,
@@ -1157,6 +1412,13 @@ _new_methods_       = (
     #
     ROOT.TTree.slice        ,
     ROOT.TTree.slices       ,
+    ROOT.TTree.arrays       ,
+    ROOT.TTree.iter_arrays  ,
+    #
+    ROOT.TChain.slice       ,
+    ROOT.TChain.slices      ,
+    ROOT.TChain.arrays      ,
+    ROOT.TChain.iter_arrays ,
     # 
     )
 # =============================================================================
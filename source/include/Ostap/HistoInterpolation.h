@@ -249,6 +249,89 @@ namespace Ostap
           const bool   extrapolate = false  , 
           const bool   density     = false  ) ;
       // ======================================================================
+    public: // batch (vectorised) versions
+      // ======================================================================
+      /** interpolate 1D histogram for the array of points 
+       *  @param h1          (INPUT)  input histogram 
+       *  @param n           (INPUT)  number of points 
+       *  @param x           (INPUT)  the x-values 
+       *  @param values      (OUTPUT) the interpolated values 
+       *  @param errors      (OUTPUT) the errors of the interpolated values 
+       *  @param t           (INPUT)  interpolation type 
+       *  @param edges       (INPUT)  use the special treatment of edges ? 
+       *  @param extrapolate (INPUT)  use extrapolation ? 
+       *  @param density     (INPUT)  rescale to density? 
+       *  @see Ostap::Math::HistoInterpolation::interpolate_1D
+       */
+      static void evaluate_1D
+        ( const TH1&          h1                   , 
+          const unsigned long n                    , 
+          const double*       x                    ,
+          double*             values               , 
+          double*             errors               , 
+          const Type          t           = Linear , 
+          const bool          edges       = true   , 
+          const bool          extrapolate = false  , 
+          const bool          density     = false  ) ;
+      // ======================================================================
+      /** interpolate 2D histogram for the arrays of points 
+       *  @param h2          (INPUT)  input histogram 
+       *  @param n           (INPUT)  number of points 
+       *  @param x           (INPUT)  the x-values 
+       *  @param y           (INPUT)  the y-values 
+       *  @param values      (OUTPUT) the interpolated values 
+       *  @param errors      (OUTPUT) the errors of the interpolated values 
+       *  @param tx          (INPUT)  interpolation type in x-direction
+       *  @param ty          (INPUT)  interpolation type in y-direction
+       *  @param edges       (INPUT)  use the special treatment of edges ? 
+       *  @param extrapolate (INPUT)  use extrapolation ? 
+       *  @param density     (INPUT)  rescale to density? 
+       *  @see Ostap::Math::HistoInterpolation::interpolate_2D
+       */
+      static void evaluate_2D
+        ( const TH2&          h2                   , 
+          const unsigned long n                    , 
+          const double*       x                    ,
+          const double*       y                    ,
+          double*             values               , 
+          double*             errors               , 
+          const Type          tx          = Linear , 
+          const Type          ty          = Linear , 
+          const bool          edges       = true   , 
+          const bool          extrapolate = false  , 
+          const bool          density     = false  ) ;
+      // ======================================================================
+      /** interpolate 3D histogram for the arrays of points 
+       *  @param h3          (INPUT)  input histogram 
+       *  @param n           (INPUT)  number of points 
+       *  @param x           (INPUT)  the x-values 
+       *  @param y           (INPUT)  the y-values 
+       *  @param z           (INPUT)  the z-values 
+       *  @param values      (OUTPUT) the interpolated values 
+       *  @param errors      (OUTPUT) the errors of the interpolated values 
+       *  @param tx          (INPUT)  interpolation type in x-direction
+       *  @param ty          (INPUT)  interpolation type in y-direction
+       *  @param tz          (INPUT)  interpolation type in z-direction
+       *  @param edges       (INPUT)  use the special treatment of edges ? 
+       *  @param extrapolate (INPUT)  use extrapolation ? 
+       *  @param density     (INPUT)  rescale to density? 
+       *  @see Ostap::Math::HistoInterpolation::interpolate_3D
+       */
+      static void evaluate_3D
+        ( const TH3&          h3                   , 
+          const unsigned long n                    , 
+          const double*       x                    ,
+          const double*       y                    ,
+          const double*       z                    ,
+          double*             values               , 
+          double*             errors               , 
+          const Type          tx          = Linear , 
+          const Type          ty          = Linear , 
+          const Type          tz          = Linear , 
+          const bool          edges       = true   , 
+          const bool          extrapolate = false  , 
+          const bool          density     = false  ) ;
+      // ======================================================================
     } ;  
     // ========================================================================
   } //                                         The end of namespace Ostap::Math
@@ -8,6 +8,8 @@
 // STD & STL
 // ============================================================================
 #include <limits>
+#include <string>
+#include <vector>
 // ============================================================================
 // Ostap
 // ============================================================================
@@ -18,6 +20,7 @@
 class TH1       ;     // ROOT 
 class TH2       ;     // ROOT 
 class TH3       ;     // ROOT 
+class TTree     ;     // ROOT 
 // =============================================================================
 class RooAbsData ; // RooFit 
 class RooAbsReal ; // RooFit 
@@ -145,6 +148,36 @@ namespace Ostap
       const unsigned long first      = 0                                         ,
       const unsigned long last       = std::numeric_limits<unsigned long>::max() ) ;
     // ========================================================================
+  public:
+    // ========================================================================
+    /** make a projection of the tree into many histograms in a single pass 
+     *  - each entry is read only once 
+     *  - each distinct expression/selection is compiled and evaluated only 
+     *    once per entry, even if it is used for many histograms 
+     *  - for 1D-histograms <code>yexpressions</code> and <code>zexpressions</code> 
+     *    items are ignored (empty strings are fine), 
+     *    for 2D-histograms <code>zexpressions</code> items are ignored 
+     *  - empty selection means "no selection"
+     *  - only the first instance of array-like expression is used 
+     *  @param tree         (INPUT)  input tree 
+     *  @param histos       (UPDATE) histograms 
+     *  @param xexpressions (INPUT)  expressions for x-axis 
+     *  @param yexpressions (INPUT)  expressions for y-axis 
+     *  @param zexpressions (INPUT)  expressions for z-axis 
+     *  @param selections   (INPUT)  selection criteria/weights 
+     *  @param first (INPUT) the first event to process 
+     *  @param last  (INPUT) the last event to process 
+     */
+    static Ostap::StatusCode projectMany
+    ( TTree*                          tree         ,
+      const std::vector<TH1*>&        histos       , 
+      const std::vector<std::string>& xexpressions ,
+      const std::vector<std::string>& yexpressions ,
+      const std::vector<std::string>& zexpressions ,
+      const std::vector<std::string>& selections   ,
+      const unsigned long first      = 0                                         ,
+      const unsigned long last       = std::numeric_limits<unsigned long>::max() ) ;
+    // ========================================================================
   };
   // ==========================================================================
 } //                                                     end of namespace Ostap
@@ -7,6 +7,8 @@
 // STD & STL
 // ============================================================================
 #include <limits>
+#include <vector>
+#include <string>
 // ============================================================================
 // Forward declarations 
 // =============================================================================
@@ -617,6 +619,32 @@ namespace Ostap
         const unsigned long first     = 0    ,
         const unsigned long last      = LAST ) ;
     // ========================================================================    
+  public:
+    // ========================================================================    
+    /** read the columns of the tree into the (row-major) buffer
+     *  for entries in [first,last) that pass the selection 
+     *  @param tree        (INPUT)  the input tree 
+     *  @param expressions (INPUT)  the column expressions 
+     *  @param cuts        (INPUT)  selection cuts 
+     *  @param buffer      (OUTPUT) the buffer of size >= (last-first)*nexpr 
+     *  @param first       (INPUT)  the first event to process 
+     *  @param last        (INPUT)  the last  event to process 
+     *  @return number of accepted rows written into the buffer 
+     *  @code
+     *  Tree& tree = ... ;
+     *  std::vector<double> buffer ( 2 * 1000 ) ;
+     *  unsigned long n = columns ( tree , { "pt" , "mass" } , "pt>3" , &buffer[0] , 0 , 1000 ) ;
+     *  @endcode 
+     *  @attention for array-like variables only the first element is read 
+     */
+    static unsigned long columns 
+      ( TTree&                          tree          , 
+        const std::vector<std::string>& expressions   , 
+        const std::string&              cuts          , 
+        double*                         buffer        , 
+        const unsigned long             first         ,
+        const unsigned long             last          ) ;
+    // ========================================================================    
   } ;
   // ==========================================================================
 } //                                                     end of namespace Ostap
@@ -53,6 +53,19 @@ namespace Ostap
       double&           tStat     ,
       RooArgSet *       args  = 0 ) ;
     // ========================================================================
+    /** evaluate PDF for all entries in dataset (batch evaluation)
+     *  @param pdf    (input)  PDF
+     *  @param data   (input)  data 
+     *  @param values (output) the buffer (at least <code>data.numEntries()</code> long)
+     *  @param args   (input)  the arguments
+     *  @return number of evaluated entries 
+     */
+    static unsigned long evaluate 
+    ( const RooAbsPdf&  pdf       , 
+      const RooDataSet& data      ,  
+      double*           values    , 
+      RooArgSet *       args  = 0 ) ;
+    // ========================================================================
   };
   // ==========================================================================
 } //                                                     end of namespace Ostap
@@ -9197,6 +9197,78 @@ Ostap::Math::HistoInterpolation::interpolate_3D
   return _bin_( h3 , ibx , iby , ibz , density ) ;  // RETURN 
 }
 
+// ============================================================================
+// interpolate 1D histogram for the array of points 
+// ============================================================================
+void Ostap::Math::HistoInterpolation::evaluate_1D
+( const TH1&                                  h1          , 
+  const unsigned long                         n           , 
+  const double*                               x           ,
+  double*                                     values      , 
+  double*                                     errors      , 
+  const Ostap::Math::HistoInterpolation::Type t           , 
+  const bool                                  edges       , 
+  const bool                                  extrapolate , 
+  const bool                                  density     ) 
+{
+  for ( unsigned long i = 0 ; i < n ; ++i ) 
+  {
+    const ValueWithError r = interpolate_1D ( h1 , x[i] , t , edges , extrapolate , density ) ;
+    values [ i ] = r.value () ;
+    errors [ i ] = r.error () ;
+  }
+}
+// ============================================================================
+// interpolate 2D histogram for the arrays of points 
+// ============================================================================
+void Ostap::Math::HistoInterpolation::evaluate_2D
+( const TH2&                                  h2          , 
+  const unsigned long                         n           , 
+  const double*                               x           ,
+  const double*                               y           ,
+  double*                                     values      , 
+  double*                                     errors      , 
+  const Ostap::Math::HistoInterpolation::Type tx          , 
+  const Ostap::Math::HistoInterpolation::Type ty          , 
+  const bool                                  edges       , 
+  const bool                                  extrapolate , 
+  const bool                                  density     ) 
+{
+  for ( unsigned long i = 0 ; i < n ; ++i ) 
+  {
+    const ValueWithError r = interpolate_2D 
+      ( h2 , x[i] , y[i] , tx , ty , edges , extrapolate , density ) ;
+    values [ i ] = r.value () ;
+    errors [ i ] = r.error () ;
+  }
+}
+// ============================================================================
+// interpolate 3D histogram for the arrays of points 
+// ============================================================================
+void Ostap::Math::HistoInterpolation::evaluate_3D
+( const TH3&                                  h3          , 
+  const unsigned long                         n           , 
+  const double*                               x           ,
+  const double*                               y           ,
+  const double*                               z           ,
+  double*                                     values      , 
+  double*                                     errors      , 
+  const Ostap::Math::HistoInterpolation::Type tx          , 
+  const Ostap::Math::HistoInterpolation::Type ty          , 
+  const Ostap::Math::HistoInterpolation::Type tz          , 
+  const bool                                  edges       , 
+  const bool                                  extrapolate , 
+  const bool                                  density     ) 
+{
+  for ( unsigned long i = 0 ; i < n ; ++i ) 
+  {
+    const ValueWithError r = interpolate_3D 
+      ( h3 , x[i] , y[i] , z[i] , tx , ty , tz , edges , extrapolate , density ) ;
+    values [ i ] = r.value () ;
+    errors [ i ] = r.error () ;
+  }
+}
+
 // ============================================================================
 // The END 
 // ============================================================================
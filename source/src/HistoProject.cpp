@@ -2,8 +2,15 @@
 // ============================================================================
 // Include files
 // ============================================================================
+// STD & STL
+// ============================================================================
+#include <map>
+#include <memory>
+#include <algorithm>
+// ============================================================================
 // ROOT 
 // ============================================================================
+#include "TTree.h"
 #include "RooDataSet.h"
 #include "RooFormulaVar.h"
 #include "TH1.h"
@@ -16,6 +23,7 @@
 #include "Ostap/Formula.h"
 #include "Ostap/HistoProject.h"
 #include "Ostap/Iterator.h"
+#include "Ostap/Notifier.h"
 // ============================================================================
 /** @file
  *  Implementation file for class Analysis::HProject
@@ -414,6 +422,139 @@ Ostap::HistoProject::project3
 // ============================================================================
 
 
+// ============================================================================
+/*  make a projection of the tree into many histograms in a single pass 
+ *  @param tree         (INPUT)  input tree 
+ *  @param histos       (UPDATE) histograms 
+ *  @param xexpressions (INPUT)  expressions for x-axis 
+ *  @param yexpressions (INPUT)  expressions for y-axis 
+ *  @param zexpressions (INPUT)  expressions for z-axis 
+ *  @param selections   (INPUT)  selection criteria/weights 
+ *  @param first (INPUT) the first event to process 
+ *  @param last  (INPUT) the last event to process 
+ */
+// ============================================================================
+Ostap::StatusCode 
+Ostap::HistoProject::projectMany
+( TTree*                          tree         ,
+  const std::vector<TH1*>&        histos       , 
+  const std::vector<std::string>& xexpressions ,
+  const std::vector<std::string>& yexpressions ,
+  const std::vector<std::string>& zexpressions ,
+  const std::vector<std::string>& selections   ,
+  const unsigned long             first        ,
+  const unsigned long             last         ) 
+{
+  //
+  if ( 0 == tree ) { return Ostap::StatusCode ( 300 ) ; }
+  //
+  const std::size_t N = histos.size() ;
+  if ( N != xexpressions.size () || 
+       N != yexpressions.size () || 
+       N != zexpressions.size () || 
+       N != selections  .size () ) { return Ostap::StatusCode ( 305 ) ; }
+  //
+  // the distinct formulae: shared expressions are compiled only once 
+  std::map<std::string,int>                     index    ;
+  std::vector<std::unique_ptr<Ostap::Formula> > formulae ;
+  auto _index_ = [&index,&formulae,tree] ( const std::string& expression ) -> int 
+    {
+      if ( expression.empty() ) { return -1 ; }
+      auto found = index.find ( expression ) ;
+      if ( index.end() != found ) { return found->second ; }
+      const int i = formulae.size() ;
+      formulae.push_back ( std::make_unique<Ostap::Formula> 
+                           ( "pmany_" + std::to_string ( i ) , expression , tree ) ) ;
+      index [ expression ] = i ;
+      return i ;
+    } ;
+  //
+  struct Item 
+  {
+    TH1* histo ;
+    int  dim   ;
+    int  x     ;
+    int  y     ;
+    int  z     ;
+    int  w     ;
+  } ;
+  //
+  std::vector<Item> items ; items.reserve ( N ) ;
+  for ( std::size_t i = 0 ; i < N ; ++i ) 
+  {
+    TH1* histo = histos [ i ] ;
+    if ( 0 == histo ) { return Ostap::StatusCode ( 301 ) ; }
+    else { histo->Reset() ; } // reset the historgam 
+    //
+    const int dim = histo->GetDimension() ;
+    Item item { histo , dim , 
+        _index_ (                xexpressions [ i ]        ) , 
+        _index_ ( 2 <= dim ? yexpressions [ i ] : std::string() ) , 
+        _index_ ( 3 <= dim ? zexpressions [ i ] : std::string() ) , 
+        _index_ (                selections   [ i ]        ) } ;
+    //
+    if ( item.x < 0                  ) { return Ostap::StatusCode ( 303 ) ; }
+    if ( 2 <= dim && item.y < 0      ) { return Ostap::StatusCode ( 304 ) ; }
+    if ( 3 <= dim && item.z < 0      ) { return Ostap::StatusCode ( 306 ) ; }
+    //
+    items.push_back ( item ) ;
+  }
+  //
+  for ( const auto& f : formulae ) 
+  { if ( !f || !f->ok() ) { return Ostap::StatusCode ( 302 ) ; } }
+  //
+  const unsigned long nEntries = std::min ( last , (unsigned long) tree->GetEntries() ) ;
+  if ( nEntries <= first  ) { return Ostap::StatusCode::SUCCESS ; }
+  //
+  std::vector<TObject*> objects ;
+  for ( const auto& f : formulae ) { objects.push_back ( f.get() ) ; }
+  Ostap::Utils::Notifier notify ( objects.begin() , objects.end() , tree ) ;
+  //
+  // per-entry cache of the evaluated formulae 
+  std::vector<double> values ( formulae.size () , 0.0   ) ;
+  std::vector<bool>   ready  ( formulae.size () , false ) ;
+  auto _value_ = [&values,&ready,&formulae] ( const int i ) -> double 
+    {
+      if ( !ready [ i ] ) 
+      {
+        values [ i ] = formulae [ i ] -> evaluate () ;
+        ready  [ i ] = true ;
+      }
+      return values [ i ] ;
+    } ;
+  //
+  for ( unsigned long entry = first ; entry < nEntries ; ++entry ) 
+  {
+    //
+    long ievent = tree->GetEntryNumber ( entry ) ;
+    if ( 0 > ievent ) { break ; }                        // BREAK
+    //
+    ievent      = tree->LoadTree ( ievent ) ;
+    if ( 0 > ievent ) { break ; }                        // BREAK
+    //
+    std::fill ( ready.begin() , ready.end() , false ) ;
+    //
+    for ( const Item& item : items ) 
+    {
+      // calculate the weight 
+      const double w = 0 <= item.w ? _value_ ( item.w ) : 1.0 ;
+      // skip null weights 
+      if ( !w ) { continue ; }
+      // calculate the values and fill the histogram (only for non-zero weights)
+      if      ( 1 == item.dim ) 
+      { item.histo->Fill ( _value_ ( item.x ) , w ) ; }
+      else if ( 2 == item.dim ) 
+      { static_cast<TH2*> ( item.histo ) -> Fill ( _value_ ( item.x ) , 
+                                                   _value_ ( item.y ) , w ) ; }
+      else if ( 3 == item.dim ) 
+      { static_cast<TH3*> ( item.histo ) -> Fill ( _value_ ( item.x ) , 
+                                                   _value_ ( item.y ) , 
+                                                   _value_ ( item.z ) , w ) ; }
+    }
+  }
+  //
+  return StatusCode::SUCCESS ;  
+}
 // ============================================================================
 // The END 
 // ============================================================================
@@ -2201,5 +2201,82 @@ Ostap::StatVar::quantiles
                        first , the_last , cutrange ) ;
 }
 // ============================================================================
+/*  read the columns of the tree into the (row-major) buffer
+ *  for entries in [first,last) that pass the selection 
+ *  @param tree        (INPUT)  the input tree 
+ *  @param expressions (INPUT)  the column expressions 
+ *  @param cuts        (INPUT)  selection cuts 
+ *  @param buffer      (OUTPUT) the buffer of size >= (last-first)*nexpr 
+ *  @param first       (INPUT)  the first event to process 
+ *  @param last        (INPUT)  the last  event to process 
+ *  @return number of accepted rows written into the buffer 
+ *  @attention for array-like variables only the first element is read 
+ */
+// ============================================================================
+unsigned long 
+Ostap::StatVar::columns 
+( TTree&                          tree        , 
+  const std::vector<std::string>& expressions , 
+  const std::string&              cuts        , 
+  double*                         buffer      , 
+  const unsigned long             first       ,
+  const unsigned long             last        ) 
+{
+  Ostap::Assert ( nullptr != buffer          , 
+                  "Invalid buffer"           ,
+                  "Ostap::StatVar::columns"  ) ;
+  Ostap::Assert ( !expressions.empty()       , 
+                  "No expressions"           ,
+                  "Ostap::StatVar::columns"  ) ;
+  //
+  std::vector<std::unique_ptr<Ostap::Formula> > formulae ;
+  formulae.reserve ( expressions.size() ) ;
+  for ( const std::string& expr : expressions ) 
+  {
+    formulae.push_back ( std::make_unique<Ostap::Formula> ( "" , expr , &tree ) ) ;
+    Ostap::Assert ( formulae.back()->ok()                  , 
+                    "Invalid expression:\"" + expr + "\"" ,
+                    "Ostap::StatVar::columns"              ) ;
+  }
+  //
+  std::unique_ptr<Ostap::Formula> cut { nullptr } ;
+  if  ( !cuts.empty() ) 
+  { 
+    cut = std::make_unique<Ostap::Formula>( "", cuts , &tree ) ; 
+    Ostap::Assert ( cut && cut->ok()               , 
+                    "Invalid cut:\"" + cuts + "\"" ,
+                    "Ostap::StatVar::columns"      ) ;
+  }
+  //
+  const unsigned long the_last = std::min ( last , (unsigned long) tree.GetEntries() ) ;
+  if ( the_last <= first ) { return 0 ; }                  // RETURN 
+  //
+  std::vector<TObject*> objects ;
+  for ( const auto& f : formulae ) { objects.push_back ( f.get() ) ; }
+  if ( cut ) { objects.push_back ( cut.get() ) ; }
+  Ostap::Utils::Notifier notify ( objects.begin() , objects.end() , &tree ) ;
+  //
+  const std::size_t nvars = formulae.size() ;
+  unsigned long     rows  = 0 ;
+  double*           row   = buffer ;
+  for ( unsigned long entry = first ; entry < the_last ; ++entry ) 
+  {      
+    long ievent = tree.GetEntryNumber ( entry ) ;
+    if ( 0 > ievent ) { break ; }                        // BREAK
+    //
+    ievent      = tree.LoadTree ( ievent ) ;
+    if ( 0 > ievent ) { break ; }                        // BREAK
+    //
+    if ( cut && !cut->evaluate() ) { continue ; }        // CONTINUE       
+    //
+    for ( std::size_t i = 0 ; i < nvars ; ++i ) { row [ i ] = formulae [ i ]->evaluate() ; }
+    //
+    row += nvars ;
+    ++rows ;
+  }
+  //
+  return rows ;
+}
+// ============================================================================
 // The END
 // ============================================================================
@@ -178,5 +178,59 @@ Ostap::StatusCode Ostap::UStat::calculate
   return Ostap::StatusCode::SUCCESS ;
 }
 // ============================================================================
+/*  evaluate PDF for all entries in dataset (batch evaluation)
+ *  @param pdf    (input)  PDF
+ *  @param data   (input)  data 
+ *  @param values (output) the buffer (at least <code>data.numEntries()</code> long)
+ *  @param args   (input)  the arguments
+ *  @return number of evaluated entries 
+ */
+// ============================================================================
+unsigned long Ostap::UStat::evaluate 
+( const RooAbsPdf&  pdf    , 
+  const RooDataSet& data   ,  
+  double*           values , 
+  RooArgSet*        args   ) 
+{
+  //
+  if ( 0 == values ) { return 0 ; }
+  // the observables, created here, are owned (and deleted) by this function 
+  std::unique_ptr<RooArgSet> owned ;
+  if ( 0 == args   ) { owned.reset ( pdf.getObservables ( data ) ) ; args = owned.get() ; }
+  if ( 0 == args   ) { return 0 ; }
+  //
+  const unsigned long num = data.numEntries () ;
+  //
+  typedef std::pair<RooRealVar*,const RooAbsReal*> PAIR  ;
+  typedef std::vector<PAIR>                        PAIRS ;
+  PAIRS pairs ;
+  //
+  for ( unsigned long i = 0 ; i < num ; ++i ) 
+  {
+    const RooArgSet* event = data.get ( i ) ;
+    if ( 0 == event ) { return i ; }                               // RETURN
+    //
+    // the dataset row is the same object for all entries 
+    if ( 0 == i ) 
+    {
+      Ostap::Utils::Iterator iter ( *args ) ;
+      RooAbsArg* arg = 0 ;
+      while ( ( arg = (RooAbsArg*) iter.next() ) ) 
+      {
+        RooRealVar*       var = dynamic_cast<RooRealVar*>       ( arg ) ;
+        const RooAbsReal* val = dynamic_cast<const RooAbsReal*> ( event->find ( arg->GetName() ) ) ;
+        if ( 0 != var && 0 != val ) { pairs.push_back ( PAIR ( var , val ) ) ; }
+      }
+    }
+    //
+    for ( PAIRS::const_iterator p = pairs.begin() ; pairs.end() != p ; ++p ) 
+    { p->first->setVal ( p->second->getVal() ) ; }
+    //
+    values [ i ] = pdf.getVal ( args ) ;
+  }
+  //
+  return num ;
+}
+// ============================================================================
 // The END 
 // ============================================================================